@@ -0,0 +1 @@
+# Este archivo permite que la carpeta benchmarks sea reconocida como un paquete de Python
@@ -0,0 +1,87 @@
+"""
+Benchmark de la base de auditoría: costo de registrar en la bitácora dentro de
+una transacción de negocio, con la bitácora en la base principal o en su propia
+base (correr dos veces, sin y con AUDIT_DB_NAME, y comparar).
+"""
+import threading
+import time
+from statistics import median
+
+from django.db import close_old_connections, connections, router, transaction
+from django.utils import timezone
+
+from bitacora.models import Bitacora
+from bitacora.utils import registrar_bitacora
+
+from .base_benchmark import BaseBenchmark
+
+HILOS = 8
+
+
+class AuditoriaBenchmark(BaseBenchmark):
+    """Transacción de login: SELECT FOR UPDATE + UPDATE del usuario + registro en la bitácora"""
+
+    descripcion = "Bitácora en la base principal vs base de auditoría (AUDIT_DB_NAME)"
+
+    @classmethod
+    def run(cls, iteraciones, escala):
+        base = router.db_for_write(Bitacora)
+        usuarios = [cls.crear_usuario(f"auditoria_{i}")[0] for i in range(HILOS)]
+        resultados = []
+
+        usuario = usuarios[0]
+        metricas = cls.cronometrar(
+            lambda: registrar_bitacora(usuario=usuario, accion="Login Cliente", modulo="USUARIOS"),
+            iteraciones,
+        )
+        resultados.append({"escenario": f"registrar_bitacora · bitácora en '{base}'", **metricas})
+
+        bloqueos = []
+        metricas = cls.cronometrar(lambda: cls._login(usuario, bloqueos), iteraciones)
+        resultados.append({
+            "escenario": f"transacción de login · bitácora en '{base}'",
+            **metricas,
+            "fila_bloqueada_p50_ms": round(median(bloqueos) * 1000, 3),
+        })
+
+        # Concurrencia: cada hilo con su usuario y su conexión
+        total = iteraciones * escala
+        bloqueos = []
+        errores = []
+
+        def trabajar(usuario):
+            try:
+                for _ in range(total):
+                    cls._login(usuario, bloqueos)
+            except Exception as exc:  # pragma: no cover - se reporta en el resultado
+                errores.append(exc)
+            finally:
+                close_old_connections()
+                for conexion in connections.all(initialized_only=True):
+                    conexion.close()
+
+        hilos = [threading.Thread(target=trabajar, args=(u,)) for u in usuarios]
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        duracion = time.perf_counter() - inicio
+        bloqueos.sort()
+        resultados.append({
+            "escenario": f"{HILOS} hilos de login · bitácora en '{base}'",
+            "ops_seg": round(HILOS * total / duracion, 1),
+            "fila_bloqueada_p50_ms": round(median(bloqueos) * 1000, 3),
+            "fila_bloqueada_p99_ms": round(bloqueos[int(len(bloqueos) * 0.99)] * 1000, 3),
+            "errores": len(errores),
+        })
+        return resultados
+
+    @staticmethod
+    def _login(usuario, bloqueos):
+        """Como un login: la fila del usuario queda bloqueada hasta el COMMIT"""
+        with transaction.atomic():
+            type(usuario).objects.select_for_update().filter(pk=usuario.pk).update(last_login=timezone.now())
+            desde = time.perf_counter()
+            registrar_bitacora(usuario=usuario, accion="Login Cliente", modulo="USUARIOS")
+        bloqueos.append(time.perf_counter() - desde)
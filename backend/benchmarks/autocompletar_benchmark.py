@@ -0,0 +1,60 @@
+"""
+Benchmark del autocompletado: prefijos de 2-3 letras contra /api/autocompletar/
+frente a la búsqueda que usaban los selectores (/api/users/search/).
+"""
+import time
+
+from django.contrib.auth import get_user_model
+
+from core import autocompletar
+
+from .base_benchmark import BaseBenchmark, WSGIClient
+from .busqueda_benchmark import BusquedaBenchmark
+
+
+class AutocompletarBenchmark(BaseBenchmark):
+    """Puebla `escala x 100.000` usuarios y mide latencia por prefijo"""
+
+    descripcion = "Autocompletado id/label (índice en memoria) vs user_search"
+
+    PREFIJOS = ["jo", "per", "mar", "usu", "nu"]
+
+    @classmethod
+    def run(cls, iteraciones, escala):
+        _, token = cls.crear_usuario(is_superuser=True)
+        BusquedaBenchmark._poblar(escala * 100_000)
+        client = WSGIClient(token=token)
+
+        inicio = time.perf_counter()
+        indice = autocompletar.obtener_indice("usuarios")
+        resultados = [{
+            "escenario": f"construcción del índice ({len(indice)} usuarios)",
+            "segundos": round(time.perf_counter() - inicio, 2),
+        }]
+
+        for prefijo in cls.PREFIJOS:
+            ruta = f"/api/autocompletar/?recurso=usuarios&q={prefijo}"
+            assert client.get(ruta)[0] == 200
+            metricas = cls.cronometrar(lambda: client.get(ruta), iteraciones)
+            resultados.append({"escenario": f"autocompletar '{prefijo}'", **metricas})
+
+        # Un usuario cambia de nombre: solo esa fila se vuelve a leer y se aplica sobre una copia
+        usuario = get_user_model().objects.order_by("id").last()
+        nombres = iter(range(10**9))
+
+        def renombrar():
+            usuario.first_name = f"Nombre{next(nombres)}"
+            usuario.save(update_fields=["first_name"])
+            autocompletar.obtener_indice("usuarios")
+
+        metricas = cls.cronometrar(renombrar, max(1, iteraciones // 20))
+        resultados.append({"escenario": "guardar un usuario + aplicar el cambio al índice", **metricas})
+
+        # Solo la consulta al índice, sin HTTP/autenticación
+        metricas = cls.cronometrar(lambda: indice.buscar(cls.PREFIJOS[0], 10), iteraciones)
+        resultados.append({"escenario": f"índice.buscar '{cls.PREFIJOS[0]}' (sin HTTP)", **metricas})
+
+        ruta = f"/api/users/search/?q={cls.PREFIJOS[0]}"
+        metricas = cls.cronometrar(lambda: client.get(ruta), max(1, iteraciones // 20))
+        resultados.append({"escenario": f"user_search '{cls.PREFIJOS[0]}' (antes)", **metricas})
+        return resultados
@@ -0,0 +1,126 @@
+"""
+Módulo base para benchmarks que proporciona funcionalidad común.
+"""
+import io
+import time
+from statistics import median
+from unittest import mock
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.test.client import RequestFactory
+
+
+class BaseBenchmark:
+    """
+    Clase base para todos los benchmarks.
+
+    Cada benchmark implementa run() y retorna una lista de escenarios medidos;
+    cada escenario es un diccionario con la clave "escenario" y sus métricas.
+    """
+
+    descripcion = ""
+
+    @classmethod
+    def run(cls, iteraciones, escala):
+        """
+        Método principal para ejecutar el benchmark.
+        Implementa la lógica específica en las clases hijas.
+        """
+        raise NotImplementedError("Cada benchmark debe implementar su método run()")
+
+    @staticmethod
+    def cronometrar(func, iteraciones):
+        """
+        Ejecuta func() la cantidad de veces indicada y retorna
+        operaciones por segundo y latencias p50/p99 en milisegundos.
+        """
+        tiempos = []
+        inicio = time.perf_counter()
+        for _ in range(iteraciones):
+            t0 = time.perf_counter()
+            func()
+            tiempos.append(time.perf_counter() - t0)
+        total = time.perf_counter() - inicio
+
+        tiempos.sort()
+        p99 = tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.99))]
+        return {
+            "ops_seg": round(iteraciones / total, 1) if total else 0.0,
+            "p50_ms": round(median(tiempos) * 1000, 3),
+            "p99_ms": round(p99 * 1000, 3),
+        }
+
+    @staticmethod
+    def sin_throttling():
+        """
+        Context manager que desactiva los límites de DEFAULT_THROTTLE_RATES,
+        para benchmarks que repiten muchas veces un endpoint público
+        """
+        from rest_framework.throttling import SimpleRateThrottle
+
+        rates = SimpleRateThrottle.THROTTLE_RATES
+        return mock.patch.dict(rates, {scope: None for scope in rates})
+
+    @staticmethod
+    def crear_usuario(username="benchmark", **extra):
+        """Crea (o reutiliza) un usuario para los benchmarks y retorna (usuario, token_acceso)"""
+        from django.contrib.auth import get_user_model
+        from users.tokens import RefreshToken
+
+        User = get_user_model()
+        user, created = User.objects.get_or_create(
+            username=username,
+            defaults={"email": f"{username}@benchmark.local", **extra},
+        )
+        if created:
+            user.set_password("benchmark")
+            user.save()
+        return user, str(RefreshToken.for_user(user).access_token)
+
+
+class WSGIClient:
+    """
+    Cliente mínimo que invoca la aplicación WSGI real.
+
+    A diferencia de django.test.Client, emite las señales request_started y
+    request_finished, por lo que el manejo de conexiones (CONN_MAX_AGE) y
+    los middlewares se comportan igual que detrás de gunicorn.
+    """
+
+    def __init__(self, token=None):
+        self.handler = WSGIHandler()
+        self.factory = RequestFactory()
+        self.token = token
+
+    def request(self, method, path, data=None, headers=None):
+        headers = dict(headers or {})
+        if self.token:
+            headers.setdefault("Authorization", f"Bearer {self.token}")
+
+        builder = getattr(self.factory, method.lower())
+        if data is not None:
+            request = builder(path, data=data, content_type="application/json", headers=headers)
+        else:
+            request = builder(path, headers=headers)
+
+        environ = request.environ
+        environ.setdefault("wsgi.input", io.BytesIO())
+        estado = {}
+
+        def start_response(status, response_headers, exc_info=None):
+            estado["status"] = int(status.split(" ", 1)[0])
+            estado["headers"] = dict(response_headers)
+
+        cuerpo = self.handler(environ, start_response)
+        try:
+            contenido = b"".join(cuerpo)
+        finally:
+            if hasattr(cuerpo, "close"):
+                cuerpo.close()
+        return estado["status"], estado["headers"], contenido
+
+    def get(self, path, headers=None):
+        return self.request("GET", path, headers=headers)
+
+    def post(self, path, data=None, headers=None):
+        return self.request("POST", path, data=data if data is not None else {}, headers=headers)
@@ -0,0 +1,93 @@
+"""
+Benchmark del archivo Parquet de la bitácora: GROUP BY en PostgreSQL contra la
+misma agregación sobre el archivo (bitacora/archivo.py), y tamaño de cada uno.
+"""
+import random
+import tempfile
+from datetime import datetime
+
+from django.db import connections, router
+from django.db.models import Count
+from django.test import override_settings
+
+from bitacora import archivo
+from bitacora.models import Bitacora
+
+from .base_benchmark import BaseBenchmark
+from .bitacora_dimensiones_benchmark import ACCIONES, PLANTILLAS_UA
+
+MODULOS = ["USUARIOS", "TRANSPORTE", "CONDUCTORES", "PERSONAL", "GENERAL"]
+MESES = ["2025-01", "2025-02", "2025-03"]
+
+
+class BitacoraArchivoBenchmark(BaseBenchmark):
+    """`escala x 30000` registros en 3 meses cerrados, 5 módulos y 14 acciones"""
+
+    descripcion = "Bitácora: agregaciones en PostgreSQL vs archivo Parquet (zstd, diccionario)"
+
+    @classmethod
+    def run(cls, iteraciones, escala):
+        if not archivo.disponible():
+            return [{"escenario": "pyarrow no está instalado"}]
+        filas = escala * 30000
+        cls._sembrar(filas)
+
+        with tempfile.TemporaryDirectory() as carpeta, override_settings(BITACORA_ARCHIVO_DIR=carpeta):
+            exportacion = cls.cronometrar(lambda: [archivo.exportar_mes(mes) for mes in MESES], 1)
+            with connections[router.db_for_write(Bitacora)].cursor() as cursor:
+                cursor.execute("VACUUM ANALYZE bitacora_bitacora")
+                cursor.execute("SELECT pg_total_relation_size('bitacora_bitacora')")
+                base_bytes = cursor.fetchone()[0]
+            archivo_bytes = sum(f.stat().st_size for f in archivo.directorio().rglob("*.parquet"))
+
+            resultados = [
+                {"escenario": "tamaño · PostgreSQL (tabla + índices)", "mb": round(base_bytes / 2**20, 2)},
+                {"escenario": "tamaño · Parquet", "mb": round(archivo_bytes / 2**20, 2)},
+                {"escenario": f"exportar {len(MESES)} meses", **exportacion},
+            ]
+            consultas = {
+                "por módulo y acción": (
+                    ("modulo", "tipo_accion__nombre"), {}, ("modulo", "accion"), {},
+                ),
+                "por mes y navegador": (
+                    ("agente__navegador",), {}, ("anio_mes", "navegador"), {},
+                ),
+                "un mes, por acción": (
+                    ("tipo_accion__nombre",), {"fecha_hora__gte": datetime(2025, 2, 1),
+                                               "fecha_hora__lt": datetime(2025, 3, 1)},
+                    ("accion",), {"desde": "2025-02", "hasta": "2025-02"},
+                ),
+            }
+            for nombre, (campos_orm, filtros_orm, agrupar, filtros) in consultas.items():
+                def postgres():
+                    return list(
+                        Bitacora.objects.filter(**filtros_orm).values(*campos_orm)
+                        .annotate(total=Count("id")).order_by("-total")
+                    )
+
+                metricas = cls.cronometrar(postgres, iteraciones)
+                resultados.append({"escenario": f"{nombre} · PostgreSQL", **metricas})
+                metricas = cls.cronometrar(lambda: archivo.agregar(agrupar, **filtros), iteraciones)
+                resultados.append({"escenario": f"{nombre} · Parquet", **metricas})
+        return resultados
+
+    @staticmethod
+    def _sembrar(filas):
+        azar = random.Random(44)
+        agentes = [p.format(v=v) for p in PLANTILLAS_UA for v in range(50)]
+        inicio = datetime(2025, 1, 1)
+        paso = (datetime(2025, 4, 1) - inicio) / filas
+        Bitacora.objects.bulk_create(
+            (
+                Bitacora(
+                    accion=azar.choice(ACCIONES),
+                    user_agent=azar.choice(agentes),
+                    descripcion=f"Registro {i}",
+                    modulo=azar.choice(MODULOS),
+                    ip=f"10.0.{i % 256}.{i % 199}",
+                    fecha_hora=inicio + paso * i,
+                )
+                for i in range(filas)
+            ),
+            batch_size=5000,
+        )
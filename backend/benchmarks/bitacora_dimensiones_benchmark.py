@@ -0,0 +1,134 @@
+"""
+Benchmark de las tablas de dimensión de la bitácora: tamaño de tabla e índices y
+tiempo de recorrido con acción y user agent como FK, contra la misma data con las
+columnas de texto de antes (se reconstruye en una tabla aparte).
+"""
+import random
+from datetime import datetime, timedelta
+
+from django.db import connections, router
+
+from bitacora import dimensiones
+from bitacora.models import Bitacora
+
+from .base_benchmark import BaseBenchmark
+
+ACCIONES = [
+    "Login Cliente", "Login Administrativo", "Logout", "Crear", "Actualizar", "Eliminar",
+    "Creación Usuario", "Actualización Usuario", "Eliminación Usuario", "Cambio Contraseña",
+    "Actualización Perfil", "Cambio Estado Usuario", "Registro Cliente", "Verificación Cliente",
+]
+
+PLANTILLAS_UA = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{v}.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.{v} Safari/605.1.15",
+    "Mozilla/5.0 (Linux; Android 13; SM-A{v}) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Mobile Safari/537.36",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_{v} like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148",
+    "Mozilla/5.0 (X11; Linux x86_64; rv:{v}.0) Gecko/20100101 Firefox/{v}.0",
+    "Dart/3.{v} (dart:io)",
+]
+
+TEXTO = "bench_bitacora_texto"
+
+
+class BitacoraDimensionesBenchmark(BaseBenchmark):
+    """`escala x 20000` registros con 14 acciones y ~300 user agents distintos"""
+
+    descripcion = "Bitácora: acción y user agent como FK a dimensiones vs texto por fila"
+
+    @classmethod
+    def run(cls, iteraciones, escala):
+        filas = escala * 20000
+        cls._sembrar(filas)
+        cls._tabla_texto()
+
+        resultados = [
+            {"escenario": "tamaño · dimensiones (FK)", **cls._tamanos("bitacora_bitacora")},
+            {"escenario": "tamaño · texto (antes)", **cls._tamanos(TEXTO)},
+        ]
+        consultas = {
+            "recorrido completo": ("SELECT count(*) FROM {t} WHERE descripcion <> ''", None),
+            "filtro por acción": (
+                "SELECT count(*) FROM {t} WHERE {accion}",
+                ("tipo_accion_id = (SELECT id FROM bitacora_accionbitacora WHERE nombre = 'Crear')",
+                 "accion = 'Crear'"),
+            ),
+        }
+        with connections[router.db_for_write(Bitacora)].cursor() as cursor:
+            cursor.execute("SET max_parallel_workers_per_gather = 0")
+            for nombre, (sql, condiciones) in consultas.items():
+                for tabla, etiqueta, indice in (("bitacora_bitacora", "dimensiones", 0), (TEXTO, "texto", 1)):
+                    sentencia = sql.format(t=tabla, accion=condiciones[indice] if condiciones else "")
+                    metricas = cls.cronometrar(lambda: cursor.execute(sentencia) or cursor.fetchone(), iteraciones)
+                    resultados.append({"escenario": f"{nombre} · {etiqueta}", **metricas})
+            cursor.execute("RESET max_parallel_workers_per_gather")
+            cursor.execute(f"DROP TABLE {TEXTO}")
+
+        # Escritura: con las caches tibias internar es un lookup en memoria
+        dimensiones.limpiar_caches()
+        agente = PLANTILLAS_UA[0].format(v=120)
+        metricas = cls.cronometrar(
+            lambda: Bitacora.objects.create(accion="Crear", user_agent=agente, descripcion="alta"),
+            iteraciones,
+        )
+        resultados.append({"escenario": "INSERT vía ORM (caches tibias)", **metricas})
+        return resultados
+
+    @staticmethod
+    def _sembrar(filas):
+        azar = random.Random(43)
+        agentes = [p.format(v=v) for p in PLANTILLAS_UA for v in range(50)]
+        inicio = datetime(2025, 1, 1)
+        Bitacora.objects.bulk_create(
+            (
+                Bitacora(
+                    accion=azar.choice(ACCIONES),
+                    user_agent=azar.choice(agentes),
+                    descripcion=f"Registro {i}",
+                    modulo="GENERAL",
+                    ip="10.0.0.1",
+                    fecha_hora=inicio + timedelta(seconds=i * 30),
+                )
+                for i in range(filas)
+            ),
+            batch_size=5000,
+        )
+
+    @staticmethod
+    def _tabla_texto():
+        """La misma data con el esquema anterior: accion y user_agent como texto en cada fila"""
+        with connections[router.db_for_write(Bitacora)].cursor() as cursor:
+            cursor.execute(f"""
+                CREATE TABLE {TEXTO} AS
+                SELECT b.id, b.usuario_id, COALESCE(a.nombre, '') AS accion, b.descripcion,
+                       b.fecha_hora, b.ip, COALESCE(u.texto, '') AS user_agent, b.modulo
+                FROM bitacora_bitacora b
+                LEFT JOIN bitacora_accionbitacora a ON a.id = b.tipo_accion_id
+                LEFT JOIN bitacora_useragent u ON u.id = b.agente_id
+            """)
+            cursor.execute(f"ALTER TABLE {TEXTO} ADD PRIMARY KEY (id)")
+            cursor.execute(f"CREATE INDEX {TEXTO}_accion ON {TEXTO} (accion, fecha_hora DESC)")
+            cursor.execute(f"ANALYZE {TEXTO}")
+            # Índices recién construidos en las dos tablas, para comparar sin el espacio
+            # libre que dejan las inserciones una a una
+            cursor.execute("REINDEX TABLE bitacora_bitacora")
+            cursor.execute("ANALYZE bitacora_bitacora")
+
+    @staticmethod
+    def _tamanos(tabla):
+        with connections[router.db_for_write(Bitacora)].cursor() as cursor:
+            indice = "bitacora_accion_fecha_idx" if tabla == "bitacora_bitacora" else f"{TEXTO}_accion"
+            # pg_table_size incluye TOAST, donde terminan los textos largos
+            cursor.execute("SELECT pg_table_size(%s), pg_relation_size(%s)", [tabla, indice])
+            tabla_bytes, indice_bytes = cursor.fetchone()
+            if tabla == "bitacora_bitacora":
+                # Las dimensiones también ocupan lugar
+                cursor.execute(
+                    "SELECT pg_total_relation_size('bitacora_accionbitacora')"
+                    " + pg_total_relation_size('bitacora_useragent')"
+                )
+                tabla_bytes += cursor.fetchone()[0]
+        return {
+            "tabla_mb": round(tabla_bytes / 2**20, 2),
+            "indice_accion_mb": round(indice_bytes / 2**20, 2),
+        }
@@ -0,0 +1,92 @@
+"""
+Benchmark de los filtros de la bitácora: la búsqueda libre (OR de icontains)
+contra los filtros por usuario, módulo y fechas con sus índices compuestos.
+"""
+import random
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connections, router
+
+from bitacora.dimensiones import id_autor
+from bitacora.models import Bitacora
+from bitacora.views import filtrar_bitacora
+
+from .base_benchmark import BaseBenchmark
+
+
+class BitacoraFiltrosBenchmark(BaseBenchmark):
+    """Primera página (COUNT + 10 filas) sobre `escala x 20000` registros"""
+
+    descripcion = "Bitácora: búsqueda libre vs filtros indexados (usuario, módulo, fechas)"
+
+    @classmethod
+    def _sembrar(cls, filas):
+        User = get_user_model()
+        usuarios = [
+            User.objects.get_or_create(username=f"auditoria{i}", defaults={"email": f"auditoria{i}@bench.com"})[0]
+            for i in range(50)
+        ]
+        # bulk_create no pasa por save(): la copia de cada usuario se asigna aquí
+        pares = [(usuario, id_autor(usuario)[0]) for usuario in usuarios]
+        modulos = [m[0] for m in Bitacora.MODULOS]
+        inicio = datetime(2025, 1, 1)
+        azar = random.Random(41)
+        Bitacora.objects.bulk_create(
+            (
+                Bitacora(
+                    usuario=usuario,
+                    autor_id=autor_id,
+                    accion=azar.choice(["Login", "Logout", "Crear", "Actualizar", "Eliminar"]),
+                    descripcion=f"Registro {i}",
+                    modulo=azar.choice(modulos),
+                    ip=f"10.0.{azar.randrange(8)}.{azar.randrange(250)}",
+                    fecha_hora=inicio + timedelta(minutes=i * 5),
+                )
+                for i in range(filas)
+                for usuario, autor_id in [azar.choice(pares)]
+            ),
+            batch_size=5000,
+        )
+        with connections[router.db_for_write(Bitacora)].cursor() as cursor:
+            cursor.execute("ANALYZE bitacora_bitacora")
+        return usuarios[7]
+
+    @staticmethod
+    def _pagina(params):
+        queryset = filtrar_bitacora(params)
+        return queryset.count(), list(queryset[:10])
+
+    @classmethod
+    def run(cls, iteraciones, escala):
+        usuario = cls._sembrar(escala * 20000)
+        escenarios = {
+            "search (OR de icontains)": {"search": usuario.username},
+            "usuario_id": {"usuario_id": str(usuario.pk)},
+            "usuario_id + modulo + desde/hasta": {
+                "usuario_id": str(usuario.pk), "modulo": "TRANSPORTE",
+                "desde": "2025-01-10", "hasta": "2025-02-10",
+            },
+            "modulo + desde/hasta": {"modulo": "PAGOS", "desde": "2025-01-10", "hasta": "2025-01-20"},
+            "ip": {"ip": "10.0.3.17"},
+        }
+
+        resultados = []
+        for nombre, params in escenarios.items():
+            filas = cls._pagina(params)[0]
+            metricas = cls.cronometrar(lambda: cls._pagina(params), iteraciones)
+            resultados.append({"escenario": f"{nombre} · con índices", "filas": filas, **metricas})
+
+        # Los mismos filtros sin poder usar los índices nuevos: el plan de antes
+        with connections[router.db_for_write(Bitacora)].cursor() as cursor:
+            cursor.execute("SET enable_indexscan = off")
+            cursor.execute("SET enable_bitmapscan = off")
+        try:
+            for nombre, params in list(escenarios.items())[1:]:
+                metricas = cls.cronometrar(lambda: cls._pagina(params), iteraciones)
+                resultados.append({"escenario": f"{nombre} · sin índices", **metricas})
+        finally:
+            with connections[router.db_for_write(Bitacora)].cursor() as cursor:
+                cursor.execute("RESET enable_indexscan")
+                cursor.execute("RESET enable_bitmapscan")
+        return resultados
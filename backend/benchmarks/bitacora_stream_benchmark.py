@@ -0,0 +1,69 @@
+"""
+Benchmark del live-tail de la bitácora: latencia de entrega a N clientes y
+consultas a la base, comparado con que cada cliente haga su propio polling.
+"""
+import time
+from statistics import median
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test.utils import override_settings
+
+from bitacora.difusor import Difusor, Filtro, difusor
+from bitacora.models import Bitacora
+
+from .base_benchmark import BaseBenchmark
+
+
+class BitacoraStreamBenchmark(BaseBenchmark):
+    """1, 10 y `escala x 100` clientes conectados; `iteraciones` registros nuevos"""
+
+    descripcion = "Live-tail SSE de bitácora: un lector por proceso para N clientes"
+
+    @classmethod
+    def run(cls, iteraciones, escala):
+        resultados = []
+        for clientes in (1, 10, escala * 100):
+            resultados.append(async_to_sync(cls._escenario)(clientes, iteraciones))
+        return resultados
+
+    @classmethod
+    async def _escenario(cls, clientes, iteraciones):
+        lecturas = 0
+        leer_nuevos = Difusor.leer_nuevos
+
+        async def contar(self):
+            nonlocal lecturas
+            lecturas += 1
+            return await leer_nuevos(self)
+
+        with override_settings(BITACORA_STREAM_INTERVALO_SEG=1, BITACORA_STREAM_MAX_CONEXIONES=100000), \
+                mock.patch.object(Difusor, "leer_nuevos", contar):
+            suscripciones = [await difusor.suscribir(Filtro()) for _ in range(clientes)]
+            tiempos = []
+            inicio = time.perf_counter()
+            for i in range(iteraciones):
+                t0 = time.perf_counter()
+                await Bitacora.objects.acreate(accion="Benchmark", descripcion=f"Evento {i}")
+                # Lo que hace el post_save al confirmar
+                difusor.despertar()
+                for suscripcion in suscripciones:
+                    await suscripcion.cola.get()
+                tiempos.append(time.perf_counter() - t0)
+            total = time.perf_counter() - inicio
+
+            for suscripcion in suscripciones:
+                difusor.desuscribir(suscripcion)
+            await difusor._tarea
+
+        tiempos.sort()
+        return {
+            "escenario": f"{clientes} clientes",
+            "eventos": iteraciones,
+            "lecturas_db": lecturas,
+            # Con polling, cada cliente consulta para enterarse de cada evento
+            "lecturas_con_polling": clientes * iteraciones,
+            "eventos_seg": round(iteraciones / total, 1),
+            "p50_ms": round(median(tiempos) * 1000, 3),
+            "p99_ms": round(tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.99))] * 1000, 3),
+        }
@@ -0,0 +1,74 @@
+"""
+Benchmark de búsqueda de usuarios (GET /api/users/search/) sobre una tabla grande,
+con el índice de trigramas (pg_trgm + unaccent) o con el icontains de respaldo.
+"""
+import random
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+
+from core.busqueda import buscar, trigram_disponible
+
+from .base_benchmark import BaseBenchmark, WSGIClient
+
+NOMBRES = ["José", "María", "Ángel", "Lucía", "Raúl", "Inés", "Martín", "Sofía", "Andrés", "Mónica"]
+APELLIDOS = ["Pérez", "Gómez", "Rodríguez", "Fernández", "López", "Núñez", "Suárez", "Ibáñez", "Chávez", "Méndez"]
+
+
+class BusquedaBenchmark(BaseBenchmark):
+    """
+    Puebla `escala x 100.000` usuarios (--escala 10 = 1M) y mide búsquedas
+    frecuentes, poco frecuentes y por fragmento sin tildes.
+    """
+
+    descripcion = "Latencia de /api/users/search/ con `escala x 100.000` usuarios"
+
+    CONSULTAS = [
+        ("apellido sin tilde (muchos resultados)", "perez"),
+        ("nombre + apellido", "maria nunez"),
+        ("fragmento de email (pocos resultados)", "usuario12345@"),
+        ("sin resultados", "zzzqqq"),
+    ]
+
+    @classmethod
+    def run(cls, iteraciones, escala):
+        _, token = cls.crear_usuario()
+        cls._poblar(escala * 100_000)
+        client = WSGIClient(token=token)
+        modo = "trigramas" if trigram_disponible() else "icontains (sin pg_trgm)"
+
+        resultados = []
+        for nombre, consulta in cls.CONSULTAS:
+            ruta = f"/api/users/search/?q={consulta}"
+            status, _, _ = client.get(ruta)
+            assert status == 200, f"user_search respondió {status}"
+            metricas = cls.cronometrar(lambda: client.get(ruta), iteraciones)
+            resultados.append({"escenario": f"{nombre} · {modo}", **metricas, "plan": cls._plan(consulta)})
+        return resultados
+
+    @staticmethod
+    def _plan(consulta):
+        """Si el planner usa el índice de trigramas para la consulta (EXPLAIN)"""
+        from users.views import USER_SEARCH_FIELDS
+
+        queryset, _ = buscar(get_user_model().objects.all(), USER_SEARCH_FIELDS, consulta)
+        return "índice GIN" if "users_customuser_busqueda_trgm" in queryset.explain() else "secuencial"
+
+    @staticmethod
+    def _poblar(total, lote=20_000):
+        User = get_user_model()
+        actuales = User.objects.count()
+        aleatorio = random.Random(42)
+        for inicio in range(actuales, total, lote):
+            User.objects.bulk_create(
+                User(
+                    username=f"usuario{i}",
+                    email=f"usuario{i}@correo.com",
+                    first_name=aleatorio.choice(NOMBRES),
+                    last_name=f"{aleatorio.choice(APELLIDOS)} {aleatorio.choice(APELLIDOS)}",
+                    password="!",
+                )
+                for i in range(inicio, min(inicio + lote, total))
+            )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE users_customuser")
@@ -0,0 +1,88 @@
+"""
+Benchmark de los campos calculados: propiedades evaluadas en Python por fila
+contra las mismas anotadas en SQL (con_calculados()), al serializar una página
+y al ordenar por ellas.
+"""
+import random
+from datetime import date, timedelta
+
+from django.db import connection
+
+from conductores.models import Conductor
+from conductores.serializers import ConductorSerializer
+from personal.models import Personal
+from personal.serializers import PersonalSerializer
+
+from .base_benchmark import BaseBenchmark
+
+PAGINA = 100
+
+
+class CalculadosBenchmark(BaseBenchmark):
+    """`escala x 5000` conductores y empleados"""
+
+    descripcion = "Campos calculados: propiedades en Python vs anotaciones SQL"
+
+    @classmethod
+    def run(cls, iteraciones, escala):
+        filas = escala * 5000
+        cls._sembrar(filas)
+        resultados = []
+        casos = [
+            ("conductores", Conductor, ConductorSerializer, "dias_para_vencer_licencia"),
+            ("personal", Personal, PersonalSerializer, "anos_antiguedad"),
+        ]
+        for nombre, modelo, serializer, campo in casos:
+            def python():
+                return serializer(modelo.objects.all()[:PAGINA], many=True).data
+
+            def sql():
+                return serializer(modelo.objects.con_calculados()[:PAGINA], many=True).data
+
+            metricas = cls.cronometrar(python, iteraciones)
+            resultados.append({"escenario": f"{nombre} · {PAGINA} filas · Python", **metricas})
+            metricas = cls.cronometrar(sql, iteraciones)
+            resultados.append({"escenario": f"{nombre} · {PAGINA} filas · SQL", **metricas})
+
+            # Antes no se podía ordenar en la base: había que traer todo y ordenar en Python
+            def ordenar_python():
+                return sorted(modelo.objects.all(), key=lambda fila: getattr(fila, campo))[:10]
+
+            def ordenar_sql():
+                return list(modelo.objects.con_calculados().order_by(campo, "id")[:10])
+
+            metricas = cls.cronometrar(ordenar_python, max(1, iteraciones // 10))
+            resultados.append({"escenario": f"{nombre} · top 10 por {campo} · Python", **metricas})
+            metricas = cls.cronometrar(ordenar_sql, iteraciones)
+            resultados.append({"escenario": f"{nombre} · top 10 por {campo} · SQL", **metricas})
+        return resultados
+
+    @staticmethod
+    def _sembrar(filas):
+        azar = random.Random(48)
+        hoy = date.today()
+        Conductor.objects.bulk_create(
+            (
+                Conductor(
+                    nombre=f"Conductor {i}", apellido="Benchmark", email=f"calc_{i}@benchmark.local",
+                    ci=f"K{i}", nro_licencia=f"KLIC{i}", tipo_licencia="B",
+                    fecha_venc_licencia=hoy + timedelta(days=azar.randint(-365, 1095)),
+                )
+                for i in range(filas)
+            ),
+            batch_size=5000,
+        )
+        Personal.objects.bulk_create(
+            (
+                Personal(
+                    nombre=f"Empleado {i}", apellido="Benchmark", fecha_nacimiento=date(1990, 1, 1),
+                    telefono="70000000", email=f"calc_{i}@benchmark.local", ci=f"K{i}",
+                    codigo_empleado=f"EMP{i}", fecha_ingreso=hoy - timedelta(days=azar.randint(0, 9000)),
+                )
+                for i in range(filas)
+            ),
+            batch_size=5000,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("VACUUM ANALYZE conductores_conductor")
+            cursor.execute("VACUUM ANALYZE personal_personal")
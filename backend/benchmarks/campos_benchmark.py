@@ -0,0 +1,136 @@
+"""
+Benchmark de los listados de usuarios, conductores y personal: serializer completo
+(antes) frente al serializer de listado y a ?fields=, midiendo tamaño de la
+respuesta, latencia y consultas SQL por página.
+"""
+from datetime import date, timedelta
+from unittest import mock
+
+from django.db import connection
+from rest_framework.pagination import PageNumberPagination
+
+from conductores.serializers import ConductorSerializer
+from conductores.views import ConductorViewSet
+from core.campos import CamposDinamicosViewMixin
+from personal.serializers import PersonalSerializer
+from personal.views import PersonalViewSet
+from users.serializers import UserSerializer
+from users.views import UserViewSet
+
+from .base_benchmark import BaseBenchmark, WSGIClient
+
+PERMISOS = [f"permiso_de_prueba_{i}" for i in range(40)]
+
+
+class CamposBenchmark(BaseBenchmark):
+    """Páginas de `escala x 100` filas de cada listado"""
+
+    descripcion = "Listados: serializer completo vs serializer de listado vs ?fields="
+
+    RECURSOS = [
+        ("/api/admin/users/", UserViewSet, UserSerializer, "id,username,rol"),
+        ("/api/conductores/", ConductorViewSet, ConductorSerializer, "id,nombre,apellido,estado"),
+        ("/api/personal/", PersonalViewSet, PersonalSerializer, "id,nombre,apellido,estado"),
+    ]
+
+    @classmethod
+    def run(cls, iteraciones, escala):
+        filas = escala * 100
+        token = cls._sembrar(filas)
+        client = WSGIClient(token=token)
+
+        resultados = []
+        with mock.patch.object(PageNumberPagination, "page_size", filas):
+            for ruta, viewset, completo, campos in cls.RECURSOS:
+                # "Antes": serializer completo en el listado y queryset sin only()/select_related()
+                antes = (
+                    mock.patch.object(viewset, "get_serializer_class", lambda self, s=completo: s),
+                    mock.patch.object(CamposDinamicosViewMixin, "acciones_campos_dinamicos", ()),
+                )
+                with antes[0], antes[1]:
+                    resultados.append(cls._medir(client, ruta, "serializer completo (antes)", iteraciones))
+                resultados.append(cls._medir(client, ruta, "serializer de listado", iteraciones))
+                resultados.append(cls._medir(client, f"{ruta}?fields={campos}", f"fields={campos}", iteraciones))
+        return resultados
+
+    @classmethod
+    def _medir(cls, client, ruta, nombre, iteraciones):
+        consultas = []
+
+        def contar(execute, sql, params, many, context):
+            consultas.append(sql)
+            return execute(sql, params, many, context)
+
+        # CaptureQueriesContext no sirve aquí: request_started reinicia connection.queries
+        with connection.execute_wrapper(contar):
+            status, _, contenido = client.get(ruta)
+        assert status == 200, f"{ruta} respondió {status}"
+        metricas = cls.cronometrar(lambda: client.get(ruta), iteraciones)
+        return {
+            "escenario": f"{ruta.split('?')[0]} · {nombre}",
+            "bytes": len(contenido),
+            "consultas": len(consultas),
+            **metricas,
+        }
+
+    @classmethod
+    def _sembrar(cls, filas):
+        from conductores.models import Conductor
+        from personal.models import Personal
+        from users.models import CustomUser, Rol
+
+        rol, _ = Rol.objects.get_or_create(
+            nombre="Administrador",
+            defaults={"es_administrativo": True, "permisos": PERMISOS},
+        )
+        _, token = cls.crear_usuario(rol=rol, is_superuser=True, is_staff=True)
+
+        roles = [
+            Rol.objects.get_or_create(
+                nombre=f"Rol benchmark {i}",
+                defaults={"descripcion": "Rol con muchos permisos", "permisos": PERMISOS},
+            )[0]
+            for i in range(5)
+        ]
+        actuales = CustomUser.objects.count()
+        CustomUser.objects.bulk_create(
+            CustomUser(
+                username=f"listado{i}",
+                email=f"listado{i}@benchmark.local",
+                first_name="Nombre",
+                last_name=f"Apellido {i}",
+                rol=roles[i % len(roles)],
+                password="!",
+            )
+            for i in range(actuales, filas)
+        )
+
+        hoy = date.today()
+        Conductor.objects.bulk_create(
+            Conductor(
+                nombre=f"Conductor{i}",
+                apellido="Benchmark",
+                fecha_nacimiento=date(1990, 1, 1),
+                telefono="70000000",
+                email=f"listado{i}@conductor.local",
+                ci=f"LS{i:06d}",
+                nro_licencia=f"LST{i:06d}",
+                tipo_licencia="B",
+                fecha_venc_licencia=hoy + timedelta(days=i),
+            )
+            for i in range(Conductor.objects.count(), filas)
+        )
+        Personal.objects.bulk_create(
+            Personal(
+                nombre=f"Empleado{i}",
+                apellido="Benchmark",
+                fecha_nacimiento=date(1990, 1, 1),
+                telefono="70000000",
+                email=f"listado{i}@personal.local",
+                ci=f"LP{i:06d}",
+                codigo_empleado=f"EMP{i:06d}",
+                fecha_ingreso=hoy - timedelta(days=i),
+            )
+            for i in range(Personal.objects.count(), filas)
+        )
+        return token
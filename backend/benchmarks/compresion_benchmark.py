@@ -0,0 +1,43 @@
+"""
+Benchmark de la compresión de respuestas: bytes transferidos y costo de CPU por
+algoritmo (gzip, br, zstd) con los payloads JSON del benchmark de json.
+"""
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from core.compresion import CompresionMiddleware, compresores_disponibles
+from core.json_api import ORJSONRenderer
+
+from .base_benchmark import BaseBenchmark
+from .json_benchmark import JsonBenchmark
+
+
+class CompresionBenchmark(BaseBenchmark):
+    """Páginas de 10 filas (tamaño por defecto) y de `escala x 100` filas"""
+
+    descripcion = "Compresión de respuestas JSON: tamaño y CPU por algoritmo"
+
+    @classmethod
+    def run(cls, iteraciones, escala):
+        factory = RequestFactory()
+        renderer = ORJSONRenderer()
+        resultados = []
+
+        for filas in (10, escala * 100):
+            for nombre, datos in JsonBenchmark._payloads(filas).items():
+                cuerpo = renderer.render(datos)
+                for algoritmo in [c.nombre for c in compresores_disponibles()]:
+                    middleware = CompresionMiddleware(
+                        lambda request: HttpResponse(cuerpo, content_type="application/json")
+                    )
+                    request = factory.get("/", HTTP_ACCEPT_ENCODING=algoritmo)
+                    response = middleware(request)
+                    metricas = cls.cronometrar(lambda: middleware(request), iteraciones)
+                    resultados.append({
+                        "escenario": f"{nombre} · {filas} filas · {algoritmo}",
+                        "bytes": len(cuerpo),
+                        "bytes_enviados": len(response.content),
+                        "ratio": round(len(cuerpo) / len(response.content), 1),
+                        **metricas,
+                    })
+        return resultados
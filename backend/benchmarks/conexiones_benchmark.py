@@ -0,0 +1,49 @@
+"""
+Benchmark de conexiones a la base de datos: requests/segundo con y sin
+conexiones persistentes sobre un endpoint CRUD liviano.
+"""
+from django.db import connection
+
+from .base_benchmark import BaseBenchmark, WSGIClient
+
+
+class ConexionesBenchmark(BaseBenchmark):
+    """
+    Compara una conexión nueva por request (CONN_MAX_AGE=0) contra
+    conexiones persistentes, con y sin health checks.
+    """
+
+    descripcion = "Requests/seg de /api/auth/user-info/ según la política de conexiones"
+
+    ESCENARIOS = [
+        ("conexión por request (CONN_MAX_AGE=0)", 0, False),
+        ("persistente (CONN_MAX_AGE=60)", 60, False),
+        ("persistente + health checks", 60, True),
+    ]
+
+    @classmethod
+    def run(cls, iteraciones, escala):
+        _, token = cls.crear_usuario()
+        client = WSGIClient(token=token)
+        original = (
+            connection.settings_dict["CONN_MAX_AGE"],
+            connection.settings_dict["CONN_HEALTH_CHECKS"],
+        )
+
+        resultados = []
+        try:
+            for nombre, max_age, health_checks in cls.ESCENARIOS:
+                connection.close()
+                connection.settings_dict["CONN_MAX_AGE"] = max_age
+                connection.settings_dict["CONN_HEALTH_CHECKS"] = health_checks
+
+                # Calentamiento: carga de URLconf, middlewares y primera conexión
+                status, _, _ = client.get("/api/auth/user-info/")
+                assert status == 200, f"user-info respondió {status}"
+                metricas = cls.cronometrar(lambda: client.get("/api/auth/user-info/"), iteraciones)
+                resultados.append({"escenario": nombre, **metricas})
+        finally:
+            connection.close()
+            connection.settings_dict["CONN_MAX_AGE"], connection.settings_dict["CONN_HEALTH_CHECKS"] = original
+
+        return resultados
@@ -0,0 +1,57 @@
+"""
+Benchmark de la cola de emails: latencia del reenvío de código con envío
+directo vs encolado, y throughput del worker según el tamaño de lote.
+"""
+from django.test import override_settings
+from django.utils import timezone
+
+from notificaciones.models import EmailPendiente
+from notificaciones.outbox import procesar_lote
+from notificaciones.smtp_stub import SMTPStub
+
+from .base_benchmark import BaseBenchmark, WSGIClient
+
+
+class EmailBenchmark(BaseBenchmark):
+    """
+    Usa un SMTP local que tarda DEMORA segundos por mensaje (relay lento)
+    para medir cuánto de esa espera llega al request.
+    """
+
+    descripcion = "Reenvío de código (SMTP directo vs outbox) y throughput del worker"
+
+    DEMORA = 0.05
+
+    @classmethod
+    def run(cls, iteraciones, escala):
+        user, _ = cls.crear_usuario(username="cliente_benchmark")
+        client = WSGIClient()
+        resultados = []
+
+        with cls.sin_throttling(), SMTPStub(demora=cls.DEMORA) as stub, override_settings(
+            EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+            EMAIL_HOST="127.0.0.1",
+            EMAIL_PORT=stub.puerto,
+        ):
+            for nombre, outbox in [("resend-code · SMTP directo", False), ("resend-code · outbox", True)]:
+                with override_settings(EMAIL_OUTBOX=outbox):
+                    metricas = cls.cronometrar(
+                        lambda: client.post("/api/resend-code/", {"user_id": user.id}),
+                        iteraciones,
+                    )
+                resultados.append({"escenario": nombre, **metricas})
+
+            # Throughput del worker sobre una cola de `escala * 100` emails
+            for lote in (1, 50):
+                EmailPendiente.objects.update(estado="PENDIENTE", proximo_intento=timezone.now())
+                EmailPendiente.objects.exclude(pk__in=EmailPendiente.objects.values("pk")[:escala * 100]).delete()
+                total = EmailPendiente.objects.count()
+                conexiones = stub.conexiones
+                metricas = cls.cronometrar(lambda: procesar_lote(lote), max(1, total // lote))
+                resultados.append({
+                    "escenario": f"worker · lote de {lote}",
+                    "emails_seg": round(metricas["ops_seg"] * lote, 1),
+                    "conexiones_smtp": stub.conexiones - conexiones,
+                })
+
+        return resultados
@@ -0,0 +1,41 @@
+"""
+Benchmark del costo de la instrumentación SQL: el mismo listado sin muestreo,
+con el muestreo de producción y con todos los requests instrumentados.
+"""
+from django.db import connection
+from django.test.utils import override_settings
+
+from core.instrumentacion_sql import RegistroSQL
+
+from .base_benchmark import BaseBenchmark, WSGIClient
+from .campos_benchmark import CamposBenchmark
+
+
+class InstrumentacionSQLBenchmark(BaseBenchmark):
+    """Listados de usuarios y conductores con SQL_MUESTREO = 0, 0.05 y 1"""
+
+    descripcion = "Overhead de InstrumentacionSQLMiddleware por nivel de muestreo"
+
+    RUTAS = ["/api/conductores/", "/api/admin/users/?fields=id,username,rol"]
+
+    @classmethod
+    def run(cls, iteraciones, escala):
+        token = CamposBenchmark._sembrar(escala * 100)
+        client = WSGIClient(token=token)
+
+        resultados = []
+        for ruta in cls.RUTAS:
+            for muestreo in (0, 0.05, 1):
+                with override_settings(SQL_MUESTREO=muestreo, SQL_SERVER_TIMING=True):
+                    assert client.get(ruta)[0] == 200
+                    metricas = cls.cronometrar(lambda: client.get(ruta), iteraciones)
+                resultados.append({"escenario": f"{ruta} · muestreo {muestreo}", **metricas})
+
+        # Costo por consulta del wrapper, sin el ruido del request completo
+        with connection.cursor() as cursor:
+            metricas = cls.cronometrar(lambda: cursor.execute("SELECT 1"), iteraciones * 10)
+            resultados.append({"escenario": "SELECT 1 · sin wrapper", **metricas})
+            with connection.execute_wrapper(RegistroSQL()):
+                metricas = cls.cronometrar(lambda: cursor.execute("SELECT 1"), iteraciones * 10)
+            resultados.append({"escenario": "SELECT 1 · con RegistroSQL", **metricas})
+        return resultados
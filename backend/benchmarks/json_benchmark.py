@@ -0,0 +1,98 @@
+"""
+Micro-benchmark del renderer/parser JSON: JSONRenderer de DRF (json estándar)
+frente a core.json_api (orjson) con payloads típicos de la API, sin HTTP ni BD.
+"""
+import io
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from bitacora.models import Bitacora, UsuarioBitacora
+from bitacora.serializers import BitacoraSerializer
+from conductores.models import Conductor
+from conductores.serializers import ConductorSerializer
+from core.json_api import ORJSONParser, ORJSONRenderer, orjson
+from users.models import CustomUser, Rol
+
+from .base_benchmark import BaseBenchmark
+
+AGENTE = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36"
+
+
+class JsonBenchmark(BaseBenchmark):
+    """Payloads de `escala x 100` filas armados en memoria"""
+
+    descripcion = "Render/parse JSON: DRF (json estándar) vs orjson"
+
+    @classmethod
+    def run(cls, iteraciones, escala):
+        filas = escala * 100
+        payloads = cls._payloads(filas)
+
+        resultados = []
+        for nombre, datos in payloads.items():
+            for renderer in (JSONRenderer(), ORJSONRenderer()):
+                contenido = renderer.render(datos)
+                metricas = cls.cronometrar(lambda: renderer.render(datos), iteraciones)
+                resultados.append({
+                    "escenario": f"render {nombre} · {type(renderer).__name__}",
+                    "bytes": len(contenido),
+                    **metricas,
+                })
+
+        cuerpo = JSONRenderer().render(payloads["conductores (serializer)"])
+        for parser in (JSONParser(), ORJSONParser()):
+            metricas = cls.cronometrar(lambda: parser.parse(io.BytesIO(cuerpo)), iteraciones)
+            resultados.append({"escenario": f"parse conductores · {type(parser).__name__}", **metricas})
+
+        if orjson is None:
+            resultados.append({"escenario": "orjson no instalado: ORJSON* usa json estándar"})
+        return resultados
+
+    @staticmethod
+    def _payloads(filas):
+        ahora = datetime(2025, 3, 1, 12, 30, 5, 123456)
+        rol = Rol(id=1, nombre="Administrador")
+        usuario = CustomUser(id=1, username="admin", first_name="Ana", last_name="Núñez", rol=rol)
+        autor = UsuarioBitacora(
+            id=1, usuario_id=1, username="admin", first_name="Ana", last_name="Núñez", rol="Administrador"
+        )
+
+        bitacora = [
+            Bitacora(
+                id=i, usuario=usuario, autor=autor, accion="LOGIN", descripcion=f"Inicio de sesión número {i}",
+                fecha_hora=ahora - timedelta(minutes=i), ip="192.168.0.10", user_agent=AGENTE,
+            )
+            for i in range(filas)
+        ]
+        conductores = [
+            Conductor(
+                id=i, nombre=f"Conductor{i}", apellido="Pérez", fecha_nacimiento=date(1990, 1, 1),
+                telefono="70000000", email=f"conductor{i}@correo.com", ci=f"{i:08d}",
+                nro_licencia=f"LIC{i:06d}", tipo_licencia="B", fecha_venc_licencia=date(2027, 1, 1),
+                experiencia_anios=5, ultima_ubicacion_lat=Decimal("-17.7833333"),
+                ultima_ubicacion_lng=Decimal("-63.1821111"), ultima_actualizacion_ubicacion=ahora,
+                fecha_creacion=ahora, fecha_actualizacion=ahora,
+            )
+            for i in range(filas)
+        ]
+
+        def pagina(resultados):
+            return {"count": filas * 10, "next": "http://api/?page=2", "previous": None, "results": resultados}
+
+        return {
+            "bitácora (serializer)": pagina(BitacoraSerializer(bitacora, many=True).data),
+            "conductores (serializer)": pagina(ConductorSerializer(conductores, many=True).data),
+            # values() sin serializer: Decimal y datetime crudos, como en las vistas de ubicaciones
+            "ubicaciones (values)": [
+                {
+                    "id": c.id, "nombre": c.nombre, "estado": c.estado,
+                    "ultima_ubicacion_lat": c.ultima_ubicacion_lat,
+                    "ultima_ubicacion_lng": c.ultima_ubicacion_lng,
+                    "ultima_actualizacion_ubicacion": c.ultima_actualizacion_ubicacion,
+                }
+                for c in conductores
+            ],
+        }
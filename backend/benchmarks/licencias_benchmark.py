@@ -0,0 +1,80 @@
+"""
+Benchmark del vencimiento de licencias: ventanas de fechas por request y todos
+los conductores serializados (como antes) contra la columna estado_licencia con
+índices parciales y una página, y el costo del proceso diario.
+"""
+import random
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import connection
+
+from conductores import licencias
+from conductores.models import Conductor
+from conductores.serializers import ConductorSerializer
+
+from .base_benchmark import BaseBenchmark
+
+
+class LicenciasBenchmark(BaseBenchmark):
+    """`escala x 20000` conductores con vencimientos repartidos en ±2 años"""
+
+    descripcion = "Licencias: ventanas de fechas por request vs estado_licencia precalculado"
+
+    @classmethod
+    def run(cls, iteraciones, escala):
+        total = escala * 20000
+        azar = random.Random(47)
+        hoy = date.today()
+        Conductor.objects.bulk_create(
+            (
+                Conductor(
+                    nombre=f"Conductor {i}", apellido="Benchmark", email=f"lic_{i}@benchmark.local",
+                    ci=f"B{i}", nro_licencia=f"BLIC{i}", tipo_licencia="B",
+                    fecha_venc_licencia=hoy + timedelta(days=azar.randint(-730, 730)),
+                )
+                for i in range(total)
+            ),
+            batch_size=5000,
+        )
+        # bulk_create no pasa por save(): el primer proceso diario calcula todo
+        inicial = cls.cronometrar(lambda: licencias.actualizar_estados(hoy), 1)
+        with connection.cursor() as cursor:
+            cursor.execute("VACUUM ANALYZE conductores_conductor")
+
+        resultados = [{"escenario": f"actualizar_licencias · {total} filas nuevas", **inicial}]
+        for estado, filtro in [
+            (licencias.POR_VENCER, licencias.tramos(hoy)[licencias.POR_VENCER]),
+            (licencias.VENCIDA, licencias.tramos(hoy)[licencias.VENCIDA]),
+        ]:
+            filas = Conductor.objects.filter(filtro).count()
+
+            def antes():
+                return ConductorSerializer(Conductor.objects.filter(filtro), many=True).data
+
+            def despues():
+                tramo = Conductor.objects.filter(estado_licencia=estado)
+                tramo.count()
+                pagina = tramo.order_by("fecha_venc_licencia", "id")[:settings.REST_FRAMEWORK["PAGE_SIZE"]]
+                return ConductorSerializer(pagina, many=True).data
+
+            metricas = cls.cronometrar(antes, max(1, iteraciones // 10))
+            resultados.append({"escenario": f"{estado} · ventana + todo ({filas} filas)", **metricas})
+            metricas = cls.cronometrar(despues, iteraciones)
+            resultados.append({"escenario": f"{estado} · columna + página", **metricas})
+
+            metricas = cls.cronometrar(lambda: Conductor.objects.filter(filtro).count(), iteraciones)
+            resultados.append({"escenario": f"{estado} · count por ventana", **metricas})
+            metricas = cls.cronometrar(lambda: Conductor.objects.filter(estado_licencia=estado).count(), iteraciones)
+            resultados.append({"escenario": f"{estado} · count por índice parcial", **metricas})
+
+        # Un día después: solo cambian las filas que cruzan un borde de tramo
+        manana = hoy + timedelta(days=1)
+        cambios = {}
+        metricas = cls.cronometrar(lambda: cambios.update(licencias.actualizar_estados(manana)), 1)
+        resultados.append({
+            "escenario": "actualizar_licencias · día siguiente",
+            **metricas,
+            "cambios": sum(len(ids) for ids in cambios.values()),
+        })
+        return resultados
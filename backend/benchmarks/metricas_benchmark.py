@@ -0,0 +1,61 @@
+"""
+Benchmark del costo de las métricas de Prometheus: registro de un request
+(contador + histograma + SQL) aislado y el mismo listado con y sin métricas.
+
+El modo depende de PROMETHEUS_MULTIPROC_DIR al arrancar el proceso; para medir
+el modo multiproceso (gunicorn):
+    PROMETHEUS_MULTIPROC_DIR=$(mktemp -d) python manage.py bench metricas
+"""
+import os
+
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.urls import resolve
+
+from core.metricas import MetricasMiddleware, _ContadorSQL
+
+from .base_benchmark import BaseBenchmark, WSGIClient
+from .campos_benchmark import CamposBenchmark
+
+
+class MetricasBenchmark(BaseBenchmark):
+    """Overhead por request del MetricasMiddleware y costo de un scrape"""
+
+    descripcion = "Overhead de las métricas de Prometheus"
+
+    RUTA = "/api/conductores/?fields=id,nombre"
+
+    @classmethod
+    def run(cls, iteraciones, escala):
+        modo = "multiproceso" if os.environ.get("PROMETHEUS_MULTIPROC_DIR") else "un proceso"
+        token = CamposBenchmark._sembrar(escala * 100)
+        client = WSGIClient(token=token)
+        resultados = []
+
+        # Solo el registro (lo que el middleware agrega después de la vista)
+        request = RequestFactory().get(cls.RUTA)
+        request.resolver_match = resolve("/api/conductores/")
+        response = client.get(cls.RUTA)
+        contador = _ContadorSQL()
+        contador.consultas, contador.segundos = 3, 0.002
+
+        class Respuesta:
+            status_code = response[0]
+
+        metricas = cls.cronometrar(
+            lambda: MetricasMiddleware._registrar(request, Respuesta, contador, 0.01), iteraciones * 10
+        )
+        resultados.append({"escenario": f"registrar un request · {modo}", **metricas})
+
+        for habilitadas in (False, True):
+            with override_settings(METRICAS_HABILITADAS=habilitadas):
+                metricas = cls.cronometrar(lambda: client.get(cls.RUTA), iteraciones)
+            estado = "con métricas" if habilitadas else "sin métricas"
+            resultados.append({"escenario": f"GET {cls.RUTA} · {estado} · {modo}", **metricas})
+
+        scrape = {"Authorization": "Bearer bench"}
+        with override_settings(METRICS_TOKEN="bench"):
+            assert client.get("/metrics", headers=scrape)[0] == 200
+            metricas = cls.cronometrar(lambda: client.get("/metrics", headers=scrape), max(1, iteraciones // 10))
+        resultados.append({"escenario": f"scrape /metrics · {modo}", **metricas})
+        return resultados
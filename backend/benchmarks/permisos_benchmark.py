@@ -0,0 +1,48 @@
+"""
+Benchmark del catálogo de permisos: armarlo en cada request (como antes) contra
+los bytes precalculados, y el 304 de un cliente que ya tiene la versión.
+"""
+from rest_framework.renderers import JSONRenderer
+
+from users import catalogo_permisos
+from users.models import Rol
+
+from .base_benchmark import BaseBenchmark, WSGIClient
+
+
+class PermisosBenchmark(BaseBenchmark):
+    """/api/permissions/ y /api/permissions/groups/"""
+
+    descripcion = "Catálogo de permisos: armado por request vs precalculado + ETag"
+
+    RUTAS = {
+        catalogo_permisos.TODOS: "/api/permissions/",
+        catalogo_permisos.POR_GRUPO: "/api/permissions/groups/",
+    }
+
+    @classmethod
+    def run(cls, iteraciones, escala):
+        rol = Rol.objects.create(nombre="Benchmark permisos", permisos=["gestionar_roles"])
+        _, token = cls.crear_usuario(username="benchmark_permisos", rol=rol)
+        client = WSGIClient(token=token)
+        renderer = JSONRenderer()
+
+        resultados = []
+        for recurso, ruta in cls.RUTAS.items():
+            # Costo de armar y serializar la respuesta en cada request (implementación anterior)
+            metricas = cls.cronometrar(
+                lambda: renderer.render(catalogo_permisos.datos()[recurso]), iteraciones
+            )
+            resultados.append({"escenario": f"{recurso} · armado por request", **metricas})
+            metricas = cls.cronometrar(lambda: catalogo_permisos.catalogo()[recurso], iteraciones)
+            resultados.append({"escenario": f"{recurso} · precalculado", **metricas})
+
+            status, headers, cuerpo = client.get(ruta)
+            assert status == 200
+            etag = headers["ETag"]
+            metricas = cls.cronometrar(lambda: client.get(ruta), iteraciones)
+            resultados.append({"escenario": f"GET {ruta} · 200", "bytes": len(cuerpo), **metricas})
+            assert client.get(ruta, headers={"If-None-Match": etag})[0] == 304
+            metricas = cls.cronometrar(lambda: client.get(ruta, headers={"If-None-Match": etag}), iteraciones)
+            resultados.append({"escenario": f"GET {ruta} · 304", "bytes": 0, **metricas})
+        return resultados
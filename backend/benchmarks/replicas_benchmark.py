@@ -0,0 +1,75 @@
+"""
+Benchmark de las réplicas de lectura: latencia de los endpoints de listado y
+estadísticas, y consultas que llegan a la base principal, leyendo de la
+principal o de la réplica (requiere DB_REPLICAS).
+"""
+from contextlib import ExitStack
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import override_settings
+
+from conductores.models import Conductor
+from users.models import Rol
+
+from .base_benchmark import BaseBenchmark, WSGIClient
+
+RUTAS = ["/api/conductores/", "/api/conductores/estadisticas/", "/api/personal/estadisticas/"]
+
+
+class ReplicasBenchmark(BaseBenchmark):
+    """`escala x 500` conductores; GET de listado y estadísticas con el token de un operador"""
+
+    descripcion = "Réplicas de lectura: principal vs réplica (DB_REPLICAS)"
+
+    @classmethod
+    def run(cls, iteraciones, escala):
+        replicas = [alias for alias in settings.DATABASES if alias.startswith("replica_")]
+        if not replicas:
+            return [{"escenario": "sin réplicas: definir DB_REPLICAS"}]
+
+        hoy = date.today()
+        Conductor.objects.bulk_create(
+            Conductor(
+                nombre=f"Conductor {i}", apellido="Benchmark", email=f"replica_{i}@benchmark.local",
+                ci=f"R{i}", nro_licencia=f"RLIC{i}", tipo_licencia="B",
+                fecha_venc_licencia=hoy + timedelta(days=i % 400 - 30),
+            )
+            for i in range(escala * 500)
+        )
+        rol = Rol.objects.create(
+            nombre="Benchmark réplicas", es_administrativo=True,
+            permisos=["gestionar_conductores", "gestionar_personal"],
+        )
+        _, token = cls.crear_usuario(username="benchmark_replicas", rol=rol)
+        client = WSGIClient(token=token)
+
+        resultados = []
+        with cls.sin_throttling():
+            for destino, alias in [("principal", []), ("réplica", replicas)]:
+                with override_settings(REPLICAS=alias):
+                    for ruta in RUTAS:
+                        assert client.get(ruta)[0] == 200
+                        consultas = {DEFAULT_DB_ALIAS: 0, **{r: 0 for r in replicas}}
+                        with ExitStack() as pila:
+                            for base in consultas:
+                                pila.enter_context(connections[base].execute_wrapper(cls._contar(consultas, base)))
+                            client.get(ruta)
+                        metricas = cls.cronometrar(lambda: client.get(ruta), iteraciones)
+                        resultados.append({
+                            "escenario": f"GET {ruta} · {destino}",
+                            **metricas,
+                            "sql_principal": consultas[DEFAULT_DB_ALIAS],
+                            "sql_replica": sum(consultas.values()) - consultas[DEFAULT_DB_ALIAS],
+                        })
+        return resultados
+
+    @staticmethod
+    def _contar(consultas, base):
+        # request_started vacía connection.queries: se cuenta con un execute_wrapper
+        def wrapper(execute, sql, params, many, context):
+            consultas[base] += 1
+            return execute(sql, params, many, context)
+
+        return wrapper
@@ -0,0 +1,137 @@
+"""
+Benchmark de reservas: cientos de compradores concurrentes contra una sola
+salida. Compara tres formas de descontar el inventario y verifica la
+sobreventa de cada una:
+
+- leer-restar-guardar: SELECT, resta en Python y save() (pierde actualizaciones)
+- SELECT ... FOR UPDATE y save(): correcto, la fila queda bloqueada más tiempo
+- UPDATE condicional (reservas/inventario.py): correcto, un solo statement
+"""
+import multiprocessing
+import random
+import time
+from datetime import timedelta
+from statistics import median
+
+from django.db import connections, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from reservas import inventario
+from reservas.models import Reserva, Salida
+
+from .base_benchmark import BaseBenchmark
+
+PROCESOS = (16, 64)
+
+
+class ReservasBenchmark(BaseBenchmark):
+    """`escala x 300` compradores de 1 a 3 asientos; la salida tiene la mitad de los asientos pedidos"""
+
+    descripcion = "Reservas: sobreventa y retenciones/s bajo contención en una salida"
+
+    @classmethod
+    def run(cls, iteraciones, escala):
+        compradores = escala * 300
+        azar = random.Random(50)
+        pedidos = [azar.randint(1, 3) for _ in range(compradores)]
+        capacidad = sum(pedidos) // 2
+        cliente, _ = cls.crear_usuario(username="benchmark_reservas")
+
+        resultados = []
+        for procesos in PROCESOS:
+            for nombre, retener in [
+                ("leer-restar-guardar", cls._leer_restar_guardar),
+                ("SELECT FOR UPDATE", cls._select_for_update),
+                ("UPDATE condicional", cls._update_condicional),
+            ]:
+                rondas = [
+                    cls._ronda(cliente, pedidos, capacidad, procesos, retener) for _ in range(max(iteraciones, 1))
+                ]
+                resultados.append({
+                    "escenario": f"{compradores} compradores · {procesos} procesos · {nombre}",
+                    "retenciones_seg": median(ronda["retenciones_seg"] for ronda in rondas),
+                    "capacidad": capacidad,
+                    # Deben ser 0: asientos vendidos por encima de la capacidad y
+                    # vendidos que el inventario no descontó (peor ronda)
+                    "sobreventa": max(ronda["sobreventa"] for ronda in rondas),
+                    "desfase_inventario": max(ronda["desfase_inventario"] for ronda in rondas),
+                })
+        return resultados
+
+    @classmethod
+    def _ronda(cls, cliente, pedidos, capacidad, procesos, retener):
+        """Una salida nueva con `capacidad` asientos y todos los compradores a la vez"""
+        salida = Salida.objects.create(
+            origen="Santa Cruz", destino="La Paz",
+            fecha_hora=timezone.now() + timedelta(days=1), capacidad=capacidad,
+        )
+        duracion = cls._concurrencia(salida, cliente, pedidos, procesos, retener)
+        salida.refresh_from_db()
+        vendidos = Reserva.objects.filter(salida=salida).aggregate(total=Sum("asientos"))["total"] or 0
+        return {
+            "retenciones_seg": round(len(pedidos) / duracion, 1),
+            "sobreventa": max(0, vendidos - capacidad),
+            "desfase_inventario": vendidos - (capacidad - salida.asientos_disponibles),
+        }
+
+    @staticmethod
+    def _concurrencia(salida, cliente, pedidos, procesos, retener):
+        """
+        Cada comprador en un proceso propio (fork) con su conexión: la contención
+        es la de la base, no el GIL de un solo proceso Python
+        """
+        contexto = multiprocessing.get_context("fork")
+        barrera = contexto.Barrier(procesos + 1)
+
+        def trabajar(lote):
+            barrera.wait()
+            for asientos in lote:
+                retener(salida, cliente, asientos)
+            connections.close_all()
+
+        # Los hijos no deben heredar la conexión abierta del padre
+        connections.close_all()
+        trabajadores = [contexto.Process(target=trabajar, args=(pedidos[i::procesos],)) for i in range(procesos)]
+        for trabajador in trabajadores:
+            trabajador.start()
+        barrera.wait()
+        inicio = time.perf_counter()
+        for trabajador in trabajadores:
+            trabajador.join()
+        duracion = time.perf_counter() - inicio
+        if any(trabajador.exitcode for trabajador in trabajadores):
+            raise RuntimeError("Un proceso comprador terminó con error")
+        return duracion
+
+    @staticmethod
+    def _nueva_reserva(salida, cliente, asientos):
+        return Reserva.objects.create(
+            salida=salida, cliente=cliente, asientos=asientos, expira_en=timezone.now() + timedelta(minutes=10)
+        )
+
+    @classmethod
+    def _leer_restar_guardar(cls, salida, cliente, asientos):
+        with transaction.atomic():
+            actual = Salida.objects.get(pk=salida.pk)
+            if actual.asientos_disponibles < asientos:
+                return False
+            cls._nueva_reserva(salida, cliente, asientos)
+            actual.asientos_disponibles -= asientos
+            actual.save(update_fields=["asientos_disponibles"])
+        return True
+
+    @classmethod
+    def _select_for_update(cls, salida, cliente, asientos):
+        with transaction.atomic():
+            actual = Salida.objects.select_for_update().get(pk=salida.pk)
+            if actual.asientos_disponibles < asientos:
+                return False
+            cls._nueva_reserva(salida, cliente, asientos)
+            actual.asientos_disponibles -= asientos
+            actual.save(update_fields=["asientos_disponibles"])
+        return True
+
+    @staticmethod
+    def _update_condicional(salida, cliente, asientos):
+        return inventario.retener(salida, cliente, asientos)[0] is not None
@@ -0,0 +1,133 @@
+"""
+Benchmark de carga HTTP de los modos de servidor de start.sh
+(runserver, gunicorn WSGI sync/gthread y gunicorn + uvicorn ASGI).
+"""
+import http.client
+import os
+import socket
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+from django.db import connection
+
+from .base_benchmark import BaseBenchmark
+
+
+class ServidorBenchmark(BaseBenchmark):
+    """
+    Levanta cada modo de servidor contra la base de datos de prueba y lo
+    carga con clientes HTTP concurrentes (keep-alive) sobre /api/auth/user-info/.
+    """
+
+    descripcion = "Carga HTTP concurrente por modo de servidor (start.sh)"
+
+    PUERTO = 8765
+    CONCURRENCIA = 16
+    RUTA = "/api/auth/user-info/"
+
+    ESCENARIOS = [
+        ("runserver (dev)", {"SERVER_MODE": "dev"}),
+        ("gunicorn sync", {"SERVER_MODE": "wsgi", "GUNICORN_WORKER_CLASS": "sync"}),
+        ("gunicorn gthread", {"SERVER_MODE": "wsgi", "GUNICORN_WORKER_CLASS": "gthread"}),
+        ("gunicorn + uvicorn (asgi)", {"SERVER_MODE": "asgi"}),
+    ]
+
+    @classmethod
+    def run(cls, iteraciones, escala):
+        _, token = cls.crear_usuario()
+        backend_dir = Path(__file__).resolve().parent.parent
+
+        resultados = []
+        for nombre, variables in cls.ESCENARIOS:
+            env = {
+                **os.environ,
+                **variables,
+                "PORT": str(cls.PUERTO),
+                "POSTGRES_DB": connection.settings_dict["NAME"],
+                "GUNICORN_ACCESS_LOG": "/dev/null",
+            }
+            proceso = subprocess.Popen(
+                ["bash", str(backend_dir / "start.sh")],
+                env=env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+            try:
+                cls._esperar_puerto()
+                cls._cargar(token, cls.CONCURRENCIA * 2)  # calentamiento
+                resultados.append({"escenario": nombre, **cls._cargar(token, iteraciones)})
+            finally:
+                os.killpg(proceso.pid, 15)
+                proceso.wait(timeout=30)
+
+        return resultados
+
+    @classmethod
+    def _esperar_puerto(cls, timeout=60):
+        limite = time.monotonic() + timeout
+        while time.monotonic() < limite:
+            try:
+                with socket.create_connection(("127.0.0.1", cls.PUERTO), timeout=1):
+                    return
+            except OSError:
+                time.sleep(0.2)
+        raise RuntimeError(f"El servidor no abrió el puerto {cls.PUERTO}")
+
+    @classmethod
+    def _cargar(cls, token, total):
+        """Reparte `total` requests entre CONCURRENCIA hilos y mide throughput y latencias"""
+        headers = {"Authorization": f"Bearer {token}"}
+        por_hilo = max(1, total // cls.CONCURRENCIA)
+        latencias = []
+        errores = []
+        lock = threading.Lock()
+
+        def pedir(conn):
+            conn.request("GET", cls.RUTA, headers=headers)
+            respuesta = conn.getresponse()
+            respuesta.read()
+            if respuesta.getheader("Connection", "").lower() == "close":
+                conn.close()
+            return respuesta.status
+
+        def cliente():
+            conn = http.client.HTTPConnection("127.0.0.1", cls.PUERTO, timeout=30)
+            propias = []
+            for _ in range(por_hilo):
+                t0 = time.perf_counter()
+                try:
+                    try:
+                        status = pedir(conn)
+                    except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                        # El reciclaje de workers cierra conexiones keep-alive ociosas;
+                        # como cualquier cliente HTTP, se reintenta el GET una vez
+                        conn.close()
+                        status = pedir(conn)
+                    if status != 200:
+                        errores.append(status)
+                except (http.client.HTTPException, OSError) as error:
+                    errores.append(str(error))
+                    conn.close()
+                propias.append(time.perf_counter() - t0)
+            conn.close()
+            with lock:
+                latencias.extend(propias)
+
+        hilos = [threading.Thread(target=cliente) for _ in range(cls.CONCURRENCIA)]
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        total_seg = time.perf_counter() - inicio
+
+        latencias.sort()
+        return {
+            "req_seg": round(len(latencias) / total_seg, 1),
+            "p50_ms": round(latencias[len(latencias) // 2] * 1000, 2),
+            "p99_ms": round(latencias[min(len(latencias) - 1, int(len(latencias) * 0.99))] * 1000, 2),
+            "errores": len(errores),
+        }
@@ -0,0 +1,44 @@
+"""
+Benchmark del throttling de login: costo de un intento rechazado por
+credenciales (hash PBKDF2 completo) frente a uno rechazado por throttling.
+"""
+from django.core.cache import cache
+
+from .base_benchmark import BaseBenchmark, WSGIClient
+
+
+class ThrottlingBenchmark(BaseBenchmark):
+    """
+    Simula una ráfaga de credential stuffing contra /api/auth/login/
+    desde una sola IP y contra una sola cuenta.
+    """
+
+    descripcion = "Intentos de login/seg: rechazo por credenciales vs rechazo por throttling (429)"
+
+    RUTA = "/api/auth/login/"
+
+    @classmethod
+    def run(cls, iteraciones, escala):
+        cls.crear_usuario(username="victima")
+        client = WSGIClient()
+        intento = {"username": "victima", "password": "incorrecta"}
+        resultados = []
+
+        def login(esperado):
+            status, _, _ = client.post(cls.RUTA, intento)
+            assert status == esperado, f"login respondió {status}, se esperaba {esperado}"
+
+        # Sin límites: cada intento llega a authenticate() y paga el hash
+        with cls.sin_throttling():
+            metricas = cls.cronometrar(lambda: login(401), iteraciones)
+        resultados.append({"escenario": "rechazo por credenciales (PBKDF2)", **metricas})
+
+        # Con límites: se agota la ventana y el resto de la ráfaga se rechaza antes del hash
+        cache.clear()
+        status = 401
+        while status != 429:
+            status, _, _ = client.post(cls.RUTA, intento)
+        metricas = cls.cronometrar(lambda: login(429), iteraciones)
+        resultados.append({"escenario": "rechazo por throttling (429)", **metricas})
+
+        return resultados
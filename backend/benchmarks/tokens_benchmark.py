@@ -0,0 +1,58 @@
+"""
+Benchmark de la blacklist de JWT: verificación de refresh tokens contra las tablas
+de simplejwt (OutstandingToken/BlacklistedToken) vs la blacklist en cache,
+a medida que crece el historial de tokens.
+"""
+from datetime import timedelta
+
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt import tokens as jwt_tokens
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from users import tokens
+
+from .base_benchmark import BaseBenchmark
+
+
+class TokensBenchmark(BaseBenchmark):
+    """
+    Mide la construcción de un RefreshToken (que valida la blacklist, como en
+    refresh/logout) y el verify, con 0 y con `escala x 100.000` tokens en el historial.
+    """
+
+    descripcion = "Latencia de refresh/verify según el tamaño del historial de tokens"
+
+    @classmethod
+    def run(cls, iteraciones, escala):
+        user, _ = cls.crear_usuario()
+        token = str(tokens.RefreshToken.for_user(user))
+        resultados = []
+
+        for historial in (0, escala * 100_000):
+            cls._poblar_historial(historial)
+            escenarios = [
+                ("refresh · BD simplejwt", lambda: jwt_tokens.RefreshToken(token)),
+                ("refresh · cache", lambda: tokens.RefreshToken(token)),
+                ("verify · BD simplejwt", lambda: jwt_serializers.TokenVerifySerializer(data={"token": token}).is_valid(raise_exception=True)),
+                ("verify · cache", lambda: tokens.TokenVerifySerializer(data={"token": token}).is_valid(raise_exception=True)),
+            ]
+            for nombre, func in escenarios:
+                metricas = cls.cronometrar(func, iteraciones)
+                resultados.append({"escenario": f"{nombre} ({historial} tokens)", **metricas})
+
+        return resultados
+
+    @staticmethod
+    def _poblar_historial(total, lote=10_000):
+        """Tokens emitidos (y la mitad revocados) como los deja la app token_blacklist"""
+        actuales = OutstandingToken.objects.count()
+        vence = aware_utcnow() + timedelta(days=7)
+        for inicio in range(actuales, total, lote):
+            emitidos = OutstandingToken.objects.bulk_create(
+                OutstandingToken(jti=f"historial-{i}", token="-", expires_at=vence)
+                for i in range(inicio, min(inicio + lote, total))
+            )
+            BlacklistedToken.objects.bulk_create(
+                BlacklistedToken(token=emitido) for emitido in emitidos[::2]
+            )
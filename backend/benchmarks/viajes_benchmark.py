@@ -0,0 +1,122 @@
+"""
+Benchmark del despacho de viajes: búsqueda del conductor más cercano con el
+índice GiST (KNN) contra un recorrido completo, y asignaciones por segundo con
+hilos concurrentes (SELECT ... FOR UPDATE SKIP LOCKED), verificando que ningún
+conductor quede asignado a dos viajes.
+"""
+import random
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection, connections, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from conductores.models import Conductor
+from viajes import despacho
+from viajes.models import ASIGNADO, Viaje
+
+from .base_benchmark import BaseBenchmark
+
+# Centro de Santa Cruz de la Sierra
+CENTRO = (-17.7833, -63.1821)
+HILOS = (1, 4, 8)
+
+
+class ViajesBenchmark(BaseBenchmark):
+    """`escala x 5000` conductores disponibles a menos de ~8 km del centro"""
+
+    descripcion = "Despacho de viajes: KNN con índice GiST y asignaciones concurrentes"
+
+    @classmethod
+    def run(cls, iteraciones, escala):
+        total = escala * 5000
+        azar = random.Random(49)
+        ahora = timezone.now()
+        vence = date.today() + timedelta(days=365)
+        Conductor.objects.bulk_create(
+            (
+                Conductor(
+                    nombre=f"Conductor {i}", apellido="Benchmark", email=f"viaje_{i}@benchmark.local",
+                    ci=f"V{i}", nro_licencia=f"VLIC{i}", tipo_licencia="B", fecha_venc_licencia=vence,
+                    ultima_ubicacion_lat=Decimal(f"{CENTRO[0] + azar.uniform(-0.05, 0.05):.7f}"),
+                    ultima_ubicacion_lng=Decimal(f"{CENTRO[1] + azar.uniform(-0.05, 0.05):.7f}"),
+                    ultima_actualizacion_ubicacion=ahora,
+                )
+                for i in range(total)
+            ),
+            batch_size=5000,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("VACUUM ANALYZE conductores_conductor")
+
+        resultados = []
+        for nombre, desactivar in [("índice GiST (KNN)", ""), ("sin índice (orden completo)", "enable_indexscan")]:
+            metricas = cls.cronometrar(lambda: cls._buscar(desactivar), iteraciones)
+            resultados.append({"escenario": f"conductor más cercano · {total} conductores · {nombre}", **metricas})
+
+        cliente, _ = cls.crear_usuario(username="benchmark_viajes")
+        # Cada ronda consume conductores: hay de sobra para todas
+        por_hilo = min(iteraciones * 10, total // (2 * sum(HILOS)))
+        for hilos in HILOS:
+            resultados.append(cls._concurrencia(cliente, hilos, por_hilo))
+
+        dobles = (
+            Viaje.objects.filter(estado=ASIGNADO).values("conductor_id")
+            .annotate(viajes=Count("id")).filter(viajes__gt=1).count()
+        )
+        resultados.append({"escenario": "conductores con dos viajes asignados (debe ser 0)", "dobles": dobles})
+        return resultados
+
+    @staticmethod
+    def _buscar(desactivar):
+        lat, lng = CENTRO
+        with transaction.atomic():
+            if desactivar:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"SET LOCAL {desactivar} = off")
+                    cursor.execute("SET LOCAL enable_bitmapscan = off")
+            return despacho.candidatos(lat, lng).first()
+
+    @staticmethod
+    def _concurrencia(cliente, hilos, por_hilo):
+        azar = random.Random(hilos)
+        viajes = [
+            Viaje.objects.create(
+                cliente=cliente,
+                origen_lat=Decimal(f"{CENTRO[0] + azar.uniform(-0.03, 0.03):.7f}"),
+                origen_lng=Decimal(f"{CENTRO[1] + azar.uniform(-0.03, 0.03):.7f}"),
+                destino_lat=Decimal(f"{CENTRO[0]:.7f}"), destino_lng=Decimal(f"{CENTRO[1]:.7f}"),
+            )
+            for _ in range(hilos * por_hilo)
+        ]
+        barrera = threading.Barrier(hilos + 1)
+        sin_conductor = []
+
+        def trabajar(lote):
+            try:
+                barrera.wait()
+                for viaje in lote:
+                    if despacho.asignar(viaje) is None:
+                        sin_conductor.append(viaje.pk)
+            finally:
+                for conexion in connections.all(initialized_only=True):
+                    conexion.close()
+
+        trabajadores = [
+            threading.Thread(target=trabajar, args=(viajes[i::hilos],)) for i in range(hilos)
+        ]
+        for trabajador in trabajadores:
+            trabajador.start()
+        barrera.wait()
+        inicio = time.perf_counter()
+        for trabajador in trabajadores:
+            trabajador.join()
+        duracion = time.perf_counter() - inicio
+        return {
+            "escenario": f"{hilos} hilos · {len(viajes)} viajes",
+            "asignaciones_seg": round((len(viajes) - len(sin_conductor)) / duracion, 1),
+            "sin_conductor": len(sin_conductor),
+        }
@@ -0,0 +1,80 @@
+"""
+Benchmark de concurrencia de las vistas async nativas bajo ASGI
+frente a las mismas vistas síncronas de DRF.
+"""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .servidor_benchmark import ServidorBenchmark
+
+
+class VistasAsyncBenchmark(ServidorBenchmark):
+    """
+    Un solo worker por escenario para comparar cuántos requests concurrentes
+    atiende cada modelo (hilos de WSGI, vistas sync bajo ASGI y vistas async).
+    """
+
+    descripcion = "Concurrencia de vistas async (ASGI) vs sync por endpoint"
+
+    RUTAS = [
+        "/api/auth/user-info/",
+        "/api/auth/dashboard-data/",
+        "/api/bitacora/",
+        "/api/conductores/ubicaciones/",
+    ]
+
+    ESCENARIOS = [
+        ("wsgi gthread", {"SERVER_MODE": "wsgi", "GUNICORN_WORKER_CLASS": "gthread"}),
+        ("asgi vistas sync", {"SERVER_MODE": "asgi", "DJANGO_ASYNC_VIEWS": "0"}),
+        ("asgi vistas async", {"SERVER_MODE": "asgi", "DJANGO_ASYNC_VIEWS": "1"}),
+    ]
+
+    @classmethod
+    def run(cls, iteraciones, escala):
+        cls._sembrar(escala)
+        resultados = []
+        for ruta in cls.RUTAS:
+            cls.RUTA = ruta
+            for fila in super().run(iteraciones, escala):
+                resultados.append({**fila, "escenario": f"{ruta} · {fila['escenario']}"})
+        return resultados
+
+    @classmethod
+    def _sembrar(cls, escala):
+        """Registros de bitácora y conductores con ubicación para que las lecturas tengan datos"""
+        from bitacora.dimensiones import id_autor
+        from bitacora.models import Bitacora
+        from conductores.models import Conductor
+        from users.models import Rol
+
+        rol, _ = Rol.objects.get_or_create(
+            nombre="Administrador",
+            defaults={"es_administrativo": True, "permisos": ["gestionar_conductores"]},
+        )
+        user, _ = cls.crear_usuario(rol=rol, is_superuser=True, is_staff=True)
+
+        if not Bitacora.objects.exists():
+            # bulk_create no pasa por save(): la copia del usuario se asigna aquí
+            autor_id, _ = id_autor(user)
+            Bitacora.objects.bulk_create(
+                Bitacora(usuario=user, autor_id=autor_id, accion="LOGIN", descripcion=f"Ingreso {i}", ip="127.0.0.1")
+                for i in range(escala * 100)
+            )
+        if not Conductor.objects.exists():
+            ahora = timezone.now()
+            Conductor.objects.bulk_create(
+                Conductor(
+                    nombre=f"Conductor{i}",
+                    apellido="Benchmark",
+                    email=f"conductor{i}@benchmark.local",
+                    ci=f"BM{i:06d}",
+                    nro_licencia=f"LIC{i:06d}",
+                    tipo_licencia="B",
+                    fecha_venc_licencia=ahora.date() + timedelta(days=365),
+                    ultima_ubicacion_lat=round(-17.78 + i * 0.001, 7),
+                    ultima_ubicacion_lng=round(-63.18 + i * 0.001, 7),
+                    ultima_actualizacion_ubicacion=ahora,
+                )
+                for i in range(escala * 20)
+            )
@@ -12,13 +12,14 @@ class BitacoraAdmin(admin.ModelAdmin):
         'user_agent_display',
         'modulo_display',
     )
-    list_filter = ('accion', 'modulo')
-    search_fields = ('accion', 'descripcion', 'usuario__username', 'modulo')
+    list_filter = ('tipo_accion', 'modulo')
+    search_fields = ('tipo_accion__nombre', 'descripcion', 'autor__username', 'modulo')
+    list_select_related = ('autor', 'tipo_accion', 'agente')
     ordering = ('-fecha_hora',)
 
     @admin.display(description="Usuario")
     def nombre_usuario(self, obj):
-        return getattr(obj.usuario, "username", "Sistema")
+        return obj.autor.username if obj.autor_id else "Sistema"
 
     @admin.display(description='Acción')
     def accion_display(self, obj):
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class BitacoraConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'bitacora'
+
+
+    def ready(self):
+        # Un registro nuevo despierta al lector del stream SSE de este proceso
+        from django.db.models.signals import post_save
+        from .difusor import registro_guardado
+        from .models import Bitacora
+
+        post_save.connect(registro_guardado, sender=Bitacora, dispatch_uid='bitacora_stream')
@@ -0,0 +1,261 @@
+"""
+Archivo columnar (Parquet) de la bitácora y agregaciones sobre él.
+
+Los meses cerrados se exportan a BITACORA_ARCHIVO_DIR con particiones Hive:
+
+    anio_mes=2025-01/modulo=USUARIOS/parte-0.parquet
+
+Las columnas de pocos valores distintos (acción, usuario, user agent y sus
+campos interpretados) se guardan como diccionario; el archivo se comprime con
+zstd. Una vez archivado, el mes se puede borrar de PostgreSQL
+(manage.py archivar_bitacora --borrar): solo se borran los ids que están en
+el archivo.
+
+agregar() responde group-by/count leyendo solo las particiones y columnas
+necesarias, lote por lote (pyarrow.dataset), sin cargar el archivo en memoria.
+pyarrow es opcional: sin él, el comando y la API responden con un error claro.
+"""
+import os
+import re
+import shutil
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - dependencia opcional
+    pa = None
+
+from .models import Bitacora
+
+MES = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+
+# Campos por los que se puede agrupar o filtrar en la API
+AGRUPABLES = ("anio_mes", "modulo", "accion", "usuario", "navegador", "sistema", "dispositivo")
+
+# (columna en el archivo, ruta en el ORM, diccionario)
+COLUMNAS = [
+    ("id", "id", False),
+    ("fecha_hora", "fecha_hora", False),
+    ("usuario_id", "usuario_id", False),
+    ("usuario", "autor__username", True),
+    ("accion", "tipo_accion__nombre", True),
+    ("descripcion", "descripcion", False),
+    ("ip", "ip", False),
+    ("user_agent", "agente__texto", True),
+    ("navegador", "agente__navegador", True),
+    ("sistema", "agente__sistema", True),
+    ("dispositivo", "agente__dispositivo", True),
+]
+
+
+class ArchivoNoDisponible(Exception):
+    """pyarrow no está instalado"""
+
+
+def disponible():
+    return pa is not None
+
+
+def _requerir():
+    if pa is None:
+        raise ArchivoNoDisponible("pyarrow no está instalado: pip install pyarrow")
+
+
+def esquema():
+    _requerir()
+    tipos = {
+        "id": pa.int64(),
+        "fecha_hora": pa.timestamp("us"),
+        "usuario_id": pa.int64(),
+    }
+    return pa.schema([
+        (nombre, pa.dictionary(pa.int32(), pa.string()) if diccionario else tipos.get(nombre, pa.string()))
+        for nombre, _, diccionario in COLUMNAS
+    ])
+
+
+def directorio():
+    return Path(settings.BITACORA_ARCHIVO_DIR)
+
+
+def _carpeta_mes(mes):
+    return directorio() / f"anio_mes={mes}"
+
+
+def meses_archivados():
+    if not directorio().is_dir():
+        return []
+    return sorted(
+        carpeta.name.split("=", 1)[1]
+        for carpeta in directorio().iterdir()
+        if carpeta.is_dir() and carpeta.name.startswith("anio_mes=") and MES.match(carpeta.name[9:])
+    )
+
+
+def rango_mes(mes):
+    """[inicio, fin) del mes "AAAA-MM" como datetimes"""
+    anio, numero = map(int, mes.split("-"))
+    inicio = datetime(anio, numero, 1)
+    fin = datetime(anio + numero // 12, numero % 12 + 1, 1)
+    return inicio, fin
+
+
+def version():
+    """Cambia cada vez que se escribe el archivo (invalida las agregaciones en cache)"""
+    marca = directorio() / "_version"
+    return marca.stat().st_mtime_ns if marca.exists() else 0
+
+
+def _tabla(filas):
+    columnas = list(zip(*filas)) if filas else [[] for _ in COLUMNAS]
+    return pa.Table.from_arrays(
+        [pa.array(valores, type=tipo) for valores, tipo in zip(columnas, esquema().types)],
+        schema=esquema(),
+    )
+
+
+def exportar_mes(mes, lote=50000):
+    """
+    Escribe el mes en el archivo (reemplaza lo que hubiera) y retorna las filas escritas.
+    Se escribe en una carpeta temporal que recién al final toma el lugar de la anterior.
+    """
+    _requerir()
+    inicio, fin = rango_mes(mes)
+    registros = (
+        Bitacora.objects.filter(fecha_hora__gte=inicio, fecha_hora__lt=fin)
+        .order_by("modulo", "id")
+        .values_list("modulo", *[ruta for _, ruta, _ in COLUMNAS])
+    )
+
+    directorio().mkdir(parents=True, exist_ok=True)
+    temporal = directorio() / f".anio_mes={mes}.tmp-{os.getpid()}"
+    shutil.rmtree(temporal, ignore_errors=True)
+    escritas = 0
+    escritor = modulo_actual = None
+    filas = []
+
+    def volcar():
+        nonlocal filas
+        if filas:
+            escritor.write_table(_tabla(filas), row_group_size=lote)
+            filas = []
+
+    try:
+        for fila in registros.iterator(chunk_size=lote):
+            modulo, datos = fila[0], fila[1:]
+            if modulo != modulo_actual:
+                volcar()
+                if escritor is not None:
+                    escritor.close()
+                carpeta = temporal / f"modulo={modulo}"
+                carpeta.mkdir(parents=True)
+                escritor = pq.ParquetWriter(
+                    carpeta / "parte-0.parquet", esquema(), compression="zstd", use_dictionary=True
+                )
+                modulo_actual = modulo
+            filas.append(datos)
+            escritas += 1
+            if len(filas) >= lote:
+                volcar()
+        if escritor is not None:
+            volcar()
+            escritor.close()
+    except BaseException:
+        if escritor is not None:
+            escritor.close()
+        shutil.rmtree(temporal, ignore_errors=True)
+        raise
+
+    destino = _carpeta_mes(mes)
+    anterior = directorio() / f".anio_mes={mes}.old-{os.getpid()}"
+    if destino.exists():
+        destino.rename(anterior)
+    if escritas:
+        temporal.rename(destino)
+    else:
+        shutil.rmtree(temporal, ignore_errors=True)
+    shutil.rmtree(anterior, ignore_errors=True)
+    (directorio() / "_version").touch()
+    return escritas
+
+
+def _dataset():
+    particiones = ds.partitioning(
+        pa.schema([("anio_mes", pa.string()), ("modulo", pa.string())]), flavor="hive"
+    )
+    return ds.dataset(
+        str(directorio()), format="parquet", partitioning=particiones,
+        exclude_invalid_files=True, ignore_prefixes=[".", "_"],
+    )
+
+
+def filas_archivadas(mes):
+    """Cantidad de filas del mes en el archivo (solo lee los metadatos)"""
+    _requerir()
+    carpeta = _carpeta_mes(mes)
+    if not carpeta.is_dir():
+        return 0
+    return sum(pq.ParquetFile(archivo).metadata.num_rows for archivo in carpeta.glob("*/*.parquet"))
+
+
+def ids_archivados(mes):
+    """Ids del mes en el archivo, por lotes (para borrar solo lo que quedó archivado)"""
+    _requerir()
+    carpeta = _carpeta_mes(mes)
+    if not carpeta.is_dir():
+        return
+    for archivo in carpeta.glob("*/*.parquet"):
+        for lote in pq.ParquetFile(archivo).iter_batches(columns=["id"], batch_size=10000):
+            yield lote.column(0).to_pylist()
+
+
+def _filtro(desde=None, hasta=None, modulo=None, accion=None, usuario_id=None):
+    condiciones = []
+    if desde:
+        condiciones.append(ds.field("anio_mes") >= desde)
+    if hasta:
+        condiciones.append(ds.field("anio_mes") <= hasta)
+    if modulo:
+        condiciones.append(ds.field("modulo") == modulo)
+    if accion:
+        condiciones.append(ds.field("accion") == accion)
+    if usuario_id is not None:
+        condiciones.append(ds.field("usuario_id") == usuario_id)
+    expresion = None
+    for condicion in condiciones:
+        expresion = condicion if expresion is None else expresion & condicion
+    return expresion
+
+
+def agregar(agrupar, **filtros):
+    """
+    [{<campos de agrupar>..., "total": n}] ordenado de mayor a menor (empates por clave).
+    Cada lote se agrega con el group_by vectorizado de Arrow y los parciales se suman.
+    """
+    _requerir()
+    if not meses_archivados():
+        return []
+    scanner = _dataset().scanner(
+        columns=list(agrupar) or ["id"], filter=_filtro(**filtros), batch_size=131072
+    )
+    if not agrupar:
+        return [{"total": scanner.count_rows()}]
+
+    totales = Counter()
+    for lote in scanner.to_batches():
+        if not lote.num_rows:
+            continue
+        parcial = pa.Table.from_batches([lote]).group_by(list(agrupar)).aggregate([([], "count_all")])
+        claves = [parcial.column(campo).to_pylist() for campo in agrupar]
+        for clave, cantidad in zip(zip(*claves), parcial.column("count_all").to_pylist()):
+            totales[clave] += cantidad
+
+    # Empates en orden de clave para que la respuesta sea estable
+    ordenados = sorted(totales.items(), key=lambda item: (-item[1], [str(valor) for valor in item[0]]))
+    return [{**dict(zip(agrupar, clave)), "total": cantidad} for clave, cantidad in ordenados]
@@ -0,0 +1,194 @@
+"""
+Vistas async de la bitácora (modo ASGI).
+
+- bitacora_list: la misma página que BitacoraViewSet.list
+  (count/next/previous/results); el resto de métodos se delega a la vista sync.
+- bitacora_stream: live-tail por Server-Sent Events (ver difusor.py).
+"""
+import asyncio
+import math
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.http import StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed, NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from core.async_api import User, api_async, autenticar, respuesta_json
+from users.permissions import CanViewBitacora
+from .difusor import Filtro, difusor, eventos
+from .models import Bitacora
+from .serializers import BitacoraSerializer
+from .views import RELACIONES, TICKET_SALT, BitacoraViewSet, filtrar_bitacora
+
+_lista_sync = BitacoraViewSet.as_view({'get': 'list', 'post': 'create'})
+
+
+@api_async(replica=True)
+async def bitacora_list(request):
+    """Lista paginada de la bitácora (async); POST se delega al ViewSet"""
+    if request.method != 'GET':
+        return await sync_to_async(_lista_sync)(request)
+    if not request.user.tiene_permiso('ver_bitacora'):
+        return respuesta_json({'detail': CanViewBitacora.message}, status=status.HTTP_403_FORBIDDEN)
+
+    page_query_param = PageNumberPagination.page_query_param
+    page_size = api_settings.PAGE_SIZE
+    try:
+        queryset = filtrar_bitacora(request.GET)
+    except ValidationError as error:
+        return respuesta_json(error.detail, status=status.HTTP_400_BAD_REQUEST)
+
+    count = await queryset.acount()
+    num_pages = max(1, math.ceil(count / page_size))
+
+    page_number = request.GET.get(page_query_param) or 1
+    if page_number in PageNumberPagination.last_page_strings:
+        page_number = num_pages
+    try:
+        page_number = int(page_number)
+    except (TypeError, ValueError):
+        page_number = 0
+    if page_number < 1 or page_number > num_pages:
+        return respuesta_json(
+            {'detail': str(NotFound(PageNumberPagination.invalid_page_message).detail)},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    offset = (page_number - 1) * page_size
+    registros = [registro async for registro in queryset[offset:offset + page_size]]
+
+    url = request.build_absolute_uri()
+    siguiente = None
+    if page_number < num_pages:
+        siguiente = replace_query_param(url, page_query_param, page_number + 1)
+    anterior = None
+    if page_number > 1:
+        anterior = (
+            remove_query_param(url, page_query_param)
+            if page_number == 2
+            else replace_query_param(url, page_query_param, page_number - 1)
+        )
+
+    return respuesta_json({
+        'count': count,
+        'next': siguiente,
+        'previous': anterior,
+        'results': BitacoraSerializer(registros, many=True).data,
+    })
+
+
+async def _usuario_stream(request):
+    """
+    Usuario del stream: EventSource no puede enviar Authorization, así que se acepta
+    un ticket de corta duración (?ticket=, ver ticket_stream) o, si no hay, JWT/sesión
+    """
+    ticket = request.GET.get('ticket')
+    if not ticket:
+        return await autenticar(request)
+    try:
+        user_id = signing.loads(ticket, salt=TICKET_SALT, max_age=settings.BITACORA_STREAM_TICKET_SEG)
+    except signing.BadSignature:
+        raise AuthenticationFailed('Ticket inválido o vencido')
+    try:
+        user = await User.objects.select_related('rol').aget(pk=user_id, is_active=True)
+    except User.DoesNotExist:
+        raise AuthenticationFailed('Ticket inválido o vencido')
+    return user
+
+
+def _filtro_stream(params):
+    usuario_id = params.get('usuario_id', '').strip()
+    if usuario_id and not usuario_id.isdigit():
+        raise ValidationError({'usuario_id': 'Debe ser un número entero'})
+    ultimo = params.get('ultimo_id', '').strip()
+    if ultimo and not ultimo.isdigit():
+        raise ValidationError({'ultimo_id': 'Debe ser un número entero'})
+    return Filtro(
+        modulo=params.get('modulo', '').strip().upper() or None,
+        accion=params.get('accion', '').strip() or None,
+        usuario_id=int(usuario_id) if usuario_id else None,
+    )
+
+
+async def _eventos_stream(suscripcion, ultimo_id):
+    """Mensajes SSE: reintento, registros perdidos desde Last-Event-ID y luego en vivo"""
+    try:
+        yield b'retry: %d\n\n' % settings.BITACORA_STREAM_RETRY_MS
+
+        enviados = set()
+        if ultimo_id is not None:
+            # Reconexión: lo que se escribió mientras el cliente no estaba (una consulta)
+            queryset = suscripcion.filtro.queryset(
+                Bitacora.objects.filter(id__gt=ultimo_id).select_related(*RELACIONES)
+            ).order_by('id')[:settings.BITACORA_STREAM_REPLAY_MAX]
+            for evento in eventos([registro async for registro in queryset]):
+                enviados.add(evento.id)
+                yield evento.mensaje
+
+        while not suscripcion.desbordada or not suscripcion.cola.empty():
+            try:
+                evento = await asyncio.wait_for(
+                    suscripcion.cola.get(), settings.BITACORA_STREAM_HEARTBEAT_SEG
+                )
+            except asyncio.TimeoutError:
+                # Comentario SSE: mantiene viva la conexión a través de proxies
+                yield b': ping\n\n'
+                continue
+            if evento.id in enviados:
+                continue
+            yield evento.mensaje
+    finally:
+        difusor.desuscribir(suscripcion)
+
+
+@csrf_exempt
+async def bitacora_stream(request):
+    """
+    Live-tail de la bitácora por Server-Sent Events (solo ASGI).
+    Filtros opcionales: modulo, accion, usuario_id. Al reconectar, EventSource envía
+    Last-Event-ID (el id del último registro recibido) y se reenvía lo que faltó;
+    ?ultimo_id= hace lo mismo en la primera conexión.
+    """
+    if request.method != 'GET':
+        return respuesta_json({'detail': 'Método no permitido.'}, status=status.HTTP_405_METHOD_NOT_ALLOWED)
+    try:
+        user = await _usuario_stream(request)
+    except (InvalidToken, AuthenticationFailed) as error:
+        return respuesta_json(error.detail, status=status.HTTP_401_UNAUTHORIZED)
+    if user is None:
+        return respuesta_json(
+            {'detail': 'Las credenciales de autenticación no se proveyeron.'},
+            status=status.HTTP_401_UNAUTHORIZED,
+        )
+    if not user.tiene_permiso('ver_bitacora'):
+        return respuesta_json({'error': 'No tienes permisos para ver la bitácora'}, status=status.HTTP_403_FORBIDDEN)
+
+    try:
+        filtro = _filtro_stream(request.GET)
+    except ValidationError as error:
+        return respuesta_json(error.detail, status=status.HTTP_400_BAD_REQUEST)
+    ultimo = request.headers.get('Last-Event-ID', '').strip() or request.GET.get('ultimo_id', '').strip()
+    ultimo_id = int(ultimo) if ultimo.isdigit() else None
+
+    if difusor.lleno():
+        return respuesta_json(
+            {'detail': 'Demasiadas conexiones al stream, reintente más tarde'},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    suscripcion = await difusor.suscribir(filtro)
+
+    response = StreamingHttpResponse(
+        _eventos_stream(suscripcion, ultimo_id), content_type='text/event-stream'
+    )
+    # no-transform: ni el middleware de compresión ni un proxy deben acumular el stream
+    response['Cache-Control'] = 'no-cache, no-transform'
+    response['X-Accel-Buffering'] = 'no'
+    return response
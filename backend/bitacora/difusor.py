@@ -0,0 +1,217 @@
+"""
+Difusor en proceso de los registros nuevos de bitácora (live-tail por SSE).
+
+Un solo lector por proceso consulta la base cada BITACORA_STREAM_INTERVALO_SEG
+(o antes, si en este proceso se escribió un registro) y reparte cada registro,
+ya serializado, a las colas de todos los suscriptores. Con N operadores mirando
+la bitácora el costo es una consulta por intervalo, no N.
+
+El lector solo corre mientras hay suscriptores y vive en el event loop del
+worker ASGI. Los ids se asignan al insertar pero se confirman en cualquier
+orden: los huecos que aparecen entre ids leídos se vuelven a consultar durante
+BITACORA_STREAM_HUECO_SEG por si eran transacciones que todavía no confirmaban.
+"""
+import asyncio
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Max, Q
+
+from core.json_api import ORJSONRenderer
+from .models import Bitacora
+from .serializers import BitacoraSerializer
+from .views import RELACIONES
+
+logger = logging.getLogger("transporte.bitacora")
+
+_renderer = ORJSONRenderer()
+
+# Máximo de registros por lectura; si hay más, se lee de nuevo sin esperar
+LOTE = 500
+
+
+class Evento:
+    """Registro de bitácora ya renderizado como mensaje SSE"""
+
+    __slots__ = ("id", "modulo", "accion", "usuario_id", "mensaje")
+
+    def __init__(self, registro):
+        self.id = registro.id
+        self.modulo = registro.modulo
+        self.accion = registro.accion
+        self.usuario_id = registro.usuario_id
+        datos = BitacoraSerializer(registro).data
+        datos["modulo"] = registro.modulo
+        self.mensaje = b"id: %d\ndata: %s\n\n" % (registro.id, _renderer.render(datos))
+
+
+def eventos(registros):
+    return [Evento(registro) for registro in registros]
+
+
+class Filtro:
+    """Filtros del stream (modulo, accion, usuario_id), evaluados en memoria"""
+
+    def __init__(self, modulo=None, accion=None, usuario_id=None):
+        self.modulo = modulo
+        self.accion = accion
+        self.usuario_id = usuario_id
+
+    def acepta(self, evento):
+        return (
+            (self.modulo is None or evento.modulo == self.modulo)
+            and (self.accion is None or evento.accion == self.accion)
+            and (self.usuario_id is None or evento.usuario_id == self.usuario_id)
+        )
+
+    def queryset(self, queryset):
+        if self.modulo is not None:
+            queryset = queryset.filter(modulo=self.modulo)
+        if self.accion is not None:
+            queryset = queryset.filter(tipo_accion__nombre=self.accion)
+        if self.usuario_id is not None:
+            queryset = queryset.filter(usuario_id=self.usuario_id)
+        return queryset
+
+
+class Suscripcion:
+    """Cola de eventos de un cliente; se descarta si el cliente no da abasto"""
+
+    def __init__(self, filtro):
+        self.filtro = filtro
+        self.cola = asyncio.Queue(maxsize=settings.BITACORA_STREAM_COLA_MAX)
+        self.desbordada = False
+
+    def entregar(self, evento):
+        if self.desbordada or not self.filtro.acepta(evento):
+            return
+        try:
+            self.cola.put_nowait(evento)
+        except asyncio.QueueFull:
+            # El cliente se reconecta con Last-Event-ID y recupera lo que falte
+            self.desbordada = True
+
+
+class Difusor:
+    """Lector único por proceso y reparto a los suscriptores"""
+
+    def __init__(self):
+        self.suscripciones = set()
+        self.ultimo_id = None
+        self.huecos = {}  # id -> instante en que se vio el hueco
+        self._loop = None
+        self._tarea = None
+        self._despertar = None
+
+    # ------------------------------------------------------------------
+    # Suscriptores
+    # ------------------------------------------------------------------
+
+    def lleno(self):
+        return len(self.suscripciones) >= settings.BITACORA_STREAM_MAX_CONEXIONES
+
+    async def suscribir(self, filtro):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Primer uso en este event loop (o el anterior ya se cerró)
+            self.suscripciones = set()
+            self._loop = loop
+            self._tarea = None
+            self._despertar = asyncio.Event()
+        if self.ultimo_id is None:
+            maximo = await Bitacora.objects.aaggregate(maximo=Max("id"))
+            self.ultimo_id = maximo["maximo"] or 0
+            self.huecos = {}
+
+        suscripcion = Suscripcion(filtro)
+        self.suscripciones.add(suscripcion)
+        if self._tarea is None or self._tarea.done():
+            self._tarea = loop.create_task(self._leer())
+        return suscripcion
+
+    def desuscribir(self, suscripcion):
+        self.suscripciones.discard(suscripcion)
+        if not self.suscripciones and self._despertar is not None:
+            # El lector termina en su próxima vuelta
+            self._despertar.set()
+
+    def despertar(self):
+        """Pide una lectura inmediata; se puede llamar desde cualquier hilo"""
+        loop, evento = self._loop, self._despertar
+        if loop is None or evento is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(evento.set)
+        except RuntimeError:
+            pass
+
+    # ------------------------------------------------------------------
+    # Lector
+    # ------------------------------------------------------------------
+
+    async def _leer(self):
+        while self.suscripciones:
+            try:
+                nuevos = await self.leer_nuevos()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Error leyendo la bitácora para el stream")
+                await sync_to_async(close_old_connections)()
+                nuevos = []
+
+            for evento in nuevos:
+                for suscripcion in list(self.suscripciones):
+                    suscripcion.entregar(evento)
+
+            if len(nuevos) >= LOTE:
+                continue
+            self._despertar.clear()
+            try:
+                await asyncio.wait_for(self._despertar.wait(), settings.BITACORA_STREAM_INTERVALO_SEG)
+            except asyncio.TimeoutError:
+                pass
+        # Sin suscriptores: la próxima suscripción parte del máximo actual
+        self.ultimo_id = None
+
+    async def leer_nuevos(self):
+        """Una consulta: ids posteriores al último leído y huecos pendientes"""
+        ahora = time.monotonic()
+        vencimiento = ahora - settings.BITACORA_STREAM_HUECO_SEG
+        self.huecos = {id_: visto for id_, visto in self.huecos.items() if visto > vencimiento}
+
+        condicion = Q(id__gt=self.ultimo_id)
+        if self.huecos:
+            condicion |= Q(id__in=list(self.huecos))
+        queryset = (
+            Bitacora.objects.filter(condicion)
+            .select_related(*RELACIONES)
+            .order_by("id")[:LOTE]
+        )
+        registros = [registro async for registro in queryset]
+
+        for registro in registros:
+            if registro.id in self.huecos:
+                del self.huecos[registro.id]
+            elif registro.id > self.ultimo_id:
+                # Un salto enorme es la secuencia, no transacciones en vuelo
+                if registro.id - self.ultimo_id <= LOTE:
+                    for faltante in range(self.ultimo_id + 1, registro.id):
+                        self.huecos[faltante] = ahora
+                self.ultimo_id = registro.id
+        return eventos(registros)
+
+
+difusor = Difusor()
+
+
+def registro_guardado(sender, instance, created, using=None, **kwargs):
+    """post_save: despierta al lector de este proceso cuando el registro se confirma"""
+    if created:
+        from django.db import transaction
+
+        # En la conexión donde se guardó: con la base de auditoría no es "default"
+        transaction.on_commit(difusor.despertar, using=using)
@@ -0,0 +1,197 @@
+"""
+Tablas de dimensión de la bitácora: acciones, user agents y autores.
+
+Cada registro guarda un id pequeño en lugar del texto. El texto se interna
+una sola vez: el primer registro con un user agent nuevo lo inserta (con el
+navegador, sistema y dispositivo ya interpretados) y los siguientes solo
+consultan una cache LRU del proceso (texto -> id).
+
+Un id entra a la cache solo cuando la fila está confirmada: si se creó dentro
+de una transacción, recién en on_commit. Así un rollback nunca deja en la cache
+un id que no existe en la base.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.db import IntegrityError, connections, router, transaction
+
+# Tamaño de las caches texto -> id por proceso
+MAX_ACCIONES = 1024
+MAX_AGENTES = 4096
+MAX_AUTORES = 4096
+
+# Campos de UsuarioBitacora, en el orden en que entran a la huella
+CAMPOS_AUTOR = ("usuario_id", "username", "first_name", "last_name", "rol")
+
+# (patrón, nombre) en orden: Edge y Opera también dicen "Chrome", Chrome también dice "Safari"
+_NAVEGADORES = [
+    (re.compile(r"Edg(?:e|A|iOS)?/"), "Edge"),
+    (re.compile(r"OPR/|Opera"), "Opera"),
+    (re.compile(r"SamsungBrowser/"), "Samsung Internet"),
+    (re.compile(r"Firefox/|FxiOS/"), "Firefox"),
+    (re.compile(r"Chrome/|CriOS/"), "Chrome"),
+    (re.compile(r"Safari/"), "Safari"),
+    (re.compile(r"^Dart/|okhttp/"), "App móvil"),
+    (re.compile(r"^PostmanRuntime/"), "Postman"),
+    (re.compile(r"^curl/"), "curl"),
+    (re.compile(r"python-requests|aiohttp|httpx"), "Python"),
+]
+_SISTEMAS = [
+    (re.compile(r"Windows"), "Windows"),
+    (re.compile(r"Android"), "Android"),
+    (re.compile(r"iPhone|iPad|iPod|iOS"), "iOS"),
+    (re.compile(r"Mac OS X|Macintosh"), "macOS"),
+    (re.compile(r"CrOS"), "ChromeOS"),
+    (re.compile(r"Linux"), "Linux"),
+]
+_BOT = re.compile(r"bot|crawl|spider|slurp|monitor", re.IGNORECASE)
+_TABLET = re.compile(r"iPad|Tablet|Android(?!.*Mobile)")
+_MOVIL = re.compile(r"Mobile|iPhone|iPod|Android|^Dart/|okhttp/")
+
+
+@lru_cache(maxsize=MAX_AGENTES)
+def parsear_user_agent(texto):
+    """(navegador, sistema, dispositivo) de un user agent; heurística sin dependencias"""
+    navegador = next((nombre for patron, nombre in _NAVEGADORES if patron.search(texto)), "Otro")
+    sistema = next((nombre for patron, nombre in _SISTEMAS if patron.search(texto)), "Otro")
+    if _BOT.search(texto):
+        dispositivo = "bot"
+    elif _TABLET.search(texto):
+        dispositivo = "tablet"
+    elif _MOVIL.search(texto):
+        dispositivo = "movil"
+    elif navegador in ("Postman", "curl", "Python"):
+        dispositivo = "script"
+    else:
+        dispositivo = "escritorio"
+    return navegador, sistema, dispositivo
+
+
+def huella(texto):
+    """Clave única del user agent (el texto puede superar el límite de un índice btree)"""
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+
+def huella_autor(datos):
+    """Clave única de una copia de los datos de un usuario (UsuarioBitacora)"""
+    return huella("\x1f".join(str(datos[campo]) for campo in CAMPOS_AUTOR))
+
+
+class _CacheLRU:
+    """texto -> id, acotada y segura entre hilos"""
+
+    def __init__(self, maximo):
+        self.maximo = maximo
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, clave):
+        with self._lock:
+            valor = self._datos.get(clave)
+            if valor is not None:
+                self._datos.move_to_end(clave)
+            return valor
+
+    def put(self, clave, valor):
+        with self._lock:
+            self._datos[clave] = valor
+            self._datos.move_to_end(clave)
+            if len(self._datos) > self.maximo:
+                self._datos.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._datos.clear()
+
+
+_acciones = _CacheLRU(MAX_ACCIONES)
+_agentes = _CacheLRU(MAX_AGENTES)
+_autores = _CacheLRU(MAX_AUTORES)
+
+
+def _recordar(cache, clave, valor, using):
+    if connections[using].in_atomic_block:
+        transaction.on_commit(lambda: cache.put(clave, valor), using=using)
+    else:
+        cache.put(clave, valor)
+
+
+def _obtener_o_crear(modelo, buscar, crear):
+    """
+    get_or_create tolerante a la carrera entre dos procesos que internan lo mismo.
+    Retorna (id, alias de la base)
+    """
+    using = router.db_for_write(modelo)
+    objetos = modelo.objects.using(using).only("id")
+    try:
+        return objetos.get(**buscar).id, using
+    except modelo.DoesNotExist:
+        pass
+    try:
+        with transaction.atomic(using=using):
+            return modelo.objects.using(using).create(**buscar, **crear).id, using
+    except IntegrityError:
+        return objetos.get(**buscar).id, using
+
+
+def id_accion(nombre):
+    """Id de AccionBitacora para el texto dado (lo crea si no existe)"""
+    from .models import AccionBitacora
+
+    id_ = _acciones.get(nombre)
+    if id_ is None:
+        id_, using = _obtener_o_crear(AccionBitacora, {"nombre": nombre}, {})
+        _recordar(_acciones, nombre, id_, using)
+    return id_
+
+
+def id_user_agent(texto):
+    """Id de UserAgent para el texto dado, None si viene vacío"""
+    from .models import UserAgent
+
+    if not texto:
+        return None
+    id_ = _agentes.get(texto)
+    if id_ is None:
+        navegador, sistema, dispositivo = parsear_user_agent(texto)
+        id_, using = _obtener_o_crear(
+            UserAgent,
+            {"huella": huella(texto)},
+            {"texto": texto, "navegador": navegador, "sistema": sistema, "dispositivo": dispositivo},
+        )
+        _recordar(_agentes, texto, id_, using)
+    return id_
+
+
+def id_autor(usuario):
+    """
+    (id de UsuarioBitacora, datos) con la copia actual de los datos del usuario.
+    La clave de la cache usa rol_id: el nombre del rol solo se consulta al internar.
+    """
+    from .models import UsuarioBitacora
+
+    clave = (usuario.pk, usuario.username, usuario.first_name, usuario.last_name, usuario.rol_id)
+    valor = _autores.get(clave)
+    if valor is None:
+        datos = {
+            "usuario_id": usuario.pk,
+            "username": usuario.username,
+            "first_name": usuario.first_name,
+            "last_name": usuario.last_name,
+            "rol": usuario.rol.nombre if usuario.rol_id else "",
+        }
+        id_, using = _obtener_o_crear(
+            UsuarioBitacora, {"huella": huella_autor(datos)}, datos
+        )
+        valor = (id_, datos)
+        _recordar(_autores, clave, valor, using)
+    return valor
+
+
+def limpiar_caches():
+    _acciones.clear()
+    _agentes.clear()
+    _autores.clear()
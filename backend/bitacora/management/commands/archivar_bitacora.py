@@ -0,0 +1,108 @@
+"""
+Exporta meses cerrados de la bitácora al archivo Parquet (ver bitacora/archivo.py).
+
+Uso:
+    python manage.py archivar_bitacora                        # hasta el mes pasado
+    python manage.py archivar_bitacora --hasta 2025-06 --borrar
+    python manage.py archivar_bitacora --desde 2025-01 --hasta 2025-01 --reemplazar
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import router, transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from bitacora import archivo
+from bitacora.models import Bitacora
+
+# Filas por DELETE al borrar lo archivado
+LOTE_BORRADO = 10000
+
+
+def _siguiente(mes):
+    anio, numero = map(int, mes.split("-"))
+    return f"{anio + numero // 12:04d}-{numero % 12 + 1:02d}"
+
+
+class Command(BaseCommand):
+    help = 'Archiva meses cerrados de la bitácora en Parquet (particionado por mes y módulo)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', help='Primer mes (AAAA-MM); por defecto el del registro más antiguo')
+        parser.add_argument('--hasta', help='Último mes (AAAA-MM, inclusive); por defecto el mes pasado')
+        parser.add_argument(
+            '--borrar',
+            action='store_true',
+            help='Después de archivar, borra de PostgreSQL los registros que quedaron en el archivo'
+        )
+        parser.add_argument(
+            '--reemplazar',
+            action='store_true',
+            help='Vuelve a exportar los meses ya archivados que sigan completos en PostgreSQL'
+        )
+
+    def handle(self, *args, **options):
+        if not archivo.disponible():
+            raise CommandError('pyarrow no está instalado: pip install pyarrow')
+
+        actual = timezone.now().strftime('%Y-%m')
+        hasta = options['hasta']
+        if hasta is None:
+            hasta = (timezone.now().replace(day=1) - timedelta(days=1)).strftime('%Y-%m')
+        desde = options['desde']
+        if desde is None:
+            antiguo = Bitacora.objects.aggregate(minimo=Min('fecha_hora'))['minimo']
+            if antiguo is None:
+                self.stdout.write('📭 La bitácora está vacía')
+                return
+            desde = antiguo.strftime('%Y-%m')
+        for valor in (desde, hasta):
+            if not archivo.MES.match(valor):
+                raise CommandError(f'Mes inválido: {valor} (use AAAA-MM)')
+        if hasta >= actual:
+            raise CommandError(f'Solo se archivan meses cerrados: --hasta debe ser anterior a {actual}')
+
+        archivados = set(archivo.meses_archivados())
+        mes = desde
+        while mes <= hasta:
+            if mes in archivados and not options['reemplazar']:
+                self.stdout.write(f'⏭️ {mes}: ya archivado ({archivo.filas_archivadas(mes)} filas)')
+            elif mes in archivados and self._en_base(mes) < archivo.filas_archivadas(mes):
+                # Reemplazar perdería lo que ya se borró de PostgreSQL
+                self.stdout.write(self.style.WARNING(
+                    f'⚠️ {mes}: no se reemplaza, el archivo tiene filas que ya no están en PostgreSQL'
+                ))
+            else:
+                filas = archivo.exportar_mes(mes)
+                en_archivo = archivo.filas_archivadas(mes)
+                if en_archivo != filas:
+                    raise CommandError(f'{mes}: se escribieron {filas} filas pero el archivo tiene {en_archivo}')
+                if filas:
+                    self.stdout.write(self.style.SUCCESS(f'🗄️ {mes}: {filas} filas archivadas'))
+            if options['borrar']:
+                borradas = self._borrar(mes)
+                if borradas:
+                    self.stdout.write(f'🧹 {mes}: {borradas} filas borradas de PostgreSQL')
+            mes = _siguiente(mes)
+
+    @staticmethod
+    def _en_base(mes):
+        inicio, fin = archivo.rango_mes(mes)
+        return Bitacora.objects.filter(fecha_hora__gte=inicio, fecha_hora__lt=fin).count()
+
+    @staticmethod
+    def _borrar(mes):
+        """Borra solo los ids del mes que están en el archivo"""
+        inicio, fin = archivo.rango_mes(mes)
+        borradas = 0
+        # La transacción va en la base de la bitácora, que puede ser la de auditoría
+        base = router.db_for_write(Bitacora)
+        for ids in archivo.ids_archivados(mes):
+            for i in range(0, len(ids), LOTE_BORRADO):
+                with transaction.atomic(using=base):
+                    cantidad, _ = Bitacora.objects.filter(
+                        id__in=ids[i:i + LOTE_BORRADO], fecha_hora__gte=inicio, fecha_hora__lt=fin
+                    ).delete()
+                borradas += cantidad
+        return borradas
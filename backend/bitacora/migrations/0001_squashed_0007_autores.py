@@ -0,0 +1,97 @@
+# Esquema completo de la bitácora en una sola migración, para bases nuevas.
+# Es la que crea las tablas en la base de auditoría (alias "audit", ver core/routers.py):
+# la historia 0001-0007 no sirve ahí porque 0002 crea la FK a la tabla de usuarios
+# con constraint, y esa tabla vive en la base principal.
+# Las bases que ya aplicaron 0001-0006 siguen la historia original.
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    replaces = [
+        ('bitacora', '0001_initial'),
+        ('bitacora', '0002_initial'),
+        ('bitacora', '0003_indices_filtros'),
+        ('bitacora', '0004_dimensiones'),
+        ('bitacora', '0005_poblar_dimensiones'),
+        ('bitacora', '0006_quitar_columnas_texto'),
+        ('bitacora', '0007_autores'),
+    ]
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccionBitacora',
+            fields=[
+                ('id', models.SmallAutoField(primary_key=True, serialize=False)),
+                ('nombre', models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                'verbose_name': 'Acción de bitácora',
+                'verbose_name_plural': 'Acciones de bitácora',
+            },
+        ),
+        migrations.CreateModel(
+            name='UserAgent',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('huella', models.CharField(max_length=40, unique=True)),
+                ('texto', models.TextField()),
+                ('navegador', models.CharField(max_length=30)),
+                ('sistema', models.CharField(max_length=30)),
+                ('dispositivo', models.CharField(max_length=20)),
+            ],
+            options={
+                'verbose_name': 'User agent',
+                'verbose_name_plural': 'User agents',
+            },
+        ),
+        migrations.CreateModel(
+            name='UsuarioBitacora',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('huella', models.CharField(max_length=40, unique=True)),
+                ('usuario_id', models.IntegerField()),
+                ('username', models.CharField(max_length=150)),
+                ('first_name', models.CharField(blank=True, max_length=150)),
+                ('last_name', models.CharField(blank=True, max_length=150)),
+                ('rol', models.CharField(blank=True, max_length=100)),
+            ],
+            options={
+                'verbose_name': 'Usuario de bitácora',
+                'verbose_name_plural': 'Usuarios de bitácora',
+            },
+        ),
+        migrations.CreateModel(
+            name='Bitacora',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('descripcion', models.TextField(blank=True)),
+                ('fecha_hora', models.DateTimeField(default=django.utils.timezone.now)),
+                ('ip', models.GenericIPAddressField(blank=True, null=True)),
+                ('modulo', models.CharField(choices=[('USUARIOS', 'Usuarios'), ('ADMINISTRACION', 'Administracion'), ('TRANSPORTE', 'Transporte'), ('RESERVAS', 'Reservas'), ('PAGOS', 'Pagos'), ('GENERAL', 'General')], default='GENERAL', max_length=50)),
+                ('usuario', models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('tipo_accion', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='bitacora.accionbitacora')),
+                ('agente', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='bitacora.useragent')),
+                ('autor', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='bitacora.usuariobitacora')),
+            ],
+            options={
+                'indexes': [
+                    models.Index(fields=['-fecha_hora'], name='bitacora_fecha_idx'),
+                    models.Index(fields=['usuario', '-fecha_hora'], name='bitacora_usuario_fecha_idx'),
+                    models.Index(fields=['modulo', '-fecha_hora'], name='bitacora_modulo_fecha_idx'),
+                    models.Index(fields=['tipo_accion', '-fecha_hora'], name='bitacora_accion_fecha_idx'),
+                    models.Index(fields=['ip', '-fecha_hora'], name='bitacora_ip_fecha_idx'),
+                ],
+            },
+        ),
+    ]
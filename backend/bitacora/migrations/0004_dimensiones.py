@@ -0,0 +1,51 @@
+# Tablas de dimensión para acciones y user agents (ver bitacora/dimensiones.py).
+# Primero se agregan las FK vacías; 0005 las completa y 0006 borra las columnas de texto.
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bitacora', '0003_indices_filtros'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccionBitacora',
+            fields=[
+                ('id', models.SmallAutoField(primary_key=True, serialize=False)),
+                ('nombre', models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                'verbose_name': 'Acción de bitácora',
+                'verbose_name_plural': 'Acciones de bitácora',
+            },
+        ),
+        migrations.CreateModel(
+            name='UserAgent',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('huella', models.CharField(max_length=40, unique=True)),
+                ('texto', models.TextField()),
+                ('navegador', models.CharField(max_length=30)),
+                ('sistema', models.CharField(max_length=30)),
+                ('dispositivo', models.CharField(max_length=20)),
+            ],
+            options={
+                'verbose_name': 'User agent',
+                'verbose_name_plural': 'User agents',
+            },
+        ),
+        migrations.AddField(
+            model_name='bitacora',
+            name='tipo_accion',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='bitacora.accionbitacora'),
+        ),
+        migrations.AddField(
+            model_name='bitacora',
+            name='agente',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='bitacora.useragent'),
+        ),
+    ]
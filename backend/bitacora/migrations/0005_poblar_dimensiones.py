@@ -0,0 +1,89 @@
+# Pasa el texto de accion y user_agent a las tablas de dimensión.
+# Los valores distintos se internan desde Python (el user agent se interpreta una vez
+# por valor) y las filas se actualizan con UPDATE ... FROM en tramos de ids, cada
+# tramo en su propia transacción para no bloquear la tabla entera.
+
+from django.db import migrations, transaction
+
+TRAMO = 50000
+
+
+def _tramos(cursor, tabla):
+    cursor.execute(f'SELECT MIN(id), MAX(id) FROM {tabla}')
+    minimo, maximo = cursor.fetchone()
+    if minimo is None:
+        return
+    for desde in range(minimo, maximo + 1, TRAMO):
+        yield desde, desde + TRAMO
+
+
+def poblar(apps, schema_editor):
+    from bitacora.dimensiones import huella, parsear_user_agent
+
+    Bitacora = apps.get_model('bitacora', 'Bitacora')
+    AccionBitacora = apps.get_model('bitacora', 'AccionBitacora')
+    UserAgent = apps.get_model('bitacora', 'UserAgent')
+    alias = schema_editor.connection.alias
+
+    acciones = set(Bitacora.objects.using(alias).exclude(accion='').values_list('accion', flat=True).distinct())
+    AccionBitacora.objects.using(alias).bulk_create(
+        [AccionBitacora(nombre=nombre) for nombre in sorted(acciones)], ignore_conflicts=True
+    )
+    agentes = set(
+        Bitacora.objects.using(alias).exclude(user_agent='').values_list('user_agent', flat=True).distinct()
+    )
+    UserAgent.objects.using(alias).bulk_create(
+        [
+            UserAgent(
+                huella=huella(texto), texto=texto,
+                **dict(zip(('navegador', 'sistema', 'dispositivo'), parsear_user_agent(texto))),
+            )
+            for texto in agentes
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+    with schema_editor.connection.cursor() as cursor:
+        for desde, hasta in _tramos(cursor, 'bitacora_bitacora'):
+            with transaction.atomic(using=alias):
+                cursor.execute(
+                    'UPDATE bitacora_bitacora b SET tipo_accion_id = a.id FROM bitacora_accionbitacora a '
+                    'WHERE b.accion = a.nombre AND b.id >= %s AND b.id < %s',
+                    [desde, hasta],
+                )
+                cursor.execute(
+                    'UPDATE bitacora_bitacora b SET agente_id = u.id FROM bitacora_useragent u '
+                    'WHERE b.user_agent = u.texto AND b.id >= %s AND b.id < %s',
+                    [desde, hasta],
+                )
+
+
+def revertir(apps, schema_editor):
+    alias = schema_editor.connection.alias
+    with schema_editor.connection.cursor() as cursor:
+        for desde, hasta in _tramos(cursor, 'bitacora_bitacora'):
+            with transaction.atomic(using=alias):
+                cursor.execute(
+                    'UPDATE bitacora_bitacora b SET accion = a.nombre FROM bitacora_accionbitacora a '
+                    'WHERE b.tipo_accion_id = a.id AND b.id >= %s AND b.id < %s',
+                    [desde, hasta],
+                )
+                cursor.execute(
+                    'UPDATE bitacora_bitacora b SET user_agent = u.texto FROM bitacora_useragent u '
+                    'WHERE b.agente_id = u.id AND b.id >= %s AND b.id < %s',
+                    [desde, hasta],
+                )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('bitacora', '0004_dimensiones'),
+    ]
+
+    operations = [
+        migrations.RunPython(poblar, revertir),
+    ]
@@ -0,0 +1,41 @@
+# Con las FK completas (0005) se borran las columnas de texto y el índice de acción
+# pasa a la FK (mismo nombre, ahora sobre un smallint). El default '' permite
+# revertir: las columnas vuelven a crearse vacías y 0005 las completa.
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bitacora', '0005_poblar_dimensiones'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='bitacora',
+            name='bitacora_accion_fecha_idx',
+        ),
+        migrations.AlterField(
+            model_name='bitacora',
+            name='accion',
+            field=models.CharField(default='', max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='bitacora',
+            name='user_agent',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.RemoveField(
+            model_name='bitacora',
+            name='accion',
+        ),
+        migrations.RemoveField(
+            model_name='bitacora',
+            name='user_agent',
+        ),
+        migrations.AddIndex(
+            model_name='bitacora',
+            index=models.Index(fields=['tipo_accion', '-fecha_hora'], name='bitacora_accion_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Bitácora sin JOIN a la tabla de usuarios, para poder moverla a su propia base:
+# la FK a usuario pierde el constraint y cada registro apunta a una copia de los
+# datos del usuario (UsuarioBitacora), que se completa aquí para lo ya registrado.
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def poblar(apps, schema_editor):
+    from bitacora.dimensiones import huella_autor
+
+    Bitacora = apps.get_model('bitacora', 'Bitacora')
+    UsuarioBitacora = apps.get_model('bitacora', 'UsuarioBitacora')
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    alias = schema_editor.connection.alias
+
+    ids = Bitacora.objects.using(alias).exclude(usuario_id=None).values_list('usuario_id', flat=True).distinct()
+    for usuario in User.objects.using(alias).select_related('rol').filter(id__in=list(ids)).iterator():
+        datos = {
+            'usuario_id': usuario.id,
+            'username': usuario.username,
+            'first_name': usuario.first_name,
+            'last_name': usuario.last_name,
+            'rol': usuario.rol.nombre if usuario.rol_id else '',
+        }
+        autor, _ = UsuarioBitacora.objects.using(alias).get_or_create(huella=huella_autor(datos), defaults=datos)
+        Bitacora.objects.using(alias).filter(usuario_id=usuario.id, autor=None).update(autor=autor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bitacora', '0006_quitar_columnas_texto'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UsuarioBitacora',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('huella', models.CharField(max_length=40, unique=True)),
+                ('usuario_id', models.IntegerField()),
+                ('username', models.CharField(max_length=150)),
+                ('first_name', models.CharField(blank=True, max_length=150)),
+                ('last_name', models.CharField(blank=True, max_length=150)),
+                ('rol', models.CharField(blank=True, max_length=100)),
+            ],
+            options={
+                'verbose_name': 'Usuario de bitácora',
+                'verbose_name_plural': 'Usuarios de bitácora',
+            },
+        ),
+        migrations.AlterField(
+            model_name='bitacora',
+            name='usuario',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='bitacora',
+            name='autor',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='bitacora.usuariobitacora'),
+        ),
+        migrations.RunPython(poblar, migrations.RunPython.noop),
+    ]
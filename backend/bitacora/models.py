@@ -2,6 +2,66 @@ from django.db import models
 from django.conf import settings
 from django.utils.timezone import now
 
+from .dimensiones import id_accion, id_autor, id_user_agent, parsear_user_agent
+
+
+class AccionBitacora(models.Model):
+    """Dimensión de acciones ("Login Cliente", "Crear"...): la bitácora guarda el id"""
+
+    id = models.SmallAutoField(primary_key=True)
+    nombre = models.CharField(max_length=100, unique=True)
+
+    class Meta:
+        verbose_name = "Acción de bitácora"
+        verbose_name_plural = "Acciones de bitácora"
+
+    def __str__(self):
+        return self.nombre
+
+
+class UserAgent(models.Model):
+    """Dimensión de user agents, interpretados una sola vez al internarlos"""
+
+    id = models.AutoField(primary_key=True)
+    # sha1 del texto: un user agent puede superar el tamaño máximo de una clave btree
+    huella = models.CharField(max_length=40, unique=True)
+    texto = models.TextField()
+    navegador = models.CharField(max_length=30)
+    sistema = models.CharField(max_length=30)
+    dispositivo = models.CharField(max_length=20)
+
+    class Meta:
+        verbose_name = "User agent"
+        verbose_name_plural = "User agents"
+
+    def __str__(self):
+        return f"{self.navegador} / {self.sistema} ({self.dispositivo})"
+
+
+class UsuarioBitacora(models.Model):
+    """
+    Datos del usuario al momento del registro. La bitácora puede estar en otra base
+    (alias "audit", ver core/routers.py): se muestra y filtra con esta copia, sin JOIN
+    a la tabla de usuarios. Un cambio de nombre o de rol crea una fila nueva.
+    """
+
+    id = models.AutoField(primary_key=True)
+    # sha1 de todos los campos
+    huella = models.CharField(max_length=40, unique=True)
+    usuario_id = models.IntegerField()
+    username = models.CharField(max_length=150)
+    first_name = models.CharField(max_length=150, blank=True)
+    last_name = models.CharField(max_length=150, blank=True)
+    rol = models.CharField(max_length=100, blank=True)
+
+    class Meta:
+        verbose_name = "Usuario de bitácora"
+        verbose_name_plural = "Usuarios de bitácora"
+
+    def __str__(self):
+        return self.username
+
+
 class Bitacora(models.Model):
     MODULOS = [
         ('USUARIOS', 'Usuarios'),
@@ -12,19 +72,76 @@ class Bitacora(models.Model):
         ('GENERAL', 'General'),
     ]
 
+    # Sin constraint: con la bitácora en su propia base, la tabla de usuarios no está ahí.
+    # Al borrar un usuario el registro conserva su id y sus datos (autor).
     usuario = models.ForeignKey(
         settings.AUTH_USER_MODEL,
-        on_delete=models.SET_NULL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
         null=True,
-        blank=True
+        blank=True,
+        related_name='+',
+        # Lo cubre el índice (usuario, -fecha_hora)
+        db_index=False,
+    )
+    # Copia de los datos del usuario; se completa al guardar (ver save)
+    autor = models.ForeignKey(
+        UsuarioBitacora, on_delete=models.PROTECT, null=True, blank=True, related_name='+', db_index=False
+    )
+    # Texto en las tablas de dimensión; se leen y escriben con las propiedades accion y user_agent
+    tipo_accion = models.ForeignKey(
+        AccionBitacora, on_delete=models.PROTECT, null=True, blank=True, related_name='+', db_index=False
     )
-    accion = models.CharField(max_length=100)  # LOGIN, LOGOUT, CREACION_USUARIO, etc.
     descripcion = models.TextField(blank=True)
     fecha_hora = models.DateTimeField(default=now)
     ip = models.GenericIPAddressField(null=True, blank=True)
-    user_agent = models.TextField(blank=True)
+    agente = models.ForeignKey(
+        UserAgent, on_delete=models.PROTECT, null=True, blank=True, related_name='+', db_index=False
+    )
     modulo = models.CharField(max_length=50, choices=MODULOS, default='GENERAL')
 
-def __str__(self):
-    usuario = getattr(self.usuario, "username", "Sistema")
-    return f"{self.fecha_hora} | {usuario} | {self.accion} | {self.modulo}"
\ No newline at end of file
+    class Meta:
+        # Cada filtro de la vista tiene su índice compuesto con la fecha: el filtro de
+        # igualdad más el rango desde/hasta y el ORDER BY -fecha_hora salen del mismo índice
+        indexes = [
+            models.Index(fields=['-fecha_hora'], name='bitacora_fecha_idx'),
+            models.Index(fields=['usuario', '-fecha_hora'], name='bitacora_usuario_fecha_idx'),
+            models.Index(fields=['modulo', '-fecha_hora'], name='bitacora_modulo_fecha_idx'),
+            models.Index(fields=['tipo_accion', '-fecha_hora'], name='bitacora_accion_fecha_idx'),
+            models.Index(fields=['ip', '-fecha_hora'], name='bitacora_ip_fecha_idx'),
+        ]
+
+    # Las propiedades aceptan texto como antes: Bitacora(accion="Crear", user_agent=...)
+    # interna el texto y deja la fila de dimensión cargada, sin consultas al leerla
+    @property
+    def accion(self):
+        return self.tipo_accion.nombre if self.tipo_accion_id else ""
+
+    @accion.setter
+    def accion(self, nombre):
+        self.tipo_accion = AccionBitacora(id=id_accion(nombre), nombre=nombre) if nombre else None
+
+    @property
+    def user_agent(self):
+        return self.agente.texto if self.agente_id else ""
+
+    @user_agent.setter
+    def user_agent(self, texto):
+        if not texto:
+            self.agente = None
+            return
+        navegador, sistema, dispositivo = parsear_user_agent(texto)
+        self.agente = UserAgent(
+            id=id_user_agent(texto), texto=texto,
+            navegador=navegador, sistema=sistema, dispositivo=dispositivo,
+        )
+
+    def save(self, *args, **kwargs):
+        if self.usuario_id and self.autor_id is None:
+            id_, datos = id_autor(self.usuario)
+            self.autor = UsuarioBitacora(id=id_, **datos)
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        usuario = self.autor.username if self.autor_id else "Sistema"
+        return f"{self.fecha_hora} | {usuario} | {self.accion} | {self.modulo}"
@@ -3,19 +3,23 @@ from .models import Bitacora
 
 class BitacoraSerializer(serializers.ModelSerializer):
     usuario = serializers.SerializerMethodField()
+    # Propiedades del modelo sobre las tablas de dimensión (tipo_accion, agente)
+    accion = serializers.CharField(max_length=100)
+    user_agent = serializers.CharField(required=False, allow_blank=True)
 
     class Meta:
         model = Bitacora
         fields = ['id', 'fecha_hora', 'usuario', 'accion', 'descripcion', 'ip', 'user_agent']
 
     def get_usuario(self, obj):
-        if obj.usuario:
-            rol_nombre = obj.usuario.rol.nombre if obj.usuario.rol else "Sin rol"
+        # Datos copiados al registrar (UsuarioBitacora): no se consulta la tabla de usuarios
+        if obj.autor_id:
+            autor = obj.autor
             return {
-                "id": obj.usuario.id,
-                "username": obj.usuario.username,
-                "first_name": obj.usuario.first_name,
-                "last_name": obj.usuario.last_name,
-                "rol": rol_nombre
+                "id": autor.usuario_id,
+                "username": autor.username,
+                "first_name": autor.first_name,
+                "last_name": autor.last_name,
+                "rol": autor.rol or "Sin rol"
             }
         return {"username": "Sistema", "first_name": "", "last_name": "", "rol": "N/A"}
\ No newline at end of file
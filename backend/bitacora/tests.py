@@ -1,3 +1,494 @@
-from django.test import TestCase
+import asyncio
+import json
+import tempfile
+from datetime import datetime
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.test.client import AsyncRequestFactory
+from io import StringIO
+from unittest import mock, skipUnless
+from rest_framework.test import APITestCase
+
+from core.routers import AUDITORIA, auditoria_separada
+from users.models import Rol
+from users.tokens import RefreshToken
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = pq = None
+
+from .async_views import bitacora_list, bitacora_stream
+from . import archivo, dimensiones
+from .difusor import Difusor, difusor
+from .models import AccionBitacora, Bitacora, UserAgent
+from .serializers import BitacoraSerializer
+from .utils import registrar_bitacora
+from .views import filtrar_bitacora
+
+User = get_user_model()
+
+# La bitácora puede estar en la base de auditoría (AUDIT_DB_NAME, core/routers.py)
+BASES = "__all__"
+
+
+def conexion_bitacora():
+    return connections[router.db_for_write(Bitacora)]
+
+
+class BitacoraAsyncListTest(APITestCase):
+    """El listado async debe devolver la misma página que BitacoraViewSet.list"""
+
+    databases = BASES
+
+    def setUp(self):
+        rol = Rol.objects.create(nombre="Auditor", permisos=["ver_bitacora"])
+        self.user = User.objects.create_user(username="auditor", password="auditor123", rol=rol)
+        self.headers = {"Authorization": f"Bearer {RefreshToken.for_user(self.user).access_token}"}
+        for i in range(15):
+            Bitacora.objects.create(
+                usuario=self.user if i % 2 else None,
+                accion=f"ACCION_{i}",
+                descripcion="registro de prueba",
+                modulo="GENERAL",
+            )
+        self.factory = AsyncRequestFactory()
+
+    async def _listar_async(self, query="", headers=None):
+        request = self.factory.get(f"/api/bitacora/{query}", headers=self.headers if headers is None else headers)
+        response = await bitacora_list(request)
+        return response.status_code, json.loads(response.content)
+
+    async def test_misma_pagina_que_viewset(self):
+        consultas = [
+            "", "?page=2", "?search=ACCION_1", "?page=last",
+            "?modulo=general&desde=2000-01-01", "?usuario_id=x",
+        ]
+        for query in consultas:
+            response = await self.async_client.get(f"/api/bitacora/{query}", headers=self.headers)
+            status_async, data_async = await self._listar_async(query)
+            self.assertEqual(status_async, response.status_code, query)
+            self.assertEqual(data_async, response.json(), query)
+
+    async def test_pagina_invalida(self):
+        status_async, _ = await self._listar_async("?page=99")
+        self.assertEqual(status_async, 404)
+
+    async def test_exige_ver_bitacora(self):
+        """Ni anónimos ni usuarios sin ver_bitacora consultan la bitácora, en async ni en sync"""
+        otro = await User.objects.acreate(username="otro")
+        sin_permiso = {"Authorization": f"Bearer {RefreshToken.for_user(otro).access_token}"}
+        for headers, esperado in [({}, 401), (sin_permiso, 403)]:
+            status_async, _ = await self._listar_async("?usuario_id=1", headers=headers)
+            response = await self.async_client.get("/api/bitacora/?usuario_id=1", headers=headers)
+            self.assertEqual((status_async, response.status_code), (esperado, esperado), headers)
+
+
+class BitacoraFiltrosTest(APITestCase):
+    """Filtros desde/hasta, modulo, accion, usuario_id e ip"""
+
+    databases = BASES
+
+    def setUp(self):
+        rol = Rol.objects.create(nombre="Auditor", permisos=["ver_bitacora"])
+        self.auditor = User.objects.create_user(username="auditor", password="auditor123", rol=rol)
+        self.otro = User.objects.create_user(username="otro", password="otro123")
+        self.client.force_authenticate(self.auditor)
+        for dia in range(1, 11):
+            Bitacora.objects.create(
+                usuario=self.auditor if dia % 2 else self.otro,
+                accion="Login" if dia <= 5 else "Crear",
+                modulo="USUARIOS" if dia % 3 else "TRANSPORTE",
+                ip=f"10.0.0.{dia}",
+                fecha_hora=datetime(2025, 3, dia, 12, 0),
+            )
+
+    def _ids(self, **params):
+        response = self.client.get("/api/bitacora/", params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return sorted(r["fecha_hora"][8:10] for r in response.json()["results"])
+
+    def test_rango_de_fechas(self):
+        self.assertEqual(self._ids(desde="2025-03-08"), ["08", "09", "10"])
+        # Una fecha sola en `hasta` incluye el día completo
+        self.assertEqual(self._ids(hasta="2025-03-02"), ["01", "02"])
+        self.assertEqual(self._ids(desde="2025-03-04T12:00:00", hasta="2025-03-05T11:59:59"), ["04"])
+
+    def test_usuario_modulo_y_fechas(self):
+        ids = self._ids(
+            usuario_id=self.auditor.pk, modulo="usuarios", desde="2025-03-01", hasta="2025-03-08"
+        )
+        self.assertEqual(ids, ["01", "05", "07"])
+        self.assertEqual(self._ids(accion="Crear", ip="10.0.0.6"), ["06"])
+        self.assertEqual(self._ids(accion="crear"), [])
+
+    def test_valores_invalidos(self):
+        for params in [{"desde": "ayer"}, {"hasta": "2025-13-01"}, {"usuario_id": "x"}, {"ip": "999.1.1.1"}]:
+            response = self.client.get("/api/bitacora/", params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn(next(iter(params)), response.json())
+
+
+@skipUnless(conexion_bitacora().vendor == "postgresql", "EXPLAIN y enable_seqscan son de PostgreSQL")
+class BitacoraIndicesTest(APITestCase):
+    """
+    Cada filtro se resuelve con un índice. Con enable_seqscan=off el planner solo
+    elige un Seq Scan si ningún índice sirve para la consulta.
+    """
+
+    databases = BASES
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="auditor", password="auditor123")
+        Bitacora.objects.bulk_create([
+            Bitacora(
+                usuario=self.user if i % 2 else None,
+                accion=f"ACCION_{i % 7}",
+                modulo=Bitacora.MODULOS[i % len(Bitacora.MODULOS)][0],
+                ip=f"10.0.{i % 5}.{i % 200}",
+            )
+            for i in range(500)
+        ])
+        with conexion_bitacora().cursor() as cursor:
+            cursor.execute("ANALYZE bitacora_bitacora")
+            # SET LOCAL: dura hasta el fin de la transacción del test
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def _plan(self, **params):
+        queryset = filtrar_bitacora(params)[:10]
+        return queryset.explain()
+
+    def test_filtros_usan_indice(self):
+        casos = {
+            "bitacora_usuario_fecha_idx": {"usuario_id": str(self.user.pk)},
+            "bitacora_modulo_fecha_idx": {"modulo": "TRANSPORTE"},
+            "bitacora_accion_fecha_idx": {"accion": "ACCION_3"},
+            "bitacora_ip_fecha_idx": {"ip": "10.0.1.1"},
+            "bitacora_fecha_idx": {"desde": "2025-01-01", "hasta": "2025-12-31"},
+        }
+        for indice, params in casos.items():
+            plan = self._plan(**params)
+            self.assertNotIn("Seq Scan on bitacora_bitacora", plan, params)
+            self.assertIn(indice, plan, params)
+
+    def test_usuario_modulo_y_rango(self):
+        plan = self._plan(
+            usuario_id=str(self.user.pk), modulo="USUARIOS", desde="2025-01-01", hasta="2025-12-31"
+        )
+        self.assertNotIn("Seq Scan on bitacora_bitacora", plan)
+        self.assertIn("Index", plan)
+
+
+@override_settings(BITACORA_STREAM_INTERVALO_SEG=0.02, BITACORA_STREAM_HEARTBEAT_SEG=5)
+class BitacoraStreamTest(APITestCase):
+    """Live-tail por SSE: ticket, filtros, Last-Event-ID y un solo lector por proceso"""
+
+    databases = BASES
+
+    def setUp(self):
+        rol = Rol.objects.create(nombre="Seguridad", permisos=["ver_bitacora"])
+        self.operador = User.objects.create_user(username="operador", password="operador123", rol=rol)
+        self.otro = User.objects.create_user(username="otro", password="otro123")
+        self.client.force_authenticate(self.operador)
+        self.factory = AsyncRequestFactory()
+
+    def _ticket(self):
+        response = self.client.post("/api/bitacora/stream/ticket/")
+        self.assertEqual(response.status_code, 200)
+        return response.json()["ticket"]
+
+    async def _abrir(self, query="", **headers):
+        request = self.factory.get(f"/api/bitacora/stream/{query}", headers=headers)
+        response = await bitacora_stream(request)
+        self.assertEqual(response.status_code, 200, getattr(response, "content", b""))
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b"retry: 3000\n\n")
+        return stream
+
+    async def _siguiente(self, stream):
+        mensaje = await asyncio.wait_for(anext(stream), 2)
+        cabecera, data = mensaje.decode().strip().split("\n")
+        return int(cabecera.removeprefix("id: ")), json.loads(data.removeprefix("data: "))
+
+    async def _cerrar(self, *streams):
+        for stream in streams:
+            await stream.aclose()
+        if difusor._tarea is not None:
+            await asyncio.wait_for(difusor._tarea, 2)
+
+    def test_ticket_y_permisos(self):
+        self.client.force_authenticate(self.otro)
+        self.assertEqual(self.client.post("/api/bitacora/stream/ticket/").status_code, 403)
+
+    async def test_sin_credenciales_o_sin_permiso(self):
+        response = await bitacora_stream(self.factory.get("/api/bitacora/stream/"))
+        self.assertEqual(response.status_code, 401)
+        response = await bitacora_stream(self.factory.get("/api/bitacora/stream/?ticket=falso"))
+        self.assertEqual(response.status_code, 401)
+
+    async def test_eventos_en_vivo_filtrados(self):
+        ticket = await asyncio.to_thread(self._ticket)
+        filtrado = await self._abrir(f"?ticket={ticket}&modulo=transporte")
+        todos = await self._abrir(f"?ticket={ticket}")
+
+        await Bitacora.objects.acreate(accion="Crear", modulo="USUARIOS")
+        nuevo = await Bitacora.objects.acreate(usuario=self.operador, accion="Crear", modulo="TRANSPORTE")
+
+        self.assertEqual((await self._siguiente(todos))[1]["modulo"], "USUARIOS")
+        id_, datos = await self._siguiente(todos)
+        self.assertEqual(id_, nuevo.id)
+        self.assertEqual(datos["usuario"]["username"], "operador")
+        # El filtrado solo recibe TRANSPORTE
+        self.assertEqual((await self._siguiente(filtrado))[0], nuevo.id)
+        await self._cerrar(filtrado, todos)
+        self.assertFalse(difusor.suscripciones)
+
+    async def test_reconexion_con_last_event_id(self):
+        ticket = await asyncio.to_thread(self._ticket)
+        previos = [await Bitacora.objects.acreate(accion=f"A{i}", modulo="PAGOS") for i in range(4)]
+        stream = await self._abrir(f"?ticket={ticket}", **{"Last-Event-ID": str(previos[1].id)})
+        self.assertEqual((await self._siguiente(stream))[0], previos[2].id)
+        self.assertEqual((await self._siguiente(stream))[0], previos[3].id)
+
+        nuevo = await Bitacora.objects.acreate(accion="A4", modulo="PAGOS")
+        # Sin duplicados entre lo reenviado y lo que llega en vivo
+        self.assertEqual((await self._siguiente(stream))[0], nuevo.id)
+        await self._cerrar(stream)
+
+    async def test_huecos_de_transacciones_sin_confirmar(self):
+        lector = Difusor()
+        primero = await Bitacora.objects.acreate(accion="A", modulo="GENERAL")
+        lector.ultimo_id = primero.id
+        medio = await Bitacora.objects.acreate(accion="B", modulo="GENERAL")
+        ultimo = await Bitacora.objects.acreate(accion="C", modulo="GENERAL")
+        medio_id = medio.id
+        await medio.adelete()
+
+        self.assertEqual([e.id for e in await lector.leer_nuevos()], [ultimo.id])
+        self.assertIn(medio_id, lector.huecos)
+        # La "transacción" confirma después: se entrega en la lectura siguiente
+        await Bitacora.objects.acreate(id=medio_id, accion="B", modulo="GENERAL")
+        self.assertEqual([e.id for e in await lector.leer_nuevos()], [medio_id])
+        self.assertFalse(lector.huecos)
+
+
+CHROME = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+
+class BitacoraDimensionesTest(APITestCase):
+    """Acciones y user agents internados en tablas de dimensión"""
+
+    databases = BASES
+
+    def setUp(self):
+        dimensiones.limpiar_caches()
+        self.addCleanup(dimensiones.limpiar_caches)
+
+    def test_parseo_de_user_agents(self):
+        casos = {
+            CHROME: ("Chrome", "Windows", "escritorio"),
+            "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 "
+            "(KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1": ("Safari", "iOS", "movil"),
+            "Mozilla/5.0 (Linux; Android 13; SM-X200) AppleWebKit/537.36 (KHTML, like Gecko) "
+            "Chrome/120.0 Safari/537.36 Edg/120.0": ("Edge", "Android", "tablet"),
+            "Dart/3.2 (dart:io)": ("App móvil", "Otro", "movil"),
+            "curl/8.4.0": ("curl", "Otro", "script"),
+            "Mozilla/5.0 (compatible; Googlebot/2.1)": ("Otro", "Otro", "bot"),
+        }
+        for texto, esperado in casos.items():
+            self.assertEqual(dimensiones.parsear_user_agent(texto), esperado, texto)
+
+    def test_texto_internado_una_vez(self):
+        a = Bitacora.objects.create(accion="Login Cliente", user_agent=CHROME)
+        b = Bitacora.objects.create(accion="Login Cliente", user_agent=CHROME)
+        Bitacora.objects.create(accion="Crear", user_agent="")
+
+        self.assertEqual(a.tipo_accion_id, b.tipo_accion_id)
+        self.assertEqual(a.agente_id, b.agente_id)
+        self.assertEqual(AccionBitacora.objects.count(), 2)
+        self.assertEqual(UserAgent.objects.get().navegador, "Chrome")
+
+        registro = Bitacora.objects.select_related("tipo_accion", "agente").get(pk=a.pk)
+        self.assertEqual((registro.accion, registro.user_agent), ("Login Cliente", CHROME))
+        self.assertEqual(Bitacora.objects.get(tipo_accion__nombre="Crear").user_agent, "")
+
+    def test_listado_con_el_mismo_formato(self):
+        Bitacora.objects.create(accion="Crear", user_agent=CHROME, modulo="TRANSPORTE")
+        self.client.force_authenticate(User.objects.create_user(username="auditor", is_superuser=True))
+        with CaptureQueriesContext(conexion_bitacora()) as consultas:
+            response = self.client.get("/api/bitacora/", {"accion": "Crear"})
+        registro = response.json()["results"][0]
+        self.assertEqual((registro["accion"], registro["user_agent"]), ("Crear", CHROME))
+        # COUNT + página, con acción y user agent en el mismo JOIN
+        self.assertEqual(len(consultas), 2)
+
+        # Las escrituras por la API siguen aceptando texto
+        response = self.client.post("/api/bitacora/", {"accion": "Exportar", "descripcion": "api"})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Bitacora.objects.get(pk=response.json()["id"]).accion, "Exportar")
+
+    def test_cache_solo_con_filas_confirmadas(self):
+        base = conexion_bitacora().alias
+        with self.captureOnCommitCallbacks(using=base, execute=False):
+            id_ = dimensiones.id_accion("Revertida")
+        # Dentro de una transacción que nunca confirma no entra a la cache
+        self.assertIsNone(dimensiones._acciones.get("Revertida"))
+
+        with self.captureOnCommitCallbacks(using=base, execute=True):
+            self.assertEqual(dimensiones.id_accion("Revertida"), id_)
+        self.assertEqual(dimensiones._acciones.get("Revertida"), id_)
+        with self.assertNumQueries(0, using=base):
+            self.assertEqual(dimensiones.id_accion("Revertida"), id_)
+
+
+@skipUnless(archivo.disponible(), "pyarrow no está instalado")
+class BitacoraArchivoTest(APITestCase):
+    """Archivo Parquet por mes/módulo (archivar_bitacora) y analítica sobre él"""
+
+    databases = BASES
+
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        ajuste = override_settings(BITACORA_ARCHIVO_DIR=directorio.name)
+        ajuste.enable()
+        self.addCleanup(ajuste.disable)
+
+        rol = Rol.objects.create(nombre="Auditor", permisos=["ver_bitacora"])
+        self.auditor = User.objects.create_user(username="auditor", password="auditor123", rol=rol)
+        self.client.force_authenticate(self.auditor)
+        registros = [
+            (datetime(2025, 1, 5), "USUARIOS", "Login Cliente", CHROME),
+            (datetime(2025, 1, 6), "USUARIOS", "Login Cliente", "Dart/3.2 (dart:io)"),
+            (datetime(2025, 1, 20), "TRANSPORTE", "Crear", CHROME),
+            (datetime(2025, 2, 1), "USUARIOS", "Logout", ""),
+            (datetime(2025, 2, 28, 23, 59), "TRANSPORTE", "Crear", CHROME),
+        ]
+        for fecha, modulo, accion, agente in registros:
+            Bitacora.objects.create(
+                usuario=self.auditor, fecha_hora=fecha, modulo=modulo, accion=accion, user_agent=agente
+            )
+        # Mes en curso: nunca se archiva
+        self.actual = Bitacora.objects.create(accion="Login Cliente", modulo="USUARIOS")
+
+    def _archivar(self, *args):
+        salida = StringIO()
+        call_command("archivar_bitacora", *args, stdout=salida)
+        return salida.getvalue()
+
+    def test_exporta_particionado_y_borra_lo_archivado(self):
+        with mock.patch.object(transaction, "atomic", wraps=transaction.atomic) as atomic:
+            self._archivar("--hasta", "2025-02", "--borrar")
+        # Cada lote de DELETE en una transacción de la base de la bitácora (quizá la de auditoría)
+        self.assertIn(mock.call(using=conexion_bitacora().alias), atomic.call_args_list)
+
+        self.assertEqual(archivo.meses_archivados(), ["2025-01", "2025-02"])
+        parte = archivo.directorio() / "anio_mes=2025-01" / "modulo=USUARIOS" / "parte-0.parquet"
+        tabla = pq.read_table(parte)
+        self.assertEqual(tabla.num_rows, 2)
+        self.assertTrue(pa.types.is_dictionary(tabla.schema.field("accion").type))
+        self.assertEqual(tabla.column("navegador").to_pylist(), ["Chrome", "App móvil"])
+        # En PostgreSQL queda solo el mes en curso
+        self.assertEqual(list(Bitacora.objects.values_list("id", flat=True)), [self.actual.id])
+
+        # Volver a correr no pisa los meses ya archivados (ya no están en la base)
+        self.assertIn("ya archivado", self._archivar("--desde", "2025-01", "--hasta", "2025-02"))
+        self.assertEqual(archivo.filas_archivadas("2025-01"), 3)
+        self.assertIn("no se reemplaza", self._archivar("--desde", "2025-01", "--hasta", "2025-01", "--reemplazar"))
+        self.assertEqual(archivo.filas_archivadas("2025-01"), 3)
+
+    def test_solo_meses_cerrados(self):
+        with self.assertRaises(CommandError):
+            self._archivar("--hasta", self.actual.fecha_hora.strftime("%Y-%m"))
+
+    def test_analitica_agrupada(self):
+        self._archivar("--hasta", "2025-02")
+
+        response = self.client.get("/api/bitacora/analitica/", {"agrupar": "modulo,accion"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["total"], 5)
+        self.assertEqual(response.json()["filas"][0], {"modulo": "TRANSPORTE", "accion": "Crear", "total": 2})
+        self.assertEqual(response.json()["filas"][1], {"modulo": "USUARIOS", "accion": "Login Cliente", "total": 2})
+
+        response = self.client.get(
+            "/api/bitacora/analitica/",
+            {"agrupar": "anio_mes,navegador", "desde": "2025-02", "modulo": "transporte"},
+        )
+        self.assertEqual(response.json()["filas"], [{"anio_mes": "2025-02", "navegador": "Chrome", "total": 1}])
+        response = self.client.get("/api/bitacora/analitica/", {"agrupar": "", "accion": "Crear"})
+        self.assertEqual(response.json()["total"], 2)
+
+    def test_analitica_validaciones_y_permisos(self):
+        for params in [{"agrupar": "ip"}, {"desde": "2025-1"}, {"limite": "0"}]:
+            self.assertEqual(self.client.get("/api/bitacora/analitica/", params).status_code, 400, params)
+        self.client.force_authenticate(User.objects.create_user(username="cliente"))
+        self.assertEqual(self.client.get("/api/bitacora/analitica/").status_code, 403)
+
+
+class BitacoraAutorTest(APITestCase):
+    """La bitácora muestra y filtra por la copia de los datos del usuario (UsuarioBitacora)"""
+
+    databases = BASES
+
+    def setUp(self):
+        self.rol = Rol.objects.create(nombre="Supervisor", permisos=["ver_bitacora"])
+        self.user = User.objects.create_user(username="ana", first_name="Ana", password="ana12345", rol=self.rol)
+        self.client.force_authenticate(self.user)
+
+    def test_datos_del_usuario_al_momento_del_registro(self):
+        viejo = Bitacora.objects.create(usuario=self.user, accion="Crear")
+        self.user.first_name = "Ana María"
+        self.user.save()
+        nuevo = Bitacora.objects.create(usuario=self.user, accion="Crear")
+        self.assertNotEqual(viejo.autor_id, nuevo.autor_id)
+        # Mismos datos: misma fila
+        self.assertEqual(Bitacora.objects.create(usuario=self.user, accion="Logout").autor_id, nuevo.autor_id)
+
+        filas = self.client.get("/api/bitacora/", {"accion": "Crear"}).json()["results"]
+        self.assertEqual(
+            [fila["usuario"] for fila in filas],
+            [
+                {"id": self.user.id, "username": "ana", "first_name": "Ana María", "last_name": "", "rol": "Supervisor"},
+                {"id": self.user.id, "username": "ana", "first_name": "Ana", "last_name": "", "rol": "Supervisor"},
+            ],
+        )
+        self.assertEqual(self.client.get("/api/bitacora/", {"search": "maría"}).json()["count"], 2)
+        self.assertEqual(self.client.get("/api/bitacora/", {"rol": "supervisor"}).json()["count"], 3)
+
+    def test_borrar_el_usuario_conserva_el_registro(self):
+        cliente = User.objects.create_user(username="temporal")
+        registro = Bitacora.objects.create(usuario=cliente, accion="Login Cliente")
+        cliente_id = cliente.id
+        cliente.delete()
+
+        registro = Bitacora.objects.select_related("autor").get(pk=registro.pk)
+        self.assertEqual(registro.usuario_id, cliente_id)
+        self.assertEqual(BitacoraSerializer(registro).data["usuario"]["username"], "temporal")
+
+    @skipUnless(auditoria_separada(), "sin base de auditoría (AUDIT_DB_NAME)")
+    def test_base_separada_fuera_de_la_transaccion(self):
+        self.assertEqual(router.db_for_write(Bitacora), AUDITORIA)
+        self.assertNotIn("bitacora_bitacora", connections[DEFAULT_DB_ALIAS].introspection.table_names())
+        self.assertNotIn("users_customuser", connections[AUDITORIA].introspection.table_names())
+
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                otro = User.objects.create_user(username="revertido")
+                registrar_bitacora(usuario=otro, accion="Creación Usuario", modulo="USUARIOS")
+                raise RuntimeError
+        # El usuario se revirtió con la transacción; el registro de auditoría no
+        self.assertFalse(User.objects.filter(username="revertido").exists())
+        self.assertEqual(Bitacora.objects.get().autor.username, "revertido")
+
+        # La FK cruza bases: el usuario se lee de la base principal
+        Bitacora.objects.create(usuario=self.user, accion="Crear")
+        self.assertEqual(Bitacora.objects.get(tipo_accion__nombre="Crear").usuario, self.user)
@@ -1,10 +1,23 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import BitacoraViewSet
+from .views import BitacoraViewSet, analitica_archivo, ticket_stream
 
 router = DefaultRouter()
 router.register(r'', BitacoraViewSet, basename='bitacora')
 
 urlpatterns = [
+    # Antes del router: su ruta de detalle tomaría "stream" como pk
+    path('stream/ticket/', ticket_stream, name='bitacora-stream-ticket'),
+    path('analitica/', analitica_archivo, name='bitacora-analitica'),
+]
+
+# Bajo ASGI el listado se sirve con la vista async nativa y se habilita el live-tail
+if settings.ASYNC_VIEWS:
+    from .async_views import bitacora_list, bitacora_stream
+    urlpatterns.append(path('', bitacora_list, name='bitacora-list'))
+    urlpatterns.append(path('stream/', bitacora_stream, name='bitacora-stream'))
+
+urlpatterns += [
     path('', include(router.urls)),
-]
\ No newline at end of file
+]
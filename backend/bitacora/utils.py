@@ -1,3 +1,4 @@
+from core.metricas import BITACORA
 from .models import Bitacora
 from django.utils.timezone import now
 
@@ -31,4 +32,5 @@ def registrar_bitacora(request=None, usuario=None, accion="", descripcion="", mo
         ip=ip,
         user_agent=user_agent,
         modulo=modulo
-    )
\ No newline at end of file
+    )
+    BITACORA.labels(modulo).inc()
\ No newline at end of file
@@ -1,28 +1,190 @@
+import hashlib
+import ipaddress
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
 from django.db.models import Q
-from rest_framework import viewsets, filters
-from .models import Bitacora
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import viewsets, filters, permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from core.metricas import cache_consulta
+from core.replicas import LecturaReplicaMixin
+from . import archivo
+from .models import AccionBitacora, Bitacora, UsuarioBitacora
 from .serializers import BitacoraSerializer
-from rest_framework.permissions import AllowAny
+from users.permissions import CanViewBitacora
+
+# JOINs que necesita BitacoraSerializer: sin ellos habría una consulta por fila.
+# Todas son tablas de la bitácora: funcionan también con la base de auditoría separada
+RELACIONES = ('autor', 'tipo_accion', 'agente')
+
+# Salt de los tickets del stream SSE (async_views.bitacora_stream)
+TICKET_SALT = 'bitacora.stream'
+
+
+def _fecha(params, nombre, fin_del_dia=False):
+    """
+    desde/hasta: "AAAA-MM-DD" o fecha y hora ISO. Una fecha sola en `hasta`
+    incluye el día completo (se compara con < día siguiente).
+    Retorna (valor, es_limite_exclusivo) o (None, False) si no vino.
+    """
+    valor = params.get(nombre, '').strip()
+    if not valor:
+        return None, False
+    try:
+        # parse_datetime también acepta una fecha sola (medianoche): se prueba primero la fecha
+        fecha = parse_date(valor)
+        if fecha is None:
+            fecha_hora = parse_datetime(valor)
+            if fecha_hora is not None:
+                return fecha_hora, False
+    except ValueError:
+        fecha = None
+    if fecha is None:
+        raise ValidationError({nombre: 'Fecha inválida, use AAAA-MM-DD o AAAA-MM-DDTHH:MM:SS'})
+    if fin_del_dia:
+        return datetime.combine(fecha + timedelta(days=1), time.min), True
+    return datetime.combine(fecha, time.min), False
+
+
+def filtrar_bitacora(params):
+    """
+    Aplica los filtros de la bitácora a partir de los query params:
+    - desde / hasta: rango de fecha_hora
+    - modulo, accion, usuario_id, ip: igualdad, cada uno con su índice (campo, -fecha_hora)
+    - search (texto libre) y rol
+    Compartido por la vista sync y la async; trae usuario y rol en el mismo JOIN
+    para que el serializer no haga una consulta por fila. Un valor inválido
+    levanta ValidationError (400).
+    """
+    queryset = Bitacora.objects.select_related(*RELACIONES).order_by('-fecha_hora')
+
+    desde, _ = _fecha(params, 'desde')
+    if desde is not None:
+        queryset = queryset.filter(fecha_hora__gte=desde)
+    hasta, exclusivo = _fecha(params, 'hasta', fin_del_dia=True)
+    if hasta is not None:
+        queryset = queryset.filter(**{'fecha_hora__lt' if exclusivo else 'fecha_hora__lte': hasta})
+
+    modulo = params.get('modulo', '').strip()
+    if modulo:
+        queryset = queryset.filter(modulo=modulo.upper())
+    accion = params.get('accion', '').strip()
+    if accion:
+        # Subconsulta sobre la tabla de acciones: el planner resuelve el id y usa el índice
+        queryset = queryset.filter(tipo_accion__in=AccionBitacora.objects.filter(nombre=accion))
+
+    usuario_id = params.get('usuario_id', '').strip()
+    if usuario_id:
+        if not usuario_id.isdigit():
+            raise ValidationError({'usuario_id': 'Debe ser un número entero'})
+        queryset = queryset.filter(usuario_id=int(usuario_id))
+
+    ip = params.get('ip', '').strip()
+    if ip:
+        try:
+            ip = str(ipaddress.ip_address(ip))
+        except ValueError:
+            raise ValidationError({'ip': 'Dirección IP inválida'})
+        queryset = queryset.filter(ip=ip)
 
-class BitacoraViewSet(viewsets.ModelViewSet):
+    search = params.get('search', '').strip()
+    if search:
+        queryset = queryset.filter(
+            Q(tipo_accion__in=AccionBitacora.objects.filter(nombre__icontains=search)) |
+            Q(descripcion__icontains=search) |
+            Q(autor__in=UsuarioBitacora.objects.filter(
+                Q(username__icontains=search) |
+                Q(first_name__icontains=search) |
+                Q(last_name__icontains=search) |
+                Q(rol__icontains=search)
+            ))
+        )
+    rol = params.get('rol', '').strip()
+    if rol:
+        queryset = queryset.filter(autor__in=UsuarioBitacora.objects.filter(rol__iexact=rol))
+
+    return queryset
+
+
+class BitacoraViewSet(LecturaReplicaMixin, viewsets.ModelViewSet):
     serializer_class = BitacoraSerializer
-    permission_classes = [AllowAny]
+    permission_classes = [CanViewBitacora]
     filter_backends = [filters.SearchFilter]
 
     def get_queryset(self):
-        queryset = Bitacora.objects.all().order_by('-fecha_hora')
-        search = self.request.GET.get('search', '').strip()
-        if search:
-            queryset = queryset.filter(
-                Q(accion__icontains=search) |
-                Q(descripcion__icontains=search) |
-                Q(usuario__username__icontains=search) |
-                Q(usuario__first_name__icontains=search) |   
-                Q(usuario__last_name__icontains=search) | 
-                Q(usuario__rol__nombre__icontains=search)
-            )
-        rol = self.request.GET.get('rol', '').strip()
-        if rol:
-            queryset = queryset.filter(usuario__rol__nombre__iexact=rol)
-
-        return queryset
\ No newline at end of file
+        return filtrar_bitacora(self.request.GET)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def ticket_stream(request):
+    """
+    Ticket de corta duración para abrir el stream SSE con EventSource,
+    que no puede enviar el encabezado Authorization:
+    new EventSource(`/api/bitacora/stream/?ticket=${ticket}`)
+    """
+    if not request.user.tiene_permiso('ver_bitacora'):
+        return Response({'error': 'No tienes permisos para ver la bitácora'}, status=status.HTTP_403_FORBIDDEN)
+    return Response({
+        'ticket': signing.dumps(request.user.pk, salt=TICKET_SALT),
+        'expira_seg': settings.BITACORA_STREAM_TICKET_SEG,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def analitica_archivo(request):
+    """
+    Conteos agrupados sobre el archivo Parquet de la bitácora (meses ya archivados).
+    ?agrupar=modulo,accion (campos de archivo.AGRUPABLES), filtros desde/hasta (AAAA-MM),
+    modulo, accion, usuario_id y ?limite= (filas de la respuesta, 1000 por defecto)
+    """
+    if not request.user.tiene_permiso('ver_bitacora'):
+        return Response({'error': 'No tienes permisos para ver la bitácora'}, status=status.HTTP_403_FORBIDDEN)
+    if not archivo.disponible():
+        return Response(
+            {'error': 'El archivo de bitácora no está disponible (falta pyarrow)'},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+    params = request.query_params
+    agrupar = [campo.strip() for campo in params.get('agrupar', 'modulo').split(',') if campo.strip()]
+    invalidos = [campo for campo in agrupar if campo not in archivo.AGRUPABLES]
+    if invalidos or len(set(agrupar)) != len(agrupar):
+        raise ValidationError({'agrupar': f'Campos válidos: {", ".join(archivo.AGRUPABLES)}'})
+    filtros = {}
+    for nombre in ('desde', 'hasta'):
+        valor = params.get(nombre, '').strip()
+        if valor and not archivo.MES.match(valor):
+            raise ValidationError({nombre: 'Use AAAA-MM'})
+        filtros[nombre] = valor or None
+    filtros['modulo'] = params.get('modulo', '').strip().upper() or None
+    filtros['accion'] = params.get('accion', '').strip() or None
+    usuario_id = params.get('usuario_id', '').strip()
+    if usuario_id and not usuario_id.isdigit():
+        raise ValidationError({'usuario_id': 'Debe ser un número entero'})
+    filtros['usuario_id'] = int(usuario_id) if usuario_id else None
+    limite = params.get('limite', '1000')
+    if not limite.isdigit() or not 0 < int(limite) <= 10000:
+        raise ValidationError({'limite': 'Entre 1 y 10000'})
+
+    # El archivo solo cambia al correr archivar_bitacora: la versión entra en la clave
+    firma = hashlib.sha1(repr((agrupar, sorted(filtros.items()))).encode()).hexdigest()
+    clave = f'bitacora:analitica:{archivo.version()}:{firma}'
+    filas = cache.get(clave)
+    cache_consulta('bitacora_analitica', filas is not None)
+    if filas is None:
+        filas = archivo.agregar(agrupar, **filtros)
+        cache.set(clave, filas, settings.BITACORA_ANALITICA_CACHE_SEG)
+
+    return Response({
+        'agrupar': agrupar,
+        'meses_archivados': archivo.meses_archivados(),
+        'total': sum(fila['total'] for fila in filas),
+        'filas': filas[:int(limite)],
+    })
@@ -19,6 +19,7 @@ class ConductorAdmin(admin.ModelAdmin):
     
     list_filter = [
         'estado',
+        'estado_licencia',
         'tipo_licencia',
         'fecha_creacion',
         'fecha_venc_licencia'
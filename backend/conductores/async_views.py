@@ -0,0 +1,33 @@
+"""
+Lecturas de ubicación de conductores con el ORM async (modo ASGI).
+
+Mismas respuestas que ConductorViewSet.ubicaciones / ConductorViewSet.ubicacion.
+"""
+from rest_framework import status
+from rest_framework.exceptions import NotFound
+
+from core.async_api import api_async, respuesta_json
+from .models import Conductor, UBICACION_FIELDS
+
+
+@api_async()
+async def ubicaciones(request):
+    """Últimas ubicaciones de los conductores (filtrable por ?estado=)"""
+    queryset = Conductor.objects.visibles_para(request.user).ubicaciones(
+        estado=request.GET.get("estado")
+    )
+    return respuesta_json([ubicacion async for ubicacion in queryset])
+
+
+@api_async()
+async def ubicacion(request, pk):
+    """Última ubicación de un conductor"""
+    conductor = await (
+        Conductor.objects.visibles_para(request.user)
+        .filter(pk=pk)
+        .values(*UBICACION_FIELDS)
+        .afirst()
+    )
+    if conductor is None:
+        return respuesta_json({"detail": str(NotFound.default_detail)}, status=status.HTTP_404_NOT_FOUND)
+    return respuesta_json(conductor)
@@ -0,0 +1,123 @@
+"""
+Vencimiento de licencias de conductores.
+
+Conductor.estado_licencia guarda el tramo de cada licencia: vigente, por vencer
+(vence dentro de LICENCIA_DIAS_AVISO días) o vencida. Se calcula al guardar el
+conductor y se pone al día una vez por día con `manage.py actualizar_licencias`
+(cron), que además encola para quienes gestionan conductores un resumen de las
+licencias que cambiaron de tramo.
+
+Los endpoints licencias_por_vencer/licencias_vencidas y las estadísticas filtran
+por la columna, con índices parciales (migración 0005), en lugar de armar las
+ventanas de fechas en cada request.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+VIGENTE = "vigente"
+POR_VENCER = "por_vencer"
+VENCIDA = "vencida"
+
+ESTADOS_LICENCIA = [
+    (VIGENTE, "Vigente"),
+    (POR_VENCER, "Por vencer"),
+    (VENCIDA, "Vencida"),
+]
+
+PLANTILLA_RESUMEN = "conductores/email/resumen_licencias"
+
+
+def estado_para(fecha_venc, hoy=None):
+    """Tramo de una licencia que vence en fecha_venc"""
+    hoy = hoy or timezone.now().date()
+    if fecha_venc < hoy:
+        return VENCIDA
+    if fecha_venc <= hoy + timedelta(days=settings.LICENCIA_DIAS_AVISO):
+        return POR_VENCER
+    return VIGENTE
+
+
+def tramos(hoy=None):
+    """Filtro de fechas de cada tramo (el mismo criterio que estado_para)"""
+    hoy = hoy or timezone.now().date()
+    aviso = hoy + timedelta(days=settings.LICENCIA_DIAS_AVISO)
+    return {
+        VENCIDA: Q(fecha_venc_licencia__lt=hoy),
+        POR_VENCER: Q(fecha_venc_licencia__gte=hoy, fecha_venc_licencia__lte=aviso),
+        VIGENTE: Q(fecha_venc_licencia__gt=aviso),
+    }
+
+
+def actualizar_estados(hoy=None):
+    """
+    Pone al día estado_licencia con UPDATE por lotes de LICENCIAS_LOTE filas.
+    Solo toca las filas que cambian de tramo; retorna {tramo: [ids que entraron]}.
+    """
+    from .models import Conductor
+
+    cambios = {}
+    for estado, filtro in tramos(hoy).items():
+        ids = list(
+            Conductor.objects.filter(filtro).exclude(estado_licencia=estado)
+            .order_by("id").values_list("id", flat=True)
+        )
+        for inicio in range(0, len(ids), settings.LICENCIAS_LOTE):
+            # El filtro se repite: una fecha editada mientras tanto ya trae su tramo
+            Conductor.objects.filter(filtro, id__in=ids[inicio:inicio + settings.LICENCIAS_LOTE]).update(
+                estado_licencia=estado
+            )
+        cambios[estado] = ids
+    return cambios
+
+
+def destinatarios():
+    """Emails de los usuarios activos que gestionan conductores"""
+    from django.contrib.auth import get_user_model
+
+    usuarios = (
+        get_user_model().objects.filter(is_active=True)
+        .filter(Q(is_superuser=True) | Q(rol__es_administrativo=True))
+        .exclude(email="").select_related("rol")
+    )
+    return sorted({u.email for u in usuarios if u.tiene_permiso("gestionar_conductores")})
+
+
+def _filas(ids):
+    """Los primeros LICENCIAS_RESUMEN_MAX conductores, por fecha de vencimiento"""
+    from .models import Conductor
+
+    return [
+        {**fila, "fecha_venc_licencia": fila["fecha_venc_licencia"].isoformat()}
+        for fila in Conductor.objects.filter(id__in=ids)
+        .order_by("fecha_venc_licencia", "id")
+        .values("nombre", "apellido", "nro_licencia", "fecha_venc_licencia")[:settings.LICENCIAS_RESUMEN_MAX]
+    ]
+
+
+def enviar_resumen(cambios, hoy=None):
+    """
+    Encola un único email por destinatario con las licencias que pasaron a por
+    vencer o a vencidas. Retorna la cantidad de emails encolados.
+    """
+    from notificaciones.outbox import encolar_emails
+
+    por_vencer, vencidas = cambios.get(POR_VENCER, []), cambios.get(VENCIDA, [])
+    if not por_vencer and not vencidas:
+        return 0
+
+    contexto = {
+        "fecha": (hoy or timezone.now().date()).isoformat(),
+        "dias_aviso": settings.LICENCIA_DIAS_AVISO,
+        "por_vencer": _filas(por_vencer),
+        "por_vencer_total": len(por_vencer),
+        "vencidas": _filas(vencidas),
+        "vencidas_total": len(vencidas),
+    }
+    asunto = f"Licencias: {len(vencidas)} vencidas y {len(por_vencer)} por vencer"
+    return len(encolar_emails(
+        {"destinatario": email, "asunto": asunto, "plantilla": PLANTILLA_RESUMEN, "contexto": contexto}
+        for email in destinatarios()
+    ))
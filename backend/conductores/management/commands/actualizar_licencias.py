@@ -0,0 +1,47 @@
+"""
+Pone al día el tramo de vencimiento de las licencias y envía el resumen del día
+(ver conductores/licencias.py). Pensado para cron, una vez por día:
+
+    5 0 * * *  python manage.py actualizar_licencias
+
+Uso:
+    python manage.py actualizar_licencias
+    python manage.py actualizar_licencias --fecha 2025-07-01 --sin-resumen
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from conductores import licencias
+
+
+class Command(BaseCommand):
+    help = 'Recalcula estado_licencia de los conductores y encola el resumen de vencimientos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fecha', help='Fecha de referencia (AAAA-MM-DD); por defecto hoy')
+        parser.add_argument(
+            '--sin-resumen',
+            action='store_true',
+            help='Solo actualiza la columna, sin encolar emails'
+        )
+
+    def handle(self, *args, **options):
+        hoy = None
+        if options['fecha']:
+            try:
+                hoy = date.fromisoformat(options['fecha'])
+            except ValueError:
+                raise CommandError(f"Fecha inválida: {options['fecha']} (AAAA-MM-DD)")
+
+        cambios = licencias.actualizar_estados(hoy)
+        for estado, nombre in licencias.ESTADOS_LICENCIA:
+            if cambios[estado]:
+                self.stdout.write(f'🪪 {len(cambios[estado])} licencias pasaron a "{nombre}"')
+        if not any(cambios.values()):
+            self.stdout.write('🪪 Sin cambios de tramo')
+
+        if not options['sin_resumen']:
+            encolados = licencias.enviar_resumen(cambios, hoy)
+            if encolados:
+                self.stdout.write(self.style.SUCCESS(f'📬 Resumen encolado para {encolados} destinatarios'))
@@ -0,0 +1,19 @@
+# Índice de trigramas (pg_trgm + unaccent) para la búsqueda, ver core/busqueda.py
+
+from django.db import migrations
+
+from core.busqueda import migracion_indice
+
+# Deben coincidir (y en el mismo orden) con los campos que busca la vista
+CAMPOS = ['nombre', 'apellido', 'email', 'ci', 'nro_licencia']
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('conductores', '0003_remove_conductor_usuario'),
+    ]
+
+    operations = [
+        migrations.RunSQL(*migracion_indice('conductores_conductor', 'conductores_conductor_busqueda_trgm', CAMPOS)),
+    ]
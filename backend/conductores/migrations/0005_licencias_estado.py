@@ -0,0 +1,36 @@
+# Generated by Django 5.0.7 on 2026-10-18 22:02
+
+from django.db import migrations, models
+
+from conductores.licencias import tramos
+
+
+def poblar(apps, schema_editor):
+    """Tramo de las licencias existentes a la fecha de hoy (después lo mantiene actualizar_licencias)"""
+    Conductor = apps.get_model('conductores', 'Conductor')
+    for estado, filtro in tramos().items():
+        Conductor.objects.filter(filtro).update(estado_licencia=estado)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('conductores', '0004_busqueda_trigram'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conductor',
+            name='estado_licencia',
+            field=models.CharField(choices=[('vigente', 'Vigente'), ('por_vencer', 'Por vencer'), ('vencida', 'Vencida')], default='vigente', editable=False, max_length=10, verbose_name='Estado de la Licencia'),
+        ),
+        migrations.RunPython(poblar, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='conductor',
+            index=models.Index(condition=models.Q(('estado_licencia', 'por_vencer')), fields=['fecha_venc_licencia', 'id'], name='conductor_lic_por_vencer_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conductor',
+            index=models.Index(condition=models.Q(('estado_licencia', 'vencida')), fields=['fecha_venc_licencia', 'id'], name='conductor_lic_vencida_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.7 on 2026-10-18 22:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('conductores', '0005_licencias_estado'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='conductor',
+            index=models.Index(fields=['-fecha_creacion'], name='conductor_creacion_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.7 on 2026-10-18 22:18
+
+import conductores.models
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('conductores', '0006_indice_creacion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='conductor',
+            index=django.contrib.postgres.indexes.GistIndex(conductores.models.Punto('ultima_ubicacion_lng', 'ultima_ubicacion_lat'), condition=models.Q(('estado', 'disponible'), ('ultima_ubicacion_lat__isnull', False), ('ultima_ubicacion_lng__isnull', False)), name='conductor_ubicacion_gist'),
+        ),
+    ]
@@ -1,9 +1,87 @@
+from django.contrib.postgres.indexes import GistIndex
 from django.db import models
+from django.db.models.functions import Cast, Concat, Trim
 from django.contrib.auth import get_user_model
 from django.core.validators import RegexValidator
+from django.utils import timezone
+from core.campos import calculado
+from .licencias import ESTADOS_LICENCIA, POR_VENCER, VENCIDA, VIGENTE, estado_para
 
 User = get_user_model()
 
+# Campos que devuelven las lecturas de ubicación de conductores
+UBICACION_FIELDS = (
+    'id',
+    'nombre',
+    'apellido',
+    'estado',
+    'ultima_ubicacion_lat',
+    'ultima_ubicacion_lng',
+    'ultima_actualizacion_ubicacion',
+)
+
+
+class Punto(models.Func):
+    """point(lng, lat) de PostgreSQL (tipo nativo, sin PostGIS): x = longitud, y = latitud"""
+
+    function = 'point'
+
+    def __init__(self, lng, lat):
+        super().__init__(Cast(lng, models.FloatField()), Cast(lat, models.FloatField()))
+
+
+class Distancia(models.Func):
+    """punto <-> punto: distancia en grados, el operador que ordena un índice GiST (KNN)"""
+
+    template = '(%(expressions)s)'
+    arg_joiner = ' <-> '
+    output_field = models.FloatField()
+
+
+# Ubicación del conductor tal como la indexa conductor_ubicacion_gist: para que
+# PostgreSQL use el índice la consulta debe repetir exactamente esta expresión
+PUNTO_UBICACION = Punto('ultima_ubicacion_lng', 'ultima_ubicacion_lat')
+
+
+class ConductorQuerySet(models.QuerySet):
+    """Consultas reutilizables de conductores (válidas tanto en vistas sync como async)"""
+
+    def visibles_para(self, user):
+        """Todos los conductores si el usuario los gestiona; si no, solo su propio perfil"""
+        if user.tiene_permiso("gestionar_conductores"):
+            return self
+        if getattr(user, "conductor_id", None):
+            return self.filter(id=user.conductor_id)
+        return self.none()
+
+    def con_calculados(self):
+        """
+        Anota nombre_completo, licencia_vencida y dias_para_vencer_licencia en SQL
+        (ver core.campos.calculado): se pueden usar en order_by, filter y aggregate
+        """
+        hoy = models.Value(timezone.now().date(), output_field=models.DateField())
+        return self.annotate(
+            nombre_completo=Trim(Concat('nombre', models.Value(' '), 'apellido')),
+            licencia_vencida=models.ExpressionWrapper(
+                models.Q(fecha_venc_licencia__lt=hoy), output_field=models.BooleanField()
+            ),
+            # date - date en PostgreSQL es la cantidad de días (integer)
+            dias_para_vencer_licencia=models.Func(
+                'fecha_venc_licencia', hoy, template='(%(expressions)s)', arg_joiner=' - ',
+                output_field=models.IntegerField(),
+            ),
+        )
+
+    def ubicaciones(self, estado=None):
+        """Última ubicación conocida de cada conductor (solo los que reportaron alguna)"""
+        queryset = self.filter(
+            ultima_ubicacion_lat__isnull=False,
+            ultima_ubicacion_lng__isnull=False,
+        )
+        if estado:
+            queryset = queryset.filter(estado=estado)
+        return queryset.order_by('-ultima_actualizacion_ubicacion').values(*UBICACION_FIELDS)
+
 
 class Conductor(models.Model):
     """Modelo para conductores del sistema de transporte"""
@@ -84,6 +162,15 @@ class Conductor(models.Model):
         verbose_name="Fecha de Vencimiento de Licencia"
     )
     
+    # Tramo de vencimiento precalculado (ver conductores/licencias.py)
+    estado_licencia = models.CharField(
+        max_length=10,
+        choices=ESTADOS_LICENCIA,
+        default=VIGENTE,
+        editable=False,
+        verbose_name="Estado de la Licencia"
+    )
+    
     # Estado operacional del conductor
     estado = models.CharField(
         max_length=20,
@@ -147,6 +234,8 @@ class Conductor(models.Model):
         verbose_name="Última Actualización de Ubicación"
     )
     
+    objects = ConductorQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Conductor"
         verbose_name_plural = "Conductores"
@@ -154,16 +243,51 @@ class Conductor(models.Model):
         indexes = [
             models.Index(fields=['nro_licencia']),
             models.Index(fields=['fecha_venc_licencia']),
+            # Orden por defecto del listado: la página se lee del índice y las
+            # anotaciones (con_calculados) se calculan solo para esas filas
+            models.Index(fields=['-fecha_creacion'], name='conductor_creacion_idx'),
+            # Solo las licencias por vencer / vencidas: los endpoints de licencias
+            # paginan y cuentan con index-only scans sobre índices chicos
+            models.Index(
+                fields=['fecha_venc_licencia', 'id'],
+                name='conductor_lic_por_vencer_idx',
+                condition=models.Q(estado_licencia=POR_VENCER),
+            ),
+            models.Index(
+                fields=['fecha_venc_licencia', 'id'],
+                name='conductor_lic_vencida_idx',
+                condition=models.Q(estado_licencia=VENCIDA),
+            ),
+            # Despacho de viajes: vecino más cercano entre los disponibles con
+            # ubicación (ver viajes/despacho.py)
+            GistIndex(
+                PUNTO_UBICACION,
+                name='conductor_ubicacion_gist',
+                condition=models.Q(
+                    estado='disponible',
+                    ultima_ubicacion_lat__isnull=False,
+                    ultima_ubicacion_lng__isnull=False,
+                ),
+            ),
         ]
     
     def __str__(self):
         return f"{self.get_full_name()} - {self.nro_licencia}"
     
+    def save(self, *args, **kwargs):
+        """El tramo de la licencia sigue a la fecha; el paso de los días lo aplica actualizar_licencias"""
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'fecha_venc_licencia' in update_fields:
+            self.estado_licencia = estado_para(self.fecha_venc_licencia)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'estado_licencia'}
+        super().save(*args, **kwargs)
+    
     def get_full_name(self):
         """Retorna el nombre completo del conductor"""
         return f"{self.nombre} {self.apellido}".strip()
     
-    @property
+    @calculado
     def nombre_completo(self):
         """Retorna el nombre completo del conductor"""
         return self.get_full_name()
@@ -174,18 +298,14 @@ class Conductor(models.Model):
         # Esta propiedad ahora se maneja desde el modelo CustomUser
         return 'sin_usuario'  # Por defecto, ya que la relación se maneja desde users
     
-    @property
+    @calculado
     def licencia_vencida(self):
         """Verifica si la licencia está vencida"""
-        from django.utils import timezone
         return self.fecha_venc_licencia < timezone.now().date()
     
-    @property
+    @calculado
     def dias_para_vencer_licencia(self):
         """Calcula los días restantes para el vencimiento de la licencia"""
-        from django.utils import timezone
-        from datetime import timedelta
-        
         hoy = timezone.now().date()
         dias_restantes = (self.fecha_venc_licencia - hoy).days
         return dias_restantes
@@ -200,8 +320,6 @@ class Conductor(models.Model):
     
     def actualizar_ubicacion(self, latitud, longitud):
         """Actualiza la ubicación del conductor"""
-        from django.utils import timezone
-        
         self.ultima_ubicacion_lat = latitud
         self.ultima_ubicacion_lng = longitud
         self.ultima_actualizacion_ubicacion = timezone.now()
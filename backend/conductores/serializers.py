@@ -1,12 +1,24 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.utils import timezone
+from core.campos import CamposDinamicosMixin
 from .models import Conductor
 
 User = get_user_model()
 
+# Columnas que leen las propiedades calculadas de Conductor (ver core.campos).
+# nombre_completo, licencia_vencida y dias_para_vencer_licencia vienen anotados
+# en SQL en list/retrieve (Conductor.objects.con_calculados())
+CAMPOS_MODELO_CONDUCTOR = {
+    'nombre_completo': (),
+    'licencia_vencida': (),
+    'dias_para_vencer_licencia': (),
+    'puede_conducir': ('estado',),
+    'estado_usuario': (),
+}
 
-class ConductorSerializer(serializers.ModelSerializer):
+
+class ConductorSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer para el modelo Conductor"""
     
     # Campos calculados
@@ -29,6 +41,7 @@ class ConductorSerializer(serializers.ModelSerializer):
             'nro_licencia',
             'tipo_licencia',
             'fecha_venc_licencia',
+            'estado_licencia',
             'estado',
             'experiencia_anios',
             'telefono_emergencia',
@@ -50,6 +63,7 @@ class ConductorSerializer(serializers.ModelSerializer):
             'fecha_actualizacion',
             'ultima_actualizacion_ubicacion'
         ]
+        campos_modelo = CAMPOS_MODELO_CONDUCTOR
     
     def validate_nro_licencia(self, value):
         """Valida que el número de licencia sea único"""
@@ -71,6 +85,39 @@ class ConductorSerializer(serializers.ModelSerializer):
         return value
 
 
+class ConductorListSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    """
+    Serializer de solo lectura para el listado de conductores: los campos
+    editables y licencia_vencida, sin ubicación ni el resto de calculados
+    """
+
+    licencia_vencida = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = Conductor
+        fields = [
+            'id',
+            'nombre',
+            'apellido',
+            'fecha_nacimiento',
+            'telefono',
+            'email',
+            'ci',
+            'nro_licencia',
+            'tipo_licencia',
+            'fecha_venc_licencia',
+            'estado_licencia',
+            'estado',
+            'experiencia_anios',
+            'telefono_emergencia',
+            'contacto_emergencia',
+            'licencia_vencida',
+            'fecha_creacion'
+        ]
+        read_only_fields = fields
+        campos_modelo = CAMPOS_MODELO_CONDUCTOR
+
+
 class ConductorCreateSerializer(serializers.ModelSerializer):
     """Serializer para crear conductores"""
     
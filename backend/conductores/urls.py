@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import ConductorViewSet
@@ -5,6 +6,16 @@ from .views import ConductorViewSet
 router = DefaultRouter()
 router.register(r'', ConductorViewSet, basename='conductores')
 
-urlpatterns = [
+urlpatterns = []
+
+# Bajo ASGI las lecturas de ubicación se sirven con vistas async nativas
+if settings.ASYNC_VIEWS:
+    from . import async_views
+    urlpatterns += [
+        path('ubicaciones/', async_views.ubicaciones, name='conductores-ubicaciones'),
+        path('<int:pk>/ubicacion/', async_views.ubicacion, name='conductores-ubicacion'),
+    ]
+
+urlpatterns += [
     path('', include(router.urls)),
-]
\ No newline at end of file
+]
@@ -5,31 +5,48 @@ from django_filters.rest_framework import DjangoFilterBackend
 from django.db import models
 from django.utils import timezone
 from bitacora.utils import registrar_bitacora
+from core.busqueda import BusquedaFilter
+from core.campos import CamposDinamicosViewMixin
+from core.replicas import LecturaReplicaMixin
+from core.metricas import UBICACIONES
 from users.permissions import CanManageConductores, IsOwnerOrAdmin
-from .models import Conductor
+from .licencias import POR_VENCER, VENCIDA
+from .models import Conductor, UBICACION_FIELDS
 from .serializers import (
     ConductorSerializer,
+    ConductorListSerializer,
     ConductorCreateSerializer,
     ConductorUpdateSerializer,
     ConductorUbicacionSerializer
 )
 
 
-class ConductorViewSet(viewsets.ModelViewSet):
-    """ViewSet para el CRUD de conductores"""
+class ConductorViewSet(LecturaReplicaMixin, CamposDinamicosViewMixin, viewsets.ModelViewSet):
+    """ViewSet para el CRUD de conductores (?fields= y ?omit= en list/retrieve)"""
+
+    # Lecturas en una réplica cuando hay (ver core/replicas.py)
+    acciones_replica = ("list", "retrieve", "estadisticas", "licencias_por_vencer", "licencias_vencidas")
 
     queryset = Conductor.objects.all()
     serializer_class = ConductorSerializer
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['estado', 'tipo_licencia']
+    # BusquedaFilter (?search=) va al final: ordena por relevancia si no hay ?ordering=
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, BusquedaFilter]
+    filterset_fields = ['estado', 'tipo_licencia', 'estado_licencia']
+    # Mismo orden que el índice de la migración 0004_busqueda_trigram
     search_fields = ['nombre', 'apellido', 'email', 'ci', 'nro_licencia']
-    ordering_fields = ['nombre', 'fecha_creacion', 'fecha_venc_licencia']
+    ordering_fields = [
+        'nombre', 'fecha_creacion', 'fecha_venc_licencia',
+        # Anotados en SQL (Conductor.objects.con_calculados())
+        'nombre_completo', 'licencia_vencida', 'dias_para_vencer_licencia',
+    ]
     ordering = ['-fecha_creacion']
 
     def get_serializer_class(self):
         """Retorna el serializer apropiado según la acción"""
-        if self.action == "create":
+        if self.action == "list":
+            return ConductorListSerializer
+        elif self.action == "create":
             return ConductorCreateSerializer
         elif self.action in ["update", "partial_update"]:
             return ConductorUpdateSerializer
@@ -40,25 +57,32 @@ class ConductorViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filtra el queryset según los permisos del usuario"""
         queryset = super().get_queryset()
+        if self.request.method in permissions.SAFE_METHODS:
+            # Calculados en SQL; en las escrituras quedan como propiedades, así
+            # reflejan lo que se acaba de guardar
+            queryset = queryset.con_calculados()
 
         # Si el usuario no tiene permisos para gestionar conductores, solo puede ver su propio perfil
         if not self.request.user.tiene_permiso("gestionar_conductores"):
-            if hasattr(self.request.user, "conductor_profile"):
-                return queryset.filter(id=self.request.user.conductor_profile.id)
-            else:
-                return queryset.none()
+            return queryset.visibles_para(self.request.user)
 
         # Filtro adicional: licencia_vencida=true/false
+        # Por fecha y no por estado_licencia: la columna se pone al día una vez
+        # al día (actualizar_licencias) y aquí hace falta el valor exacto; el
+        # predicado usa el índice de fecha_venc_licencia
         licencia_vencida = self.request.query_params.get("licencia_vencida")
         if licencia_vencida is not None:
-            from django.utils import timezone
-
             hoy = timezone.now().date()
             if licencia_vencida.lower() == "true":
                 queryset = queryset.filter(fecha_venc_licencia__lt=hoy)
             elif licencia_vencida.lower() == "false":
                 queryset = queryset.filter(fecha_venc_licencia__gte=hoy)
 
+        # Filtro adicional: vence_en_dias=N (licencias que vencen dentro de N días, vencidas incluidas)
+        vence_en_dias = self.request.query_params.get("vence_en_dias")
+        if vence_en_dias is not None and vence_en_dias.lstrip("-").isdigit():
+            queryset = queryset.filter(dias_para_vencer_licencia__lte=int(vence_en_dias))
+
         return queryset
 
     def perform_create(self, serializer):
@@ -128,6 +152,7 @@ class ConductorViewSet(viewsets.ModelViewSet):
                 serializer.validated_data["ultima_ubicacion_lat"],
                 serializer.validated_data["ultima_ubicacion_lng"],
             )
+            UBICACIONES.inc()
 
             return Response(
                 {
@@ -138,6 +163,24 @@ class ConductorViewSet(viewsets.ModelViewSet):
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=["get"])
+    def ubicaciones(self, request):
+        """Últimas ubicaciones de los conductores (filtrable por ?estado=)"""
+        ubicaciones = Conductor.objects.visibles_para(request.user).ubicaciones(
+            estado=request.query_params.get("estado")
+        )
+        return Response(list(ubicaciones))
+
+    @action(detail=True, methods=["get"])
+    def ubicacion(self, request, pk=None):
+        """Última ubicación de un conductor"""
+        conductor = self.get_object()
+        ubicacion = {
+            field: getattr(conductor, field)
+            for field in UBICACION_FIELDS
+        }
+        return Response(ubicacion)
+
     @action(detail=False, methods=["get"])
     def estadisticas(self, request):
         """Estadísticas de conductores"""
@@ -158,14 +201,9 @@ class ConductorViewSet(viewsets.ModelViewSet):
             'por_tipo_licencia': dict(queryset.values('tipo_licencia').annotate(
                 count=models.Count('id')
             ).values_list('tipo_licencia', 'count')),
-            'licencias_vencidas': queryset.filter(
-                fecha_venc_licencia__lt=timezone.now().date()
-            ).count(),
-            "licencias_por_vencer": queryset.filter(
-                fecha_venc_licencia__lte=timezone.now().date()
-                + timezone.timedelta(days=30),
-                fecha_venc_licencia__gte=timezone.now().date(),
-            ).count(),
+            # Tramos precalculados por actualizar_licencias (índices parciales)
+            'licencias_vencidas': queryset.filter(estado_licencia=VENCIDA).count(),
+            "licencias_por_vencer": queryset.filter(estado_licencia=POR_VENCER).count(),
             "nuevos_este_mes": queryset.filter(
                 fecha_creacion__gte=timezone.now().replace(day=1)
             ).count(),
@@ -206,14 +244,8 @@ class ConductorViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        # Conductores con licencias que vencen en los próximos 30 días
-        conductores = Conductor.objects.filter(
-            fecha_venc_licencia__lte=timezone.now().date() + timezone.timedelta(days=30),
-            fecha_venc_licencia__gte=timezone.now().date()
-        )
-
-        serializer = self.get_serializer(conductores, many=True)
-        return Response(serializer.data)
+        # Conductores con licencias que vencen en los próximos LICENCIA_DIAS_AVISO días
+        return self._licencias(POR_VENCER)
 
     @action(detail=False, methods=["get"])
     def licencias_vencidas(self, request):
@@ -225,9 +257,13 @@ class ConductorViewSet(viewsets.ModelViewSet):
             )
 
         # Conductores con licencias vencidas
-        conductores = Conductor.objects.filter(
-            fecha_venc_licencia__lt=timezone.now().date()
-        )
+        return self._licencias(VENCIDA)
 
-        serializer = self.get_serializer(conductores, many=True)
-        return Response(serializer.data)
+    def _licencias(self, estado_licencia):
+        """Página de conductores de un tramo, en el orden del índice parcial del tramo"""
+        conductores = Conductor.objects.con_calculados().filter(estado_licencia=estado_licencia).order_by(
+            "fecha_venc_licencia", "id"
+        )
+        page = self.paginate_queryset(conductores)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
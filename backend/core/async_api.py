@@ -0,0 +1,102 @@
+"""
+Utilidades para vistas async nativas (modo ASGI).
+
+Las vistas de DRF son síncronas: bajo ASGI cada request ocupa un hilo mientras
+espera a PostgreSQL. Las vistas async de lectura más usadas se escriben como vistas
+de Django async que usan el ORM async; este módulo replica lo mínimo de DRF que
+necesitan (autenticación JWT/sesión, permisos y respuesta JSON).
+"""
+from functools import wraps
+
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from core.json_api import ORJSONRenderer
+from core.replicas import aelegir_replica, usar_replica
+
+User = get_user_model()
+
+_jwt_auth = JWTAuthentication()
+_renderer = ORJSONRenderer()
+
+
+def respuesta_json(data, status=status.HTTP_200_OK):
+    """Respuesta JSON con el mismo renderer que las vistas de DRF"""
+    return HttpResponse(
+        _renderer.render(data),
+        status=status,
+        content_type="application/json",
+    )
+
+
+async def autenticar(request):
+    """
+    Autentica el request igual que DEFAULT_AUTHENTICATION_CLASSES:
+    primero JWT (Authorization: Bearer) y luego la sesión de Django.
+    Retorna el usuario (con su rol ya cargado) o None.
+    """
+    header = _jwt_auth.get_header(request)
+    if header is not None:
+        raw_token = _jwt_auth.get_raw_token(header)
+        if raw_token is not None:
+            # Validar el JWT es solo CPU; la única consulta es la del usuario
+            validated_token = _jwt_auth.get_validated_token(raw_token)
+            try:
+                user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+            except KeyError:
+                raise InvalidToken("Token contained no recognizable user identification")
+            try:
+                user = await User.objects.select_related("rol").aget(
+                    **{jwt_settings.USER_ID_FIELD: user_id}
+                )
+            except User.DoesNotExist:
+                raise AuthenticationFailed("User not found", code="user_not_found")
+            if jwt_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+                raise AuthenticationFailed("User is inactive", code="user_inactive")
+            return user
+
+    # request.auser lo agrega AuthenticationMiddleware
+    if not hasattr(request, "auser"):
+        return None
+    session_user = await request.auser()
+    if session_user.is_authenticated:
+        return await User.objects.select_related("rol").aget(pk=session_user.pk)
+    return None
+
+
+def api_async(permitir_anonimo=False, replica=False):
+    """
+    Decorador para vistas async de solo lectura.
+    Autentica el request, deja el usuario en request.user y responde
+    401 como DRF cuando la vista requiere autenticación.
+    Con replica=True las consultas de la vista van a una réplica (core/replicas.py).
+    """
+    def decorator(view_func):
+        @csrf_exempt
+        @wraps(view_func)
+        async def _wrapped_view(request, *args, **kwargs):
+            try:
+                user = await autenticar(request)
+            except (InvalidToken, AuthenticationFailed) as error:
+                return respuesta_json(error.detail, status=status.HTTP_401_UNAUTHORIZED)
+
+            if user is None and not permitir_anonimo:
+                return respuesta_json(
+                    {"detail": "Las credenciales de autenticación no se proveyeron."},
+                    status=status.HTTP_401_UNAUTHORIZED,
+                )
+
+            if user is not None:
+                request.user = user
+            if not replica:
+                return await view_func(request, *args, **kwargs)
+            with usar_replica(await aelegir_replica(request, user)):
+                return await view_func(request, *args, **kwargs)
+        return _wrapped_view
+    return decorator
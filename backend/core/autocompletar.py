@@ -0,0 +1,338 @@
+"""
+Autocompletado (type-ahead) de usuarios, conductores y personal.
+
+GET /api/autocompletar/?recurso=usuarios&q=ju[&limit=10] -> [{"id": 1, "label": "Juan Pérez (jperez)"}, ...]
+
+Cada proceso mantiene, por recurso, una lista ordenada de palabras (sin tildes, en
+minúsculas) apuntando a cada fila; un prefijo se resuelve con bisect sin tocar la base.
+
+Los cambios se aplican de a uno: las señales post_save/post_delete (solo si cambió
+algún campo del label) incrementan la versión del recurso en la cache compartida y
+anotan el id de la fila bajo esa versión. Un proceso que ve una versión nueva lee
+de la base solo esas filas y arma una copia del índice con ellas; el índice completo
+se reconstruye únicamente:
+- la primera vez, o pasado AUTOCOMPLETAR_TTL_SEG desde la última reconstrucción,
+- si faltan anotaciones (vencieron) o hay más de MAX_CAMBIOS pendientes.
+
+Un solo hilo a la vez actualiza el índice; el resto sigue respondiendo con el
+anterior (o, si aún no hay ninguno, espera a ese mismo resultado).
+"""
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, bisect_right
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_init, post_save
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from core.metricas import cache_consulta
+
+
+def normalizar(texto):
+    """Minúsculas y sin tildes ("Núñez" -> "nunez")"""
+    texto = unicodedata.normalize("NFKD", str(texto or "").lower())
+    return "".join(c for c in texto if not unicodedata.combining(c))
+
+
+def _label_usuario(fila):
+    nombre = f"{fila['first_name']} {fila['last_name']}".strip()
+    return f"{nombre} ({fila['username']})" if nombre else fila['username']
+
+
+def _label_persona(codigo):
+    def label(fila):
+        return f"{fila['nombre']} {fila['apellido']} · {fila[codigo]}"
+    return label
+
+
+# recurso -> modelo, campos buscables, cómo armar el label y permisos (cualquiera alcanza)
+RECURSOS = {
+    "usuarios": {
+        "modelo": "users.CustomUser",
+        "campos": ("username", "first_name", "last_name", "email"),
+        "label": _label_usuario,
+        "permisos": ("gestionar_usuarios", "ver_usuarios"),
+    },
+    "conductores": {
+        "modelo": "conductores.Conductor",
+        "campos": ("nombre", "apellido", "ci", "nro_licencia"),
+        "label": _label_persona("ci"),
+        "permisos": ("gestionar_conductores", "ver_conductores"),
+    },
+    "personal": {
+        "modelo": "personal.Personal",
+        "campos": ("nombre", "apellido", "ci", "codigo_empleado"),
+        "label": _label_persona("codigo_empleado"),
+        "permisos": ("gestionar_personal", "ver_personal"),
+    },
+}
+
+
+# Cambios pendientes a partir de los cuales conviene reconstruir el índice completo
+MAX_CAMBIOS = 1000
+
+# Atributo de la instancia con los valores de los campos indexados al cargarla
+_VALORES_PREVIOS = "_autocompletar_previos"
+_SIN_CARGAR = object()
+
+
+def _clave_version(recurso):
+    return f"autocompletar:version:{recurso}"
+
+
+def _clave_cambio(recurso, version):
+    return f"autocompletar:cambio:{recurso}:{version}"
+
+
+def version_actual(recurso):
+    return cache.get(_clave_version(recurso), 0)
+
+
+def registrar_cambio(recurso, pk=None):
+    """
+    Nueva versión del recurso en todos los procesos. Con pk, solo cambió esa fila
+    y se actualiza en el índice; sin pk el índice se reconstruye completo.
+    """
+    clave = _clave_version(recurso)
+    if cache.add(clave, 1, None):
+        version = 1
+    else:
+        try:
+            version = cache.incr(clave)
+        except ValueError:
+            cache.set(clave, 1, None)
+            version = 1
+    if pk is not None:
+        cache.set(_clave_cambio(recurso, version), pk, settings.AUTOCOMPLETAR_TTL_SEG)
+
+
+def invalidar(recurso):
+    """Fuerza la reconstrucción del índice del recurso en todos los procesos"""
+    registrar_cambio(recurso)
+
+
+def _cambios(recurso, desde, hasta):
+    """Ids que cambiaron entre dos versiones, o None si hay que reconstruir"""
+    if desde is None or not 0 < hasta - desde <= MAX_CAMBIOS:
+        return None
+    claves = [_clave_cambio(recurso, version) for version in range(desde + 1, hasta + 1)]
+    anotados = cache.get_many(claves)
+    if len(anotados) != len(claves):
+        return None
+    return set(anotados.values())
+
+
+class IndicePrefijos:
+    """Palabras ordenadas -> filas, para responder prefijos con bisect"""
+
+    def __init__(self, filas, campos, label):
+        self.campos = campos
+        self.label = label
+        self.ids = []
+        self.labels = []
+        self.palabras = []
+        self.posiciones_por_id = {}
+        pares = []
+        for fila in filas:
+            posicion = self._agregar_fila(fila)
+            pares.extend((palabra, posicion) for palabra in self.palabras[posicion])
+        pares.sort()
+        self.claves = [palabra for palabra, _ in pares]
+        self.posiciones = [posicion for _, posicion in pares]
+
+    def __len__(self):
+        return len(self.posiciones_por_id)
+
+    def _agregar_fila(self, fila):
+        palabras = set()
+        for campo in self.campos:
+            palabras.update(normalizar(fila[campo]).split())
+        posicion = len(self.ids)
+        self.ids.append(fila["id"])
+        self.labels.append(self.label(fila))
+        self.palabras.append(tuple(palabras))
+        self.posiciones_por_id[fila["id"]] = posicion
+        return posicion
+
+    def _rango(self, palabra, posicion):
+        """Índice de (palabra, posicion) en las listas ordenadas"""
+        desde = bisect_left(self.claves, palabra)
+        hasta = bisect_right(self.claves, palabra, desde)
+        return bisect_left(self.posiciones, posicion, desde, hasta)
+
+    def con_cambios(self, filas, ids):
+        """
+        Índice con las filas `ids` reemplazadas por `filas` (las que ya no vienen en
+        `filas` se borraron). Otros hilos pueden estar buscando en el índice actual:
+        las listas ordenadas se copian; las filas solo se agregan al final, y una
+        fila reemplazada deja de estar referenciada pero conserva su label.
+        """
+        nuevo = object.__new__(IndicePrefijos)
+        nuevo.__dict__.update(self.__dict__)
+        nuevo.claves = list(self.claves)
+        nuevo.posiciones = list(self.posiciones)
+
+        for pk in ids:
+            posicion = nuevo.posiciones_por_id.pop(pk, None)
+            if posicion is None:
+                continue
+            for palabra in nuevo.palabras[posicion]:
+                i = nuevo._rango(palabra, posicion)
+                del nuevo.claves[i]
+                del nuevo.posiciones[i]
+
+        for fila in filas:
+            posicion = nuevo._agregar_fila(fila)
+            for palabra in nuevo.palabras[posicion]:
+                i = nuevo._rango(palabra, posicion)
+                nuevo.claves.insert(i, palabra)
+                nuevo.posiciones.insert(i, posicion)
+        return nuevo
+
+    def buscar(self, consulta, limite):
+        terminos = normalizar(consulta).split()
+        if not terminos:
+            return []
+        # El término más largo acota más el rango recorrido; el resto se verifica por fila
+        principal = max(terminos, key=len)
+        resto = [t for t in terminos if t is not principal]
+
+        resultados = []
+        vistos = set()
+        i = bisect_left(self.claves, principal)
+        while i < len(self.claves) and self.claves[i].startswith(principal):
+            posicion = self.posiciones[i]
+            i += 1
+            if posicion in vistos:
+                continue
+            vistos.add(posicion)
+            palabras = self.palabras[posicion]
+            if all(any(p.startswith(t) for p in palabras) for t in resto):
+                resultados.append({"id": self.ids[posicion], "label": self.labels[posicion]})
+                if len(resultados) >= limite:
+                    break
+        return resultados
+
+
+class _Entrada:
+    def __init__(self):
+        self.indice = None
+        self.version = None
+        self.construido = 0.0
+        self.lock = threading.Lock()
+
+
+_entradas = {recurso: _Entrada() for recurso in RECURSOS}
+
+
+def _filas(recurso, ids=None):
+    config = RECURSOS[recurso]
+    queryset = apps.get_model(config["modelo"]).objects.order_by()
+    if ids is not None:
+        queryset = queryset.filter(id__in=ids)
+    return queryset.values("id", *config["campos"]).iterator(chunk_size=5000)
+
+
+def _construir(recurso):
+    config = RECURSOS[recurso]
+    return IndicePrefijos(_filas(recurso), config["campos"], config["label"])
+
+
+def _vencido(entrada):
+    return time.monotonic() - entrada.construido >= settings.AUTOCOMPLETAR_TTL_SEG
+
+
+def obtener_indice(recurso):
+    """Índice vigente del recurso, poniéndolo al día (un hilo a la vez) si quedó viejo"""
+    entrada = _entradas[recurso]
+    version = version_actual(recurso)
+    vigente = entrada.indice is not None and entrada.version == version and not _vencido(entrada)
+    cache_consulta(f"autocompletar_{recurso}", vigente)
+    if vigente:
+        return entrada.indice
+
+    # Si otro hilo ya lo está actualizando y hay un índice anterior, se usa ese
+    if not entrada.lock.acquire(blocking=entrada.indice is None):
+        return entrada.indice
+    try:
+        # Otro hilo pudo ponerlo al día mientras se esperaba el lock
+        if entrada.indice is not None and entrada.version == version and not _vencido(entrada):
+            return entrada.indice
+        cambios = None
+        if entrada.indice is not None and not _vencido(entrada):
+            cambios = _cambios(recurso, entrada.version, version)
+        if cambios is None:
+            entrada.indice = _construir(recurso)
+            entrada.construido = time.monotonic()
+        else:
+            entrada.indice = entrada.indice.con_cambios(_filas(recurso, cambios), cambios)
+        entrada.version = version
+        return entrada.indice
+    finally:
+        entrada.lock.release()
+
+
+def _valores(instance, campos):
+    # Del __dict__: un campo diferido (.only()) no dispara una consulta
+    return tuple(instance.__dict__.get(campo, _SIN_CARGAR) for campo in campos)
+
+
+def _conectar_senales():
+    """Anota en la cache las filas cuyos campos de label/búsqueda cambiaron"""
+    for recurso, config in RECURSOS.items():
+        modelo = apps.get_model(config["modelo"])
+        campos = config["campos"]
+
+        def al_cargar(sender, instance, _campos=campos, **kwargs):
+            instance.__dict__[_VALORES_PREVIOS] = _valores(instance, _campos)
+
+        def al_guardar(sender, instance, created=False, update_fields=None, _recurso=recurso,
+                       _campos=campos, **kwargs):
+            # p. ej. update_last_login guarda solo last_login: no afecta el índice
+            if update_fields is not None and not set(_campos).intersection(update_fields):
+                return
+            valores = _valores(instance, _campos)
+            if not created and _SIN_CARGAR not in valores and valores == instance.__dict__.get(_VALORES_PREVIOS):
+                return
+            instance.__dict__[_VALORES_PREVIOS] = valores
+            registrar_cambio(_recurso, instance.pk)
+
+        def al_borrar(sender, instance, _recurso=recurso, **kwargs):
+            registrar_cambio(_recurso, instance.pk)
+
+        post_init.connect(al_cargar, sender=modelo, weak=False, dispatch_uid=f"autocompletar_init_{recurso}")
+        post_save.connect(al_guardar, sender=modelo, weak=False, dispatch_uid=f"autocompletar_save_{recurso}")
+        post_delete.connect(al_borrar, sender=modelo, weak=False, dispatch_uid=f"autocompletar_delete_{recurso}")
+
+
+@api_view(["GET"])
+@permission_classes([permissions.IsAuthenticated])
+def autocompletar(request):
+    """
+    Sugerencias id/label para los selectores del panel (solo lectura, sin serializers)
+    """
+    recurso = request.GET.get("recurso", "")
+    config = RECURSOS.get(recurso)
+    if config is None:
+        return Response(
+            {"error": f"recurso debe ser uno de: {', '.join(RECURSOS)}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if not any(request.user.tiene_permiso(permiso) for permiso in config["permisos"]):
+        return Response({"error": "Acceso denegado"}, status=status.HTTP_403_FORBIDDEN)
+
+    try:
+        limite = min(max(int(request.GET.get("limit", 10)), 1), 50)
+    except ValueError:
+        limite = 10
+
+    resultados = obtener_indice(recurso).buscar(request.GET.get("q", ""), limite)
+    response = Response(resultados)
+    # El navegador reutiliza las respuestas mientras se sigue tecleando o se borra
+    response["Cache-Control"] = f"private, max-age={settings.AUTOCOMPLETAR_CACHE_NAVEGADOR_SEG}"
+    return response
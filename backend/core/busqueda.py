@@ -0,0 +1,129 @@
+"""
+Búsqueda indexada con pg_trgm + unaccent para conductores, personal y usuarios.
+
+Cada recurso tiene un índice GIN de trigramas sobre un "documento" de búsqueda:
+los campos buscables concatenados, en minúsculas y sin tildes. El filtro compara
+con LIKE '%término%' sobre esa misma expresión, de modo que PostgreSQL usa el
+índice; los resultados se ordenan por word_similarity (ranking).
+
+Las extensiones se crean en las migraciones solo si el servidor las ofrece.
+Sin ellas (p. ej. un PostgreSQL sin contrib) se vuelve al icontains de siempre.
+"""
+from django.db import connection
+from django.db.models import F, FloatField, Q, TextField, Value
+from django.db.models.expressions import Func, RawSQL
+from django.db.models.functions import Lower
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+# unaccent() es STABLE y no se puede usar en un índice: este wrapper IMMUTABLE
+# fija el diccionario y sí se puede
+SQL_CREAR_FUNCION = """
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS unaccent;
+CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    AS $f$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $f$;
+"""
+
+_disponible = {}
+
+
+def documento_sql(campos, tabla=None):
+    """
+    Expresión SQL del documento de búsqueda. Debe ser idéntica en el índice y
+    en las consultas para que el planner use el índice.
+    """
+    prefijo = f'"{tabla}".' if tabla else ""
+    partes = " || ' ' || ".join(f"coalesce({prefijo}\"{campo}\", '')" for campo in campos)
+    return f"f_unaccent(lower({partes}))"
+
+
+def migracion_indice(tabla, nombre_indice, campos):
+    """
+    SQL (ida y vuelta) para una migración RunSQL que crea el índice de trigramas.
+    Si el servidor no tiene pg_trgm/unaccent, la migración no hace nada.
+    """
+    crear = f"""
+DO $migracion$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm')
+       AND EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'unaccent') THEN
+        {SQL_CREAR_FUNCION}
+        CREATE INDEX IF NOT EXISTS {nombre_indice} ON "{tabla}"
+            USING gin (({documento_sql(campos)}) gin_trgm_ops);
+    ELSE
+        RAISE NOTICE 'pg_trgm/unaccent no disponibles: {nombre_indice} no se crea';
+    END IF;
+END
+$migracion$;
+"""
+    return crear, f"DROP INDEX IF EXISTS {nombre_indice};"
+
+
+def trigram_disponible():
+    """True si la base tiene f_unaccent (y por lo tanto pg_trgm/unaccent)"""
+    alias = connection.alias
+    if alias not in _disponible:
+        if connection.vendor != "postgresql":
+            _disponible[alias] = False
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT to_regprocedure('f_unaccent(text)') IS NOT NULL")
+                _disponible[alias] = cursor.fetchone()[0]
+    return _disponible[alias]
+
+
+def _normalizar(termino):
+    return Func(Lower(Value(termino, output_field=TextField())), function="f_unaccent", output_field=TextField())
+
+
+def buscar(queryset, campos, texto):
+    """
+    Filtra `queryset` por los términos de `texto` (todos deben aparecer, en
+    cualquiera de los campos) y, con pg_trgm, lo anota con `rango_busqueda`.
+    Retorna (queryset, rankeado).
+    """
+    terminos = [termino for termino in texto.replace(",", " ").split() if termino]
+    if not terminos:
+        return queryset, False
+
+    if not trigram_disponible():
+        for termino in terminos:
+            condicion = Q()
+            for campo in campos:
+                condicion |= Q(**{f"{campo}__icontains": termino})
+            queryset = queryset.filter(condicion)
+        return queryset, False
+
+    documento = RawSQL(documento_sql(campos, queryset.model._meta.db_table), (), output_field=TextField())
+    queryset = queryset.annotate(documento_busqueda=documento)
+    for termino in terminos:
+        # contains escapa % y _ del término y genera LIKE '%...%': usa el índice GIN
+        queryset = queryset.filter(documento_busqueda__contains=_normalizar(termino))
+
+    rango = Func(
+        _normalizar(" ".join(terminos)),
+        F("documento_busqueda"),
+        function="word_similarity",
+        output_field=FloatField(),
+    )
+    return queryset.annotate(rango_busqueda=rango), True
+
+
+class BusquedaFilter(filters.SearchFilter):
+    """
+    SearchFilter de DRF (?search=) sobre el índice de trigramas.
+    Va después de OrderingFilter: sin ?ordering= explícito, ordena por relevancia.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        texto = request.query_params.get(self.search_param, "")
+        if not search_fields or not texto.strip():
+            return queryset
+
+        queryset, rankeado = buscar(queryset, search_fields, texto)
+        if rankeado and api_settings.ORDERING_PARAM not in request.query_params:
+            queryset = queryset.order_by("-rango_busqueda", *queryset.query.order_by)
+        return queryset
@@ -0,0 +1,151 @@
+"""
+Selección de campos (sparse fieldsets) para los serializers y viewsets del panel.
+
+    GET /api/conductores/?fields=id,nombre,apellido,estado
+    GET /api/admin/users/?omit=rol,last_login
+
+- CamposDinamicosMixin (serializer): quita los campos que no se pidieron. Un
+  nombre que el serializer no tiene responde 400 con la lista de inválidos.
+- CamposDinamicosViewMixin (viewset): en list/retrieve ajusta el queryset a los
+  campos que quedaron, con only() y select_related() de las relaciones anidadas,
+  para no traer columnas que nadie va a serializar.
+
+Los campos calculados (propiedades del modelo) declaran en Meta.campos_modelo qué
+columnas necesitan; si no, only() las difiere y cada fila haría otra consulta.
+Los que el queryset anota en SQL (@calculado + con_calculados()) no necesitan
+ninguna.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+FIELDS_PARAM = "fields"
+OMIT_PARAM = "omit"
+
+
+class calculado:
+    """
+    Propiedad de modelo que el queryset también puede anotar en SQL con el mismo
+    nombre (con_calculados() en conductores y personal). Si la fila trae la
+    anotación se usa ese valor, sin aritmética en Python; si no, se calcula como
+    una @property común.
+
+    Es un descriptor sin __set__: Django guarda la anotación en el __dict__ de la
+    instancia y ese valor tiene prioridad sobre __get__, como en cached_property.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.__doc__ = func.__doc__
+
+    def __get__(self, instancia, owner=None):
+        if instancia is None:
+            return self
+        return self.func(instancia)
+
+
+def _lista(valor):
+    return {nombre.strip() for nombre in (valor or "").split(",") if nombre.strip()}
+
+
+class CamposDinamicosMixin:
+    """
+    Serializer que respeta ?fields= y ?omit= del request del contexto.
+    Solo aplica al serializer raíz (los anidados se declaran sin contexto).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self._context.get("request")
+        if request is None or request.method not in ("GET", "HEAD"):
+            return
+
+        pedidos = _lista(request.query_params.get(FIELDS_PARAM))
+        omitidos = _lista(request.query_params.get(OMIT_PARAM))
+        # Un nombre que este serializer no tiene (mal escrito, o que solo está en
+        # el detalle y no en el listado) es un 400, no un campo que falta callado
+        errores = {}
+        for parametro, nombres in ((FIELDS_PARAM, pedidos), (OMIT_PARAM, omitidos)):
+            invalidos = sorted(nombres - set(self.fields))
+            if invalidos:
+                errores[parametro] = [f"Campos no disponibles: {', '.join(invalidos)}"]
+        if errores:
+            raise serializers.ValidationError(errores)
+
+        for nombre in list(self.fields):
+            if (pedidos and nombre not in pedidos) or nombre in omitidos:
+                self.fields.pop(nombre)
+
+    @classmethod
+    def columnas(cls, serializer, modelo, prefijo=""):
+        """
+        Columnas del modelo (rutas para only()) y relaciones (para select_related())
+        que necesitan los campos legibles de `serializer`.
+        """
+        extra = getattr(getattr(serializer, "Meta", None), "campos_modelo", {})
+        columnas = {f"{prefijo}{modelo._meta.pk.name}"}
+        relaciones = set()
+
+        for nombre, campo in serializer.fields.items():
+            if campo.write_only:
+                continue
+            if nombre in extra:
+                for ruta in extra[nombre]:
+                    columnas.add(f"{prefijo}{ruta}")
+                    partes = ruta.split("__")[:-1]
+                    for i in range(1, len(partes) + 1):
+                        relacion = "__".join(partes[:i])
+                        relaciones.add(f"{prefijo}{relacion}")
+                        columnas.add(f"{prefijo}{relacion}")
+                continue
+            if campo.source == "*" or "." in campo.source:
+                continue
+            try:
+                campo_modelo = modelo._meta.get_field(campo.source)
+            except FieldDoesNotExist:
+                # Propiedad sin Meta.campos_modelo: se deja el modelo completo
+                return None, set()
+            if not campo_modelo.concrete:
+                continue
+            columnas.add(f"{prefijo}{campo_modelo.name}")
+
+            if isinstance(campo, serializers.BaseSerializer) and campo_modelo.is_relation:
+                anidadas, sub_relaciones = cls.columnas(
+                    campo, campo_modelo.related_model, f"{prefijo}{campo_modelo.name}__"
+                )
+                relaciones.add(f"{prefijo}{campo_modelo.name}")
+                relaciones.update(sub_relaciones)
+                if anidadas is None:
+                    # El anidado necesita todas sus columnas
+                    columnas.update(
+                        f"{prefijo}{campo_modelo.name}__{f.name}"
+                        for f in campo_modelo.related_model._meta.concrete_fields
+                    )
+                else:
+                    columnas.update(anidadas)
+        return columnas, relaciones
+
+
+class CamposDinamicosViewMixin:
+    """
+    Para viewsets cuyo serializer usa CamposDinamicosMixin: en list/retrieve el
+    queryset trae solo las columnas (y relaciones) que el serializer va a leer.
+    Va antes de ModelViewSet en las bases.
+    """
+
+    acciones_campos_dinamicos = ("list", "retrieve")
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action not in self.acciones_campos_dinamicos:
+            return queryset
+
+        serializer_class = self.get_serializer_class()
+        if not issubclass(serializer_class, CamposDinamicosMixin):
+            return queryset
+        serializer = serializer_class(context=self.get_serializer_context())
+        columnas, relaciones = serializer_class.columnas(serializer, queryset.model)
+        if relaciones:
+            queryset = queryset.select_related(*sorted(relaciones))
+        if columnas is not None:
+            queryset = queryset.only(*sorted(columnas))
+        return queryset
@@ -0,0 +1,285 @@
+"""
+Compresión de respuestas negociada con Accept-Encoding: brotli, zstd y gzip.
+
+Reemplaza a GZipMiddleware de Django con:
+- brotli ("br") y zstd si están instalados (paquetes `brotli` y `zstandard`);
+  gzip siempre, con zlib de la librería estándar
+- un tamaño mínimo (COMPRESION_MIN_BYTES): bajo ese tamaño los encabezados y
+  la CPU cuestan más de lo que se ahorra
+- StreamingHttpResponse (sync y async): cada fragmento se comprime y se vacía
+  al cliente, sin esperar al final del stream
+- sin recomprimir lo que ya viene comprimido (imágenes, zip, pdf...) ni
+  respuestas con Content-Encoding o Cache-Control: no-transform
+
+BREACH: gzip conserva la mitigación de GZipMiddleware (Django >= 4.2), un nombre
+de archivo de largo aleatorio en el encabezado, que cambia el tamaño de
+cada respuesta. brotli y zstd no tienen dónde agregar ese relleno: las respuestas
+con secretos (Set-Cookie, token CSRF en un formulario, JWT en el cuerpo) solo se
+comprimen con gzip.
+
+Va primera en MIDDLEWARE, para que el resto vea el contenido sin comprimir.
+"""
+import re
+import secrets
+import struct
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependencia opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dependencia opcional
+    zstandard = None
+
+# Tipos que ya vienen comprimidos: recomprimirlos gasta CPU sin reducir nada
+TIPOS_COMPRIMIDOS = (
+    "image/",
+    "video/",
+    "audio/",
+    "font/woff",
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/x-7z-compressed",
+    "application/x-rar-compressed",
+    "application/zstd",
+    "application/pdf",
+    "application/octet-stream",
+    "application/vnd.apache.parquet",
+)
+# "image/svg+xml" es texto y sí se comprime
+TIPOS_TEXTO = ("image/svg+xml",)
+
+# Cuerpos que llevan secretos: el token CSRF de los formularios (admin, API navegable)
+# y los JWT que devuelven login, registro y refresh
+MARCAS_SECRETAS = (b"csrfmiddlewaretoken", b'"access"', b'"refresh"')
+
+# Largo máximo del nombre aleatorio del encabezado gzip (el mismo que GZipMiddleware)
+MAX_BYTES_ALEATORIOS = 100
+
+_re_q = re.compile(r"^q=([0-9.]+)$")
+
+
+class _Gzip:
+    """gzip armado a mano (deflate crudo) para poner un nombre aleatorio en el encabezado"""
+
+    nombre = "gzip"
+
+    def __init__(self, nivel):
+        self.nivel = nivel
+
+    @staticmethod
+    def _encabezado():
+        # Lo que varía es el largo, no el contenido (igual que django.utils.text.compress_string)
+        relleno = b"a" * (1 + secrets.randbelow(MAX_BYTES_ALEATORIOS))
+        # Firma, deflate, FNAME, mtime 0, sin flags extra, sistema desconocido
+        return b"\x1f\x8b\x08\x08\x00\x00\x00\x00\x00\xff" + relleno + b"\x00"
+
+    def _deflate(self):
+        return zlib.compressobj(self.nivel, zlib.DEFLATED, -zlib.MAX_WBITS)
+
+    @staticmethod
+    def _cola(crc, largo):
+        return struct.pack("<II", crc, largo & 0xFFFFFFFF)
+
+    def comprimir(self, datos):
+        compresor = self._deflate()
+        return (
+            self._encabezado() + compresor.compress(datos) + compresor.flush()
+            + self._cola(zlib.crc32(datos), len(datos))
+        )
+
+    def stream(self):
+        compresor = self._deflate()
+        encabezado = self._encabezado()
+        crc = largo = 0
+
+        def comprimir(fragmento):
+            nonlocal encabezado, crc, largo
+            crc = zlib.crc32(fragmento, crc)
+            largo += len(fragmento)
+            datos = encabezado + compresor.compress(fragmento) + compresor.flush(zlib.Z_SYNC_FLUSH)
+            encabezado = b""
+            return datos
+
+        def terminar():
+            return encabezado + compresor.flush() + self._cola(crc, largo)
+
+        return comprimir, terminar
+
+
+class _Brotli:
+    nombre = "br"
+
+    def __init__(self, nivel):
+        self.nivel = nivel
+
+    def comprimir(self, datos):
+        return brotli.compress(datos, quality=self.nivel)
+
+    def stream(self):
+        compresor = brotli.Compressor(quality=self.nivel)
+        return (
+            lambda fragmento: compresor.process(fragmento) + compresor.flush(),
+            compresor.finish,
+        )
+
+
+class _Zstd:
+    nombre = "zstd"
+
+    def __init__(self, nivel):
+        self.compresor = zstandard.ZstdCompressor(level=nivel)
+
+    def comprimir(self, datos):
+        return self.compresor.compress(datos)
+
+    def stream(self):
+        compresor = self.compresor.compressobj()
+        return (
+            lambda fragmento: compresor.compress(fragmento) + compresor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+            compresor.flush,
+        )
+
+
+def compresores_disponibles():
+    """Compresores configurados en COMPRESION_ALGORITMOS cuya librería está instalada, en orden de preferencia"""
+    fabricas = {
+        "br": lambda: _Brotli(settings.COMPRESION_NIVEL_BROTLI) if brotli else None,
+        "zstd": lambda: _Zstd(settings.COMPRESION_NIVEL_ZSTD) if zstandard else None,
+        "gzip": lambda: _Gzip(settings.COMPRESION_NIVEL_GZIP),
+    }
+    compresores = []
+    for nombre in settings.COMPRESION_ALGORITMOS:
+        compresor = fabricas[nombre]() if nombre in fabricas else None
+        if compresor is not None:
+            compresores.append(compresor)
+    return compresores
+
+
+def elegir_codificacion(accept_encoding, disponibles):
+    """
+    Codificación a usar según Accept-Encoding ("gzip, br;q=0.9, *;q=0"):
+    la de mayor q; a igual q, la primera de `disponibles` (preferencia del servidor).
+    """
+    aceptadas = {}
+    for parte in accept_encoding.split(","):
+        nombre, _, parametros = parte.strip().partition(";")
+        nombre = nombre.strip().lower()
+        if not nombre:
+            continue
+        q = 1.0
+        coincidencia = _re_q.match(parametros.strip().replace(" ", ""))
+        if coincidencia:
+            try:
+                q = float(coincidencia.group(1))
+            except ValueError:
+                q = 0.0
+        aceptadas[nombre] = q
+
+    mejor, mejor_q = None, 0.0
+    for nombre in disponibles:
+        q = aceptadas.get(nombre, aceptadas.get("*", 0.0))
+        if q > mejor_q:
+            mejor, mejor_q = nombre, q
+    return mejor
+
+
+def tiene_secretos(response):
+    """Si la respuesta fija cookies o su cuerpo lleva un token (ver MARCAS_SECRETAS)"""
+    if response.cookies:
+        return True
+    if response.streaming:
+        return False
+    contenido = response.content
+    return any(marca in contenido for marca in MARCAS_SECRETAS)
+
+
+def es_comprimible(content_type):
+    tipo = content_type.split(";", 1)[0].strip().lower()
+    if tipo in TIPOS_TEXTO:
+        return True
+    return not tipo.startswith(TIPOS_COMPRIMIDOS)
+
+
+class CompresionMiddleware(MiddlewareMixin):
+    """Comprime la respuesta con la mejor codificación que acepte el cliente"""
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.compresores = {c.nombre: c for c in compresores_disponibles()}
+
+    def process_response(self, request, response):
+        if not settings.COMPRESION_HABILITADA or not self.compresores:
+            return response
+        if response.status_code in (204, 206, 304) or response.has_header("Content-Encoding"):
+            return response
+        if "no-transform" in response.get("Cache-Control", ""):
+            return response
+        if not es_comprimible(response.get("Content-Type", "")):
+            return response
+
+        if not response.streaming:
+            if len(response.content) < settings.COMPRESION_MIN_BYTES:
+                return response
+        elif response.has_header("Content-Length") and \
+                int(response["Content-Length"]) < settings.COMPRESION_MIN_BYTES:
+            return response
+
+        # A partir de aquí la respuesta depende de Accept-Encoding (cachés intermedias)
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        disponibles = self.compresores
+        if tiene_secretos(response):
+            # Solo gzip tiene la mitigación de BREACH (ver _Gzip)
+            disponibles = [nombre for nombre in disponibles if nombre == "gzip"]
+        nombre = elegir_codificacion(request.META.get("HTTP_ACCEPT_ENCODING", ""), disponibles)
+        if nombre is None:
+            return response
+        compresor = self.compresores[nombre]
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self._comprimir_async(response.streaming_content, compresor)
+            else:
+                response.streaming_content = self._comprimir_stream(response.streaming_content, compresor)
+            # El tamaño final no se conoce de antemano
+            del response["Content-Length"]
+        else:
+            comprimido = compresor.comprimir(response.content)
+            if len(comprimido) >= len(response.content):
+                return response
+            response.content = comprimido
+            response["Content-Length"] = str(len(comprimido))
+
+        # El ETag fuerte identifica los bytes sin comprimir (igual que GZipMiddleware)
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = nombre
+        return response
+
+    @staticmethod
+    def _comprimir_stream(contenido, compresor):
+        comprimir, terminar = compresor.stream()
+        for fragmento in contenido:
+            datos = comprimir(fragmento)
+            if datos:
+                yield datos
+        yield terminar()
+
+    @staticmethod
+    async def _comprimir_async(contenido, compresor):
+        comprimir, terminar = compresor.stream()
+        async for fragmento in contenido:
+            datos = comprimir(fragmento)
+            if datos:
+                yield datos
+        yield terminar()
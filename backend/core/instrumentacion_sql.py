@@ -0,0 +1,184 @@
+"""
+Instrumentación SQL por request: cantidad de consultas, tiempo total en la base,
+consultas repetidas y las más lentas, con el nombre de la vista.
+
+- Una fracción de los requests (SQL_MUESTREO, 0..1) se instrumenta con
+  connection.execute_wrapper en todas las conexiones; el resto no paga nada.
+- Cada request muestreado deja una línea JSON en el logger "transporte.sql" y,
+  con SQL_SERVER_TIMING, el encabezado Server-Timing (visible en las devtools).
+- Si supera SQL_UMBRAL_CONSULTAS consultas, SQL_UMBRAL_MS de base o tiene una
+  consulta de más de SQL_UMBRAL_CONSULTA_MS, la línea se emite como WARNING con
+  el SQL de las consultas más lentas y de las repetidas (típico N+1).
+
+Las conexiones de Django son por hilo. Bajo ASGI las vistas sync y el ORM corren
+en el hilo de sync_to_async del request, no en el del event loop: ahí se instalan
+los wrappers (instrumentar_async).
+"""
+import json
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import ExitStack, asynccontextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger("transporte.sql")
+
+# Largo máximo del SQL que se guarda en el log por consulta
+MAX_SQL = 500
+
+
+class RegistroSQL:
+    """Wrapper para execute_wrapper que acumula las consultas de un request"""
+
+    def __init__(self):
+        self.consultas = []  # (sql, params, alias, segundos)
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.consultas.append(
+                (sql, params, context["connection"].alias, time.perf_counter() - inicio)
+            )
+
+    @property
+    def total_ms(self):
+        return sum(c[3] for c in self.consultas) * 1000
+
+    def repetidas(self):
+        """(sql, veces) de las sentencias ejecutadas más de una vez, con cualquier parámetro"""
+        conteo = Counter(c[0] for c in self.consultas)
+        return [(sql, veces) for sql, veces in conteo.most_common() if veces > 1]
+
+    def duplicadas(self):
+        """Consultas idénticas (mismo SQL y mismos parámetros) ejecutadas de más"""
+        conteo = Counter((c[0], repr(c[1])) for c in self.consultas)
+        return sum(veces - 1 for veces in conteo.values() if veces > 1)
+
+
+def instrumentar(wrapper):
+    """execute_wrapper en todas las conexiones del hilo actual (principal, réplicas, auditoría)"""
+    pila = ExitStack()
+    for alias in connections:
+        pila.enter_context(connections[alias].execute_wrapper(wrapper))
+    return pila
+
+
+@asynccontextmanager
+async def instrumentar_async(wrapper):
+    """
+    instrumentar() para requests async: instala y quita los wrappers en el hilo
+    donde corren las vistas sync y el ORM del request (sync_to_async con
+    thread_sensitive, el mismo para todo el request)
+    """
+    pila = await sync_to_async(instrumentar)(wrapper)
+    try:
+        yield
+    finally:
+        await sync_to_async(pila.close)()
+
+
+def nombre_vista(request):
+    """
+    "ConductorViewSet.estadisticas" para viewsets de DRF, "UserDetailView.get"
+    para APIViews y el nombre de la función para vistas de función
+    """
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return None
+    func = match.func
+    clase = getattr(func, "cls", None) or getattr(func, "view_class", None)
+    if clase is None:
+        return getattr(func, "__name__", match.view_name)
+    acciones = getattr(func, "actions", None) or {}
+    metodo = request.method.lower()
+    if clase.__name__ == "WrappedAPIView":
+        # @api_view: la clase es genérica, el nombre útil es el de la función
+        return getattr(func, "__name__", match.view_name)
+    return f"{clase.__name__}.{acciones.get(metodo, metodo)}"
+
+
+class InstrumentacionSQLMiddleware:
+    """Mide las consultas SQL de una muestra de los requests (sync y async)"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.es_async = iscoroutinefunction(get_response)
+        if self.es_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.es_async:
+            return self.__acall__(request)
+        if not self._muestrear():
+            return self.get_response(request)
+
+        registro = RegistroSQL()
+        inicio = time.perf_counter()
+        with instrumentar(registro):
+            response = self.get_response(request)
+        self._reportar(request, response, registro, time.perf_counter() - inicio)
+        return response
+
+    async def __acall__(self, request):
+        if not self._muestrear():
+            return await self.get_response(request)
+
+        registro = RegistroSQL()
+        inicio = time.perf_counter()
+        async with instrumentar_async(registro):
+            response = await self.get_response(request)
+        self._reportar(request, response, registro, time.perf_counter() - inicio)
+        return response
+
+    @staticmethod
+    def _muestrear():
+        muestreo = settings.SQL_MUESTREO
+        return muestreo >= 1 or (muestreo > 0 and random.random() < muestreo)
+
+    def _reportar(self, request, response, registro, segundos):
+        total_ms = registro.total_ms
+        if settings.SQL_SERVER_TIMING:
+            response["Server-Timing"] = ", ".join(filter(None, [
+                response.get("Server-Timing"),
+                f'db;dur={total_ms:.1f};desc="{len(registro.consultas)} consultas"',
+                f"app;dur={segundos * 1000:.1f}",
+            ]))
+
+        lenta_ms = max((c[3] for c in registro.consultas), default=0) * 1000
+        excedido = (
+            len(registro.consultas) > settings.SQL_UMBRAL_CONSULTAS
+            or total_ms > settings.SQL_UMBRAL_MS
+            or lenta_ms > settings.SQL_UMBRAL_CONSULTA_MS
+        )
+        nivel = logging.WARNING if excedido else logging.INFO
+        if not logger.isEnabledFor(nivel):
+            return
+
+        linea = {
+            "vista": nombre_vista(request),
+            "metodo": request.method,
+            "ruta": request.path,
+            "status": response.status_code,
+            "ms": round(segundos * 1000, 1),
+            "consultas": len(registro.consultas),
+            "db_ms": round(total_ms, 1),
+            "duplicadas": registro.duplicadas(),
+        }
+        if excedido:
+            lentas = sorted(registro.consultas, key=lambda c: c[3], reverse=True)[:5]
+            linea["mas_lentas"] = [
+                {"ms": round(c[3] * 1000, 1), "alias": c[2], "sql": c[0][:MAX_SQL]} for c in lentas
+            ]
+            linea["repetidas"] = [
+                {"veces": veces, "sql": sql[:MAX_SQL]} for sql, veces in registro.repetidas()[:5]
+            ]
+        logger.log(nivel, json.dumps(linea, ensure_ascii=False))
@@ -0,0 +1,73 @@
+"""
+Renderer y parser JSON de la API basados en orjson.
+
+El JSONRenderer de DRF usa json.dumps de la librería estándar, que en páginas
+grandes (bitácora, conductores) es buena parte del tiempo de CPU del request.
+orjson serializa en C los tipos nativos (dict, list, str, int, float, datetime,
+date, UUID); lo demás (Decimal, lazy strings, QuerySet, timedelta...) pasa por
+el mismo JSONEncoder de DRF, así que la salida es la misma que antes.
+
+Si orjson no está instalado, o se pide indentación (?format=api, Accept con
+indent=), se usa la implementación estándar de DRF.
+"""
+from django.conf import settings
+from rest_framework import parsers, renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+_encoder = encoders.JSONEncoder()
+
+
+def _default(obj):
+    """Tipos que orjson no conoce: misma representación que el JSONEncoder de DRF"""
+    return _encoder.default(obj)
+
+
+if orjson is not None:
+    # OPT_UTC_Z: "...Z" en vez de "+00:00", como DRF
+    # OPT_NON_STR_KEYS: claves int/date en dicts armados a mano (p. ej. estadísticas)
+    OPCIONES_ORJSON = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    """JSONRenderer de DRF con orjson cuando está disponible"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_default, option=OPCIONES_ORJSON)
+        except orjson.JSONEncodeError:
+            # p. ej. enteros de más de 64 bits: la versión estándar los maneja (o da el error de siempre)
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Igual que DRF: U+2028/U+2029 escapados para que el JSON sea JavaScript válido
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+class ORJSONParser(parsers.JSONParser):
+    """JSONParser de DRF con orjson cuando está disponible"""
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        # orjson solo lee UTF-8
+        if orjson is None or encoding.lower().replace("_", "-") not in ("utf-8", "utf8"):
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
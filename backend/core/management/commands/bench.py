@@ -0,0 +1,112 @@
+"""
+Comando de gestión de Django para ejecutar los benchmarks.
+Este comando permite ejecutar todos los benchmarks o benchmarks específicos
+desde la línea de comandos, sobre una base de datos de prueba desechable.
+
+Uso:
+    python manage.py bench [nombre_benchmark1 nombre_benchmark2 ...]
+
+    - Sin argumentos: ejecuta todos los benchmarks
+    - Con argumentos: ejecuta solo los benchmarks especificados
+    - --iteraciones / --escala: ajustan la cantidad de requests y el tamaño de los datos
+"""
+import importlib
+import inspect
+import os
+import pkgutil
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from benchmarks.base_benchmark import BaseBenchmark
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta los benchmarks de rendimiento sobre una base de datos de prueba'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'benchmarks',
+            nargs='*',
+            help='Nombres de los benchmarks a ejecutar (sin el sufijo "_benchmark"). Si no se especifica, se ejecutan todos.'
+        )
+        parser.add_argument(
+            '--iteraciones',
+            type=int,
+            default=500,
+            help='Cantidad de operaciones medidas por escenario'
+        )
+        parser.add_argument(
+            '--escala',
+            type=int,
+            default=1000,
+            help='Cantidad de registros de datos de prueba que generan los benchmarks'
+        )
+        parser.add_argument(
+            '--keepdb',
+            action='store_true',
+            help='Conserva la base de datos de prueba entre ejecuciones'
+        )
+
+    def handle(self, *args, **options):
+        benchmarks_to_run = options['benchmarks']
+
+        # Importa dinámicamente todos los benchmarks del paquete
+        benchmarks_module = importlib.import_module('benchmarks')
+        benchmarks_path = os.path.dirname(benchmarks_module.__file__)
+
+        all_benchmarks = []
+
+        for _, module_name, is_pkg in pkgutil.iter_modules([benchmarks_path]):
+            if is_pkg or module_name == 'base_benchmark':
+                continue
+
+            module = importlib.import_module(f'benchmarks.{module_name}')
+
+            for name, obj in inspect.getmembers(module, inspect.isclass):
+                if issubclass(obj, BaseBenchmark) and obj != BaseBenchmark and obj.__module__ == module.__name__:
+                    all_benchmarks.append((name, obj))
+
+        if not all_benchmarks:
+            self.stdout.write(self.style.WARNING('No se encontraron benchmarks'))
+            return
+
+        if benchmarks_to_run:
+            filtered = []
+            for name, benchmark_class in all_benchmarks:
+                base_name = name.lower().replace('benchmark', '').strip('_')
+                if any(arg.lower() == base_name for arg in benchmarks_to_run):
+                    filtered.append((name, benchmark_class))
+
+            if not filtered:
+                self.stdout.write(self.style.ERROR(
+                    f'No se encontraron benchmarks con los nombres: {", ".join(benchmarks_to_run)}'
+                ))
+                return
+            all_benchmarks = filtered
+
+        # Base de datos desechable, igual que el test runner
+        setup_test_environment(debug=False)
+        old_config = setup_databases(verbosity=1, interactive=False, keepdb=options['keepdb'])
+        try:
+            for name, benchmark_class in all_benchmarks:
+                self.stdout.write(self.style.MIGRATE_HEADING(f'{name}: {benchmark_class.descripcion}'))
+                resultados = benchmark_class.run(
+                    iteraciones=options['iteraciones'],
+                    escala=options['escala'],
+                )
+                for resultado in resultados:
+                    escenario = resultado.pop('escenario')
+                    metricas = '  '.join(f'{k}={v}' for k, v in resultado.items())
+                    self.stdout.write(f'  {escenario:<40} {metricas}')
+        finally:
+            # Conexiones de otros alias (réplicas) abiertas contra la base de prueba
+            connections.close_all()
+            teardown_databases(old_config, verbosity=1, keepdb=options['keepdb'])
+            teardown_test_environment()
@@ -0,0 +1,19 @@
+"""
+Genera el token para perfilar un request en producción (ver core/perfilador.py).
+
+Uso:
+    curl -H "X-Perfilar: $(python manage.py token_perfilador)" https://.../api/conductores/
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.perfilador import generar_token
+
+
+class Command(BaseCommand):
+    help = 'Imprime un token firmado para el encabezado X-Perfilar'
+
+    def handle(self, *args, **options):
+        if not settings.PERFILADOR_HABILITADO:
+            self.stderr.write('⚠️ PERFILADOR_HABILITADO=0: el token no tendrá efecto')
+        self.stdout.write(generar_token())
@@ -0,0 +1,193 @@
+"""
+Métricas en formato Prometheus: GET /metrics
+
+Contadores e histogramas en memoria de cada proceso (prometheus_client). Con
+gunicorn (varios workers) start.sh define PROMETHEUS_MULTIPROC_DIR: cada worker
+escribe sus valores en archivos mmap de ese directorio y /metrics los suma, así
+que el scrape ve el total aunque lo atienda un solo worker.
+
+Se miden:
+- requests por vista y status, y su latencia (MetricasMiddleware)
+- consultas SQL y tiempo en la base por vista
+- aciertos/fallos de las caches de la aplicación (cache_consulta)
+- escrituras de bitácora, logins por resultado, rechazos de throttling
+- ubicaciones recibidas (la tasa la calcula Prometheus con rate())
+- lecturas enviadas a una réplica o a la principal por una escritura reciente
+- despachos de viajes: asignados y sin conductor libre cerca
+- reservas de asientos: retenidas, sin cupo, confirmadas, canceladas y expiradas
+- al momento del scrape: emails pendientes en el outbox y conductores que
+  reportaron ubicación en los últimos METRICAS_VENTANA_UBICACION_SEG
+"""
+import hmac
+import os
+import time
+from datetime import timedelta
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from core.instrumentacion_sql import instrumentar, instrumentar_async, nombre_vista
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+REQUESTS = Counter(
+    "http_requests_total", "Requests HTTP atendidos", ["vista", "metodo", "status"]
+)
+LATENCIA = Histogram(
+    "http_request_duracion_segundos", "Latencia de los requests HTTP", ["vista", "metodo"],
+    buckets=BUCKETS_LATENCIA,
+)
+DB_CONSULTAS = Counter("db_consultas_total", "Consultas SQL ejecutadas", ["vista"])
+DB_SEGUNDOS = Counter("db_duracion_segundos_total", "Tiempo total en la base de datos", ["vista"])
+CACHE = Counter(
+    "app_cache_consultas_total", "Consultas a las caches de la aplicación", ["cache", "resultado"]
+)
+BITACORA = Counter("bitacora_escrituras_total", "Registros de bitácora escritos", ["modulo"])
+LOGINS = Counter("login_intentos_total", "Intentos de login por resultado", ["resultado"])
+THROTTLE = Counter("throttle_rechazos_total", "Requests rechazados por throttling", ["scope"])
+UBICACIONES = Counter("ubicaciones_recibidas_total", "Actualizaciones de ubicación de conductores")
+LECTURAS = Counter(
+    "lecturas_destino_total", "Requests de lectura por base (con réplicas configuradas)", ["destino"]
+)
+DESPACHOS = Counter("viajes_despachos_total", "Intentos de asignación de viajes por resultado", ["resultado"])
+RESERVAS = Counter("reservas_operaciones_total", "Operaciones sobre reservas de asientos por resultado", ["resultado"])
+
+# Vista para los requests que no resolvieron ninguna URL (404): etiqueta acotada
+SIN_VISTA = "sin_vista"
+
+
+def cache_consulta(cache, acierto):
+    """Registra un acierto o fallo de una cache de la aplicación"""
+    CACHE.labels(cache, "acierto" if acierto else "fallo").inc()
+
+
+class _ContadorSQL:
+    """execute_wrapper mínimo: solo cantidad y tiempo"""
+
+    __slots__ = ("consultas", "segundos")
+
+    def __init__(self):
+        self.consultas = 0
+        self.segundos = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.consultas += 1
+            self.segundos += time.perf_counter() - inicio
+
+
+class MetricasMiddleware:
+    """Cuenta requests, latencia y SQL por vista (sync y async)"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.es_async = iscoroutinefunction(get_response)
+        if self.es_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.es_async:
+            return self.__acall__(request)
+        if not settings.METRICAS_HABILITADAS:
+            return self.get_response(request)
+
+        contador = _ContadorSQL()
+        inicio = time.perf_counter()
+        with instrumentar(contador):
+            response = self.get_response(request)
+        self._registrar(request, response, contador, time.perf_counter() - inicio)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.METRICAS_HABILITADAS:
+            return await self.get_response(request)
+
+        contador = _ContadorSQL()
+        inicio = time.perf_counter()
+        # En el hilo de sync_to_async del request, donde corren las consultas
+        async with instrumentar_async(contador):
+            response = await self.get_response(request)
+        self._registrar(request, response, contador, time.perf_counter() - inicio)
+        return response
+
+    @staticmethod
+    def _registrar(request, response, contador, segundos):
+        vista = nombre_vista(request) or SIN_VISTA
+        REQUESTS.labels(vista, request.method, response.status_code).inc()
+        LATENCIA.labels(vista, request.method).observe(segundos)
+        if contador.consultas:
+            DB_CONSULTAS.labels(vista).inc(contador.consultas)
+            DB_SEGUNDOS.labels(vista).inc(contador.segundos)
+
+
+class ColasCollector:
+    """Valores que se leen de la base al momento del scrape (uno solo, no por worker)"""
+
+    def collect(self):
+        from conductores.models import Conductor
+        from notificaciones.models import EmailPendiente
+
+        # Usa el índice parcial email_pendiente_cola_idx
+        pendientes = EmailPendiente.objects.filter(estado='PENDIENTE').count()
+        yield GaugeMetricFamily(
+            "email_cola_pendientes", "Emails pendientes de envío en el outbox", value=pendientes
+        )
+
+        desde = timezone.now() - timedelta(seconds=settings.METRICAS_VENTANA_UBICACION_SEG)
+        activos = Conductor.objects.filter(ultima_actualizacion_ubicacion__gte=desde).count()
+        yield GaugeMetricFamily(
+            "conductores_reportando_ubicacion",
+            "Conductores que enviaron ubicación dentro de la ventana", value=activos,
+        )
+
+
+class _ProcesoActual:
+    """Métricas del REGISTRY global (un solo proceso: runserver, tests)"""
+
+    def collect(self):
+        return REGISTRY.collect()
+
+
+def _registry():
+    registry = CollectorRegistry()
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        # Suma los archivos de todos los workers
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry.register(_ProcesoActual())
+    registry.register(ColasCollector())
+    return registry
+
+
+@csrf_exempt
+def metrics(request):
+    """
+    Exposición para Prometheus: requiere "Authorization: Bearer <METRICS_TOKEN>".
+    Sin METRICS_TOKEN configurado responde 403 a todos: latencias por vista,
+    cantidad de SQL y colas no quedan públicas por olvido.
+    """
+    token = settings.METRICS_TOKEN
+    if not token:
+        return HttpResponse("METRICS_TOKEN no está configurado\n", status=403, content_type="text/plain")
+    if not hmac.compare_digest(request.META.get("HTTP_AUTHORIZATION", ""), f"Bearer {token}"):
+        return HttpResponse(status=401)
+    return HttpResponse(generate_latest(_registry()), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,244 @@
+"""
+Perfilado por muestreo de un request puntual, activado a pedido.
+
+Un request se perfila si trae:
+- el encabezado X-Perfilar con un token firmado (manage.py token_perfilador),
+  válido por PERFILADOR_TOKEN_SEG, o
+- ?perfilar=1 y lo hace un superusuario (sesión o JWT). Por eso el middleware va
+  después de AuthenticationMiddleware.
+
+Mientras la vista corre, un hilo toma cada PERFILADOR_INTERVALO_MS la pila del
+hilo que la ejecuta (sys._current_frames). En ASGI las vistas sincrónicas corren
+en el hilo de sync_to_async del request, no en el del event loop: se muestrea ese
+hilo, y también ahí se verifica el superusuario, que consulta la base. El resultado son "collapsed
+stacks" (una línea "modulo:funcion;modulo:funcion N" por pila distinta), el
+formato de entrada de flamegraph.pl y speedscope:
+- por defecto se guarda en PERFILADOR_DIR y la respuesta lleva X-Perfil con el archivo
+  (en ASGI la escritura corre con sync_to_async, fuera del event loop)
+- con ?perfilar=inline (o X-Perfilar-Salida: inline) la respuesta es el perfil en texto
+
+A lo sumo PERFILADOR_MAX_CONCURRENTES requests por proceso se perfilan a la vez
+y cada uno como máximo PERFILADOR_MAX_SEG; el resto se atiende sin perfilar.
+"""
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+from django.utils import timezone
+
+from core.instrumentacion_sql import nombre_vista
+
+SALT = "core.perfilador"
+ENCABEZADO = "HTTP_X_PERFILAR"
+ENCABEZADO_SALIDA = "HTTP_X_PERFILAR_SALIDA"
+PARAMETRO = "perfilar"
+
+_cupos = None
+_cupos_lock = threading.Lock()
+
+
+def generar_token():
+    """Token para el encabezado X-Perfilar (vence a los PERFILADOR_TOKEN_SEG)"""
+    return signing.TimestampSigner(salt=SALT).sign("perfilar")
+
+
+def token_valido(token):
+    try:
+        signing.TimestampSigner(salt=SALT).unsign(token, max_age=settings.PERFILADOR_TOKEN_SEG)
+        return True
+    except signing.BadSignature:
+        return False
+
+
+def _es_superusuario(request):
+    """Sesión de Django o, si no hay, el JWT del encabezado Authorization"""
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user.is_superuser
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+    from rest_framework.exceptions import AuthenticationFailed
+
+    try:
+        resultado = JWTAuthentication().authenticate(request)
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return False
+    return resultado is not None and resultado[0].is_superuser
+
+
+def _pide_perfil(request):
+    """Chequeo barato, sin tocar la base: el request trae el encabezado o el parámetro"""
+    return bool(request.META.get(ENCABEZADO) or request.GET.get(PARAMETRO))
+
+
+def solicitado(request):
+    """True si el request pidió ser perfilado y está autorizado"""
+    token = request.META.get(ENCABEZADO)
+    if token:
+        return token_valido(token)
+    if request.GET.get(PARAMETRO):
+        return _es_superusuario(request)
+    return False
+
+
+async def _hilo_de_la_vista(request):
+    """Id del hilo donde correrá la vista bajo ASGI"""
+    try:
+        vista = resolve(request.path_info, getattr(request, "urlconf", None)).func
+    except Resolver404:
+        vista = None
+    if vista is not None and iscoroutinefunction(vista):
+        return threading.get_ident()
+    # Dentro del ThreadSensitiveContext del request, todo sync_to_async va al mismo hilo
+    return await sync_to_async(threading.get_ident)()
+
+
+def _salida_inline(request):
+    return "inline" in (request.GET.get(PARAMETRO, ""), request.META.get(ENCABEZADO_SALIDA, ""))
+
+
+def _guardar_perfil(request, perfil):
+    """Escribe el perfil en PERFILADOR_DIR y retorna el nombre del archivo"""
+    vista = (nombre_vista(request) or "sin_vista").replace("/", "_")
+    # Microsegundos y un sufijo al azar: dos perfiles de la misma vista no se pisan
+    nombre = f"{timezone.now():%Y%m%d-%H%M%S-%f}-{os.getpid()}-{secrets.token_hex(3)}-{vista}.folded"
+    os.makedirs(settings.PERFILADOR_DIR, exist_ok=True)
+    with open(os.path.join(settings.PERFILADOR_DIR, nombre), "w", encoding="utf-8") as archivo:
+        archivo.write(perfil)
+    return nombre
+
+
+def _semaforo():
+    global _cupos
+    with _cupos_lock:
+        if _cupos is None:
+            _cupos = threading.BoundedSemaphore(settings.PERFILADOR_MAX_CONCURRENTES)
+    return _cupos
+
+
+class MuestreadorPilas:
+    """Toma muestras periódicas de la pila de un hilo y las acumula colapsadas"""
+
+    def __init__(self, hilo_id, intervalo, max_segundos):
+        self.hilo_id = hilo_id
+        self.intervalo = intervalo
+        self.max_segundos = max_segundos
+        self.pilas = Counter()
+        self.muestras = 0
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._muestrear, name="perfilador", daemon=True)
+
+    def __enter__(self):
+        self._hilo.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._detener.set()
+        self._hilo.join()
+
+    def _muestrear(self):
+        limite = time.monotonic() + self.max_segundos
+        while not self._detener.wait(self.intervalo) and time.monotonic() < limite:
+            frame = sys._current_frames().get(self.hilo_id)
+            if frame is None:
+                continue
+            pila = []
+            while frame is not None:
+                codigo = frame.f_code
+                modulo = frame.f_globals.get("__name__", codigo.co_filename)
+                pila.append(f"{modulo}:{codigo.co_name}")
+                frame = frame.f_back
+            self.pilas[";".join(reversed(pila))] += 1
+            self.muestras += 1
+
+    def colapsado(self):
+        return "\n".join(f"{pila} {veces}" for pila, veces in self.pilas.most_common()) + "\n"
+
+
+class PerfiladorMiddleware:
+    """Perfila los requests que lo piden, con cupo por proceso"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.es_async = iscoroutinefunction(get_response)
+        if self.es_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.es_async:
+            return self.__acall__(request)
+        if not settings.PERFILADOR_HABILITADO or not solicitado(request):
+            return self.get_response(request)
+
+        cupos = _semaforo()
+        if not cupos.acquire(blocking=False):
+            response = self.get_response(request)
+            response["X-Perfil"] = "ocupado"
+            return response
+        try:
+            with self._muestreador(threading.get_ident()) as muestreador:
+                response = self.get_response(request)
+        finally:
+            cupos.release()
+        return self._entregar(request, response, muestreador)
+
+    async def __acall__(self, request):
+        if not settings.PERFILADOR_HABILITADO or not _pide_perfil(request):
+            return await self.get_response(request)
+        # request.user y el JWT consultan la base: no se pueden evaluar en el event loop
+        if not await sync_to_async(solicitado)(request):
+            return await self.get_response(request)
+
+        cupos = _semaforo()
+        if not cupos.acquire(blocking=False):
+            response = await self.get_response(request)
+            response["X-Perfil"] = "ocupado"
+            return response
+        hilo_id = await _hilo_de_la_vista(request)
+        try:
+            with self._muestreador(hilo_id) as muestreador:
+                response = await self.get_response(request)
+        finally:
+            cupos.release()
+        if _salida_inline(request):
+            return self._inline(response, muestreador)
+        nombre = await sync_to_async(_guardar_perfil)(request, muestreador.colapsado())
+        return self._con_archivo(response, muestreador, nombre)
+
+    @staticmethod
+    def _muestreador(hilo_id):
+        return MuestreadorPilas(
+            hilo_id,
+            settings.PERFILADOR_INTERVALO_MS / 1000,
+            settings.PERFILADOR_MAX_SEG,
+        )
+
+    @classmethod
+    def _entregar(cls, request, response, muestreador):
+        if _salida_inline(request):
+            return cls._inline(response, muestreador)
+        return cls._con_archivo(response, muestreador, _guardar_perfil(request, muestreador.colapsado()))
+
+    @staticmethod
+    def _inline(response, muestreador):
+        nuevo = HttpResponse(muestreador.colapsado(), content_type="text/plain; charset=utf-8")
+        nuevo["X-Perfil-Muestras"] = str(muestreador.muestras)
+        nuevo["X-Perfil-Status"] = str(response.status_code)
+        return nuevo
+
+    @staticmethod
+    def _con_archivo(response, muestreador, nombre):
+        response["X-Perfil"] = nombre
+        response["X-Perfil-Muestras"] = str(muestreador.muestras)
+        return response
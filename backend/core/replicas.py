@@ -0,0 +1,145 @@
+"""
+Lecturas en réplicas de PostgreSQL (DB_REPLICAS en settings).
+
+Solo las vistas que lo declaran leen de una réplica:
+
+- viewsets: LecturaReplicaMixin, para las acciones de acciones_replica
+  (por defecto list y retrieve)
+- vistas de función: @lectura_en_replica, debajo de @api_view
+- vistas async: @api_async(replica=True)
+
+Cada request elige una réplica al azar y la usa para todas sus lecturas
+(ReplicaRouter en core/routers.py). La autenticación ocurre antes y siempre lee de
+la base principal; las escrituras también van siempre a la principal.
+
+Lectura de lo propio: después de un POST/PUT/PATCH/DELETE de un usuario,
+ReplicaMiddleware lo anota en la cache por REPLICA_LECTURA_PROPIA_SEG y durante ese
+tiempo sus lecturas van a la principal, así no ve datos anteriores a su cambio
+por el retraso de la replicación. Con varios workers la cache debe ser compartida
+(Redis); con LocMem la marca solo vale en el proceso que atendió la escritura.
+"""
+import random
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+from core.metricas import LECTURAS
+
+# Alias de la réplica que usa el request en curso (None: base principal)
+_replica = ContextVar("replica", default=None)
+
+
+def replica_actual():
+    return _replica.get()
+
+
+def _clave(usuario_id):
+    return f"replica:escritura:{usuario_id}"
+
+
+def _usuario_id(usuario):
+    return usuario.pk if usuario is not None and usuario.is_authenticated else None
+
+
+def _aplica(request):
+    return bool(settings.REPLICAS) and request.method in SAFE_METHODS
+
+
+def _elegir(escribio):
+    if escribio:
+        LECTURAS.labels("principal_escritura_reciente").inc()
+        return None
+    LECTURAS.labels("replica").inc()
+    return random.choice(settings.REPLICAS)
+
+
+def elegir_replica(request):
+    """Alias de réplica para este request, o None si debe leer de la principal"""
+    if not _aplica(request):
+        return None
+    usuario_id = _usuario_id(getattr(request, "user", None))
+    return _elegir(usuario_id is not None and cache.get(_clave(usuario_id)) is not None)
+
+
+async def aelegir_replica(request, usuario):
+    if not _aplica(request):
+        return None
+    usuario_id = _usuario_id(usuario)
+    return _elegir(usuario_id is not None and await cache.aget(_clave(usuario_id)) is not None)
+
+
+@contextmanager
+def usar_replica(alias):
+    token = _replica.set(alias)
+    try:
+        yield alias
+    finally:
+        _replica.reset(token)
+
+
+def marcar_escritura(usuario):
+    """Las lecturas de este usuario van a la principal por REPLICA_LECTURA_PROPIA_SEG"""
+    usuario_id = _usuario_id(usuario)
+    if settings.REPLICAS and usuario_id is not None:
+        cache.set(_clave(usuario_id), 1, settings.REPLICA_LECTURA_PROPIA_SEG)
+
+
+class LecturaReplicaMixin:
+    """Viewset cuyas acciones de acciones_replica leen de una réplica"""
+
+    acciones_replica = ("list", "retrieve")
+
+    def dispatch(self, request, *args, **kwargs):
+        self._lectura = ExitStack()
+        with self._lectura:
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        # Autenticación, permisos y throttling en la principal; recién después la réplica
+        super().initial(request, *args, **kwargs)
+        if self.action in self.acciones_replica:
+            self._lectura.enter_context(usar_replica(elegir_replica(request)))
+
+
+def lectura_en_replica(vista):
+    """Para vistas @api_view de solo lectura (va debajo de @api_view y @permission_classes)"""
+
+    @wraps(vista)
+    def _wrapped_view(request, *args, **kwargs):
+        with usar_replica(elegir_replica(request)):
+            return vista(request, *args, **kwargs)
+
+    return _wrapped_view
+
+
+class ReplicaMiddleware:
+    """Anota las escrituras de cada usuario para la lectura de lo propio"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.es_async = iscoroutinefunction(get_response)
+        if self.es_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.es_async:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if settings.REPLICAS and request.method not in SAFE_METHODS:
+            marcar_escritura(getattr(request, "user", None))
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if settings.REPLICAS and request.method not in SAFE_METHODS:
+            # request.user puede ser perezoso (sesión): se evalúa fuera del event loop
+            await sync_to_async(marcar_escritura)(getattr(request, "user", None))
+        return response
@@ -0,0 +1,94 @@
+"""
+Routers de base de datos (settings.DATABASE_ROUTERS).
+
+AuditoriaRouter manda la bitácora a su propia base cuando existe el alias
+"audit" en DATABASES (variables AUDIT_DB_*). Así los INSERT de auditoría no
+compiten con usuarios y conductores por el WAL, los locks y las conexiones de
+la base principal, y quedan fuera de la transacción de quien los registra: si
+esa transacción se revierte, el registro de auditoría permanece.
+
+Sin el alias el router no opina y todo queda en "default", como siempre.
+
+ReplicaRouter manda las lecturas a la réplica elegida para el request en curso
+(settings.REPLICAS, ver core/replicas.py); fuera de esas vistas, y para toda
+escritura, se usa la principal. Dentro de una transacción abierta en la principal
+también se lee de ella: la réplica no ve lo que esa transacción escribió y aún no
+confirmó. Va después de AuditoriaRouter: la bitácora en su propia base no tiene
+réplicas.
+"""
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.replicas import replica_actual
+
+AUDITORIA = "audit"
+
+# Apps cuyas tablas viven en la base de auditoría
+APPS_AUDITORIA = {"bitacora"}
+
+
+def auditoria_separada():
+    return AUDITORIA in settings.DATABASES
+
+
+class AuditoriaRouter:
+    def _base(self, model, **hints):
+        if not auditoria_separada():
+            return None
+        if model._meta.app_label in APPS_AUDITORIA:
+            return AUDITORIA
+        instancia = hints.get("instance")
+        if instancia is not None and instancia._state.db == AUDITORIA:
+            # registro.usuario: sin este caso Django buscaría al usuario en la
+            # base del registro, donde no está
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def db_for_read(self, model, **hints):
+        return self._base(model, **hints)
+
+    def db_for_write(self, model, **hints):
+        return self._base(model, **hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if not auditoria_separada():
+            return None
+        if {obj1._meta.app_label, obj2._meta.app_label} & APPS_AUDITORIA:
+            # La FK bitacora.usuario cruza bases (no tiene constraint)
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if not auditoria_separada():
+            return None
+        if app_label in APPS_AUDITORIA:
+            return db == AUDITORIA
+        if db == AUDITORIA:
+            return False
+        return None
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        alias = replica_actual()
+        if alias is not None and connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        instancia = hints.get("instance")
+        if instancia is not None and instancia._state.db in settings.REPLICAS:
+            # Un objeto leído de la réplica se guarda en la principal
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        principal = {DEFAULT_DB_ALIAS, *settings.REPLICAS}
+        if obj1._state.db in principal and obj2._state.db in principal:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.REPLICAS:
+            return False
+        return None
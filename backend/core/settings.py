@@ -11,8 +11,10 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
 from pathlib import Path
+import copy
 import os
 from datetime import timedelta
+from urllib.parse import urlsplit
 from dotenv import load_dotenv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -142,6 +144,9 @@ INSTALLED_APPS = [
     # "dj_rest_auth.jwt_auth",
     "rest_framework_simplejwt.token_blacklist",
     "bitacora",
+    "notificaciones",
+    "viajes",
+    "reservas",
 ]
 
 AUTH_USER_MODEL = "users.CustomUser"
@@ -150,15 +155,26 @@ SITE_ID = 1  # importante para allauth
 
 
 MIDDLEWARE = [
+    # Primero: comprime la respuesta cuando el resto ya terminó con ella (ver core/compresion.py)
+    "core.compresion.CompresionMiddleware",
+    # Consultas SQL por request, muestreadas (ver core/instrumentacion_sql.py)
+    "core.instrumentacion_sql.InstrumentacionSQLMiddleware",
+    # Contadores para /metrics (ver core/metricas.py)
+    "core.metricas.MetricasMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    # Perfilado por muestreo de requests puntuales, a pedido (ver core/perfilador.py).
+    # Después de AuthenticationMiddleware, para reconocer al superusuario de la sesión
+    "core.perfilador.PerfiladorMiddleware",
     "allauth.account.middleware.AccountMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # Anota las escrituras de cada usuario: sus lecturas no van a una réplica por un rato
+    "core.replicas.ReplicaMiddleware",
 ]
 
 ROOT_URLCONF = "core.urls"
@@ -187,20 +203,130 @@ AUTHENTICATION_BACKENDS = [
 
 WSGI_APPLICATION = "core.wsgi.application"
 
+# Vistas async nativas para las lecturas más usadas (solo tiene sentido bajo ASGI;
+# start.sh lo activa en SERVER_MODE=asgi). Con WSGI se usan las vistas sync de DRF.
+ASYNC_VIEWS = os.getenv("DJANGO_ASYNC_VIEWS", "0") == "1"
+
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
-DATABASES = {
-    "default": {
+# ========== CONFIGURACIÓN DE CONEXIONES A LA BASE DE DATOS ==========
+def get_database_config():
+    """
+    Configura la conexión a PostgreSQL a partir de variables de entorno:
+    - DB_CONN_MAX_AGE: segundos que se reutiliza una conexión (0 = una por request)
+    - DB_CONN_HEALTH_CHECKS: verifica la conexión persistente antes de reutilizarla
+    - DB_POOL_MODE:
+        * "none" (por defecto): solo conexiones persistentes
+        * "pgbouncer": PgBouncer en modo transaction pooling (sin cursores del lado del servidor)
+        * "psycopg": pool de psycopg 3 dentro del proceso (requiere Django >= 5.1 y psycopg[pool])
+    """
+    config = {
         "ENGINE": "django.db.backends.postgresql",
         "NAME": os.getenv("POSTGRES_DB", "transporte"),
         "USER": os.getenv("POSTGRES_USER", "postgres"),
         "PASSWORD": os.getenv("POSTGRES_PASSWORD", "postgres"),
         "HOST": os.getenv("POSTGRES_HOST", "127.0.0.1"),
         "PORT": os.getenv("POSTGRES_PORT", "5432"),
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": os.getenv("DB_CONN_HEALTH_CHECKS", "True") == "True",
+        "OPTIONS": {
+            "connect_timeout": int(os.getenv("DB_CONNECT_TIMEOUT", "5")),
+        },
     }
+
+    pool_mode = os.getenv("DB_POOL_MODE", "none").strip().lower()
+
+    if pool_mode == "pgbouncer":
+        # En transaction pooling cada transacción puede ir a un backend distinto,
+        # por lo que los cursores con nombre (server-side) dejarían de existir.
+        config["DISABLE_SERVER_SIDE_CURSORS"] = True
+        print("🔁 [Django] Base de datos detrás de PgBouncer (transaction pooling)")
+    elif pool_mode == "psycopg":
+        import django
+
+        try:
+            import psycopg_pool  # noqa: F401
+            pool_disponible = django.VERSION >= (5, 1)
+        except ImportError:
+            pool_disponible = False
+
+        if pool_disponible:
+            # El pool reemplaza a las conexiones persistentes de Django
+            config["CONN_MAX_AGE"] = 0
+            config["OPTIONS"]["pool"] = {
+                "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+                "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+                "timeout": int(os.getenv("DB_POOL_TIMEOUT", "10")),
+            }
+            print(f"🏊 [Django] Pool de conexiones psycopg: {config['OPTIONS']['pool']}")
+        else:
+            print("⚠️ [Django] DB_POOL_MODE=psycopg requiere Django >= 5.1 y psycopg[pool]; "
+                  "se usan conexiones persistentes")
+
+    print(f"🗄️ [Django] Conexiones a BD: CONN_MAX_AGE={config['CONN_MAX_AGE']}, "
+          f"health checks={config['CONN_HEALTH_CHECKS']}, pool={pool_mode}")
+    return config
+
+DATABASES = {
+    "default": get_database_config()
 }
 
+# ========== BASE DE AUDITORÍA (OPCIONAL) ==========
+def get_audit_database_config():
+    """
+    Con AUDIT_DB_NAME la bitácora va a su propia base, alias "audit" (ver core/routers.py).
+    - AUDIT_DB_HOST / AUDIT_DB_PORT / AUDIT_DB_USER / AUDIT_DB_PASSWORD: por defecto los de
+      la base principal (otra base en el mismo servidor)
+    - AUDIT_DB_ENGINE=sqlite3: AUDIT_DB_NAME es la ruta de un archivo SQLite (pruebas locales)
+    """
+    nombre = os.getenv("AUDIT_DB_NAME", "").strip()
+    if not nombre:
+        return None
+    if os.getenv("AUDIT_DB_ENGINE", "postgresql").strip().lower() == "sqlite3":
+        config = {"ENGINE": "django.db.backends.sqlite3", "NAME": nombre}
+    else:
+        config = copy.deepcopy(DATABASES["default"])
+        config["NAME"] = nombre
+        for clave in ("HOST", "PORT", "USER", "PASSWORD"):
+            config[clave] = os.getenv(f"AUDIT_DB_{clave}") or config[clave]
+    print(f"📒 [Django] Bitácora en base separada: {config['ENGINE'].rsplit('.', 1)[-1]} {nombre}")
+    return config
+
+audit_database = get_audit_database_config()
+if audit_database is not None:
+    DATABASES["audit"] = audit_database
+
+# ========== RÉPLICAS DE LECTURA (OPCIONAL) ==========
+def get_replicas_config():
+    """
+    DB_REPLICAS: réplicas separadas por coma, cada una "host[:puerto][/base]"; lo que no
+    se indica se toma de la base principal. Por ejemplo, para probar en local con otra
+    base del mismo servidor: DB_REPLICAS=127.0.0.1:5432/transporte_replica
+    Se registran como replica_1, replica_2... (ver core/replicas.py)
+    """
+    replicas = {}
+    for i, entrada in enumerate(filter(None, (e.strip() for e in os.getenv("DB_REPLICAS", "").split(","))), 1):
+        direccion, _, nombre = entrada.partition("/")
+        host, _, puerto = direccion.partition(":")
+        config = copy.deepcopy(DATABASES["default"])
+        config["HOST"] = host or config["HOST"]
+        config["PORT"] = puerto or config["PORT"]
+        config["NAME"] = nombre or config["NAME"]
+        # En los tests la réplica es la misma base de prueba que "default"
+        config["TEST"] = {"MIRROR": "default"}
+        replicas[f"replica_{i}"] = config
+    for alias, config in replicas.items():
+        print(f"📚 [Django] Réplica de lectura {alias}: {config['HOST']}:{config['PORT']}/{config['NAME']}")
+    return replicas
+
+DATABASES.update(get_replicas_config())
+REPLICAS = [alias for alias in DATABASES if alias.startswith("replica_")]
+# Tras una escritura, las lecturas del usuario van a la principal durante este tiempo
+REPLICA_LECTURA_PROPIA_SEG = int(os.getenv("REPLICA_LECTURA_PROPIA_SEG", "10"))
+
+DATABASE_ROUTERS = ["core.routers.AuditoriaRouter", "core.routers.ReplicaRouter"]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -310,8 +436,42 @@ EMAIL_HOST = os.getenv("EMAIL_HOST", "mailhog")
 EMAIL_PORT = int(os.getenv("EMAIL_PORT", "1025"))
 EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "False") == "True"
 EMAIL_USE_SSL = os.getenv("EMAIL_USE_SSL", "False") == "True"
+# Sin timeout, un servidor SMTP colgado dejaría al worker esperando para siempre
+EMAIL_TIMEOUT = int(os.getenv("EMAIL_TIMEOUT", "30"))
 DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "no-reply@localhost")
 
+# ====== COLA DE EMAILS (OUTBOX) ======
+# Los requests encolan y el worker (manage.py procesar_emails) envía por lotes.
+# EMAIL_OUTBOX=False envía en el mismo request (desarrollo sin worker)
+EMAIL_OUTBOX = os.getenv("EMAIL_OUTBOX", "True") == "True"
+EMAIL_OUTBOX_LOTE = int(os.getenv("EMAIL_OUTBOX_LOTE", "50"))
+EMAIL_OUTBOX_INTERVALO_SEG = float(os.getenv("EMAIL_OUTBOX_INTERVALO_SEG", "1"))
+EMAIL_OUTBOX_MAX_INTENTOS = int(os.getenv("EMAIL_OUTBOX_MAX_INTENTOS", "5"))
+EMAIL_OUTBOX_BACKOFF_SEG = int(os.getenv("EMAIL_OUTBOX_BACKOFF_SEG", "30"))
+# Vida del reclamo de un lote: pasado este tiempo sin resultado, otro worker lo retoma.
+# Debe superar lo que tarda un lote completo (ver EMAIL_TIMEOUT)
+EMAIL_OUTBOX_ARRIENDO_SEG = int(os.getenv("EMAIL_OUTBOX_ARRIENDO_SEG", "300"))
+
+# ====== VENCIMIENTO DE LICENCIAS ======
+# manage.py actualizar_licencias, una vez por día (ver conductores/licencias.py)
+LICENCIA_DIAS_AVISO = int(os.getenv("LICENCIA_DIAS_AVISO", "30"))
+LICENCIAS_LOTE = int(os.getenv("LICENCIAS_LOTE", "1000"))
+# Conductores que lista cada sección del resumen por email (el total va aparte)
+LICENCIAS_RESUMEN_MAX = int(os.getenv("LICENCIAS_RESUMEN_MAX", "50"))
+
+# ====== DESPACHO DE VIAJES ======
+# Radio máximo entre el conductor y el origen del viaje (ver viajes/despacho.py)
+VIAJES_RADIO_KM = float(os.getenv("VIAJES_RADIO_KM", "10"))
+# Un conductor sin reportar ubicación en este tiempo no recibe viajes
+VIAJES_UBICACION_MAX_MIN = int(os.getenv("VIAJES_UBICACION_MAX_MIN", "10"))
+
+# ====== RESERVAS DE ASIENTOS ======
+# Minutos que dura una retención sin confirmar (ver reservas/inventario.py)
+RESERVAS_RETENCION_MIN = int(os.getenv("RESERVAS_RETENCION_MIN", "10"))
+RESERVAS_MAX_ASIENTOS = int(os.getenv("RESERVAS_MAX_ASIENTOS", "10"))
+# Retenciones vencidas por transacción en manage.py liberar_reservas
+RESERVAS_LOTE = int(os.getenv("RESERVAS_LOTE", "500"))
+
 # ====== DRF + JWT ======
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
@@ -321,10 +481,33 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    # JSON con orjson (si no está instalado, json estándar); ver core/json_api.py
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.json_api.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.json_api.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     # --- NUEVO ---
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,  # registros por página
+    # Límites de los endpoints públicos de autenticación (ver users/throttling.py)
+    "DEFAULT_THROTTLE_RATES": {
+        "login_ip": os.getenv("THROTTLE_LOGIN_IP", "20/min"),
+        "login_usuario": os.getenv("THROTTLE_LOGIN_USUARIO", "5/min"),
+        "verificacion_ip": os.getenv("THROTTLE_VERIFICACION_IP", "20/min"),
+        "verificacion_usuario": os.getenv("THROTTLE_VERIFICACION_USUARIO", "5/min"),
+        "reenvio_codigo": os.getenv("THROTTLE_REENVIO_CODIGO", "3/min"),
+        "google_ip": os.getenv("THROTTLE_GOOGLE_IP", "20/min"),
+    },
 }
+# Proxies propios delante de Django (nginx, balanceador). Los límites por IP toman la
+# entrada de X-Forwarded-For que agregó el más lejano; con 0 usan REMOTE_ADDR y el
+# encabezado se ignora (lo escribe el cliente y rotarlo evadiría los límites)
+THROTTLE_PROXIES_CONFIABLES = int(os.getenv("THROTTLE_PROXIES_CONFIABLES", "0"))
 # REST_USE_JWT = True
 
 REST_AUTH = {
@@ -341,6 +524,9 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
+    # Blacklist de JTI revocados en la cache compartida (ver users/tokens.py)
+    "TOKEN_REFRESH_SERIALIZER": "users.tokens.TokenRefreshSerializer",
+    "TOKEN_VERIFY_SERIALIZER": "users.tokens.TokenVerifySerializer",
 }
 
 # ====== GOOGLE OAUTH CONFIGURATION ======
@@ -358,13 +544,29 @@ SOCIALACCOUNT_PROVIDERS = {
 }
 
 # ====== CACHE CONFIGURATION ======
-# Configuración para verificación móvil
-CACHES = {
-    "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-        "LOCATION": "unique-snowflake",
+# Códigos de verificación y contadores de throttling. Con varios workers de gunicorn
+# la cache tiene que ser compartida (Redis); LocMem es por proceso y solo sirve en desarrollo
+REDIS_URL = os.getenv("REDIS_URL", "")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": "transporte",
+        }
     }
-}
+    # Sin la contraseña de la URL (redis://:clave@host) en el log
+    _redis = urlsplit(REDIS_URL)
+    _redis_log = _redis._replace(netloc=f"***@{_redis.hostname}:{_redis.port or 6379}") if _redis.password else _redis
+    print(f"🧠 [Django] Cache compartida en Redis: {_redis_log.geturl()}")
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "unique-snowflake",
+        }
+    }
+    print("🧠 [Django] Cache local en memoria (LocMem, no compartida entre workers)")
 
 # ====== EMAIL BACKENDS ======
 # Backend de email personalizado para verificación móvil
@@ -373,6 +575,95 @@ EMAIL_BACKENDS = {
     "mobile_verification": "django.core.mail.backends.console.EmailBackend",  # Para testing
 }
 
+# ====== AUTOCOMPLETADO ======
+# Índice de prefijos en memoria por proceso (ver core/autocompletar.py): aplica los cambios
+# fila por fila (anotados en la cache) y se reconstruye completo cada AUTOCOMPLETAR_TTL_SEG
+AUTOCOMPLETAR_TTL_SEG = int(os.getenv("AUTOCOMPLETAR_TTL_SEG", "300"))
+AUTOCOMPLETAR_CACHE_NAVEGADOR_SEG = int(os.getenv("AUTOCOMPLETAR_CACHE_NAVEGADOR_SEG", "30"))
+
+# ====== COMPRESIÓN DE RESPUESTAS ======
+# br y zstd solo si están instalados los paquetes brotli / zstandard; gzip siempre
+COMPRESION_HABILITADA = os.getenv("COMPRESION_HABILITADA", "1") == "1"
+COMPRESION_ALGORITMOS = [
+    a.strip() for a in os.getenv("COMPRESION_ALGORITMOS", "br,zstd,gzip").split(",") if a.strip()
+]
+COMPRESION_MIN_BYTES = int(os.getenv("COMPRESION_MIN_BYTES", "1024"))
+COMPRESION_NIVEL_GZIP = int(os.getenv("COMPRESION_NIVEL_GZIP", "6"))
+COMPRESION_NIVEL_BROTLI = int(os.getenv("COMPRESION_NIVEL_BROTLI", "4"))
+COMPRESION_NIVEL_ZSTD = int(os.getenv("COMPRESION_NIVEL_ZSTD", "3"))
+
+# ====== INSTRUMENTACIÓN SQL ======
+# Fracción de requests instrumentados (0 = ninguno, 1 = todos)
+SQL_MUESTREO = float(os.getenv("SQL_MUESTREO", "1" if DEBUG else "0.05"))
+# Encabezado Server-Timing en los requests muestreados (expone tiempos: por defecto solo en DEBUG)
+SQL_SERVER_TIMING = os.getenv("SQL_SERVER_TIMING", "1" if DEBUG else "0") == "1"
+# Umbrales para loguear el request como WARNING con su SQL
+SQL_UMBRAL_CONSULTAS = int(os.getenv("SQL_UMBRAL_CONSULTAS", "30"))
+SQL_UMBRAL_MS = float(os.getenv("SQL_UMBRAL_MS", "200"))
+SQL_UMBRAL_CONSULTA_MS = float(os.getenv("SQL_UMBRAL_CONSULTA_MS", "100"))
+
+# ====== MÉTRICAS (PROMETHEUS) ======
+METRICAS_HABILITADAS = os.getenv("METRICAS_HABILITADAS", "1") == "1"
+# GET /metrics exige "Authorization: Bearer <METRICS_TOKEN>"; sin token definido responde 403
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+# Un conductor cuenta como "reportando" si envió ubicación en esta ventana
+METRICAS_VENTANA_UBICACION_SEG = int(os.getenv("METRICAS_VENTANA_UBICACION_SEG", "300"))
+
+# ====== PERFILADOR POR REQUEST ======
+PERFILADOR_HABILITADO = os.getenv("PERFILADOR_HABILITADO", "1") == "1"
+PERFILADOR_DIR = os.getenv("PERFILADOR_DIR", "/tmp/perfiles")
+PERFILADOR_INTERVALO_MS = float(os.getenv("PERFILADOR_INTERVALO_MS", "5"))
+PERFILADOR_MAX_SEG = float(os.getenv("PERFILADOR_MAX_SEG", "30"))
+# Requests perfilados a la vez por proceso; los demás se atienden sin perfilar
+PERFILADOR_MAX_CONCURRENTES = int(os.getenv("PERFILADOR_MAX_CONCURRENTES", "1"))
+# Vigencia del token de X-Perfilar (manage.py token_perfilador)
+PERFILADOR_TOKEN_SEG = int(os.getenv("PERFILADOR_TOKEN_SEG", "600"))
+
+# ====== CATÁLOGO DE PERMISOS ======
+# Identificador del deploy (p. ej. el sha de git); cambia el ETag del catálogo en cada deploy
+DEPLOY_ID = os.getenv("DEPLOY_ID", "")
+# Tiempo que el navegador reutiliza el catálogo sin volver a pedirlo
+PERMISOS_CACHE_SEG = int(os.getenv("PERMISOS_CACHE_SEG", "86400"))
+
+# ====== LIVE-TAIL DE BITÁCORA (SSE, solo ASGI) ======
+# Cada cuánto el lector de cada proceso busca registros nuevos (uno para todos los clientes)
+BITACORA_STREAM_INTERVALO_SEG = float(os.getenv("BITACORA_STREAM_INTERVALO_SEG", "1"))
+BITACORA_STREAM_HEARTBEAT_SEG = float(os.getenv("BITACORA_STREAM_HEARTBEAT_SEG", "15"))
+BITACORA_STREAM_RETRY_MS = int(os.getenv("BITACORA_STREAM_RETRY_MS", "3000"))
+# Registros reenviados como máximo al reconectar con Last-Event-ID
+BITACORA_STREAM_REPLAY_MAX = int(os.getenv("BITACORA_STREAM_REPLAY_MAX", "500"))
+# Clientes por proceso y eventos en cola por cliente (si se llena, se corta y reconecta)
+BITACORA_STREAM_MAX_CONEXIONES = int(os.getenv("BITACORA_STREAM_MAX_CONEXIONES", "200"))
+BITACORA_STREAM_COLA_MAX = int(os.getenv("BITACORA_STREAM_COLA_MAX", "1000"))
+# Tiempo que se vuelve a buscar un id faltante (transacción aún sin confirmar)
+BITACORA_STREAM_HUECO_SEG = float(os.getenv("BITACORA_STREAM_HUECO_SEG", "10"))
+BITACORA_STREAM_TICKET_SEG = int(os.getenv("BITACORA_STREAM_TICKET_SEG", "60"))
+
+# ====== ARCHIVO PARQUET DE BITÁCORA ======
+# Destino de manage.py archivar_bitacora (particionado por mes y módulo)
+BITACORA_ARCHIVO_DIR = os.getenv("BITACORA_ARCHIVO_DIR") or str(BASE_DIR / "archivo_bitacora")
+# Las agregaciones se cachean hasta que cambie el archivo o venza este tiempo
+BITACORA_ANALITICA_CACHE_SEG = int(os.getenv("BITACORA_ANALITICA_CACHE_SEG", "3600"))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "simple": {"format": "%(asctime)s %(levelname)s %(name)s %(message)s"},
+    },
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "formatter": "simple"},
+    },
+    "loggers": {
+        # Una línea JSON por request muestreado (INFO) o por request que supera los umbrales (WARNING)
+        "transporte.sql": {
+            "handlers": ["console"],
+            "level": os.getenv("SQL_LOG_NIVEL", "WARNING"),
+            "propagate": False,
+        },
+    },
+}
+
 # Configuración de Google OAuth
 GOOGLE_OAUTH2_CLIENT_ID = os.getenv("GOOGLE_OAUTH2_CLIENT_ID", "")
 GOOGLE_OAUTH2_CLIENT_SECRET = os.getenv("GOOGLE_OAUTH2_CLIENT_SECRET", "")
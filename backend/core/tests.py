@@ -0,0 +1,753 @@
+import asyncio
+import gzip
+import io
+import json
+import os
+import tempfile
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from conductores.models import Conductor
+from personal.models import Personal
+from users.models import Rol
+from users.tokens import RefreshToken
+
+from . import autocompletar, perfilador, replicas
+from .autocompletar import IndicePrefijos, normalizar
+from .compresion import CompresionMiddleware, elegir_codificacion
+from .instrumentacion_sql import RegistroSQL
+from .perfilador import generar_token
+from .routers import ReplicaRouter
+from .json_api import ORJSONParser, ORJSONRenderer
+
+User = get_user_model()
+
+
+class IndicePrefijosTest(TestCase):
+    """Índice de prefijos en memoria"""
+
+    def setUp(self):
+        filas = [
+            {"id": 1, "nombre": "José", "apellido": "Núñez"},
+            {"id": 2, "nombre": "Josefina", "apellido": "Pérez"},
+            {"id": 3, "nombre": "Juan", "apellido": "José Pérez"},
+        ]
+        self.indice = IndicePrefijos(filas, ("nombre", "apellido"), lambda f: f"{f['nombre']} {f['apellido']}")
+
+    def test_normalizar(self):
+        self.assertEqual(normalizar("Ñandú PÉREZ"), "nandu perez")
+
+    def test_prefijo_sin_tildes_y_sin_duplicados(self):
+        self.assertEqual([r["id"] for r in self.indice.buscar("jo", 10)], [1, 3, 2])
+        self.assertEqual([r["id"] for r in self.indice.buscar("NU", 10)], [1])
+
+    def test_varios_terminos(self):
+        self.assertEqual([r["id"] for r in self.indice.buscar("jo pe", 10)], [3, 2])
+        self.assertEqual(self.indice.buscar("jo pe", 1), [{"id": 3, "label": "Juan José Pérez"}])
+
+
+class AutocompletarAPITest(APITestCase):
+    """GET /api/autocompletar/"""
+
+    def setUp(self):
+        cache.clear()
+        # Los índices son por proceso: no deben arrastrar filas de otros tests
+        for entrada in autocompletar._entradas.values():
+            entrada.indice = None
+        self.admin = User.objects.create_user(username="admin", password="admin123", is_superuser=True)
+        self.client.force_authenticate(self.admin)
+        self.conductor = Conductor.objects.create(
+            nombre="Raúl", apellido="Chávez", email="raul@test.com", ci="123",
+            nro_licencia="LIC1", tipo_licencia="B", fecha_venc_licencia=date.today() + timedelta(days=30),
+        )
+
+    def test_id_label(self):
+        response = self.client.get("/api/autocompletar/", {"recurso": "conductores", "q": "ch"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{"id": self.conductor.id, "label": "Raúl Chávez · 123"}])
+        self.assertIn("max-age", response["Cache-Control"])
+
+    def test_cambios_invalidan_el_indice(self):
+        self.client.get("/api/autocompletar/", {"recurso": "conductores", "q": "ra"})
+        self.conductor.nombre = "Ramiro"
+        self.conductor.save()
+        response = self.client.get("/api/autocompletar/", {"recurso": "conductores", "q": "rami"})
+        self.assertEqual(len(response.json()), 1)
+
+    def test_guardar_solo_last_login_no_invalida(self):
+        version = autocompletar.version_actual("usuarios")
+        self.admin.save(update_fields=["last_login"])
+        self.assertEqual(autocompletar.version_actual("usuarios"), version)
+
+        # Guardar todo sin tocar los campos del label tampoco
+        conductor = Conductor.objects.get(pk=self.conductor.pk)
+        version = autocompletar.version_actual("conductores")
+        conductor.telefono = "70000001"
+        conductor.save()
+        self.assertEqual(autocompletar.version_actual("conductores"), version)
+
+    def test_cambios_incrementales_sin_reconstruir(self):
+        def buscar(q):
+            return self.client.get("/api/autocompletar/", {"recurso": "conductores", "q": q}).json()
+
+        buscar("ra")
+        nuevo = Conductor.objects.create(
+            nombre="Rosa", apellido="Chávez", email="rosa@test.com", ci="456",
+            nro_licencia="LIC2", tipo_licencia="B", fecha_venc_licencia=date.today() + timedelta(days=30),
+        )
+        self.conductor.apellido = "Vaca"
+        self.conductor.save()
+        with mock.patch.object(autocompletar, "_construir") as construir:
+            self.assertEqual([r["id"] for r in buscar("chav")], [nuevo.id])
+            self.assertEqual(buscar("raul vac"), [{"id": self.conductor.id, "label": "Raúl Vaca · 123"}])
+            nuevo.delete()
+            self.assertEqual(buscar("rosa"), [])
+        construir.assert_not_called()
+
+        # Sin la anotación de un cambio (venció) se reconstruye completo
+        autocompletar.invalidar("conductores")
+        self.assertEqual(len(buscar("raul")), 1)
+        self.assertEqual(len(autocompletar._entradas["conductores"].indice), 1)
+
+    def test_reconstruccion_coalescida(self):
+        self.client.get("/api/autocompletar/", {"recurso": "usuarios", "q": "ad"})
+        with mock.patch.object(autocompletar, "_construir") as construir:
+            for _ in range(5):
+                self.client.get("/api/autocompletar/", {"recurso": "usuarios", "q": "ad"})
+        construir.assert_not_called()
+
+    def test_permisos_y_recurso(self):
+        cliente = User.objects.create_user(username="cliente", password="cliente123")
+        self.client.force_authenticate(cliente)
+        response = self.client.get("/api/autocompletar/", {"recurso": "usuarios", "q": "ad"})
+        self.assertEqual(response.status_code, 403)
+        response = self.client.get("/api/autocompletar/", {"recurso": "viajes", "q": "ad"})
+        self.assertEqual(response.status_code, 400)
+
+
+class JSONApiTest(SimpleTestCase):
+    """Renderer/parser orjson: misma salida que el JSONRenderer de DRF"""
+
+    datos = {
+        "id": 7,
+        "lat": Decimal("-17.7833333"),
+        "fecha": date(2025, 3, 1),
+        "creado": datetime(2025, 3, 1, 12, 30, 5, 120000),
+        "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "duracion": timedelta(minutes=90),
+        "texto": gettext_lazy("Conductor"),
+        "separador": "a\u2028b",
+        "lista": (1, 2.5, None, True),
+        3: "clave entera",
+    }
+
+    def test_misma_salida_que_drf(self):
+        self.assertEqual(ORJSONRenderer().render(self.datos), JSONRenderer().render(self.datos))
+
+    def test_sin_orjson_usa_json_estandar(self):
+        with mock.patch("core.json_api.orjson", None):
+            self.assertEqual(ORJSONRenderer().render(self.datos), JSONRenderer().render(self.datos))
+            self.assertEqual(ORJSONParser().parse(io.BytesIO(b'{"a": [1]}')), {"a": [1]})
+
+    def test_indentacion_y_entero_grande(self):
+        renderer = ORJSONRenderer()
+        self.assertIn(b"\n    ", renderer.render({"a": 1}, "application/json; indent=4"))
+        self.assertEqual(renderer.render({"n": 2 ** 70}), b'{"n":1180591620717411303424}')
+
+    def test_parser(self):
+        parser = ORJSONParser()
+        self.assertEqual(parser.parse(io.BytesIO('{"nombre": "Núñez"}'.encode())), {"nombre": "Núñez"})
+        with self.assertRaises(ParseError):
+            parser.parse(io.BytesIO(b"{no es json"))
+
+
+@override_settings(COMPRESION_HABILITADA=True, COMPRESION_ALGORITMOS=["br", "zstd", "gzip"], COMPRESION_MIN_BYTES=200)
+class CompresionMiddlewareTest(SimpleTestCase):
+    """Compresión negociada con Accept-Encoding (core/compresion.py)"""
+
+    cuerpo = b'{"results": [' + b",".join(b'{"id": %d, "nombre": "Conductor"}' % i for i in range(50)) + b"]}"
+
+    def procesar(self, response, accept_encoding):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompresionMiddleware(lambda r: response)(request)
+
+    def test_negociacion(self):
+        disponibles = ["br", "zstd", "gzip"]
+        self.assertEqual(elegir_codificacion("gzip, deflate, br", disponibles), "br")
+        self.assertEqual(elegir_codificacion("gzip;q=1, br;q=0.5", disponibles), "gzip")
+        self.assertEqual(elegir_codificacion("br;q=0, *", disponibles), "zstd")
+        self.assertIsNone(elegir_codificacion("identity", disponibles))
+        self.assertIsNone(elegir_codificacion("", disponibles))
+
+    def test_gzip_con_umbral(self):
+        response = self.procesar(HttpResponse(self.cuerpo, content_type="application/json"), "gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), self.cuerpo)
+        self.assertEqual(response["Content-Length"], str(len(response.content)))
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+        chica = self.procesar(HttpResponse(b'{"ok": true}', content_type="application/json"), "gzip")
+        self.assertFalse(chica.has_header("Content-Encoding"))
+
+    def test_gzip_con_relleno_aleatorio(self):
+        """Mitigación de BREACH de GZipMiddleware: el largo cambia en cada respuesta"""
+        largos = set()
+        for _ in range(20):
+            response = self.procesar(HttpResponse(self.cuerpo, content_type="application/json"), "gzip")
+            self.assertEqual(response.content[3] & 0x08, 0x08)  # FNAME
+            self.assertEqual(gzip.decompress(response.content), self.cuerpo)
+            largos.add(len(response.content))
+        self.assertGreater(len(largos), 1)
+
+    def test_secretos_solo_con_gzip(self):
+        con_cookie = HttpResponse(self.cuerpo, content_type="application/json")
+        con_cookie.set_cookie("csrftoken", "x" * 32)
+        self.assertEqual(self.procesar(con_cookie, "br, zstd, gzip")["Content-Encoding"], "gzip")
+
+        cuerpo_jwt = b'{"access": "eyJ", "refresh": "eyJ", ' + self.cuerpo[1:]
+        con_jwt = HttpResponse(cuerpo_jwt, content_type="application/json")
+        self.assertEqual(self.procesar(con_jwt, "br, zstd, gzip")["Content-Encoding"], "gzip")
+        # Sin gzip aceptado, va sin comprimir
+        con_jwt = HttpResponse(cuerpo_jwt, content_type="application/json")
+        self.assertFalse(self.procesar(con_jwt, "br, zstd").has_header("Content-Encoding"))
+
+    def test_brotli_y_zstd(self):
+        from .compresion import brotli, zstandard
+
+        if brotli is not None:
+            response = self.procesar(HttpResponse(self.cuerpo, content_type="application/json"), "br, gzip")
+            self.assertEqual(response["Content-Encoding"], "br")
+            self.assertEqual(brotli.decompress(response.content), self.cuerpo)
+        if zstandard is not None:
+            response = self.procesar(HttpResponse(self.cuerpo, content_type="application/json"), "zstd")
+            self.assertEqual(response["Content-Encoding"], "zstd")
+            self.assertEqual(zstandard.ZstdDecompressor().decompress(response.content), self.cuerpo)
+
+    def test_no_recomprime(self):
+        imagen = self.procesar(HttpResponse(self.cuerpo, content_type="image/png"), "gzip")
+        self.assertFalse(imagen.has_header("Content-Encoding"))
+
+        ya_comprimida = HttpResponse(self.cuerpo, content_type="application/json")
+        ya_comprimida["Content-Encoding"] = "identity"
+        self.assertEqual(self.procesar(ya_comprimida, "gzip")["Content-Encoding"], "identity")
+
+    def test_streaming(self):
+        fragmentos = [self.cuerpo[i:i + 100] for i in range(0, len(self.cuerpo), 100)]
+        response = self.procesar(StreamingHttpResponse(iter(fragmentos), content_type="text/event-stream"), "gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), self.cuerpo)
+
+
+@override_settings(SQL_MUESTREO=1, SQL_SERVER_TIMING=True, SQL_UMBRAL_CONSULTAS=1000,
+                   SQL_UMBRAL_MS=10_000, SQL_UMBRAL_CONSULTA_MS=10_000)
+class InstrumentacionSQLTest(APITestCase):
+    """Consultas por request, Server-Timing y log de requests lentos (core/instrumentacion_sql.py)"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin", password="admin123", is_superuser=True)
+        self.client.force_authenticate(self.admin)
+
+    def test_server_timing_y_linea_json(self):
+        with self.assertLogs("transporte.sql", "INFO") as logs:
+            response = self.client.get("/api/conductores/estadisticas/")
+        self.assertRegex(response["Server-Timing"], r'db;dur=[0-9.]+;desc="\d+ consultas", app;dur=')
+
+        linea = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(linea["vista"], "ConductorViewSet.estadisticas")
+        self.assertGreater(linea["consultas"], 0)
+        self.assertNotIn("mas_lentas", linea)
+
+    def test_umbral_loguea_sql(self):
+        with override_settings(SQL_UMBRAL_CONSULTAS=0), self.assertLogs("transporte.sql", "WARNING") as logs:
+            self.client.get("/api/conductores/")
+        linea = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(linea["vista"], "ConductorViewSet.list")
+        self.assertIn("conductores_conductor", linea["mas_lentas"][0]["sql"])
+
+    async def test_request_async(self):
+        """Bajo ASGI las consultas corren en el hilo de sync_to_async: también se cuentan"""
+        token = str(RefreshToken.for_user(self.admin).access_token)
+        with self.assertLogs("transporte.sql", "INFO") as logs:
+            response = await self.async_client.get(
+                "/api/conductores/estadisticas/", headers={"Authorization": f"Bearer {token}"}
+            )
+        self.assertEqual(response.status_code, 200)
+        linea = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(linea["vista"], "ConductorViewSet.estadisticas")
+        self.assertGreater(linea["consultas"], 0)
+        self.assertGreater(linea["db_ms"], 0)
+
+    def test_sin_muestreo(self):
+        with override_settings(SQL_MUESTREO=0):
+            response = self.client.get("/api/conductores/")
+        self.assertFalse(response.has_header("Server-Timing"))
+
+    def test_repetidas_y_duplicadas(self):
+        registro = RegistroSQL()
+        registro.consultas = [
+            ("SELECT 1 WHERE id = %s", (1,), "default", 0.001),
+            ("SELECT 1 WHERE id = %s", (1,), "default", 0.001),
+            ("SELECT 1 WHERE id = %s", (2,), "default", 0.001),
+            ("SELECT 2", (), "default", 0.001),
+        ]
+        self.assertEqual(registro.repetidas(), [("SELECT 1 WHERE id = %s", 3)])
+        self.assertEqual(registro.duplicadas(), 1)
+
+
+@override_settings(METRICAS_HABILITADAS=True, METRICS_TOKEN="secreto")
+class MetricasTest(APITestCase):
+    """GET /metrics (core/metricas.py)"""
+
+    SCRAPE = {"Authorization": "Bearer secreto"}
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(username="admin", password="admin123", is_superuser=True)
+
+    def metricas(self):
+        response = self.client.get("/metrics", headers=self.SCRAPE)
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def valor(self, texto, linea):
+        for fila in texto.splitlines():
+            if fila.startswith(linea + " "):
+                return float(fila.rsplit(" ", 1)[1])
+        return 0.0
+
+    def test_requests_y_sql_por_vista(self):
+        antes = self.metricas()
+        self.client.force_authenticate(self.admin)
+        self.client.get("/api/conductores/estadisticas/")
+        despues = self.metricas()
+
+        linea = 'http_requests_total{metodo="GET",status="200",vista="ConductorViewSet.estadisticas"}'
+        self.assertEqual(self.valor(despues, linea) - self.valor(antes, linea), 1)
+        consultas = 'db_consultas_total{vista="ConductorViewSet.estadisticas"}'
+        self.assertGreater(self.valor(despues, consultas), self.valor(antes, consultas))
+        self.assertIn('http_request_duracion_segundos_bucket{le="0.005",metodo="GET"', despues)
+
+    async def test_sql_de_requests_async(self):
+        """Bajo ASGI también se cuentan las consultas, que corren en el hilo de sync_to_async"""
+        token = str(RefreshToken.for_user(self.admin).access_token)
+        consultas = 'db_consultas_total{vista="ConductorViewSet.estadisticas"}'
+        antes = self.valor((await self.async_client.get("/metrics", headers=self.SCRAPE)).content.decode(), consultas)
+        response = await self.async_client.get(
+            "/api/conductores/estadisticas/", headers={"Authorization": f"Bearer {token}"}
+        )
+        self.assertEqual(response.status_code, 200)
+        despues = self.valor((await self.async_client.get("/metrics", headers=self.SCRAPE)).content.decode(), consultas)
+        self.assertGreater(despues, antes)
+
+    def test_logins_y_colas(self):
+        linea = 'login_intentos_total{resultado="fallido"}'
+        antes = self.valor(self.metricas(), linea)
+        self.client.post("/api/auth/login/", {"username": "admin", "password": "otra"}, format="json")
+        texto = self.metricas()
+        self.assertEqual(self.valor(texto, linea) - antes, 1)
+        self.assertIn("email_cola_pendientes 0.0", texto)
+        self.assertIn("conductores_reportando_ubicacion 0.0", texto)
+
+    def test_token(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 401)
+        self.assertEqual(self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer otro").status_code, 401)
+        self.metricas()
+        # Sin token configurado no se expone a nadie
+        with override_settings(METRICS_TOKEN=""):
+            self.assertEqual(self.client.get("/metrics").status_code, 403)
+
+
+@override_settings(PERFILADOR_HABILITADO=True, PERFILADOR_INTERVALO_MS=1, PERFILADOR_MAX_CONCURRENTES=1)
+class PerfiladorTest(APITestCase):
+    """Perfilado a pedido de un request (core/perfilador.py)"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin", password="admin123", is_superuser=True)
+        self.usuario = User.objects.create_user(username="usuario", password="usuario123")
+
+    def test_token_firmado_devuelve_perfil_inline(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(
+            "/api/conductores/estadisticas/",
+            HTTP_X_PERFILAR=generar_token(), HTTP_X_PERFILAR_SALIDA="inline",
+        )
+        self.assertEqual(response["Content-Type"], "text/plain; charset=utf-8")
+        self.assertEqual(response["X-Perfil-Status"], "200")
+        for linea in response.content.decode().splitlines():
+            self.assertRegex(linea, r"^\S+ \d+$")
+
+    def test_parametro_solo_superusuario(self):
+        self.client.force_authenticate(self.usuario)
+        response = self.client.get("/api/conductores/", {"perfilar": "inline"})
+        self.assertEqual(response["Content-Type"], "application/json")
+
+        # El middleware corre antes que DRF: el superusuario se reconoce por su JWT
+        token = str(RefreshToken.for_user(self.admin).access_token)
+        self.client.force_authenticate(None)
+        response = self.client.get(
+            "/api/conductores/", {"perfilar": "inline"}, HTTP_AUTHORIZATION=f"Bearer {token}"
+        )
+        self.assertEqual(response["Content-Type"], "text/plain; charset=utf-8")
+
+    def test_superusuario_de_sesion(self):
+        self.client.force_login(self.admin)
+        response = self.client.get("/api/conductores/", {"perfilar": "inline"})
+        self.assertEqual(response["Content-Type"], "text/plain; charset=utf-8")
+
+    async def test_request_async_muestrea_el_hilo_de_la_vista(self):
+        """Bajo ASGI el JWT se verifica fuera del event loop y se muestrea el hilo de la vista"""
+        token = str(RefreshToken.for_user(self.admin).access_token)
+        response = await self.async_client.get(
+            "/api/conductores/estadisticas/", {"perfilar": "inline"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        self.assertEqual(response["Content-Type"], "text/plain; charset=utf-8")
+        self.assertEqual(response["X-Perfil-Status"], "200")
+        self.assertIn("rest_framework.views:dispatch", response.content.decode())
+
+    def test_token_invalido_y_cupo(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.get("/api/conductores/", HTTP_X_PERFILAR="falso:token")
+        self.assertFalse(response.has_header("X-Perfil"))
+
+        with mock.patch("core.perfilador._cupos", mock.Mock(acquire=mock.Mock(return_value=False))):
+            response = self.client.get("/api/conductores/", HTTP_X_PERFILAR=generar_token())
+        self.assertEqual(response["X-Perfil"], "ocupado")
+
+    def test_guarda_en_disco(self):
+        self.client.force_authenticate(self.admin)
+        with tempfile.TemporaryDirectory() as directorio, override_settings(PERFILADOR_DIR=directorio):
+            nombres = {
+                self.client.get("/api/conductores/", HTTP_X_PERFILAR=generar_token())["X-Perfil"]
+                for _ in range(2)
+            }
+            # Dos perfiles de la misma vista en el mismo segundo no se pisan
+            self.assertEqual(len(nombres), 2)
+            for nombre in nombres:
+                self.assertTrue(nombre.endswith("ConductorViewSet.list.folded"))
+                self.assertTrue(os.path.exists(os.path.join(directorio, nombre)))
+
+    async def test_async_guarda_fuera_del_event_loop(self):
+        token = str(RefreshToken.for_user(self.admin).access_token)
+        guardar = perfilador._guardar_perfil
+        en_event_loop = []
+
+        def espiar(request, perfil):
+            try:
+                asyncio.get_running_loop()
+                en_event_loop.append(True)
+            except RuntimeError:
+                en_event_loop.append(False)
+            return guardar(request, perfil)
+
+        with tempfile.TemporaryDirectory() as directorio, override_settings(PERFILADOR_DIR=directorio):
+            with mock.patch.object(perfilador, "_guardar_perfil", side_effect=espiar):
+                response = await self.async_client.get(
+                    "/api/conductores/", headers={"Authorization": f"Bearer {token}", "X-Perfilar": generar_token()}
+                )
+            self.assertTrue(os.path.exists(os.path.join(directorio, response["X-Perfil"])))
+        self.assertEqual(en_event_loop, [False])
+
+
+class ReplicasTest(APITestCase):
+    """Lecturas en réplicas (core/replicas.py) y lectura de lo propio"""
+
+    databases = "__all__"
+
+    def setUp(self):
+        cache.clear()
+        rol = Rol.objects.create(
+            nombre="Operador", es_administrativo=True,
+            permisos=["ver_bitacora", "gestionar_conductores", "gestionar_personal", "gestionar_usuarios"],
+        )
+        self.user = User.objects.create_user(username="operador", password="operador123", rol=rol)
+        self.client.force_authenticate(self.user)
+        self.conductor = Conductor.objects.create(
+            nombre="Raúl", apellido="Chávez", email="raul@test.com", ci="123",
+            nro_licencia="LIC1", tipo_licencia="B", fecha_venc_licencia=date.today() + timedelta(days=30),
+        )
+
+    def _destinos(self, metodo, ruta, datos=None):
+        """Bases que eligió ReplicaRouter para las lecturas de un request"""
+        destinos = []
+
+        def espiar():
+            alias = replicas.replica_actual()
+            destinos.append(alias)
+            return alias
+
+        with mock.patch("core.routers.replica_actual", side_effect=espiar):
+            response = getattr(self.client, metodo)(ruta, datos, format="json")
+        self.assertLess(response.status_code, 400, response.content)
+        return set(destinos)
+
+    # La misma base hace de réplica: se verifica la elección, no la replicación
+    @override_settings(REPLICAS=[DEFAULT_DB_ALIAS])
+    def test_lecturas_declaradas_van_a_la_replica(self):
+        for ruta in [
+            "/api/conductores/", f"/api/conductores/{self.conductor.id}/", "/api/conductores/estadisticas/",
+            "/api/personal/", "/api/personal/estadisticas/", "/api/bitacora/",
+            "/api/users/stats/", "/api/auth/dashboard-data/",
+        ]:
+            self.assertIn(DEFAULT_DB_ALIAS, self._destinos("get", ruta), ruta)
+        # Acción que no está en acciones_replica
+        self.assertEqual(self._destinos("get", "/api/conductores/disponibles_para_usuario/") - {None}, set())
+
+    @override_settings(REPLICAS=[DEFAULT_DB_ALIAS])
+    def test_lectura_de_lo_propio(self):
+        self._destinos("patch", f"/api/conductores/{self.conductor.id}/", {"telefono": "70000001"})
+        self.assertEqual(self._destinos("get", "/api/conductores/") - {None}, set())
+
+        # Otro usuario sigue leyendo de la réplica
+        otro = User.objects.create_user(username="otro", rol=self.user.rol)
+        self.client.force_authenticate(otro)
+        self.assertIn(DEFAULT_DB_ALIAS, self._destinos("get", "/api/conductores/"))
+
+        # Vencida la marca, el primero vuelve a la réplica
+        cache.clear()
+        self.client.force_authenticate(self.user)
+        self.assertIn(DEFAULT_DB_ALIAS, self._destinos("get", "/api/conductores/"))
+
+    @override_settings(REPLICAS=[])
+    def test_sin_replicas_todo_en_la_principal(self):
+        self.assertEqual(self._destinos("get", "/api/conductores/") - {None}, set())
+        self.assertIsNone(cache.get(replicas._clave(self.user.id)))
+        self.client.patch(f"/api/conductores/{self.conductor.id}/", {"telefono": "70000001"}, format="json")
+        self.assertIsNone(cache.get(replicas._clave(self.user.id)))
+
+
+class ReplicasTransaccionTest(APITransactionTestCase):
+    """Réplicas fuera de la transacción de cada TestCase, con los datos ya confirmados"""
+
+    databases = "__all__"
+
+    def setUp(self):
+        cache.clear()
+        rol = Rol.objects.create(nombre="Operador", es_administrativo=True, permisos=["gestionar_conductores"])
+        self.user = User.objects.create_user(username="operador", password="operador123", rol=rol)
+        self.client.force_authenticate(self.user)
+        self.conductor = Conductor.objects.create(
+            nombre="Raúl", apellido="Chávez", email="raul@test.com", ci="123",
+            nro_licencia="LIC1", tipo_licencia="B", fecha_venc_licencia=date.today() + timedelta(days=30),
+        )
+
+    @override_settings(REPLICAS=["replica_x"])
+    def test_router(self):
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Conductor))
+        with replicas.usar_replica("replica_x"):
+            self.assertEqual(router.db_for_read(Conductor), "replica_x")
+            # Dentro de una transacción de la principal la réplica no vería lo escrito en ella
+            with transaction.atomic():
+                self.assertIsNone(router.db_for_read(Conductor))
+            # Escrituras siempre en la principal, aunque el objeto venga de la réplica
+            self.conductor._state.db = "replica_x"
+            self.assertEqual(router.db_for_write(Conductor, instance=self.conductor), DEFAULT_DB_ALIAS)
+        self.assertIs(router.allow_relation(self.conductor, self.user), True)
+        self.assertIs(router.allow_migrate("replica_x", "conductores"), False)
+        self.assertIsNone(router.allow_migrate(DEFAULT_DB_ALIAS, "conductores"))
+
+    @skipUnless("replica_1" in settings.DATABASES, "sin réplicas (DB_REPLICAS)")
+    @override_settings(REPLICAS=["replica_1"])
+    def test_lectura_en_la_conexion_de_la_replica(self):
+        # El espejo es otra conexión: ve los datos porque TransactionTestCase los confirma
+        with CaptureQueriesContext(connections["replica_1"]) as en_replica:
+            response = self.client.get("/api/conductores/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 1)
+        self.assertTrue(any("conductores_conductor" in q["sql"] for q in en_replica.captured_queries))
+
+
+class LicenciasTest(APITestCase):
+    """Tramos de vencimiento precalculados (conductores/licencias.py)"""
+
+    def setUp(self):
+        self.hoy = date.today()
+        self.admin = User.objects.create_superuser(username="admin_lic", email="admin@test.com", password="x")
+        rol = Rol.objects.create(nombre="Flota", es_administrativo=True, permisos=["gestionar_conductores"])
+        User.objects.create_user(username="flota", email="flota@test.com", rol=rol)
+        User.objects.create_user(username="sin_permiso", email="otro@test.com")
+        self.client.force_authenticate(self.admin)
+        # dias respecto de hoy: vencidas, por vencer y vigentes
+        self.conductores = {
+            dias: Conductor.objects.create(
+                nombre=f"C{i}", apellido="Lic", email=f"lic{i}@test.com", ci=f"L{i}",
+                nro_licencia=f"LIC{i}", tipo_licencia="B", fecha_venc_licencia=self.hoy + timedelta(days=dias),
+            )
+            for i, dias in enumerate([-10, -1, 0, 5, 30, 31, 200])
+        }
+
+    def _estados(self):
+        return {dias: Conductor.objects.get(pk=c.pk).estado_licencia for dias, c in self.conductores.items()}
+
+    def test_estado_al_guardar(self):
+        self.assertEqual(self._estados(), {
+            -10: "vencida", -1: "vencida", 0: "por_vencer", 5: "por_vencer",
+            30: "por_vencer", 31: "vigente", 200: "vigente",
+        })
+        conductor = self.conductores[200]
+        conductor.fecha_venc_licencia = self.hoy - timedelta(days=1)
+        conductor.save(update_fields=["fecha_venc_licencia"])
+        self.assertEqual(Conductor.objects.get(pk=conductor.pk).estado_licencia, "vencida")
+
+    @override_settings(EMAIL_OUTBOX=True)
+    def test_actualizar_y_resumen(self):
+        from conductores import licencias
+        from notificaciones.models import EmailPendiente
+
+        # Diez días después: 0 y 5 vencen, 31 entra en el aviso
+        dentro_de_10 = self.hoy + timedelta(days=10)
+        cambios = licencias.actualizar_estados(dentro_de_10)
+        self.assertCountEqual(cambios["vencida"], [self.conductores[0].pk, self.conductores[5].pk])
+        self.assertEqual(cambios["por_vencer"], [self.conductores[31].pk])
+        self.assertEqual(cambios["vigente"], [])
+        self.assertEqual(self._estados()[31], "por_vencer")
+
+        self.assertEqual(licencias.enviar_resumen(cambios, dentro_de_10), 2)
+        emails = EmailPendiente.objects.order_by("destinatario")
+        self.assertEqual([e.destinatario for e in emails], ["admin@test.com", "flota@test.com"])
+        contexto = emails[0].contexto
+        self.assertEqual((contexto["vencidas_total"], contexto["por_vencer_total"]), (2, 1))
+        self.assertEqual(contexto["vencidas"][0]["nro_licencia"], "LIC2")
+
+        # Misma fecha otra vez: nada cambia y no se repite el resumen
+        cambios = licencias.actualizar_estados(dentro_de_10)
+        self.assertFalse(any(cambios.values()))
+        self.assertEqual(licencias.enviar_resumen(cambios, dentro_de_10), 0)
+
+    @override_settings(EMAIL_OUTBOX=True)
+    def test_comando(self):
+        from django.core.management import call_command
+        from notificaciones.models import EmailPendiente
+
+        salida = io.StringIO()
+        fecha = (self.hoy + timedelta(days=1)).isoformat()
+        call_command("actualizar_licencias", "--fecha", fecha, "--sin-resumen", stdout=salida)
+        self.assertIn('1 licencias pasaron a "Vencida"', salida.getvalue())
+        self.assertEqual(EmailPendiente.objects.count(), 0)
+
+    def test_endpoints_paginados(self):
+        response = self.client.get("/api/conductores/licencias_vencidas/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual([c["nro_licencia"] for c in response.data["results"]], ["LIC0", "LIC1"])
+
+        response = self.client.get("/api/conductores/licencias_por_vencer/")
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual([c["nro_licencia"] for c in response.data["results"]], ["LIC2", "LIC3", "LIC4"])
+        self.assertEqual(response.data["results"][0]["estado_licencia"], "por_vencer")
+
+        response = self.client.get("/api/conductores/estadisticas/")
+        self.assertEqual((response.data["licencias_vencidas"], response.data["licencias_por_vencer"]), (2, 3))
+        response = self.client.get("/api/conductores/", {"licencia_vencida": "true"})
+        self.assertEqual(response.data["count"], 2)
+
+    def test_filtro_licencia_vencida_por_fecha(self):
+        # Tramo desfasado (el cron aún no corrió): el filtro mira la fecha, no la columna
+        Conductor.objects.filter(pk=self.conductores[-1].pk).update(estado_licencia="vigente")
+        response = self.client.get("/api/conductores/", {"licencia_vencida": "true"})
+        self.assertEqual({c["nro_licencia"] for c in response.data["results"]}, {"LIC0", "LIC1"})
+        response = self.client.get("/api/conductores/", {"licencia_vencida": "false"})
+        self.assertEqual(response.data["count"], 5)
+
+    @skipUnless(connections[DEFAULT_DB_ALIAS].vendor == "postgresql", "índices parciales de PostgreSQL")
+    def test_indices_parciales(self):
+        from conductores.licencias import POR_VENCER, VENCIDA
+
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute("ANALYZE conductores_conductor")
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        for estado, indice in [(POR_VENCER, "conductor_lic_por_vencer_idx"), (VENCIDA, "conductor_lic_vencida_idx")]:
+            tramo = Conductor.objects.filter(estado_licencia=estado)
+            # Lo que lee un count(): solo el índice
+            self.assertIn(f"Index Only Scan using {indice}", tramo.order_by().values("id").explain())
+            self.assertIn(indice, tramo.order_by("fecha_venc_licencia", "id")[:10].explain())
+
+
+class CalculadosSQLTest(APITestCase):
+    """Propiedades de conductores y personal anotadas en SQL (core.campos.calculado)"""
+
+    def setUp(self):
+        self.hoy = date.today()
+        self.client.force_authenticate(User.objects.create_superuser(username="admin_calc", password="x"))
+        self.conductores = [
+            Conductor.objects.create(
+                nombre=f"C{dias}", apellido=" Díaz ", email=f"calc{i}@test.com", ci=f"K{i}",
+                nro_licencia=f"CALC{i}", tipo_licencia="B", fecha_venc_licencia=self.hoy + timedelta(days=dias),
+            )
+            for i, dias in enumerate([-3, 0, 12, 400])
+        ]
+        ingresos = [
+            self.hoy,
+            self.hoy.replace(year=self.hoy.year - 1) + timedelta(days=1),  # aún no cumple el año
+            self.hoy.replace(year=self.hoy.year - 1),
+            date(2016, 2, 29),
+        ]
+        self.personal = [
+            Personal.objects.create(
+                nombre=f"P{i}", apellido="Ruiz", fecha_nacimiento=date(1990, 1, 1), telefono="7000",
+                email=f"p{i}@test.com", ci=f"PC{i}", codigo_empleado=f"E{i}", fecha_ingreso=ingreso,
+            )
+            for i, ingreso in enumerate(ingresos)
+        ]
+
+    def test_sql_igual_a_python(self):
+        for anotado in Conductor.objects.con_calculados():
+            python = Conductor.objects.get(pk=anotado.pk)
+            for campo in ("nombre_completo", "licencia_vencida", "dias_para_vencer_licencia"):
+                self.assertIn(campo, anotado.__dict__)
+                self.assertEqual(getattr(anotado, campo), getattr(python, campo), campo)
+        for anotado in Personal.objects.con_calculados():
+            python = Personal.objects.get(pk=anotado.pk)
+            for campo in ("nombre_completo", "anos_antiguedad"):
+                self.assertEqual(getattr(anotado, campo), getattr(python, campo), campo)
+
+    def test_listado_sin_aritmetica_en_python(self):
+        prohibido = mock.Mock(side_effect=AssertionError("calculado en Python"))
+        with mock.patch.object(Conductor.dias_para_vencer_licencia, "func", prohibido), \
+                mock.patch.object(Conductor.licencia_vencida, "func", prohibido), \
+                mock.patch.object(Personal.anos_antiguedad, "func", prohibido):
+            self.assertEqual(self.client.get("/api/conductores/").status_code, 200)
+            conductor = self.conductores[0]
+            response = self.client.get(f"/api/conductores/{conductor.pk}/")
+            self.assertEqual(response.data["dias_para_vencer_licencia"], -3)
+            self.assertIs(response.data["licencia_vencida"], True)
+            self.assertEqual(self.client.get("/api/personal/").status_code, 200)
+            response = self.client.get(f"/api/personal/{self.personal[2].pk}/")
+            self.assertEqual(response.data["anos_antiguedad"], 1)
+
+    def test_ordenar_filtrar_y_agregar(self):
+        response = self.client.get("/api/conductores/", {"ordering": "-dias_para_vencer_licencia"})
+        self.assertEqual([c["nro_licencia"] for c in response.data["results"]], ["CALC3", "CALC2", "CALC1", "CALC0"])
+        response = self.client.get("/api/conductores/", {"vence_en_dias": "12"})
+        self.assertEqual(response.data["count"], 3)
+
+        response = self.client.get("/api/personal/", {"ordering": "anos_antiguedad,id"})
+        self.assertEqual([p["codigo_empleado"] for p in response.data["results"]], ["E0", "E1", "E2", "E3"])
+        response = self.client.get("/api/personal/", {"antiguedad_min": "1"})
+        self.assertEqual(response.data["count"], 2)
+        response = self.client.get("/api/personal/estadisticas/")
+        antiguedad_e3 = Personal.objects.get(codigo_empleado="E3").anos_antiguedad
+        self.assertEqual(response.data["antiguedad_promedio"], round((0 + 0 + 1 + antiguedad_e3) / 4, 1))
+
+    def test_escritura_devuelve_valores_al_dia(self):
+        # En las escrituras no se anota: la propiedad ve lo que se acaba de guardar
+        conductor = self.conductores[3]
+        with mock.patch("conductores.views.registrar_bitacora") as registrar:
+            response = self.client.patch(f"/api/conductores/{conductor.pk}/", {"nombre": "Nuevo"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(registrar.call_args.kwargs["descripcion"], "Se actualizó el conductor Nuevo  Díaz")
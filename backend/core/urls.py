@@ -15,8 +15,12 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.staticfiles.urls import staticfiles_urlpatterns
 from django.urls import path, include
+from core.autocompletar import autocompletar
+from core.metricas import metrics
 # Endpoints principales del sistema
 urlpatterns = [
     # Panel de administración de Django
@@ -32,12 +36,28 @@ urlpatterns = [
     
     # Personal: gestión de personal de empresa
     path("api/personal/", include("personal.urls")),
+
+    # Viajes: solicitud y despacho a conductores
+    path("api/viajes/", include("viajes.urls")),
+
+    # Reservas: salidas programadas e inventario de asientos
+    path("api/reservas/", include("reservas.urls")),
     
     
     path("api/bitacora/", include("bitacora.urls")),
 
+    # Autocompletado id/label para los selectores del panel
+    path("api/autocompletar/", autocompletar, name="autocompletar"),
+
+    # Métricas para Prometheus (fuera de /api/: lo consulta el scraper, no el frontend)
+    path("metrics", metrics, name="metrics"),
+
     # Auth social: endpoints para login social (navegador)
     path("accounts/", include("allauth.urls")),
     
     
 ]
+
+# gunicorn/uvicorn no sirven estáticos como runserver: en DEBUG los expone Django
+if settings.DEBUG:
+    urlpatterns += staticfiles_urlpatterns()
@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import EmailPendiente
+
+
+@admin.register(EmailPendiente)
+class EmailPendienteAdmin(admin.ModelAdmin):
+    list_display = ('fecha_creacion', 'destinatario', 'asunto', 'estado', 'intentos', 'proximo_intento')
+    list_filter = ('estado',)
+    search_fields = ('destinatario', 'asunto')
+    ordering = ('-fecha_creacion',)
+    exclude = ('contexto',)  # puede contener códigos de verificación
@@ -0,0 +1,60 @@
+"""
+Worker de la cola de emails (outbox).
+
+Uso:
+    python manage.py procesar_emails            # corre en bucle
+    python manage.py procesar_emails --una-vez  # procesa lo pendiente y termina
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from notificaciones.outbox import procesar_lote
+
+
+class Command(BaseCommand):
+    help = 'Envía los emails pendientes de la cola por lotes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=settings.EMAIL_OUTBOX_LOTE,
+            help='Cantidad máxima de emails por lote (una conexión SMTP por lote)'
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=settings.EMAIL_OUTBOX_INTERVALO_SEG,
+            help='Segundos de espera cuando la cola está vacía'
+        )
+        parser.add_argument(
+            '--una-vez',
+            action='store_true',
+            help='Procesa los pendientes actuales y termina'
+        )
+
+    def handle(self, *args, **options):
+        lote = options['lote']
+        self.stdout.write(self.style.SUCCESS(f'📬 Worker de emails iniciado (lote={lote})'))
+
+        try:
+            while True:
+                # Descarta conexiones a la BD caídas o vencidas entre lotes
+                close_old_connections()
+                procesados, enviados = procesar_lote(lote)
+                if procesados:
+                    self.stdout.write(f'✉️ {enviados}/{procesados} emails enviados')
+
+                if options['una_vez']:
+                    if procesados < lote:
+                        break
+                elif procesados < lote:
+                    # Cola vacía (o solo reintentos a futuro): esperar antes de volver a consultar
+                    time.sleep(options['intervalo'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS('📭 Worker de emails detenido'))
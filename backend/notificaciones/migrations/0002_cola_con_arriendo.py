@@ -0,0 +1,26 @@
+# Generated by Django 5.0.7 on 2026-10-18 23:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notificaciones', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='emailpendiente',
+            name='email_pendiente_cola_idx',
+        ),
+        migrations.AlterField(
+            model_name='emailpendiente',
+            name='estado',
+            field=models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('ENVIANDO', 'Enviando'), ('ENVIADO', 'Enviado'), ('FALLIDO', 'Fallido')], default='PENDIENTE', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='emailpendiente',
+            index=models.Index(condition=models.Q(('estado__in', ['PENDIENTE', 'ENVIANDO'])), fields=['estado', 'proximo_intento'], name='email_pendiente_cola_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import models
+from django.utils.timezone import now
+
+
+class EmailPendiente(models.Model):
+    """
+    Outbox de emails transaccionales.
+    El request solo inserta la fila; el worker (manage.py procesar_emails)
+    renderiza y envía por lotes reutilizando una conexión SMTP.
+    """
+
+    ESTADOS = [
+        ('PENDIENTE', 'Pendiente'),
+        # Reclamado por un worker hasta proximo_intento (arriendo, ver outbox.py)
+        ('ENVIANDO', 'Enviando'),
+        ('ENVIADO', 'Enviado'),
+        ('FALLIDO', 'Fallido'),
+    ]
+
+    destinatario = models.EmailField()
+    asunto = models.CharField(max_length=255)
+    # Nombre base de las plantillas: se renderizan <plantilla>.txt y <plantilla>.html
+    plantilla = models.CharField(max_length=150)
+    contexto = models.JSONField(default=dict, blank=True)
+    estado = models.CharField(max_length=10, choices=ESTADOS, default='PENDIENTE')
+    intentos = models.PositiveSmallIntegerField(default=0)
+    proximo_intento = models.DateTimeField(default=now)
+    ultimo_error = models.TextField(blank=True)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_envio = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Email pendiente"
+        verbose_name_plural = "Emails pendientes"
+        ordering = ['proximo_intento']
+        indexes = [
+            # El worker solo busca pendientes y arriendos vencidos: índice parcial y pequeño
+            models.Index(
+                fields=['estado', 'proximo_intento'],
+                name='email_pendiente_cola_idx',
+                condition=models.Q(estado__in=['PENDIENTE', 'ENVIANDO']),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.destinatario} | {self.asunto} | {self.estado}"
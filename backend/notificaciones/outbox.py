@@ -0,0 +1,195 @@
+"""
+OUTBOX.PY - COLA DE EMAILS TRANSACCIONALES
+
+RESPONSABILIDADES:
+- Encolar emails desde los requests (una inserción, sin SMTP)
+- Encolar muchos de una vez desde los procesos por lotes (un INSERT por lote)
+- Enviar los pendientes por lotes con una sola conexión SMTP
+- Reintentos con backoff exponencial
+
+El worker reclama el lote en una transacción corta (estado ENVIANDO y un
+arriendo de EMAIL_OUTBOX_ARRIENDO_SEG en proximo_intento) y envía fuera de toda
+transacción: un SMTP lento no retiene locks ni deja una conexión de la base
+"idle in transaction". Cada resultado se guarda con su propio UPDATE. Si el
+worker muere a mitad del lote, el arriendo vence y otro worker retoma esos
+emails (el intento perdido cuenta para EMAIL_OUTBOX_MAX_INTENTOS).
+
+Las plantillas se compilan una vez por proceso y se reutilizan en cada envío.
+"""
+
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.template.loader import get_template
+from django.utils import timezone
+
+from .models import EmailPendiente
+
+
+@lru_cache(maxsize=None)
+def _plantilla(nombre):
+    """Plantilla compilada (se compila la primera vez que se usa en el proceso)"""
+    return get_template(nombre)
+
+
+def encolar_email(destinatario, asunto, plantilla, contexto):
+    """
+    Encola un email para que lo envíe el worker.
+    `plantilla` es el nombre base: se usan <plantilla>.txt y <plantilla>.html.
+    `contexto` debe ser serializable a JSON.
+
+    Con EMAIL_OUTBOX=False (desarrollo sin worker) se envía en el momento.
+    """
+    email = EmailPendiente.objects.create(
+        destinatario=destinatario,
+        asunto=asunto,
+        plantilla=plantilla,
+        contexto=contexto,
+    )
+    if not settings.EMAIL_OUTBOX:
+        enviar_pendientes([email])
+    return email
+
+
+def encolar_emails(mensajes):
+    """
+    Como encolar_email para muchos mensajes (dicts con destinatario, asunto,
+    plantilla y contexto), con bulk_create de a EMAIL_OUTBOX_LOTE filas.
+    """
+    emails = EmailPendiente.objects.bulk_create(
+        (EmailPendiente(**mensaje) for mensaje in mensajes),
+        batch_size=settings.EMAIL_OUTBOX_LOTE,
+    )
+    if not settings.EMAIL_OUTBOX:
+        enviar_pendientes(emails)
+    return emails
+
+
+def _construir_mensaje(email, connection):
+    mensaje = EmailMultiAlternatives(
+        subject=email.asunto,
+        body=_plantilla(f"{email.plantilla}.txt").render(email.contexto),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[email.destinatario],
+        connection=connection,
+    )
+    mensaje.attach_alternative(_plantilla(f"{email.plantilla}.html").render(email.contexto), "text/html")
+    return mensaje
+
+
+def _reprogramar(email, error):
+    """Backoff exponencial: BACKOFF, 2xBACKOFF, 4xBACKOFF... hasta MAX_INTENTOS"""
+    email.intentos += 1
+    email.ultimo_error = str(error)[:1000]
+    if email.intentos >= settings.EMAIL_OUTBOX_MAX_INTENTOS:
+        email.estado = 'FALLIDO'
+    else:
+        email.estado = 'PENDIENTE'
+        espera = settings.EMAIL_OUTBOX_BACKOFF_SEG * 2 ** (email.intentos - 1)
+        email.proximo_intento = timezone.now() + timedelta(seconds=espera)
+
+
+def _guardar(email, arriendo):
+    """Un UPDATE por email; con arriendo, solo si este worker todavía lo tiene reclamado"""
+    filas = EmailPendiente.objects.filter(pk=email.pk)
+    if arriendo is not None:
+        # Si el arriendo venció, otro worker retomó el email: vale su resultado
+        filas = filas.filter(estado='ENVIANDO', proximo_intento=arriendo)
+    filas.update(
+        estado=email.estado,
+        intentos=email.intentos,
+        proximo_intento=email.proximo_intento,
+        ultimo_error=email.ultimo_error,
+        fecha_envio=email.fecha_envio,
+        contexto=email.contexto,
+    )
+
+
+def enviar_pendientes(emails, arriendo=None):
+    """
+    Envía los emails dados por una única conexión SMTP y guarda el resultado
+    de cada uno apenas se conoce. `arriendo` es el vencimiento con que
+    procesar_lote los reclamó. Retorna la cantidad enviada.
+    """
+    if not emails:
+        return 0
+
+    enviados = 0
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as error:
+        # Sin servidor SMTP no tiene sentido intentar mensaje por mensaje
+        print(f"❌ [outbox] No se pudo conectar al servidor SMTP: {error}")
+        for email in emails:
+            _reprogramar(email, error)
+            _guardar(email, arriendo)
+    else:
+        try:
+            for email in emails:
+                try:
+                    connection.send_messages([_construir_mensaje(email, connection)])
+                except Exception as error:
+                    print(f"❌ [outbox] Error enviando email a {email.destinatario}: {error}")
+                    _reprogramar(email, error)
+                    # La conexión puede haber quedado inservible: se reabre en el siguiente envío
+                    connection.close()
+                    _guardar(email, arriendo)
+                else:
+                    email.estado = 'ENVIADO'
+                    email.fecha_envio = timezone.now()
+                    email.intentos += 1
+                    email.ultimo_error = ''
+                    # Los códigos de verificación no quedan guardados una vez enviados
+                    email.contexto = {}
+                    _guardar(email, arriendo)
+                    enviados += 1
+        finally:
+            connection.close()
+    return enviados
+
+
+def recuperar_arriendos(ahora=None):
+    """
+    Devuelve a la cola los emails ENVIANDO cuyo arriendo venció (el worker que
+    los reclamó murió o quedó colgado). El intento perdido cuenta: los que ya
+    agotaron EMAIL_OUTBOX_MAX_INTENTOS quedan FALLIDO. Retorna cuántos retomó.
+    """
+    ahora = ahora or timezone.now()
+    vencidos = EmailPendiente.objects.filter(estado='ENVIANDO', proximo_intento__lte=ahora)
+    error = 'Venció el arriendo del worker sin resultado'
+    vencidos.filter(intentos__gte=settings.EMAIL_OUTBOX_MAX_INTENTOS - 1).update(
+        estado='FALLIDO', intentos=F('intentos') + 1, ultimo_error=error
+    )
+    return vencidos.update(estado='PENDIENTE', intentos=F('intentos') + 1, ultimo_error=error)
+
+
+def procesar_lote(tamanio=None):
+    """
+    Reclama hasta `tamanio` emails pendientes vencidos y los envía.
+    SKIP LOCKED permite correr varios workers sin que dos reclamen el mismo
+    email; el lock dura solo lo que tarda el UPDATE del reclamo.
+    Retorna (procesados, enviados).
+    """
+    tamanio = tamanio or settings.EMAIL_OUTBOX_LOTE
+    ahora = timezone.now()
+    recuperar_arriendos(ahora)
+
+    arriendo = ahora + timedelta(seconds=settings.EMAIL_OUTBOX_ARRIENDO_SEG)
+    with transaction.atomic():
+        ids = list(
+            EmailPendiente.objects
+            .select_for_update(skip_locked=True)
+            .filter(estado='PENDIENTE', proximo_intento__lte=ahora)
+            .order_by('proximo_intento')
+            .values_list('id', flat=True)[:tamanio]
+        )
+        EmailPendiente.objects.filter(pk__in=ids).update(estado='ENVIANDO', proximo_intento=arriendo)
+
+    # Fuera de la transacción: el SMTP puede tardar lo que quiera sin retener locks
+    emails = list(EmailPendiente.objects.filter(pk__in=ids).order_by('pk'))
+    return len(emails), enviar_pendientes(emails, arriendo)
@@ -0,0 +1,81 @@
+"""
+Servidor SMTP mínimo en memoria para tests y benchmarks de la cola de emails.
+
+Acepta cualquier mensaje, cuenta conexiones y mensajes recibidos y puede
+simular un relay lento (`demora` segundos por mensaje).
+
+Uso:
+    with SMTPStub(demora=0.2) as stub:
+        ...  # EMAIL_HOST=127.0.0.1, EMAIL_PORT=stub.puerto
+        stub.mensajes, stub.conexiones
+"""
+import socketserver
+import threading
+import time
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+
+    def responder(self, linea):
+        self.wfile.write(f"{linea}\r\n".encode())
+
+    def handle(self):
+        stub = self.server.stub
+        with stub.lock:
+            stub.conexiones += 1
+
+        self.responder("220 stub ESMTP")
+        while True:
+            linea = self.rfile.readline()
+            if not linea:
+                return
+            comando = linea.decode(errors="replace").strip().upper()
+
+            if comando.startswith("EHLO"):
+                self.responder("250-stub")
+                self.responder("250 8BITMIME")
+            elif comando.startswith("DATA"):
+                self.responder("354 End data with <CR><LF>.<CR><LF>")
+                partes = []
+                while True:
+                    dato = self.rfile.readline()
+                    if not dato or dato in (b".\r\n", b".\n"):
+                        break
+                    partes.append(dato)
+                if stub.demora:
+                    time.sleep(stub.demora)
+                with stub.lock:
+                    stub.mensajes.append(b"".join(partes))
+                self.responder("250 OK")
+            elif comando.startswith("QUIT"):
+                self.responder("221 Bye")
+                return
+            else:
+                # HELO, MAIL FROM, RCPT TO, RSET, NOOP...
+                self.responder("250 OK")
+
+
+class _Servidor(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SMTPStub:
+    """Servidor SMTP en un hilo aparte, escuchando en 127.0.0.1 y un puerto libre"""
+
+    def __init__(self, demora=0):
+        self.demora = demora
+        self.conexiones = 0
+        self.mensajes = []
+        self.lock = threading.Lock()
+        self._servidor = _Servidor(("127.0.0.1", 0), _SMTPHandler)
+        self._servidor.stub = self
+        self.puerto = self._servidor.server_address[1]
+
+    def __enter__(self):
+        threading.Thread(target=self._servidor.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._servidor.shutdown()
+        self._servidor.server_close()
@@ -0,0 +1,132 @@
+import socket
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from .models import EmailPendiente
+from . import outbox
+from .outbox import encolar_email, procesar_lote
+from .smtp_stub import SMTPStub
+
+User = get_user_model()
+
+PLANTILLA = "account/email/mobile_verification"
+SMTP = "django.core.mail.backends.smtp.EmailBackend"
+
+
+def _puerto_cerrado():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class OutboxTest(TestCase):
+    """Cola de emails: encolado, envío por lotes y reintentos"""
+
+    def _encolar(self, cantidad):
+        for i in range(cantidad):
+            encolar_email(
+                destinatario=f"cliente{i}@test.com",
+                asunto="Código de verificación",
+                plantilla=PLANTILLA,
+                contexto={"username": f"cliente{i}", "verification_code": f"{i:06d}", "site_name": "Test"},
+            )
+
+    def test_encolar_no_envia(self):
+        self._encolar(1)
+        email = EmailPendiente.objects.get()
+        self.assertEqual(email.estado, "PENDIENTE")
+        self.assertEqual(email.intentos, 0)
+
+    def test_lote_usa_una_conexion_smtp(self):
+        self._encolar(5)
+        with SMTPStub() as stub, override_settings(EMAIL_BACKEND=SMTP, EMAIL_HOST="127.0.0.1", EMAIL_PORT=stub.puerto):
+            procesados, enviados = procesar_lote(10)
+
+        self.assertEqual((procesados, enviados), (5, 5))
+        self.assertEqual(stub.conexiones, 1)
+        self.assertEqual(len(stub.mensajes), 5)
+        self.assertIn(b"000003", b"".join(stub.mensajes))
+        self.assertFalse(EmailPendiente.objects.exclude(estado="ENVIADO").exists())
+        # El código no queda guardado una vez enviado
+        self.assertFalse(EmailPendiente.objects.exclude(contexto={}).exists())
+
+    @override_settings(EMAIL_BACKEND=SMTP, EMAIL_HOST="127.0.0.1", EMAIL_OUTBOX_BACKOFF_SEG=30)
+    def test_reintento_con_backoff(self):
+        self._encolar(2)
+        with override_settings(EMAIL_PORT=_puerto_cerrado()):
+            procesados, enviados = procesar_lote(10)
+            self.assertEqual((procesados, enviados), (2, 0))
+            email = EmailPendiente.objects.first()
+            self.assertEqual(email.estado, "PENDIENTE")
+            self.assertEqual(email.intentos, 1)
+            self.assertGreater(email.proximo_intento, timezone.now() + timedelta(seconds=25))
+
+            # Aún no vence el reintento: el worker no los toma
+            self.assertEqual(procesar_lote(10), (0, 0))
+
+        EmailPendiente.objects.update(proximo_intento=timezone.now())
+        with SMTPStub() as stub, override_settings(EMAIL_PORT=stub.puerto):
+            self.assertEqual(procesar_lote(10), (2, 2))
+        self.assertEqual(EmailPendiente.objects.filter(estado="ENVIADO", intentos=2).count(), 2)
+
+    def test_envia_fuera_de_la_transaccion(self):
+        self._encolar(2)
+        # TestCase ya abre transacción: se compara contra los savepoints previos
+        previos = len(connection.savepoint_ids)
+        durante = []
+        construir = outbox._construir_mensaje
+
+        def espiar(email, conexion):
+            durante.append((len(connection.savepoint_ids), EmailPendiente.objects.get(pk=email.pk).estado))
+            return construir(email, conexion)
+
+        with SMTPStub() as stub, override_settings(EMAIL_BACKEND=SMTP, EMAIL_HOST="127.0.0.1", EMAIL_PORT=stub.puerto):
+            with mock.patch.object(outbox, "_construir_mensaje", side_effect=espiar):
+                self.assertEqual(procesar_lote(10), (2, 2))
+        self.assertEqual(durante, [(previos, "ENVIANDO")] * 2)
+
+    @override_settings(EMAIL_BACKEND=SMTP, EMAIL_HOST="127.0.0.1", EMAIL_OUTBOX_MAX_INTENTOS=3)
+    def test_arriendo_vencido_se_retoma(self):
+        self._encolar(2)
+        vencido = timezone.now() - timedelta(seconds=1)
+        EmailPendiente.objects.update(estado="ENVIANDO", proximo_intento=vencido)
+        EmailPendiente.objects.filter(pk=EmailPendiente.objects.order_by("pk").last().pk).update(intentos=2)
+
+        with SMTPStub() as stub, override_settings(EMAIL_PORT=stub.puerto):
+            self.assertEqual(procesar_lote(10), (1, 1))
+        primero, ultimo = EmailPendiente.objects.order_by("pk")
+        # El intento del worker que murió cuenta
+        self.assertEqual((primero.estado, primero.intentos), ("ENVIADO", 2))
+        self.assertEqual((ultimo.estado, ultimo.intentos), ("FALLIDO", 3))
+
+        # Un worker cuyo arriendo venció no pisa el resultado del que retomó el email
+        primero.estado, primero.ultimo_error = "PENDIENTE", "tarde"
+        outbox._guardar(primero, vencido)
+        self.assertEqual(EmailPendiente.objects.get(pk=primero.pk).estado, "ENVIADO")
+
+    @override_settings(EMAIL_BACKEND=SMTP, EMAIL_HOST="127.0.0.1", EMAIL_OUTBOX_MAX_INTENTOS=1)
+    def test_fallido_tras_max_intentos(self):
+        self._encolar(1)
+        with override_settings(EMAIL_PORT=_puerto_cerrado()):
+            procesar_lote(10)
+        self.assertEqual(EmailPendiente.objects.get().estado, "FALLIDO")
+
+
+class ResendCodeOutboxTest(APITestCase):
+    """El reenvío de código responde sin tocar SMTP: solo encola"""
+
+    @override_settings(EMAIL_BACKEND=SMTP, EMAIL_HOST="127.0.0.1")
+    def test_resend_encola(self):
+        user = User.objects.create_user(username="cliente", email="cliente@test.com", password="cliente123")
+        with override_settings(EMAIL_PORT=_puerto_cerrado()):
+            response = self.client.post("/api/resend-code/", {"user_id": user.id}, format="json")
+        self.assertEqual(response.status_code, 200)
+        email = EmailPendiente.objects.get()
+        self.assertEqual(email.destinatario, "cliente@test.com")
+        self.assertEqual(len(email.contexto["verification_code"]), 6)
@@ -0,0 +1,19 @@
+# Índice de trigramas (pg_trgm + unaccent) para la búsqueda, ver core/busqueda.py
+
+from django.db import migrations
+
+from core.busqueda import migracion_indice
+
+# Deben coincidir (y en el mismo orden) con los campos que busca la vista
+CAMPOS = ['nombre', 'apellido', 'email', 'ci', 'codigo_empleado']
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('personal', '0003_remove_personal_usuario'),
+    ]
+
+    operations = [
+        migrations.RunSQL(*migracion_indice('personal_personal', 'personal_personal_busqueda_trgm', CAMPOS)),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.7 on 2026-10-18 22:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('personal', '0004_busqueda_trigram'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='personal',
+            index=models.Index(fields=['-fecha_creacion'], name='personal_creacion_idx'),
+        ),
+    ]
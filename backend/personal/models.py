@@ -1,10 +1,35 @@
 from django.db import models
+from django.db.models.functions import Cast, Concat, Greatest, Trim
 from django.contrib.auth import get_user_model
 from django.core.validators import RegexValidator
+from django.utils import timezone
+from core.campos import calculado
 
 User = get_user_model()
 
 
+class PersonalQuerySet(models.QuerySet):
+    """Consultas reutilizables de personal"""
+
+    def con_calculados(self):
+        """
+        Anota nombre_completo y anos_antiguedad en SQL (ver core.campos.calculado):
+        se pueden usar en order_by, filter y aggregate
+        """
+        hoy = models.Value(timezone.now().date(), output_field=models.DateField())
+        return self.annotate(
+            nombre_completo=Trim(Concat('nombre', models.Value(' '), 'apellido')),
+            # AGE() ya descuenta el año si todavía no se cumplió el aniversario
+            anos_antiguedad=Greatest(
+                models.Value(0),
+                Cast(
+                    models.Func(hoy, 'fecha_ingreso', template='EXTRACT(YEAR FROM AGE(%(expressions)s))'),
+                    models.IntegerField(),
+                ),
+            ),
+        )
+
+
 class Personal(models.Model):
     """Modelo para personal de la empresa - Refactorizado según especificaciones"""
 
@@ -67,6 +92,8 @@ class Personal(models.Model):
         auto_now=True, verbose_name="Fecha de Actualización"
     )
 
+    objects = PersonalQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Personal"
         verbose_name_plural = "Personal"
@@ -75,6 +102,9 @@ class Personal(models.Model):
             models.Index(fields=['ci']),
             models.Index(fields=['email']),
             models.Index(fields=['codigo_empleado']),
+            # Orden por defecto del listado: la página se lee del índice y las
+            # anotaciones (con_calculados) se calculan solo para esas filas
+            models.Index(fields=['-fecha_creacion'], name='personal_creacion_idx'),
         ]
         constraints = [
             models.UniqueConstraint(fields=['email'], name='unique_personal_email'),
@@ -89,17 +119,15 @@ class Personal(models.Model):
         """Retorna el nombre completo del empleado"""
         return f"{self.nombre} {self.apellido}".strip()
 
-    @property
+    @calculado
     def nombre_completo(self):
         """Retorna el nombre completo del empleado"""
         return self.get_full_name()
 
-    @property
+    @calculado
     def anos_antiguedad(self):
         """Calcula los años de antigüedad"""
-        from datetime import date
-
-        hoy = date.today()
+        hoy = timezone.now().date()
         anos = hoy.year - self.fecha_ingreso.year
 
         # Ajustar si aún no ha cumplido el año
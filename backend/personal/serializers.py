@@ -1,11 +1,21 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from core.campos import CamposDinamicosMixin
 from .models import Personal
 
 User = get_user_model()
 
+# Columnas que leen las propiedades calculadas de Personal (ver core.campos).
+# nombre_completo y anos_antiguedad vienen anotados en SQL en list/retrieve
+# (Personal.objects.con_calculados())
+CAMPOS_MODELO_PERSONAL = {
+    'nombre_completo': (),
+    'anos_antiguedad': (),
+    'puede_acceder_sistema': ('estado',),
+}
 
-class PersonalSerializer(serializers.ModelSerializer):
+
+class PersonalSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer para el modelo Personal - Refactorizado"""
     
     # Campos calculados
@@ -39,6 +49,7 @@ class PersonalSerializer(serializers.ModelSerializer):
             'fecha_creacion',
             'fecha_actualizacion'
         ]
+        campos_modelo = CAMPOS_MODELO_PERSONAL
 
     def validate_codigo_empleado(self, value):
         """Valida que el código de empleado sea único"""
@@ -72,6 +83,30 @@ class PersonalSerializer(serializers.ModelSerializer):
         return value
 
 
+class PersonalListSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    """Serializer de solo lectura para el listado de personal: solo los campos editables"""
+
+    class Meta:
+        model = Personal
+        fields = [
+            'id',
+            'nombre',
+            'apellido',
+            'fecha_nacimiento',
+            'telefono',
+            'email',
+            'ci',
+            'codigo_empleado',
+            'fecha_ingreso',
+            'estado',
+            'telefono_emergencia',
+            'contacto_emergencia',
+            'fecha_creacion'
+        ]
+        read_only_fields = fields
+        campos_modelo = CAMPOS_MODELO_PERSONAL
+
+
 class PersonalCreateSerializer(serializers.ModelSerializer):
     """Serializer para crear personal"""
 
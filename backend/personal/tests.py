@@ -128,3 +128,38 @@ class PersonalAPISimpleTest(APITestCase):
         result = personal.cambiar_estado(True)
         self.assertTrue(result)
         self.assertTrue(personal.estado)
+    
+    def test_busqueda_personal(self):
+        """Test de búsqueda (?search=) sobre varios campos"""
+        self.user.is_superuser = True
+        self.user.save()
+        Personal.objects.create(**self.personal_data)
+        
+        response = self.client.get('/api/personal/', {'search': 'juan EMP001'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+        
+        response = self.client.get('/api/personal/', {'search': 'maria'})
+        self.assertEqual(response.data['count'], 0)
+
+    def test_listado_con_fields(self):
+        """El listado usa el serializer liviano y respeta ?fields="""
+        self.user.is_superuser = True
+        self.user.save()
+        Personal.objects.create(**self.personal_data)
+
+        response = self.client.get('/api/personal/')
+        self.assertNotIn('anos_antiguedad', response.data['results'][0])
+
+        response = self.client.get('/api/personal/', {'fields': 'id,nombre,apellido'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'nombre', 'apellido'})
+
+        # Los calculados solo están en el detalle: en el listado es un error, no se descartan
+        response = self.client.get('/api/personal/', {'fields': 'id,nombre_completo,anos_antiguedad'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['fields'], ['Campos no disponibles: anos_antiguedad, nombre_completo'])
+
+        personal = Personal.objects.get()
+        response = self.client.get(f'/api/personal/{personal.pk}/', {'fields': 'id,nombre_completo,anos_antiguedad'})
+        self.assertEqual(response.data['nombre_completo'], 'Juan Pérez')
+        self.assertIn(response.data['anos_antiguedad'], (0, 1))
@@ -6,30 +6,45 @@ from django_filters.rest_framework import DjangoFilterBackend
 from django.db import models
 from django.utils import timezone
 from bitacora.utils import registrar_bitacora
+from core.busqueda import BusquedaFilter
+from core.campos import CamposDinamicosViewMixin
+from core.replicas import LecturaReplicaMixin
 from .models import Personal
 from .serializers import (
     PersonalSerializer,
+    PersonalListSerializer,
     PersonalCreateSerializer,
     PersonalUpdateSerializer,
     PersonalEstadoSerializer
 )
 
 
-class PersonalViewSet(viewsets.ModelViewSet):
-    """ViewSet para el CRUD de personal - Refactorizado"""
+class PersonalViewSet(LecturaReplicaMixin, CamposDinamicosViewMixin, viewsets.ModelViewSet):
+    """ViewSet para el CRUD de personal - Refactorizado (?fields= y ?omit= en list/retrieve)"""
+
+    # Lecturas en una réplica cuando hay (ver core/replicas.py)
+    acciones_replica = ("list", "retrieve", "estadisticas")
     
     queryset = Personal.objects.all()
     serializer_class = PersonalSerializer
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # BusquedaFilter (?search=) va al final: ordena por relevancia si no hay ?ordering=
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, BusquedaFilter]
     filterset_fields = ['estado']
+    # Mismo orden que el índice de la migración 0004_busqueda_trigram
     search_fields = ['nombre', 'apellido', 'email', 'ci', 'codigo_empleado']
-    ordering_fields = ['nombre', 'apellido', 'fecha_creacion', 'fecha_ingreso']
+    ordering_fields = [
+        'nombre', 'apellido', 'fecha_creacion', 'fecha_ingreso',
+        # Anotados en SQL (Personal.objects.con_calculados())
+        'nombre_completo', 'anos_antiguedad',
+    ]
     ordering = ['-fecha_creacion']
 
     def get_serializer_class(self):
         """Retorna el serializer apropiado según la acción"""
-        if self.action == "create":
+        if self.action == "list":
+            return PersonalListSerializer
+        elif self.action == "create":
             return PersonalCreateSerializer
         elif self.action in ["update", "partial_update"]:
             return PersonalUpdateSerializer
@@ -40,6 +55,10 @@ class PersonalViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filtra el queryset según los permisos del usuario"""
         queryset = super().get_queryset()
+        if self.request.method in permissions.SAFE_METHODS:
+            # Calculados en SQL; en las escrituras quedan como propiedades, así
+            # reflejan lo que se acaba de guardar
+            queryset = queryset.con_calculados()
 
         # Si el usuario no tiene permisos para gestionar personal, solo puede ver su propio perfil
         if not self.request.user.tiene_permiso('gestionar_personal'):
@@ -51,7 +70,13 @@ class PersonalViewSet(viewsets.ModelViewSet):
                     return queryset.none()
             except:
                 return queryset.none()
-        
+
+        # Filtros adicionales: antiguedad_min=N / antiguedad_max=N (años)
+        for parametro, lookup in (("antiguedad_min", "gte"), ("antiguedad_max", "lte")):
+            valor = self.request.query_params.get(parametro)
+            if valor is not None and valor.isdigit():
+                queryset = queryset.filter(**{f"anos_antiguedad__{lookup}": int(valor)})
+
         return queryset
     
     def perform_create(self, serializer):
@@ -151,6 +176,9 @@ class PersonalViewSet(viewsets.ModelViewSet):
             'nuevos_este_mes': queryset.filter(
                 fecha_creacion__gte=timezone.now().replace(day=1)
             ).count(),
+            'antiguedad_promedio': round(
+                queryset.aggregate(promedio=models.Avg('anos_antiguedad'))['promedio'] or 0, 1
+            ),
         }
 
         return Response(stats)
@@ -0,0 +1,62 @@
+from django.contrib import admin
+from .models import Reserva, Salida
+
+
+@admin.register(Salida)
+class SalidaAdmin(admin.ModelAdmin):
+    list_display = [
+        'origen',
+        'destino',
+        'fecha_hora',
+        'capacidad',
+        'asientos_disponibles',
+        'estado',
+    ]
+
+    list_filter = [
+        'estado',
+        'fecha_hora',
+    ]
+
+    search_fields = [
+        'origen',
+        'destino',
+    ]
+
+    raw_id_fields = ['conductor']
+    # El inventario solo cambia con las operaciones de reservas/inventario.py
+    readonly_fields = ['asientos_disponibles', 'fecha_creacion']
+
+    def get_readonly_fields(self, request, obj=None):
+        if obj is not None:
+            return [*self.readonly_fields, 'capacidad']
+        return self.readonly_fields
+
+
+@admin.register(Reserva)
+class ReservaAdmin(admin.ModelAdmin):
+    list_display = [
+        'id',
+        'salida',
+        'cliente',
+        'asientos',
+        'estado',
+        'expira_en',
+        'fecha_creacion',
+    ]
+
+    list_filter = [
+        'estado',
+        'fecha_creacion',
+    ]
+
+    search_fields = [
+        'cliente__username',
+        'salida__origen',
+        'salida__destino',
+    ]
+
+    raw_id_fields = ['salida', 'cliente']
+    list_select_related = ['salida', 'cliente']
+    # Los cambios de estado mueven el inventario: se hacen desde la API
+    readonly_fields = ['estado', 'asientos', 'expira_en', 'fecha_creacion', 'fecha_confirmacion']
@@ -0,0 +1,179 @@
+"""
+Inventario de asientos de las salidas y ciclo de vida de las reservas.
+
+Salida.asientos_disponibles es el inventario. Retener descuenta con un único
+UPDATE condicional:
+
+    UPDATE reservas_salida SET asientos_disponibles = asientos_disponibles - n
+    WHERE id = ... AND asientos_disponibles >= n
+
+en lugar de leer, restar en Python y guardar. PostgreSQL serializa los UPDATE
+sobre la fila y cada uno vuelve a evaluar la condición con el valor que dejó el
+anterior: si ya no alcanza, no actualiza nada y la retención se rechaza. Nunca
+se vende de más; el CHECK de la columna (>= 0 y <= capacidad) lo garantiza
+también en la base. La fila de la salida, la más disputada, queda bloqueada
+solo entre ese UPDATE, el INSERT de la reserva y el COMMIT; rechazar a un
+comprador cuando ya no hay cupo cuesta ese único UPDATE.
+
+Una retención vale RESERVAS_RETENCION_MIN minutos:
+
+- confirmar() la vuelve definitiva; es idempotente, confirmar dos veces
+  devuelve la misma reserva confirmada
+- cancelar() devuelve los asientos a la salida
+- liberar_vencidas() marca las vencidas como expiradas y devuelve sus
+  asientos; la corre `manage.py liberar_reservas` (cron, cada minuto) y
+  también retener() cuando no encuentra cupo, sobre esa salida
+
+Los cambios de estado son UPDATE condicionales sobre el estado actual: una
+reserva no puede confirmarse y expirar (o cancelarse dos veces) aunque las
+operaciones lleguen a la vez.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.metricas import RESERVAS
+
+from .models import CANCELADA, CONFIRMADA, EXPIRADA, PROGRAMADA, RETENIDA, Reserva, Salida
+
+
+class ClaveReutilizada(Exception):
+    """La Idempotency-Key ya se usó para retener otra salida u otra cantidad de asientos"""
+
+
+def _retener(salida_id, cliente, asientos, clave):
+    ahora = timezone.now()
+    with transaction.atomic():
+        descontados = Salida.objects.filter(
+            pk=salida_id,
+            estado=PROGRAMADA,
+            fecha_hora__gt=ahora,
+            asientos_disponibles__gte=asientos,
+        ).update(asientos_disponibles=F('asientos_disponibles') - asientos)
+        if not descontados:
+            # Sin cupo: un solo UPDATE que no tocó nada, sin INSERT que deshacer
+            return None
+        return Reserva.objects.create(
+            salida_id=salida_id,
+            cliente=cliente,
+            asientos=asientos,
+            clave_idempotencia=clave,
+            expira_en=ahora + timedelta(minutes=settings.RESERVAS_RETENCION_MIN),
+        )
+
+
+def _hay_vencidas(salida_id):
+    return Reserva.objects.filter(salida_id=salida_id, estado=RETENIDA, expira_en__lte=timezone.now()).exists()
+
+
+def _reintento(existente, salida, asientos):
+    if existente.salida_id != salida.pk or existente.asientos != asientos:
+        raise ClaveReutilizada(
+            f"La clave ya se usó en la reserva {existente.pk}: "
+            f"{existente.asientos} asientos de la salida {existente.salida_id}"
+        )
+    return existente, False
+
+
+def retener(salida, cliente, asientos, clave=None):
+    """
+    Retiene `asientos` de la salida para el cliente. Retorna (reserva, creada):
+    reserva es None si la salida no tiene cupo (o ya salió, o está suspendida).
+    Con `clave` (Idempotency-Key) un reintento devuelve la reserva que ya se
+    creó con esa clave, sin descontar de nuevo; si la clave se usó con otra
+    salida u otros asientos lanza ClaveReutilizada.
+    """
+    if clave:
+        existente = Reserva.objects.filter(cliente=cliente, clave_idempotencia=clave).first()
+        if existente is not None:
+            return _reintento(existente, salida, asientos)
+
+    try:
+        reserva = _retener(salida.pk, cliente, asientos, clave)
+        if reserva is None and _hay_vencidas(salida.pk) and liberar_vencidas(salida_id=salida.pk):
+            # Había retenciones vencidas sin barrer: sus asientos vuelven a la venta
+            reserva = _retener(salida.pk, cliente, asientos, clave)
+    except IntegrityError:
+        if not clave:
+            raise
+        # Un request simultáneo con la misma clave ganó la carrera
+        return _reintento(Reserva.objects.get(cliente=cliente, clave_idempotencia=clave), salida, asientos)
+
+    RESERVAS.labels("retenida" if reserva else "sin_cupo").inc()
+    return reserva, reserva is not None
+
+
+def confirmar(reserva):
+    """
+    Confirma una retención vigente. Idempotente: si ya estaba confirmada la
+    devuelve igual. Retorna None si venció o fue cancelada.
+    """
+    ahora = timezone.now()
+    confirmada = Reserva.objects.filter(pk=reserva.pk, estado=RETENIDA, expira_en__gt=ahora).update(
+        estado=CONFIRMADA, fecha_confirmacion=ahora
+    )
+    if confirmada:
+        RESERVAS.labels("confirmada").inc()
+    reserva.refresh_from_db()
+    return reserva if reserva.estado == CONFIRMADA else None
+
+
+def cancelar(reserva):
+    """
+    Cancela una reserva retenida o confirmada de una salida que todavía no partió
+    y devuelve sus asientos. Retorna None si ya no estaba activa.
+    """
+    with transaction.atomic():
+        cancelada = Reserva.objects.filter(
+            pk=reserva.pk,
+            estado__in=(RETENIDA, CONFIRMADA),
+            salida__fecha_hora__gt=timezone.now(),
+        ).update(estado=CANCELADA)
+        if not cancelada:
+            return None
+        Salida.objects.filter(pk=reserva.salida_id).update(
+            asientos_disponibles=F('asientos_disponibles') + reserva.asientos
+        )
+    RESERVAS.labels("cancelada").inc()
+    reserva.refresh_from_db()
+    return reserva
+
+
+def liberar_vencidas(lote=None, salida_id=None, ahora=None):
+    """
+    Marca como expiradas las retenciones vencidas y devuelve sus asientos, por
+    lotes de `lote` reservas (SKIP LOCKED: varios procesos pueden barrer a la
+    vez). Con salida_id solo las de esa salida. Retorna cuántas liberó.
+    """
+    lote = lote or settings.RESERVAS_LOTE
+    ahora = ahora or timezone.now()
+    total = 0
+    while True:
+        with transaction.atomic():
+            vencidas = Reserva.objects.select_for_update(skip_locked=True).filter(
+                estado=RETENIDA, expira_en__lte=ahora
+            )
+            if salida_id is not None:
+                vencidas = vencidas.filter(salida_id=salida_id)
+            filas = list(vencidas.order_by('expira_en').values_list('id', 'salida_id', 'asientos')[:lote])
+            if filas:
+                Reserva.objects.filter(id__in=[fila[0] for fila in filas]).update(estado=EXPIRADA)
+                por_salida = defaultdict(int)
+                for _, salida, asientos in filas:
+                    por_salida[salida] += asientos
+                # Siempre en orden de id: dos barridos concurrentes no se bloquean en cruz
+                for salida, asientos in sorted(por_salida.items()):
+                    Salida.objects.filter(pk=salida).update(
+                        asientos_disponibles=F('asientos_disponibles') + asientos
+                    )
+        total += len(filas)
+        if len(filas) < lote:
+            break
+
+    if total:
+        RESERVAS.labels("expirada").inc(total)
+    return total
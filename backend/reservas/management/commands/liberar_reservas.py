@@ -0,0 +1,33 @@
+"""
+Libera las retenciones de asientos vencidas y devuelve sus asientos a la venta
+(ver reservas/inventario.py). Pensado para cron, cada minuto:
+
+    * * * * *  python manage.py liberar_reservas
+
+Uso:
+    python manage.py liberar_reservas
+    python manage.py liberar_reservas --lote 200
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from reservas import inventario
+
+
+class Command(BaseCommand):
+    help = 'Marca como expiradas las retenciones vencidas y devuelve sus asientos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=settings.RESERVAS_LOTE,
+            help='Reservas por transacción'
+        )
+
+    def handle(self, *args, **options):
+        liberadas = inventario.liberar_vencidas(lote=options['lote'])
+        if liberadas:
+            self.stdout.write(self.style.SUCCESS(f'🎫 {liberadas} retenciones vencidas liberadas'))
+        else:
+            self.stdout.write('🎫 Sin retenciones vencidas')
@@ -0,0 +1,81 @@
+# Generated by Django 5.0.7 on 2026-10-18 22:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('conductores', '0007_ubicacion_gist'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Salida',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('origen', models.CharField(max_length=100, verbose_name='Origen')),
+                ('destino', models.CharField(max_length=100, verbose_name='Destino')),
+                ('fecha_hora', models.DateTimeField(verbose_name='Fecha y Hora de Salida')),
+                ('capacidad', models.PositiveIntegerField(verbose_name='Capacidad')),
+                ('asientos_disponibles', models.PositiveIntegerField(editable=False, verbose_name='Asientos Disponibles')),
+                ('precio', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Precio por Asiento')),
+                ('estado', models.CharField(choices=[('programada', 'Programada'), ('suspendida', 'Suspendida')], default='programada', max_length=20, verbose_name='Estado')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+                ('conductor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='salidas', to='conductores.conductor', verbose_name='Conductor')),
+            ],
+            options={
+                'verbose_name': 'Salida',
+                'verbose_name_plural': 'Salidas',
+                'ordering': ['fecha_hora'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Reserva',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asientos', models.PositiveSmallIntegerField(verbose_name='Asientos')),
+                ('estado', models.CharField(choices=[('retenida', 'Retenida'), ('confirmada', 'Confirmada'), ('expirada', 'Expirada'), ('cancelada', 'Cancelada')], default='retenida', max_length=20, verbose_name='Estado')),
+                ('clave_idempotencia', models.CharField(blank=True, max_length=64, null=True, verbose_name='Clave de Idempotencia')),
+                ('expira_en', models.DateTimeField(verbose_name='Retención Vence')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+                ('fecha_confirmacion', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Confirmación')),
+                ('cliente', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='reservas', to=settings.AUTH_USER_MODEL, verbose_name='Cliente')),
+                ('salida', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='reservas', to='reservas.salida', verbose_name='Salida')),
+            ],
+            options={
+                'verbose_name': 'Reserva',
+                'verbose_name_plural': 'Reservas',
+                'ordering': ['-fecha_creacion'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='salida',
+            index=models.Index(condition=models.Q(('estado', 'programada')), fields=['fecha_hora'], name='salida_programada_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='salida',
+            constraint=models.CheckConstraint(check=models.Q(('asientos_disponibles__lte', models.F('capacidad'))), name='salida_asientos_lte_capacidad'),
+        ),
+        migrations.AddIndex(
+            model_name='reserva',
+            index=models.Index(fields=['cliente', '-fecha_creacion'], name='reserva_cliente_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reserva',
+            index=models.Index(fields=['salida', 'estado'], name='reserva_salida_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reserva',
+            index=models.Index(condition=models.Q(('estado', 'retenida')), fields=['expira_en'], name='reserva_retenida_expira_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='reserva',
+            constraint=models.UniqueConstraint(condition=models.Q(('clave_idempotencia__isnull', False)), fields=('cliente', 'clave_idempotencia'), name='reserva_clave_unica'),
+        ),
+    ]
@@ -0,0 +1,167 @@
+from django.conf import settings
+from django.db import models
+
+PROGRAMADA = 'programada'
+SUSPENDIDA = 'suspendida'
+
+RETENIDA = 'retenida'
+CONFIRMADA = 'confirmada'
+EXPIRADA = 'expirada'
+CANCELADA = 'cancelada'
+
+
+class Salida(models.Model):
+    """Salida programada de una ruta, con su inventario de asientos"""
+
+    ESTADOS_CHOICES = [
+        (PROGRAMADA, 'Programada'),
+        (SUSPENDIDA, 'Suspendida'),
+    ]
+
+    origen = models.CharField(max_length=100, verbose_name="Origen")
+    destino = models.CharField(max_length=100, verbose_name="Destino")
+    fecha_hora = models.DateTimeField(verbose_name="Fecha y Hora de Salida")
+
+    conductor = models.ForeignKey(
+        'conductores.Conductor',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='salidas',
+        verbose_name="Conductor"
+    )
+
+    capacidad = models.PositiveIntegerField(verbose_name="Capacidad")
+
+    # Inventario: solo cambia con UPDATE condicionales (ver reservas/inventario.py)
+    asientos_disponibles = models.PositiveIntegerField(
+        editable=False,
+        verbose_name="Asientos Disponibles"
+    )
+
+    precio = models.DecimalField(max_digits=10, decimal_places=2, default=0, verbose_name="Precio por Asiento")
+
+    estado = models.CharField(
+        max_length=20,
+        choices=ESTADOS_CHOICES,
+        default=PROGRAMADA,
+        verbose_name="Estado"
+    )
+
+    fecha_creacion = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Creación")
+
+    class Meta:
+        verbose_name = "Salida"
+        verbose_name_plural = "Salidas"
+        ordering = ['fecha_hora']
+        indexes = [
+            # Listado de próximas salidas
+            models.Index(
+                fields=['fecha_hora'],
+                name='salida_programada_idx',
+                condition=models.Q(estado=PROGRAMADA),
+            ),
+        ]
+        constraints = [
+            # Junto con el CHECK >= 0 de PositiveIntegerField: el inventario nunca sale de rango
+            models.CheckConstraint(
+                check=models.Q(asientos_disponibles__lte=models.F('capacidad')),
+                name='salida_asientos_lte_capacidad',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.origen} → {self.destino} ({self.fecha_hora:%Y-%m-%d %H:%M})"
+
+    def save(self, *args, **kwargs):
+        """Una salida nueva empieza con todos los asientos disponibles"""
+        if self._state.adding and self.asientos_disponibles is None:
+            self.asientos_disponibles = self.capacidad
+        super().save(*args, **kwargs)
+
+
+class ReservaQuerySet(models.QuerySet):
+    """Consultas reutilizables de reservas"""
+
+    def visibles_para(self, user):
+        """Todas las reservas si el usuario gestiona viajes; si no, solo las propias"""
+        if user.tiene_permiso("gestionar_viajes"):
+            return self
+        return self.filter(cliente=user)
+
+
+class Reserva(models.Model):
+    """Asientos de una salida retenidos o comprados por un cliente"""
+
+    ESTADOS_CHOICES = [
+        (RETENIDA, 'Retenida'),
+        (CONFIRMADA, 'Confirmada'),
+        (EXPIRADA, 'Expirada'),
+        (CANCELADA, 'Cancelada'),
+    ]
+
+    salida = models.ForeignKey(
+        Salida,
+        on_delete=models.PROTECT,
+        related_name='reservas',
+        verbose_name="Salida",
+        # Lo cubre el índice (salida, estado)
+        db_index=False,
+    )
+
+    cliente = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.PROTECT,
+        related_name='reservas',
+        verbose_name="Cliente",
+        # Lo cubre el índice (cliente, -fecha_creacion)
+        db_index=False,
+    )
+
+    asientos = models.PositiveSmallIntegerField(verbose_name="Asientos")
+
+    estado = models.CharField(
+        max_length=20,
+        choices=ESTADOS_CHOICES,
+        default=RETENIDA,
+        verbose_name="Estado"
+    )
+
+    # Header Idempotency-Key del POST: un reintento devuelve la misma reserva
+    clave_idempotencia = models.CharField(
+        max_length=64,
+        null=True,
+        blank=True,
+        verbose_name="Clave de Idempotencia"
+    )
+
+    expira_en = models.DateTimeField(verbose_name="Retención Vence")
+    fecha_creacion = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Creación")
+    fecha_confirmacion = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de Confirmación")
+
+    objects = ReservaQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Reserva"
+        verbose_name_plural = "Reservas"
+        ordering = ['-fecha_creacion']
+        indexes = [
+            models.Index(fields=['cliente', '-fecha_creacion'], name='reserva_cliente_fecha_idx'),
+            models.Index(fields=['salida', 'estado'], name='reserva_salida_estado_idx'),
+            # Barrido de retenciones vencidas (liberar_reservas): solo las retenidas
+            models.Index(
+                fields=['expira_en'],
+                name='reserva_retenida_expira_idx',
+                condition=models.Q(estado=RETENIDA),
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['cliente', 'clave_idempotencia'],
+                name='reserva_clave_unica',
+                condition=models.Q(clave_idempotencia__isnull=False),
+            ),
+        ]
+
+    def __str__(self):
+        return f"Reserva {self.pk} - {self.asientos} asientos - {self.get_estado_display()}"
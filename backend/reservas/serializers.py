@@ -0,0 +1,72 @@
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import serializers
+
+from .models import Reserva, Salida
+
+
+class SalidaSerializer(serializers.ModelSerializer):
+    """Serializer para el modelo Salida (la capacidad solo se fija al crear)"""
+
+    class Meta:
+        model = Salida
+        fields = [
+            'id',
+            'origen',
+            'destino',
+            'fecha_hora',
+            'conductor',
+            'capacidad',
+            'asientos_disponibles',
+            'precio',
+            'estado',
+            'fecha_creacion',
+        ]
+        read_only_fields = ['asientos_disponibles', 'fecha_creacion']
+
+    def get_extra_kwargs(self):
+        extra_kwargs = super().get_extra_kwargs()
+        if self.instance is not None:
+            # Cambiarla movería el inventario fuera de los UPDATE condicionales
+            extra_kwargs['capacidad'] = {**extra_kwargs.get('capacidad', {}), 'read_only': True}
+        return extra_kwargs
+
+    def validate_fecha_hora(self, value):
+        if self.instance is None and value <= timezone.now():
+            raise serializers.ValidationError("La salida debe ser a futuro")
+        return value
+
+
+class ReservaSerializer(serializers.ModelSerializer):
+    """Serializer para el modelo Reserva"""
+
+    salida_detalle = serializers.CharField(source='salida.__str__', read_only=True)
+
+    class Meta:
+        model = Reserva
+        fields = [
+            'id',
+            'salida',
+            'salida_detalle',
+            'cliente',
+            'asientos',
+            'estado',
+            'expira_en',
+            'fecha_creacion',
+            'fecha_confirmacion',
+        ]
+        read_only_fields = fields
+
+
+class ReservaCreateSerializer(serializers.Serializer):
+    """Retención de asientos: el inventario lo descuenta reservas.inventario.retener"""
+
+    salida = serializers.PrimaryKeyRelatedField(queryset=Salida.objects.all())
+    asientos = serializers.IntegerField(min_value=1)
+
+    def validate_asientos(self, value):
+        if value > settings.RESERVAS_MAX_ASIENTOS:
+            raise serializers.ValidationError(
+                f"No se pueden reservar más de {settings.RESERVAS_MAX_ASIENTOS} asientos por reserva"
+            )
+        return value
@@ -0,0 +1,164 @@
+import random
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Sum
+from django.test import TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from users.models import Rol
+
+from . import inventario
+from .models import CONFIRMADA, EXPIRADA, RETENIDA, Reserva, Salida
+
+User = get_user_model()
+
+
+def crear_salida(capacidad, **kwargs):
+    return Salida.objects.create(
+        origen="Santa Cruz", destino="Cochabamba",
+        fecha_hora=timezone.now() + timedelta(days=1), capacidad=capacidad, **kwargs,
+    )
+
+
+class ReservasTest(APITestCase):
+    """Inventario de asientos con UPDATE condicionales (reservas/inventario.py)"""
+
+    def setUp(self):
+        rol = Rol.objects.create(nombre="Pasajero", permisos=["reservar_asiento"])
+        self.cliente = User.objects.create_user(username="pasajero", email="pasajero@test.com", rol=rol)
+        self.client.force_authenticate(self.cliente)
+        self.salida = crear_salida(3)
+
+    def _reservar(self, asientos, clave=None):
+        headers = {"Idempotency-Key": clave} if clave else {}
+        return self.client.post(
+            "/api/reservas/", {"salida": self.salida.pk, "asientos": asientos}, format="json", headers=headers
+        )
+
+    def _disponibles(self):
+        self.salida.refresh_from_db()
+        return self.salida.asientos_disponibles
+
+    def test_retener_descuenta_y_sin_cupo(self):
+        response = self._reservar(2)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["estado"], RETENIDA)
+        self.assertEqual(self._disponibles(), 1)
+
+        self.assertEqual(self._reservar(2).status_code, 409)
+        self.assertEqual(self._disponibles(), 1)
+        self.assertEqual(Reserva.objects.count(), 1)
+
+    def test_creacion_idempotente(self):
+        primera = self._reservar(1, clave="compra-1")
+        repetida = self._reservar(1, clave="compra-1")
+        self.assertEqual(primera.status_code, 201)
+        self.assertEqual(repetida.status_code, 200)
+        self.assertEqual(repetida.data["id"], primera.data["id"])
+        self.assertEqual(self._disponibles(), 2)
+
+    def test_clave_reutilizada_con_otros_datos(self):
+        primera = self._reservar(1, clave="compra-1")
+        self.assertEqual(self._reservar(2, clave="compra-1").status_code, 422)
+        otra_salida = crear_salida(3)
+        response = self.client.post(
+            "/api/reservas/", {"salida": otra_salida.pk, "asientos": 1}, format="json",
+            headers={"Idempotency-Key": "compra-1"},
+        )
+        self.assertEqual(response.status_code, 422)
+        self.assertIn(str(primera.data["id"]), response.data["error"])
+        self.assertEqual(self._disponibles(), 2)
+        otra_salida.refresh_from_db()
+        self.assertEqual(otra_salida.asientos_disponibles, 3)
+
+    def test_confirmar_idempotente(self):
+        reserva_id = self._reservar(1).data["id"]
+        for _ in range(2):
+            response = self.client.post(f"/api/reservas/{reserva_id}/confirmar/")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data["estado"], CONFIRMADA)
+        self.assertEqual(self._disponibles(), 2)
+
+        # Cancelar devuelve los asientos una sola vez
+        self.assertEqual(self.client.post(f"/api/reservas/{reserva_id}/cancelar/").status_code, 200)
+        self.assertEqual(self.client.post(f"/api/reservas/{reserva_id}/cancelar/").status_code, 409)
+        self.assertEqual(self._disponibles(), 3)
+
+    def test_retencion_vencida(self):
+        reserva_id = self._reservar(3).data["id"]
+        Reserva.objects.filter(pk=reserva_id).update(expira_en=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.client.post(f"/api/reservas/{reserva_id}/confirmar/").status_code, 409)
+
+        salida_comando = StringIO()
+        call_command("liberar_reservas", stdout=salida_comando)
+        self.assertIn("1 retenciones vencidas liberadas", salida_comando.getvalue())
+        self.assertEqual(Reserva.objects.get(pk=reserva_id).estado, EXPIRADA)
+        self.assertEqual(self._disponibles(), 3)
+        # Una segunda pasada no devuelve los asientos otra vez
+        self.assertEqual(inventario.liberar_vencidas(), 0)
+        self.assertEqual(self._disponibles(), 3)
+
+    def test_sin_cupo_libera_las_vencidas_de_la_salida(self):
+        vencida = self._reservar(3).data["id"]
+        Reserva.objects.filter(pk=vencida).update(expira_en=timezone.now() - timedelta(seconds=1))
+        response = self._reservar(2)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Reserva.objects.get(pk=vencida).estado, EXPIRADA)
+        self.assertEqual(self._disponibles(), 1)
+
+    def test_salidas_y_permisos(self):
+        self.assertEqual(self.client.get("/api/reservas/salidas/").data["count"], 1)
+        self.assertEqual(
+            self.client.post("/api/reservas/salidas/", {"origen": "A", "destino": "B"}).status_code, 403
+        )
+        self.client.force_authenticate(User.objects.create_user(username="sin_rol", email="x@test.com"))
+        self.assertEqual(self._reservar(1).status_code, 403)
+        self.assertEqual(self.client.get("/api/reservas/").data["count"], 0)
+
+
+@skipUnless(connections[DEFAULT_DB_ALIAS].vendor == "postgresql", "concurrencia real de PostgreSQL")
+class ReservasConcurrentesTest(TransactionTestCase):
+    """Cientos de compradores a la vez contra una salida: nunca se vende de más"""
+
+    COMPRADORES = 200
+    CONEXIONES = 20
+
+    def test_sin_sobreventa(self):
+        cliente = User.objects.create_user(username="comprador", email="comprador@test.com")
+        salida = crear_salida(50)
+        azar = random.Random(50)
+        pedidos = [azar.randint(1, 3) for _ in range(self.COMPRADORES)]
+        compras = []
+        barrera = threading.Barrier(self.CONEXIONES)
+
+        def comprar(lote):
+            try:
+                barrera.wait()
+                for asientos in lote:
+                    reserva, _ = inventario.retener(salida, cliente, asientos)
+                    compras.append(reserva is not None and inventario.confirmar(reserva) is not None)
+            finally:
+                connections.close_all()
+
+        hilos = [
+            threading.Thread(target=comprar, args=(pedidos[i::self.CONEXIONES],)) for i in range(self.CONEXIONES)
+        ]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        salida.refresh_from_db()
+        vendidos = Reserva.objects.filter(salida=salida, estado=CONFIRMADA).aggregate(total=Sum("asientos"))["total"]
+        self.assertEqual(vendidos, salida.capacidad - salida.asientos_disponibles)
+        self.assertLessEqual(vendidos, salida.capacidad)
+        self.assertEqual(Reserva.objects.filter(salida=salida).count(), sum(compras))
+        # La demanda (~400 asientos) supera la capacidad: solo pueden quedar restos menores a 3
+        self.assertLess(salida.asientos_disponibles, 3)
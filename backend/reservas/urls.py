@@ -0,0 +1,12 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import ReservaViewSet, SalidaViewSet
+
+router = DefaultRouter()
+# Antes que las reservas: /salidas/ no debe resolverse como detalle de una reserva
+router.register(r'salidas', SalidaViewSet, basename='salidas')
+router.register(r'', ReservaViewSet, basename='reservas')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -0,0 +1,183 @@
+from django.utils import timezone
+from rest_framework import mixins, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from bitacora.utils import registrar_bitacora
+from core.replicas import LecturaReplicaMixin
+
+from . import inventario
+from .models import PROGRAMADA, RETENIDA, Reserva, Salida
+from .serializers import ReservaCreateSerializer, ReservaSerializer, SalidaSerializer
+
+# Header con el que el cliente hace idempotente la creación de una reserva
+HEADER_IDEMPOTENCIA = "Idempotency-Key"
+
+
+class SalidaViewSet(LecturaReplicaMixin, viewsets.ModelViewSet):
+    """Salidas programadas con su inventario de asientos (escritura: gestionar_viajes)"""
+
+    queryset = Salida.objects.all()
+    serializer_class = SalidaSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        """Próximas salidas programadas; ?origen=, ?destino=, ?con_cupo=true, ?todas=true"""
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        if self.action == "list" and params.get("todas", "").lower() != "true":
+            queryset = queryset.filter(estado=PROGRAMADA, fecha_hora__gt=timezone.now())
+        if params.get("origen"):
+            queryset = queryset.filter(origen__iexact=params["origen"])
+        if params.get("destino"):
+            queryset = queryset.filter(destino__iexact=params["destino"])
+        if params.get("con_cupo", "").lower() == "true":
+            queryset = queryset.filter(asientos_disponibles__gt=0)
+        return queryset
+
+    def check_permissions(self, request):
+        super().check_permissions(request)
+        if request.method not in permissions.SAFE_METHODS and not request.user.tiene_permiso("gestionar_viajes"):
+            self.permission_denied(request, message="No tienes permisos para gestionar salidas")
+
+    def perform_create(self, serializer):
+        """Crear una salida"""
+        salida = serializer.save()
+        registrar_bitacora(
+            request=self.request,
+            usuario=self.request.user,
+            accion="Crear",
+            descripcion=f"Se creó la salida {salida}",
+            modulo="RESERVAS",
+        )
+
+    def perform_destroy(self, instance):
+        """Solo se eliminan salidas sin reservas; con reservas se suspenden"""
+        if instance.reservas.exists():
+            raise ValidationError(
+                {"error": "La salida tiene reservas: cambie su estado a suspendida"}
+            )
+        instance.delete()
+
+
+class ReservaViewSet(
+    LecturaReplicaMixin,
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Reservas de asientos: POST retiene (con Idempotency-Key opcional), confirmar
+    la vuelve definitiva y cancelar devuelve los asientos (ver reservas/inventario.py)
+    """
+
+    queryset = Reserva.objects.select_related('salida')
+    serializer_class = ReservaSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    # Los ids numéricos no chocan con /salidas/ (mismo prefijo en urls.py)
+    lookup_value_regex = r'\d+'
+
+    def get_serializer_class(self):
+        """Retorna el serializer apropiado según la acción"""
+        if self.action == "create":
+            return ReservaCreateSerializer
+        return ReservaSerializer
+
+    def get_queryset(self):
+        """Reservas visibles para el usuario, filtrables por ?estado= y ?salida="""
+        queryset = super().get_queryset().visibles_para(self.request.user)
+        estado = self.request.query_params.get("estado")
+        if estado:
+            queryset = queryset.filter(estado=estado)
+        salida = self.request.query_params.get("salida")
+        if salida and salida.isdigit():
+            queryset = queryset.filter(salida_id=int(salida))
+        return queryset
+
+    def create(self, request, *args, **kwargs):
+        """Retener asientos de una salida"""
+        if not request.user.tiene_permiso("reservar_asiento"):
+            return Response(
+                {"error": "No tienes permisos para reservar asientos"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        clave = request.headers.get(HEADER_IDEMPOTENCIA) or None
+        if clave and len(clave) > 64:
+            return Response(
+                {"error": f"{HEADER_IDEMPOTENCIA} admite hasta 64 caracteres"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            reserva, creada = inventario.retener(
+                serializer.validated_data["salida"], request.user, serializer.validated_data["asientos"], clave
+            )
+        except inventario.ClaveReutilizada as e:
+            return Response({"error": str(e)}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+        if reserva is None:
+            return Response(
+                {"error": "No quedan asientos suficientes en esta salida"},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        if creada:
+            registrar_bitacora(
+                request=request,
+                usuario=request.user,
+                accion="Retener asientos",
+                descripcion=f"Reserva {reserva.pk}: {reserva.asientos} asientos de la salida {reserva.salida_id}",
+                modulo="RESERVAS",
+            )
+        return Response(
+            ReservaSerializer(reserva).data,
+            status=status.HTTP_201_CREATED if creada else status.HTTP_200_OK,
+        )
+
+    @action(detail=True, methods=["post"])
+    def confirmar(self, request, pk=None):
+        """Confirmar una retención vigente (repetirlo devuelve la misma reserva)"""
+        reserva = self.get_object()
+        estado_anterior = reserva.estado
+        confirmada = inventario.confirmar(reserva)
+        if confirmada is None:
+            vencida = reserva.estado == RETENIDA
+            return Response(
+                {"error": "La retención venció" if vencida else f"La reserva está {reserva.get_estado_display().lower()}"},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        if estado_anterior == RETENIDA:
+            registrar_bitacora(
+                request=request,
+                usuario=request.user,
+                accion="Confirmar reserva",
+                descripcion=f"Reserva {reserva.pk} confirmada",
+                modulo="RESERVAS",
+            )
+        return Response(ReservaSerializer(confirmada).data)
+
+    @action(detail=True, methods=["post"])
+    def cancelar(self, request, pk=None):
+        """Cancelar una reserva y devolver sus asientos"""
+        reserva = self.get_object()
+        cancelada = inventario.cancelar(reserva)
+        if cancelada is None:
+            reserva.refresh_from_db(fields=['estado'])
+            return Response(
+                {"error": f"La reserva está {reserva.get_estado_display().lower()} o la salida ya partió"},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        registrar_bitacora(
+            request=request,
+            usuario=request.user,
+            accion="Cancelar reserva",
+            descripcion=f"Reserva {reserva.pk} cancelada: {reserva.asientos} asientos devueltos",
+            modulo="RESERVAS",
+        )
+        return Response(ReservaSerializer(cancelada).data)
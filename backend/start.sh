@@ -0,0 +1,46 @@
+#!/usr/bin/env bash
+# Arranca el servidor de aplicación según SERVER_MODE:
+#   dev  -> runserver de Django (un proceso, autoreload; solo desarrollo)
+#   wsgi -> gunicorn con workers sync/gthread sobre core.wsgi
+#   asgi -> gunicorn con workers de uvicorn sobre core.asgi
+# Los parámetros de gunicorn (workers, hilos, reciclaje...) están en gunicorn.conf.py
+set -e
+
+cd "$(dirname "$0")"
+
+SERVER_MODE="${SERVER_MODE:-wsgi}"
+PORT="${PORT:-8000}"
+export PORT
+
+# Métricas de Prometheus multiproceso (core/metricas.py): cada worker de gunicorn
+# escribe en este directorio y /metrics suma todos. Se vacía en cada arranque.
+if [ "$SERVER_MODE" != "dev" ]; then
+  export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus_multiproc}"
+  rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+  mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
+case "$SERVER_MODE" in
+  dev)
+    echo "🛠️ [start] runserver en 0.0.0.0:${PORT}"
+    exec python manage.py runserver "0.0.0.0:${PORT}"
+    ;;
+  wsgi)
+    echo "🚀 [start] gunicorn WSGI (${GUNICORN_WORKER_CLASS:-gthread}) en 0.0.0.0:${PORT}"
+    exec gunicorn core.wsgi:application -c gunicorn.conf.py
+    ;;
+  asgi)
+    echo "⚡ [start] gunicorn + uvicorn ASGI en 0.0.0.0:${PORT}"
+    # Bajo ASGI las conexiones persistentes de Django no se reutilizan entre requests
+    # y se acumulan hasta agotar max_connections: una conexión por request
+    # (idealmente detrás de PgBouncer, DB_POOL_MODE=pgbouncer)
+    export DB_CONN_MAX_AGE=0
+    # Vistas async nativas para las lecturas más usadas (ver settings.ASYNC_VIEWS)
+    export DJANGO_ASYNC_VIEWS="${DJANGO_ASYNC_VIEWS:-1}"
+    exec gunicorn core.asgi:application -c gunicorn.conf.py -k uvicorn_worker.UvicornWorker
+    ;;
+  *)
+    echo "❌ [start] SERVER_MODE desconocido: ${SERVER_MODE} (usa dev, wsgi o asgi)" >&2
+    exit 1
+    ;;
+esac
@@ -25,4 +25,7 @@ class UsersConfig(AppConfig):
         # Django maneja automáticamente:
         # - date_joined: Se establece al crear el usuario
         # - last_login: Se actualiza automáticamente en cada login
-        pass
\ No newline at end of file
+
+        # Catálogo de permisos: se serializa una vez por proceso, no por request
+        from . import catalogo_permisos
+        catalogo_permisos.catalogo()
\ No newline at end of file
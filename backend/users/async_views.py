@@ -0,0 +1,48 @@
+"""
+ASYNC_VIEWS.PY - VERSIONES ASYNC DE LAS VISTAS DE LECTURA MÁS USADAS
+
+RESPONSABILIDADES:
+- user_info y dashboard_data con el ORM async (modo ASGI)
+
+Se enrutan en lugar de las versiones de auth.py cuando settings.ASYNC_VIEWS
+está activo; ambas comparten la construcción de la respuesta.
+"""
+
+from core.async_api import api_async, respuesta_json
+from viajes.models import CONTEOS_CLIENTE
+from .auth import (
+    _get_admin_stats_querysets,
+    _get_cliente_stats_queryset,
+    _get_dashboard_base,
+    _get_user_info_data,
+)
+
+
+@api_async()
+async def user_info(request):
+    """
+    Información del usuario autenticado (async)
+    El rol llega cargado desde la autenticación: no hay consultas adicionales
+    """
+    return respuesta_json(_get_user_info_data(request.user))
+
+
+@api_async(replica=True)
+async def dashboard_data(request):
+    """
+    Datos del dashboard según el tipo de usuario (async)
+    """
+    user = request.user
+    data = _get_dashboard_base(user)
+
+    if user.es_administrativo:
+        estadisticas = {}
+        for seccion, conteos in _get_admin_stats_querysets(user).items():
+            estadisticas[seccion] = {
+                nombre: await queryset.acount() for nombre, queryset in conteos.items()
+            }
+        data['estadisticas'] = estadisticas
+    else:
+        data['estadisticas'] = await _get_cliente_stats_queryset(user).aaggregate(**CONTEOS_CLIENTE)
+
+    return respuesta_json(data)
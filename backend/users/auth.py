@@ -19,12 +19,16 @@ from rest_framework import status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
+from .tokens import RefreshToken
 from django.contrib.auth import authenticate
 from django.utils import timezone
 from bitacora.utils import registrar_bitacora
+from core.metricas import LOGINS
+from core.replicas import lectura_en_replica
+from viajes.models import CONTEOS_CLIENTE, Viaje
 from .models import Rol
 from .serializers import UserSerializer
+from .throttling import LoginIPThrottle, LoginUsuarioThrottle
 
 
 class UniversalLoginView(APIView):
@@ -34,6 +38,8 @@ class UniversalLoginView(APIView):
     """
     
     permission_classes = [permissions.AllowAny]
+    # Se rechaza por IP/usuario antes de llegar al hash de authenticate()
+    throttle_classes = [LoginIPThrottle, LoginUsuarioThrottle]
     
     def post(self, request):
         username = request.data.get('username')
@@ -53,6 +59,7 @@ class UniversalLoginView(APIView):
         user = authenticate(username=login_field, password=password)
         
         if not user:
+            LOGINS.labels("fallido").inc()
             return Response(
                 {'error': 'Credenciales inválidas'},
                 status=status.HTTP_401_UNAUTHORIZED
@@ -60,11 +67,14 @@ class UniversalLoginView(APIView):
         
         # Verificar que el usuario esté activo
         if not user.is_active:
+            LOGINS.labels("inactivo").inc()
             return Response(
                 {'error': 'Usuario inactivo'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
+        LOGINS.labels("exitoso").inc()
+
         # Generar tokens JWT
         refresh = RefreshToken.for_user(user)
         access_token = refresh.access_token
@@ -160,8 +170,33 @@ def user_info(request):
     Información del usuario autenticado
     Retorna datos específicos según el tipo de usuario
     """
+    return Response(_get_user_info_data(request.user))
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+@lectura_en_replica
+def dashboard_data(request):
+    """
+    Datos del dashboard según el tipo de usuario
+    Retorna información específica para cada tipo de usuario
+    """
     user = request.user
+    data = _get_dashboard_base(user)
+    
+    if user.es_administrativo:
+        data['estadisticas'] = _get_admin_stats(user)
+    else:
+        data['estadisticas'] = _get_cliente_stats(user)
     
+    return Response(data)
+
+
+def _get_user_info_data(user):
+    """
+    Arma la respuesta de user_info (compartida por la vista sync y la async).
+    No consulta la base de datos si el usuario ya trae su rol cargado.
+    """
     # Información básica
     data = {
         'id': user.id,
@@ -222,39 +257,27 @@ def user_info(request):
         data['fecha_nacimiento'] = user.fecha_nacimiento
         data['ci'] = user.ci
     
-    return Response(data)
+    return data
 
 
-@api_view(['GET'])
-@permission_classes([permissions.IsAuthenticated])
-def dashboard_data(request):
-    """
-    Datos del dashboard según el tipo de usuario
-    Retorna información específica para cada tipo de usuario
-    """
-    user = request.user
-    
+def _get_dashboard_base(user):
+    """Datos del dashboard que no requieren consultas (menú, rol y permisos)"""
     if user.es_administrativo:
         # Dashboard administrativo
-        data = {
+        return {
             'tipo_usuario': 'administrativo',
             'rol': user.rol.nombre if user.rol else 'Sin rol',
             'permisos': user.get_permisos(),
             'departamento': getattr(user, 'departamento', None),
             'codigo_empleado': getattr(user, 'codigo_empleado', None),
             'menu_items': _get_admin_menu_items(user),
-            'estadisticas': _get_admin_stats(user)
-        }
-    else:
-        # Dashboard cliente
-        data = {
-            'tipo_usuario': 'cliente',
-            'rol': user.rol.nombre if user.rol else 'Sin rol',
-            'menu_items': _get_cliente_menu_items(),
-            'estadisticas': _get_cliente_stats(user)
         }
-    
-    return Response(data)
+    # Dashboard cliente
+    return {
+        'tipo_usuario': 'cliente',
+        'rol': user.rol.nombre if user.rol else 'Sin rol',
+        'menu_items': _get_cliente_menu_items(),
+    }
 
 
 def _get_admin_menu_items(user):
@@ -348,31 +371,34 @@ def _get_cliente_menu_items():
     ]
 
 
-def _get_admin_stats(user):
-    """Obtiene estadísticas para el dashboard administrativo"""
-    stats = {}
+def _get_admin_stats_querysets(user):
+    """
+    Querysets (sin evaluar) de las estadísticas del dashboard administrativo,
+    agrupados por sección. La vista sync los evalúa con count() y la async con acount().
+    """
+    querysets = {}
     
     # Estadísticas de usuarios
     if user.tiene_permiso('gestionar_usuarios'):
         from django.contrib.auth import get_user_model
         User = get_user_model()
         
-        stats['usuarios'] = {
-            'total': User.objects.count(),
-            'activos': User.objects.filter(is_active=True).count(),
-            'administrativos': User.objects.filter(rol__es_administrativo=True).count(),
-            'clientes': User.objects.filter(rol__es_administrativo=False).count()
+        querysets['usuarios'] = {
+            'total': User.objects.all(),
+            'activos': User.objects.filter(is_active=True),
+            'administrativos': User.objects.filter(rol__es_administrativo=True),
+            'clientes': User.objects.filter(rol__es_administrativo=False)
         }
     
     # Estadísticas de conductores
     if user.tiene_permiso('ver_conductores'):
         try:
             from conductores.models import Conductor
-            stats['conductores'] = {
-                'total': Conductor.objects.count(),
-                'activos': Conductor.objects.filter(usuario__is_active=True).count(),
-                'disponibles': Conductor.objects.filter(estado='disponible', usuario__is_active=True).count(),
-                'ocupados': Conductor.objects.filter(estado='ocupado', usuario__is_active=True).count()
+            querysets['conductores'] = {
+                'total': Conductor.objects.all(),
+                'activos': Conductor.objects.filter(usuario_conductor__is_active=True),
+                'disponibles': Conductor.objects.filter(estado='disponible', usuario_conductor__is_active=True),
+                'ocupados': Conductor.objects.filter(estado='ocupado', usuario_conductor__is_active=True)
             }
         except ImportError:
             pass
@@ -381,23 +407,30 @@ def _get_admin_stats(user):
     if user.tiene_permiso('ver_personal'):
         try:
             from personal.models import Personal
-            stats['personal'] = {
-                'total': Personal.objects.count(),
-                'activos': Personal.objects.filter(estado=True).count(),
-                'inactivos': Personal.objects.filter(estado=False).count()
+            querysets['personal'] = {
+                'total': Personal.objects.all(),
+                'activos': Personal.objects.filter(estado=True),
+                'inactivos': Personal.objects.filter(estado=False)
             }
         except ImportError:
             pass
     
-    return stats
+    return querysets
 
 
-def _get_cliente_stats(user):
-    """Obtiene estadísticas para el dashboard del cliente"""
-    # Aquí puedes agregar estadísticas específicas del cliente
-    # como número de viajes, viajes pendientes, etc.
+def _get_admin_stats(user):
+    """Obtiene estadísticas para el dashboard administrativo"""
     return {
-        'viajes_totales': 0,  # Implementar según tu lógica de negocio
-        'viajes_pendientes': 0,
-        'viajes_completados': 0
+        seccion: {nombre: queryset.count() for nombre, queryset in conteos.items()}
+        for seccion, conteos in _get_admin_stats_querysets(user).items()
     }
+
+
+def _get_cliente_stats_queryset(user):
+    """Viajes del cliente; se agregan con CONTEOS_CLIENTE (aggregate o aaggregate)"""
+    return Viaje.objects.filter(cliente=user).order_by()
+
+
+def _get_cliente_stats(user):
+    """Obtiene estadísticas para el dashboard del cliente (una sola consulta)"""
+    return _get_cliente_stats_queryset(user).aggregate(**CONTEOS_CLIENTE)
@@ -0,0 +1,112 @@
+"""
+Catálogo de permisos para el frontend (GET /api/permissions/ y /api/permissions/groups/)
+
+Los permisos salen de users.constants y no cambian entre deploys: las dos
+respuestas se arman y serializan una sola vez al iniciar (UsersConfig.ready) y
+las vistas solo devuelven los bytes ya renderizados.
+
+Cada respuesta lleva un ETag derivado de DEPLOY_ID y del contenido, y
+Cache-Control privado por PERMISOS_CACHE_SEG: el navegador no vuelve a pedir el
+catálogo durante ese tiempo y, al revalidar con If-None-Match, recibe un 304 sin
+cuerpo. Un deploy nuevo cambia el ETag aunque el catálogo sea el mismo.
+"""
+import hashlib
+from functools import cache
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+
+from core.json_api import ORJSONRenderer
+
+from .constants import (
+    ALL_PERMISSIONS,
+    AUDIT_PERMISSIONS,
+    AUTH_PERMISSIONS,
+    CLIENT_PERMISSIONS,
+    DASHBOARD_PERMISSIONS,
+    DRIVER_MANAGEMENT_PERMISSIONS,
+    REPORT_PERMISSIONS,
+    ROLE_MANAGEMENT_PERMISSIONS,
+    STAFF_MANAGEMENT_PERMISSIONS,
+    TRIP_MANAGEMENT_PERMISSIONS,
+    USER_MANAGEMENT_PERMISSIONS,
+)
+
+GRUPOS = {
+    'Autenticación': AUTH_PERMISSIONS,
+    'Gestión de Usuarios': USER_MANAGEMENT_PERMISSIONS,
+    'Gestión de Roles': ROLE_MANAGEMENT_PERMISSIONS,
+    'Gestión de Conductores': DRIVER_MANAGEMENT_PERMISSIONS,
+    'Gestión de Personal': STAFF_MANAGEMENT_PERMISSIONS,
+    'Gestión de Viajes': TRIP_MANAGEMENT_PERMISSIONS,
+    'Reportes': REPORT_PERMISSIONS,
+    'Dashboard': DASHBOARD_PERMISSIONS,
+    'Cliente': CLIENT_PERMISSIONS,
+    'Bitácora': AUDIT_PERMISSIONS,
+}
+
+TODOS = "todos"
+POR_GRUPO = "grupos"
+
+
+def _formatear(permisos, content_type):
+    """Formato esperado por el frontend; los ids son posicionales"""
+    return [
+        {
+            'id': i + 1,
+            'name': permiso.replace('_', ' ').title(),
+            'codename': permiso,
+            'content_type': content_type,
+        }
+        for i, permiso in enumerate(permisos)
+    ]
+
+
+def datos():
+    """Las dos respuestas del catálogo como estructuras de Python"""
+    return {
+        TODOS: _formatear(ALL_PERMISSIONS, 'custom_permission'),
+        POR_GRUPO: {
+            nombre: _formatear(permisos, nombre.lower().replace(' ', '_'))
+            for nombre, permisos in GRUPOS.items()
+        },
+    }
+
+
+def construir(deploy_id):
+    """{recurso: (cuerpo en bytes, etag)} para un deploy dado"""
+    renderer = ORJSONRenderer()
+    catalogo = {}
+    for recurso, contenido in datos().items():
+        cuerpo = renderer.render(contenido)
+        resumen = hashlib.sha256(f"{deploy_id}:{recurso}:".encode() + cuerpo).hexdigest()[:20]
+        catalogo[recurso] = (cuerpo, f'"{resumen}"')
+    return catalogo
+
+
+@cache
+def catalogo():
+    """Catálogo del proceso; se arma en UsersConfig.ready"""
+    return construir(settings.DEPLOY_ID)
+
+
+def _coincide(if_none_match, etag):
+    """Comparación débil de If-None-Match: la compresión publica el ETag como W/"..." """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(candidato.strip().removeprefix("W/") == etag for candidato in if_none_match.split(","))
+
+
+def responder(request, recurso):
+    """200 con los bytes precalculados o 304 si el cliente ya tiene esta versión"""
+    cuerpo, etag = catalogo()[recurso]
+    if _coincide(request.META.get("HTTP_IF_NONE_MATCH"), etag):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(cuerpo, content_type="application/json")
+    response["ETag"] = etag
+    # private: la respuesta exige autenticación, ningún proxy compartido debe guardarla
+    response["Cache-Control"] = f"private, max-age={settings.PERMISOS_CACHE_SEG}"
+    return response
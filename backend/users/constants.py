@@ -62,6 +62,11 @@ STAFF_MANAGEMENT_PERMISSIONS = [
     "eliminar_personal",
 ]
 
+# PERMISOS DE GESTIÓN DE VIAJES
+TRIP_MANAGEMENT_PERMISSIONS = [
+    "gestionar_viajes",
+]
+
 # PERMISOS DE REPORTES
 REPORT_PERMISSIONS = [
     "ver_reportes_basicos",
@@ -81,6 +86,7 @@ CLIENT_PERMISSIONS = [
     "ver_historial_viajes",
     "cancelar_viaje",
     "calificar_viaje",
+    "reservar_asiento",
 ]
 
 # PERMISOS DE BITÁCORA
@@ -96,6 +102,7 @@ ALL_PERMISSIONS = (
     ROLE_MANAGEMENT_PERMISSIONS +
     DRIVER_MANAGEMENT_PERMISSIONS +
     STAFF_MANAGEMENT_PERMISSIONS +
+    TRIP_MANAGEMENT_PERMISSIONS +
     REPORT_PERMISSIONS +
     DASHBOARD_PERMISSIONS +
     CLIENT_PERMISSIONS +
@@ -112,6 +119,7 @@ PERMISSION_GROUPS = {
     "GESTION_ROLES": ROLE_MANAGEMENT_PERMISSIONS,
     "GESTION_CONDUCTORES": DRIVER_MANAGEMENT_PERMISSIONS,
     "GESTION_PERSONAL": STAFF_MANAGEMENT_PERMISSIONS,
+    "GESTION_VIAJES": TRIP_MANAGEMENT_PERMISSIONS,
     "REPORTES": REPORT_PERMISSIONS,
     "DASHBOARD": DASHBOARD_PERMISSIONS,
     "CLIENTE": CLIENT_PERMISSIONS,
@@ -138,6 +146,7 @@ ROLES_CONFIG = {
             USER_MANAGEMENT_PERMISSIONS +
             DRIVER_MANAGEMENT_PERMISSIONS +
             STAFF_MANAGEMENT_PERMISSIONS +
+            TRIP_MANAGEMENT_PERMISSIONS +
             REPORT_PERMISSIONS +
             DASHBOARD_PERMISSIONS +
             AUDIT_PERMISSIONS
@@ -172,6 +181,7 @@ ROLES_CONFIG = {
         "permisos": (
             AUTH_PERMISSIONS +
             ["ver_conductores", "ver_personal"] +
+            TRIP_MANAGEMENT_PERMISSIONS +
             ["ver_reportes_basicos", "ver_dashboard_admin"]
         ),
         "is_staff": True,
@@ -0,0 +1,66 @@
+"""
+Limpieza periódica de la lista de tokens de simplejwt.
+
+Borra por lotes los OutstandingToken vencidos (y sus BlacklistedToken), sin una
+única transacción gigante como flushexpiredtokens. Antes de borrar, copia a la
+blacklist en cache las revocaciones de la BD que aún no vencieron, para que los
+tokens revocados antes de usar la cache sigan rechazados.
+
+Uso (p. ej. desde cron, cada hora):
+    python manage.py limpiar_tokens [--lote 5000]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow, datetime_to_epoch
+
+from users.tokens import revocar_jti
+
+
+class Command(BaseCommand):
+    help = 'Borra por lotes los tokens JWT vencidos de la base de datos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=5000,
+            help='Filas a borrar por lote'
+        )
+
+    def handle(self, *args, **options):
+        lote = options['lote']
+        # simplejwt guarda expires_at en UTC (naive con USE_TZ=False)
+        ahora = aware_utcnow()
+
+        # Revocaciones vigentes de la BD -> blacklist en cache
+        vigentes = (
+            BlacklistedToken.objects
+            .filter(token__expires_at__gte=ahora)
+            .values_list('token__jti', 'token__expires_at')
+        )
+        copiados = 0
+        for jti, expires_at in vigentes.iterator(chunk_size=lote):
+            revocar_jti(jti, datetime_to_epoch(expires_at))
+            copiados += 1
+        if copiados:
+            self.stdout.write(f'🔁 {copiados} revocaciones vigentes copiadas a la cache')
+
+        borrados = 0
+        inicio = time.perf_counter()
+        while True:
+            ids = list(
+                OutstandingToken.objects
+                .filter(expires_at__lt=ahora)
+                .values_list('id', flat=True)[:lote]
+            )
+            if not ids:
+                break
+            BlacklistedToken.objects.filter(token_id__in=ids).delete()
+            OutstandingToken.objects.filter(id__in=ids).delete()
+            borrados += len(ids)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'🧹 {borrados} tokens vencidos eliminados en {time.perf_counter() - inicio:.1f}s'
+        ))
@@ -0,0 +1,19 @@
+# Índice de trigramas (pg_trgm + unaccent) para la búsqueda, ver core/busqueda.py
+
+from django.db import migrations
+
+from core.busqueda import migracion_indice
+
+# Deben coincidir (y en el mismo orden) con los campos que busca la vista
+CAMPOS = ['username', 'first_name', 'last_name', 'email']
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_remove_duplicate_date_fields'),
+    ]
+
+    operations = [
+        migrations.RunSQL(*migracion_indice('users_customuser', 'users_customuser_busqueda_trgm', CAMPOS)),
+    ]
@@ -72,6 +72,21 @@ class CanManagePersonal(permissions.BasePermission):
         return request.user.tiene_permiso("gestionar_personal")
 
 
+class CanViewBitacora(permissions.BasePermission):
+    """
+    Leer la bitácora exige ver_bitacora; registrar en ella, un usuario autenticado
+    """
+    message = "No tienes permisos para ver la bitácora"
+
+    def has_permission(self, request, view):
+        if not request.user or not request.user.is_authenticated:
+            return False
+
+        if request.method in permissions.SAFE_METHODS:
+            return request.user.tiene_permiso("ver_bitacora")
+        return True
+
+
 class IsOwnerOrAdmin(permissions.BasePermission):
     """
     Permiso que permite acceso solo al propietario del objeto o a administradores
@@ -16,26 +16,45 @@ DIFERENCIAS CON SISTEMA ANTERIOR:
 """
 
 from rest_framework import status, permissions
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
+from .tokens import RefreshToken
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.core.cache import cache
-from django.core.mail import send_mail
-from django.conf import settings
-from django.template.loader import render_to_string
 import requests
 import random
 import string
 from bitacora.utils import registrar_bitacora
+from notificaciones.outbox import encolar_email
 from .models import Rol
 from .serializers import UserSerializer, ClienteRegisterSerializer, AdminCreateSerializer
+from .throttling import (
+    GoogleIPThrottle,
+    ReenvioCodigoThrottle,
+    VerificacionIPThrottle,
+    VerificacionUsuarioThrottle,
+)
 
 User = get_user_model()
 
 
+def encolar_codigo_verificacion(user, code):
+    """Encola el email con el código de verificación de un cliente"""
+    return encolar_email(
+        destinatario=user.email,
+        asunto="Código de verificación - Sistema de Transporte",
+        plantilla="account/email/mobile_verification",
+        contexto={
+            'username': user.username,
+            'verification_code': code,
+            'site_name': 'Sistema de Transporte',
+            'expiration_minutes': 10,
+        },
+    )
+
+
 class ClienteRegisterView(APIView):
     """
     Registro público de clientes con verificación obligatoria
@@ -82,35 +101,12 @@ class ClienteRegisterView(APIView):
         return ''.join(random.choices(string.digits, k=6))
     
     def _send_verification_code(self, user, code):
-        """Envía el código de verificación por email usando templates"""
+        """Encola el email con el código de verificación (lo envía el worker de notificaciones)"""
         try:
-            # Contexto para los templates
-            context = {
-                'user': user,
-                'verification_code': code,
-                'site_name': 'Sistema de Transporte',
-                'expiration_minutes': 10,
-            }
-            
-            # Renderizar templates
-            html_message = render_to_string('account/email/mobile_verification.html', context)
-            plain_message = render_to_string('account/email/mobile_verification.txt', context)
-            
-            subject = "Código de verificación - Sistema de Transporte"
-            
-            send_mail(
-                subject=subject,
-                message=plain_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[user.email],
-                html_message=html_message,
-                fail_silently=False,
-            )
-            
-            print(f"✅ Email de verificación enviado a {user.email} con código: {code}")
-            
+            encolar_codigo_verificacion(user, code)
+            print(f"📬 Email de verificación encolado para {user.email}")
         except Exception as e:
-            print(f"❌ Error enviando email a {user.email}: {str(e)}")
+            print(f"❌ Error encolando email a {user.email}: {str(e)}")
             # No lanzar excepción para no interrumpir el registro
 
 
@@ -155,6 +151,7 @@ class AdminCreateView(APIView):
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([GoogleIPThrottle])
 def google_auth(request):
     """
     Autenticación con Google OAuth
@@ -267,6 +264,7 @@ def google_auth(request):
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([VerificacionIPThrottle, VerificacionUsuarioThrottle])
 def verify_code(request):
     """
     Verificación de código para usuarios cliente
@@ -327,6 +325,7 @@ def verify_code(request):
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([VerificacionIPThrottle, ReenvioCodigoThrottle])
 def resend_verification_code(request):
     """
     Reenviar código de verificación
@@ -353,35 +352,13 @@ def resend_verification_code(request):
     # Guardar código en cache (expira en 10 minutos)
     cache.set(f"verification_{user_id}", verification_code, 600)
     
-    # Enviar código por email usando templates
+    # Encolar el email con el código (lo envía el worker de notificaciones)
     try:
-        # Contexto para los templates
-        context = {
-            'user': user,
-            'verification_code': verification_code,
-            'site_name': 'Sistema de Transporte',
-            'expiration_minutes': 10,
-        }
-        
-        # Renderizar templates
-        html_message = render_to_string('account/email/mobile_verification.html', context)
-        plain_message = render_to_string('account/email/mobile_verification.txt', context)
-        
-        subject = "Código de verificación - Sistema de Transporte"
-        
-        send_mail(
-            subject=subject,
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            html_message=html_message,
-            fail_silently=False,
-        )
-        
-        print(f"✅ Email de reenvío enviado a {user.email} con código: {verification_code}")
+        encolar_codigo_verificacion(user, verification_code)
+        print(f"📬 Email de reenvío encolado para {user.email}")
         
     except Exception as e:
-        print(f"❌ Error enviando email de reenvío a {user.email}: {str(e)}")
+        print(f"❌ Error encolando email de reenvío a {user.email}: {str(e)}")
         return Response(
             {'error': 'Error enviando el código de verificación'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -17,6 +17,7 @@ DIFERENCIAS CON SISTEMA ANTERIOR:
 from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from core.campos import CamposDinamicosMixin
 from .models import CustomUser, Rol
 
 
@@ -27,7 +28,22 @@ class RolSerializer(serializers.ModelSerializer):
         fields = ["id", "nombre", "descripcion", "es_administrativo", "permisos", "fecha_creacion", "fecha_actualizacion"]
 
 
-class UserSerializer(serializers.ModelSerializer):
+class RolResumenSerializer(serializers.ModelSerializer):
+    """Rol sin la lista de permisos, para los listados"""
+    class Meta:
+        model = Rol
+        fields = ["id", "nombre", "es_administrativo"]
+
+
+# Columnas que leen las propiedades calculadas de CustomUser (ver core.campos)
+CAMPOS_MODELO_USUARIO = {
+    "puede_acceder_admin": ("is_staff", "rol__es_administrativo"),
+    "es_administrativo": ("rol__es_administrativo",),
+    "es_cliente": ("rol__es_administrativo",),
+}
+
+
+class UserSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer base para usuarios"""
     rol = RolSerializer(read_only=True)
     rol_id = serializers.IntegerField(write_only=True, required=False)
@@ -70,6 +86,7 @@ class UserSerializer(serializers.ModelSerializer):
             "last_login",
         ]
         read_only_fields = ["id", "date_joined", "last_login", "puede_acceder_admin", "es_administrativo", "es_cliente"]
+        campos_modelo = CAMPOS_MODELO_USUARIO
 
     def validate(self, attrs):
         """Validaciones generales"""
@@ -175,6 +192,45 @@ class UserSerializer(serializers.ModelSerializer):
 
 
 
+class UserListSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    """
+    Serializer de solo lectura para el listado de usuarios:
+    el rol va resumido (sin permisos) y no incluye campos de escritura
+    """
+    rol = RolResumenSerializer(read_only=True)
+    puede_acceder_admin = serializers.BooleanField(read_only=True)
+    es_administrativo = serializers.BooleanField(read_only=True)
+    es_cliente = serializers.BooleanField(read_only=True)
+    personal_id = serializers.IntegerField(read_only=True)
+    conductor_id = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = CustomUser
+        fields = [
+            "id",
+            "username",
+            "email",
+            "first_name",
+            "last_name",
+            "telefono",
+            "direccion",
+            "ci",
+            "fecha_nacimiento",
+            "rol",
+            "is_staff",
+            "is_active",
+            "personal_id",
+            "conductor_id",
+            "puede_acceder_admin",
+            "es_administrativo",
+            "es_cliente",
+            "date_joined",
+            "last_login",
+        ]
+        read_only_fields = fields
+        campos_modelo = CAMPOS_MODELO_USUARIO
+
+
 class ClienteRegisterSerializer(serializers.ModelSerializer):
     """Serializer para registro de clientes con verificación"""
     password = serializers.CharField(write_only=True, validators=[validate_password])
@@ -0,0 +1,337 @@
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from core.busqueda import buscar, documento_sql, trigram_disponible
+
+from . import catalogo_permisos
+from .constants import ALL_PERMISSIONS
+from .models import Rol
+from .throttling import SlidingWindowThrottle
+from .tokens import RefreshToken, jti_revocado
+from .views import USER_SEARCH_FIELDS
+
+User = get_user_model()
+
+
+# Hasher rápido: aquí interesa el throttling, no el costo de PBKDF2
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class LoginThrottlingTest(APITestCase):
+    """Límites de intentos en los endpoints públicos de autenticación"""
+
+    # El login registra en la bitácora, que puede estar en la base de auditoría
+    databases = "__all__"
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="cliente", email="cliente@test.com", password="cliente123")
+
+    def _login(self, username, password="incorrecta", ip="10.0.0.1"):
+        return self.client.post(
+            "/api/auth/login/",
+            {"username": username, "password": password},
+            format="json",
+            REMOTE_ADDR=ip,
+        )
+
+    def test_rechaza_por_usuario_antes_de_autenticar(self):
+        # login_usuario = 5/min: intentos desde IPs distintas contra la misma cuenta
+        for i in range(5):
+            self.assertEqual(self._login("cliente", ip=f"10.0.0.{i}").status_code, 401)
+
+        with mock.patch("users.auth.authenticate") as authenticate:
+            response = self._login("CLIENTE ", ip="10.0.0.99")
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+        authenticate.assert_not_called()
+
+    def test_rechaza_por_ip(self):
+        # login_ip = 20/min: muchas cuentas distintas desde la misma IP
+        for i in range(20):
+            self.assertEqual(self._login(f"usuario{i}").status_code, 401)
+        self.assertEqual(self._login("cliente", password="cliente123").status_code, 429)
+        # Otra IP no se ve afectada
+        self.assertEqual(self._login("cliente", password="cliente123", ip="10.0.0.2").status_code, 200)
+
+    def test_x_forwarded_for_solo_de_proxies_confiables(self):
+        # Sin proxies configurados, rotar el encabezado no cambia la IP contada
+        for i in range(20):
+            self.client.post(
+                "/api/auth/login/", {"username": f"usuario{i}", "password": "x"}, format="json",
+                REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR=f"1.2.3.{i}",
+            )
+        self.assertEqual(self._login("cliente", password="cliente123").status_code, 429)
+
+        # Detrás de un proxy cuenta la entrada que agregó el proxy, no las del cliente
+        cache.clear()
+        with override_settings(THROTTLE_PROXIES_CONFIABLES=1):
+            for i in range(20):
+                self.client.post(
+                    "/api/auth/login/", {"username": f"usuario{i}", "password": "x"}, format="json",
+                    REMOTE_ADDR="10.0.0.254", HTTP_X_FORWARDED_FOR=f"1.2.3.{i}, 200.0.0.1",
+                )
+            response = self.client.post(
+                "/api/auth/login/", {"username": "cliente", "password": "cliente123"}, format="json",
+                REMOTE_ADDR="10.0.0.254", HTTP_X_FORWARDED_FOR="200.0.0.1",
+            )
+            self.assertEqual(response.status_code, 429)
+            response = self.client.post(
+                "/api/auth/login/", {"username": "cliente", "password": "cliente123"}, format="json",
+                REMOTE_ADDR="10.0.0.254", HTTP_X_FORWARDED_FOR="200.0.0.2",
+            )
+            self.assertEqual(response.status_code, 200)
+
+    def test_verificacion_limitada_por_usuario(self):
+        cache.set(f"verification_{self.user.id}", "123456", 600)
+        for _ in range(5):
+            response = self.client.post("/api/verify/", {"user_id": self.user.id, "code": "000000"}, format="json")
+            self.assertEqual(response.status_code, 400)
+        response = self.client.post("/api/verify/", {"user_id": self.user.id, "code": "123456"}, format="json")
+        self.assertEqual(response.status_code, 429)
+
+    def test_ventana_deslizante(self):
+        throttle = LoginThrottlingTest._throttle("3/min")
+        request = mock.Mock(data={"username": "cliente"})
+
+        with mock.patch.object(throttle, "timer", return_value=60 * 100 + 30):
+            self.assertTrue(all(throttle.allow_request(request, None) for _ in range(3)))
+            self.assertFalse(throttle.allow_request(request, None))
+
+        # A mitad de la ventana siguiente los 3 anteriores pesan 1.5: entran dos intentos más
+        with mock.patch.object(throttle, "timer", return_value=60 * 101 + 30):
+            self.assertTrue(throttle.allow_request(request, None))
+            self.assertTrue(throttle.allow_request(request, None))
+            self.assertFalse(throttle.allow_request(request, None))
+
+    @staticmethod
+    def _throttle(rate):
+        class Throttle(SlidingWindowThrottle):
+            scope = "prueba"
+
+            def get_cache_key(self, request, view):
+                return f"throttle:prueba:{request.data['username']}"
+
+        Throttle.rate = rate
+        return Throttle()
+
+
+class TokenBlacklistTest(APITestCase):
+    """Blacklist de JWT en la cache: logout, rotación y limpieza de la BD"""
+
+    # El login registra en la bitácora, que puede estar en la base de auditoría
+    databases = "__all__"
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="cliente", email="cliente@test.com", password="cliente123")
+        self.refresh = RefreshToken.for_user(self.user)
+
+    def test_login_no_registra_outstanding(self):
+        self.assertFalse(OutstandingToken.objects.exists())
+
+    def test_logout_revoca_refresh(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post("/api/auth/logout/", {"refresh": str(self.refresh)}, format="json")
+        self.assertEqual(response.status_code, 205)
+
+        response = self.client.post("/api/auth/token/refresh/", {"refresh": str(self.refresh)}, format="json")
+        self.assertEqual(response.status_code, 401)
+        response = self.client.post("/api/auth/token/verify/", {"token": str(self.refresh)}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(BlacklistedToken.objects.exists())
+
+    def test_rotacion_revoca_el_anterior(self):
+        response = self.client.post("/api/auth/token/refresh/", {"refresh": str(self.refresh)}, format="json")
+        self.assertEqual(response.status_code, 200)
+        nuevo = response.json()["refresh"]
+
+        self.assertEqual(self.client.post("/api/auth/token/verify/", {"token": nuevo}, format="json").status_code, 200)
+        response = self.client.post("/api/auth/token/refresh/", {"refresh": str(self.refresh)}, format="json")
+        self.assertEqual(response.status_code, 401)
+
+    def test_ttl_igual_a_vida_restante(self):
+        with mock.patch.object(cache, "set") as cache_set:
+            self.refresh.blacklist()
+        _, _, ttl = cache_set.call_args.args
+        restante = self.refresh["exp"] - int(time.time())
+        self.assertAlmostEqual(ttl, restante, delta=2)
+
+    def test_limpiar_tokens(self):
+        vencido = OutstandingToken.objects.create(
+            jti="vencido", token="x", expires_at=aware_utcnow() - timedelta(days=1)
+        )
+        BlacklistedToken.objects.create(token=vencido)
+        revocado = OutstandingToken.objects.create(
+            jti="revocado", token="y", expires_at=aware_utcnow() + timedelta(days=1)
+        )
+        BlacklistedToken.objects.create(token=revocado)
+
+        call_command("limpiar_tokens", lote=1, stdout=StringIO())
+
+        self.assertEqual(list(OutstandingToken.objects.values_list("jti", flat=True)), ["revocado"])
+        self.assertTrue(jti_revocado("revocado"))
+        self.assertFalse(jti_revocado("vencido"))
+
+
+class UserSearchTest(APITestCase):
+    """Búsqueda de usuarios (core/busqueda.py)"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="admin", email="admin@test.com", password="admin123")
+        User.objects.create_user(username="jperez", first_name="Juan", last_name="Pérez", email="juan@test.com")
+        User.objects.create_user(username="mlopez", first_name="María", last_name="López", email="maria@test.com")
+        self.client.force_authenticate(self.user)
+
+    def test_todos_los_terminos_en_cualquier_campo(self):
+        response = self.client.get("/api/users/search/", {"q": "juan Pérez"})
+        self.assertEqual([u["username"] for u in response.json()], ["jperez"])
+
+        response = self.client.get("/api/users/search/", {"q": "juan lópez"})
+        self.assertEqual(response.json(), [])
+
+    def test_consulta_con_trigramas(self):
+        """Con pg_trgm la consulta usa el documento indexado, sin tildes y con ranking"""
+        with mock.patch("core.busqueda.trigram_disponible", return_value=True):
+            queryset, rankeado = buscar(User.objects.all(), USER_SEARCH_FIELDS, "pérez 50%")
+        sql, params = queryset.query.sql_with_params()
+
+        self.assertTrue(rankeado)
+        self.assertIn(documento_sql(USER_SEARCH_FIELDS, "users_customuser"), sql)
+        self.assertIn("word_similarity", sql)
+        self.assertEqual(sql.count("LIKE"), 2)
+        self.assertIn("pérez", params)
+        self.assertIn("50%", params)
+
+    def test_plan_usa_el_indice_gin(self):
+        """La expresión de la consulta coincide con la del índice (PostgreSQL con pg_trgm/unaccent)"""
+        if not trigram_disponible():
+            self.skipTest("pg_trgm/unaccent no disponibles")
+        queryset, _ = buscar(User.objects.all(), USER_SEARCH_FIELDS, "perez")
+        with connection.cursor() as cursor:
+            # Con tres filas el planner prefiere leer la tabla: se le quita esa opción
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        self.assertIn("users_customuser_busqueda_trgm", queryset.explain())
+        self.assertEqual([u.username for u in queryset], ["jperez"])
+
+
+class UserListCamposTest(APITestCase):
+    """Listado liviano de usuarios y ?fields= / ?omit= (core/campos.py)"""
+
+    def setUp(self):
+        self.rol = Rol.objects.create(
+            nombre="Administrador", es_administrativo=True, permisos=["gestionar_usuarios", "ver_usuarios"]
+        )
+        self.user = User.objects.create_user(
+            username="admin", email="admin@test.com", password="admin123", is_staff=True, rol=self.rol
+        )
+        for i in range(5):
+            User.objects.create_user(username=f"usuario{i}", email=f"usuario{i}@test.com", rol=self.rol)
+        self.client.force_authenticate(self.user)
+
+    def test_listado_con_rol_resumido_en_una_consulta(self):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get("/api/admin/users/")
+        self.assertEqual(response.status_code, 200)
+
+        usuario = response.data["results"][0]
+        self.assertEqual(set(usuario["rol"]), {"id", "nombre", "es_administrativo"})
+        self.assertTrue(usuario["es_administrativo"])
+        # COUNT + página con el rol en JOIN: sin una consulta por usuario
+        self.assertEqual(len(consultas), 2)
+
+    def test_fields_limita_campos_y_columnas(self):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get("/api/admin/users/", {"fields": "id,username"})
+        self.assertEqual(set(response.data["results"][0]), {"id", "username"})
+        sql = consultas[-1]["sql"]
+        self.assertNotIn('"email"', sql)
+        self.assertNotIn("users_rol", sql)
+
+    def test_omit_y_detalle(self):
+        response = self.client.get("/api/admin/users/", {"omit": "rol,email"})
+        self.assertNotIn("rol", response.data["results"][0])
+        self.assertNotIn("email", response.data["results"][0])
+
+        # El detalle sigue con el serializer completo (rol con permisos)
+        response = self.client.get(f"/api/admin/users/{self.user.pk}/")
+        self.assertIn("permisos", response.data["rol"])
+        response = self.client.get(f"/api/admin/users/{self.user.pk}/", {"fields": "id,puede_acceder_admin"})
+        self.assertEqual(response.data, {"id": self.user.pk, "puede_acceder_admin": True})
+
+    def test_campos_desconocidos(self):
+        response = self.client.get("/api/admin/users/", {"fields": "id,usernme", "omit": "clave"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {
+            "fields": ["Campos no disponibles: usernme"],
+            "omit": ["Campos no disponibles: clave"],
+        })
+
+
+class CatalogoPermisosTest(APITestCase):
+    """Catálogo de permisos precalculado con ETag (users/catalogo_permisos.py)"""
+
+    def setUp(self):
+        rol = Rol.objects.create(nombre="Administrador", es_administrativo=True, permisos=["gestionar_roles"])
+        self.user = User.objects.create_user(username="admin", email="admin@test.com", rol=rol)
+        self.client.force_authenticate(self.user)
+
+    def test_mismo_contenido_que_antes(self):
+        response = self.client.get("/api/permissions/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), len(ALL_PERMISSIONS))
+        self.assertEqual(response.json()[0], {
+            "id": 1,
+            "name": ALL_PERMISSIONS[0].replace("_", " ").title(),
+            "codename": ALL_PERMISSIONS[0],
+            "content_type": "custom_permission",
+        })
+
+        grupos = self.client.get("/api/permissions/groups/").json()
+        self.assertEqual(list(grupos), list(catalogo_permisos.GRUPOS))
+        self.assertEqual(grupos["Gestión de Roles"][0]["content_type"], "gestión_de_roles")
+        self.assertEqual(grupos["Bitácora"][-1]["id"], len(catalogo_permisos.GRUPOS["Bitácora"]))
+
+    def test_etag_y_304(self):
+        response = self.client.get("/api/permissions/groups/")
+        etag = response["ETag"]
+        self.assertIn("private", response["Cache-Control"])
+
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get("/api/permissions/groups/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+        # Solo la autenticación toca la base (force_authenticate: ninguna)
+        self.assertEqual(len(consultas), 0)
+
+        # La versión débil que publica el middleware de compresión también vale
+        response = self.client.get("/api/permissions/groups/", HTTP_IF_NONE_MATCH=f"W/{etag}")
+        self.assertEqual(response.status_code, 304)
+        # Cada recurso tiene su propio ETag
+        response = self.client.get("/api/permissions/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_cambia_con_el_deploy(self):
+        a = catalogo_permisos.construir("deploy-a")[catalogo_permisos.TODOS]
+        b = catalogo_permisos.construir("deploy-b")[catalogo_permisos.TODOS]
+        self.assertEqual(a[0], b[0])
+        self.assertNotEqual(a[1], b[1])
+
+    def test_sin_permiso_no_revela_el_catalogo(self):
+        etag = self.client.get("/api/permissions/")["ETag"]
+        otro = User.objects.create_user(username="cliente", email="cliente@test.com")
+        self.client.force_authenticate(otro)
+        response = self.client.get("/api/permissions/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 403)
+        self.assertNotIn("ETag", response)
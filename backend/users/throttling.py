@@ -0,0 +1,144 @@
+"""
+THROTTLING.PY - LÍMITES DE INTENTOS EN LOS ENDPOINTS PÚBLICOS DE AUTENTICACIÓN
+
+RESPONSABILIDADES:
+- Limitar intentos de login, verificación de código, reenvío y Google OAuth
+- Contar por IP (REMOTE_ADDR o, detrás de proxies, X-Forwarded-For) y por usuario
+- Rechazar antes de ejecutar la vista (antes del hash PBKDF2 de authenticate())
+
+Los contadores viven en la cache compartida (Redis en producción), así que el
+límite es global para todos los workers. Los límites se configuran en
+REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"].
+"""
+
+from django.conf import settings
+from rest_framework.throttling import SimpleRateThrottle
+
+from core.metricas import THROTTLE
+
+
+def ip_cliente(request):
+    """
+    IP contra la que se cuentan los intentos. X-Forwarded-For lo puede escribir el
+    cliente: solo valen las THROTTLE_PROXIES_CONFIABLES entradas de la derecha, las
+    que agregaron nuestros proxies. Sin proxies configurados se usa REMOTE_ADDR.
+    """
+    proxies = settings.THROTTLE_PROXIES_CONFIABLES
+    if proxies > 0:
+        reenviadas = [
+            ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()
+        ]
+        if len(reenviadas) >= proxies:
+            return reenviadas[-proxies]
+    return request.META.get('REMOTE_ADDR')
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """
+    Ventana deslizante aproximada con dos contadores de ventana fija:
+    estimado = anterior * (fracción de la ventana anterior aún dentro del período) + actual.
+
+    A diferencia de SimpleRateThrottle (que guarda la lista de timestamps y la
+    reescribe en cada request), cuesta un get_many y, si se acepta, un incremento
+    atómico; los requests rechazados no escriben en la cache.
+    """
+
+    cache_format = 'throttle:%(scope)s:%(ident)s'
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        ventana = int(self.now // self.duration)
+        clave_actual = f"{self.key}:{ventana}"
+        clave_anterior = f"{self.key}:{ventana - 1}"
+
+        contadores = self.cache.get_many([clave_actual, clave_anterior])
+        self.actual = contadores.get(clave_actual, 0)
+        self.anterior = contadores.get(clave_anterior, 0)
+
+        peso_anterior = 1 - (self.now % self.duration) / self.duration
+        if self.anterior * peso_anterior + self.actual >= self.num_requests:
+            THROTTLE.labels(self.scope).inc()
+            return self.throttle_failure()
+
+        # Dos ventanas de vida: la actual se usa como "anterior" en la siguiente
+        if not self.cache.add(clave_actual, 1, self.duration * 2):
+            try:
+                self.cache.incr(clave_actual)
+            except ValueError:
+                # Expiró entre el add y el incr
+                self.cache.set(clave_actual, 1, self.duration * 2)
+        return True
+
+    def wait(self):
+        """Segundos hasta que el estimado vuelva a quedar bajo el límite"""
+        transcurrido = self.now % self.duration
+        if self.actual < self.num_requests and self.anterior:
+            # Alcanza con que la ventana anterior pierda peso
+            objetivo = self.duration * (1 - (self.num_requests - self.actual) / self.anterior)
+            return max(objetivo - transcurrido, 1)
+        return self.duration - transcurrido
+
+
+class PorIPThrottle(SlidingWindowThrottle):
+    """Cuenta los intentos por IP del cliente"""
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': ip_cliente(request),
+        }
+
+
+class PorUsuarioThrottle(SlidingWindowThrottle):
+    """
+    Cuenta los intentos por usuario objetivo, tomado del body del request.
+    Frena ataques distribuidos (muchas IPs) contra una misma cuenta.
+    """
+
+    campos = ()
+
+    def get_cache_key(self, request, view):
+        for campo in self.campos:
+            valor = request.data.get(campo)
+            if valor:
+                return self.cache_format % {
+                    'scope': self.scope,
+                    'ident': str(valor).strip().lower(),
+                }
+        # Sin usuario en el body la vista responde 400 sin hacer trabajo caro
+        return None
+
+
+class LoginIPThrottle(PorIPThrottle):
+    scope = 'login_ip'
+
+
+class LoginUsuarioThrottle(PorUsuarioThrottle):
+    scope = 'login_usuario'
+    campos = ('username', 'email')
+
+
+class VerificacionIPThrottle(PorIPThrottle):
+    scope = 'verificacion_ip'
+
+
+class VerificacionUsuarioThrottle(PorUsuarioThrottle):
+    """Limita la fuerza bruta sobre el código de 6 dígitos de un usuario"""
+    scope = 'verificacion_usuario'
+    campos = ('user_id',)
+
+
+class ReenvioCodigoThrottle(PorUsuarioThrottle):
+    scope = 'reenvio_codigo'
+    campos = ('user_id',)
+
+
+class GoogleIPThrottle(PorIPThrottle):
+    scope = 'google_ip'
@@ -0,0 +1,84 @@
+"""
+TOKENS.PY - BLACKLIST DE JWT EN LA CACHE COMPARTIDA
+
+RESPONSABILIDADES:
+- RefreshToken que guarda los JTI revocados en la cache (Redis), no en la BD
+- Serializers de refresh/verify que consultan esa blacklist
+
+La app token_blacklist de simplejwt inserta un OutstandingToken por cada login
+y cada rotación, y un BlacklistedToken por cada logout/rotación; esas tablas crecen
+sin límite y cada refresh/verify hace un JOIN contra ellas. Aquí un JTI revocado es
+una clave en la cache con TTL igual a la vida restante del token: al vencer el token
+la clave desaparece sola y la consulta cuesta siempre un GET.
+"""
+
+import time
+
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt import tokens as jwt_tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+BLACKLIST_PREFIX = "jwt_blacklist"
+
+
+def _clave(jti):
+    return f"{BLACKLIST_PREFIX}:{jti}"
+
+
+def revocar_jti(jti, exp):
+    """Agrega el JTI a la blacklist hasta el vencimiento del token (`exp`, epoch)"""
+    restante = int(exp - time.time())
+    if restante > 0:
+        cache.set(_clave(jti), 1, restante)
+
+
+def jti_revocado(jti):
+    """True si el JTI fue revocado y el token aún no venció"""
+    return cache.get(_clave(jti)) is not None
+
+
+class CacheBlacklistMixin:
+    """
+    Reemplaza los métodos de BlacklistMixin de simplejwt:
+    la blacklist vive en la cache y no se registran OutstandingToken.
+    """
+
+    def check_blacklist(self):
+        if jti_revocado(self.payload[jwt_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        revocar_jti(self.payload[jwt_settings.JTI_CLAIM], self.payload["exp"])
+
+    def outstand(self):
+        # Sin lista de tokens emitidos: nada que registrar
+        return None
+
+    @classmethod
+    def for_user(cls, user):
+        # Token.for_user sin el INSERT de OutstandingToken de BlacklistMixin
+        return jwt_tokens.Token.for_user.__func__(cls, user)
+
+
+class RefreshToken(CacheBlacklistMixin, jwt_tokens.RefreshToken):
+    """RefreshToken de simplejwt con blacklist en la cache"""
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """Refresh (con rotación) usando la blacklist en cache"""
+
+    token_class = RefreshToken
+
+
+class TokenVerifySerializer(jwt_serializers.TokenVerifySerializer):
+    """Verify que consulta la blacklist en cache en vez de BlacklistedToken"""
+
+    def validate(self, attrs):
+        token = jwt_tokens.UntypedToken(attrs["token"])
+        if jti_revocado(token.get(jwt_settings.JTI_CLAIM)):
+            raise serializers.ValidationError(_("Token is blacklisted"))
+        return {}
@@ -15,17 +15,31 @@ DIFERENCIAS CON SISTEMA ANTERIOR:
 - Estructura más lógica
 """
 
+from django.conf import settings
 from django.urls import path, include
+from rest_framework_simplejwt.views import TokenRefreshView, TokenVerifyView
 from . import auth, registration, views
 
+# Bajo ASGI las lecturas más usadas se sirven con vistas async nativas
+if settings.ASYNC_VIEWS:
+    from . import async_views
+    user_info_view = async_views.user_info
+    dashboard_data_view = async_views.dashboard_data
+else:
+    user_info_view = auth.user_info
+    dashboard_data_view = auth.dashboard_data
+
 urlpatterns = [
     # ========================================
     # AUTENTICACIÓN UNIFICADA
     # ========================================
     path('auth/login/', auth.UniversalLoginView.as_view(), name='universal_login'),
     path('auth/logout/', auth.universal_logout, name='universal_logout'),
-    path('auth/user-info/', auth.user_info, name='user_info'),
-    path('auth/dashboard-data/', auth.dashboard_data, name='dashboard_data'),
+    path('auth/user-info/', user_info_view, name='user_info'),
+    path('auth/dashboard-data/', dashboard_data_view, name='dashboard_data'),
+    # Serializers configurados en SIMPLE_JWT (blacklist en cache, ver tokens.py)
+    path('auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('auth/token/verify/', TokenVerifyView.as_view(), name='token_verify'),
     
     # ========================================
     # REGISTRO DIFERENCIADO
@@ -20,11 +20,15 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.contrib.auth import get_user_model
-from django.db.models import Q
 from bitacora.utils import registrar_bitacora
+from core.busqueda import buscar
+from core.campos import CamposDinamicosViewMixin
+from core.replicas import lectura_en_replica
+from . import catalogo_permisos
 from .models import Rol
 from .serializers import (
     UserSerializer,
+    UserListSerializer,
     RolSerializer,
     UserProfileSerializer, 
     ChangePasswordSerializer
@@ -38,14 +42,24 @@ from .permissions import (
 
 User = get_user_model()
 
+# Campos de user_search (mismo orden que el índice users_customuser_busqueda_trgm)
+USER_SEARCH_FIELDS = ['username', 'first_name', 'last_name', 'email']
 
-class UserViewSet(viewsets.ModelViewSet):
+
+class UserViewSet(CamposDinamicosViewMixin, viewsets.ModelViewSet):
     """
     Vista para gestión completa de usuarios (CRUD)
     Solo administradores pueden gestionar usuarios
+    Admite ?fields= y ?omit= en list/retrieve (ver core.campos)
     """
     serializer_class = UserSerializer
     permission_classes = [IsAdminPortalUser, CanManageUsers]
+
+    def get_serializer_class(self):
+        """El listado usa el serializer liviano (rol sin permisos)"""
+        if self.action == "list":
+            return UserListSerializer
+        return UserSerializer
     
     def get_queryset(self):
         """Obtener usuarios según permisos del usuario"""
@@ -238,17 +252,21 @@ def user_search(request):
     if not query:
         return Response({'error': 'Parámetro de búsqueda requerido'}, status=status.HTTP_400_BAD_REQUEST)
     
-    # Construir consulta
-    q = Q(username__icontains=query) | Q(first_name__icontains=query) | Q(last_name__icontains=query) | Q(email__icontains=query)
+    # Búsqueda sin tildes sobre el índice de trigramas (ver core/busqueda.py)
+    usuarios = User.objects.select_related('rol')
     
     # Filtrar por tipo si se especifica
     if tipo == 'administrativo':
-        q &= Q(rol__es_administrativo=True)
+        usuarios = usuarios.filter(rol__es_administrativo=True)
     elif tipo == 'cliente':
-        q &= Q(rol__es_administrativo=False)
+        usuarios = usuarios.filter(rol__es_administrativo=False)
+    
+    usuarios, rankeado = buscar(usuarios, USER_SEARCH_FIELDS, query)
+    if rankeado:
+        usuarios = usuarios.order_by('-rango_busqueda', 'id')
     
     # Obtener usuarios
-    usuarios = User.objects.filter(q)[:20]  # Limitar a 20 resultados
+    usuarios = usuarios[:20]  # Limitar a 20 resultados
     
     serializer = UserSerializer(usuarios, many=True)
     return Response(serializer.data)
@@ -256,6 +274,7 @@ def user_search(request):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@lectura_en_replica
 def user_stats(request):
     """
     Estadísticas de usuarios
@@ -352,73 +371,24 @@ def user_permissions(request, user_id):
 @permission_classes([permissions.IsAuthenticated])
 def get_all_permissions(request):
     """
-    Obtener todos los permisos disponibles del sistema
+    Obtener todos los permisos disponibles del sistema (catálogo precalculado, con ETag)
     """
     if not request.user.tiene_permiso('gestionar_roles'):
         return Response({'error': 'No tienes permisos para ver permisos'}, status=status.HTTP_403_FORBIDDEN)
-    
-    from .constants import ALL_PERMISSIONS
-    
-    # Convertir permisos a formato esperado por el frontend
-    permissions_list = []
-    for i, permiso in enumerate(ALL_PERMISSIONS):
-        permissions_list.append({
-            'id': i + 1,
-            'name': permiso.replace('_', ' ').title(),
-            'codename': permiso,
-            'content_type': 'custom_permission'
-        })
-    
-    return Response(permissions_list)
+
+    return catalogo_permisos.responder(request, catalogo_permisos.TODOS)
 
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def get_permissions_by_group(request):
     """
-    Obtener permisos agrupados por categoría
+    Obtener permisos agrupados por categoría (catálogo precalculado, con ETag)
     """
     if not request.user.tiene_permiso('gestionar_roles'):
         return Response({'error': 'No tienes permisos para ver permisos'}, status=status.HTTP_403_FORBIDDEN)
-    
-    from .constants import (
-        AUTH_PERMISSIONS,
-        USER_MANAGEMENT_PERMISSIONS,
-        ROLE_MANAGEMENT_PERMISSIONS,
-        DRIVER_MANAGEMENT_PERMISSIONS,
-        STAFF_MANAGEMENT_PERMISSIONS,
-        REPORT_PERMISSIONS,
-        DASHBOARD_PERMISSIONS,
-        CLIENT_PERMISSIONS,
-        AUDIT_PERMISSIONS
-    )
-    
-    groups = {
-        'Autenticación': AUTH_PERMISSIONS,
-        'Gestión de Usuarios': USER_MANAGEMENT_PERMISSIONS,
-        'Gestión de Roles': ROLE_MANAGEMENT_PERMISSIONS,
-        'Gestión de Conductores': DRIVER_MANAGEMENT_PERMISSIONS,
-        'Gestión de Personal': STAFF_MANAGEMENT_PERMISSIONS,
-        'Reportes': REPORT_PERMISSIONS,
-        'Dashboard': DASHBOARD_PERMISSIONS,
-        'Cliente': CLIENT_PERMISSIONS,
-        'Bitácora': AUDIT_PERMISSIONS
-    }
-    
-    # Convertir a formato esperado por el frontend
-    formatted_groups = {}
-    for group_name, permissions in groups.items():
-        formatted_groups[group_name] = [
-            {
-                'id': i + 1,
-                'name': permiso.replace('_', ' ').title(),
-                'codename': permiso,
-                'content_type': group_name.lower().replace(' ', '_')
-            }
-            for i, permiso in enumerate(permissions)
-        ]
-    
-    return Response(formatted_groups)
+
+    return catalogo_permisos.responder(request, catalogo_permisos.POR_GRUPO)
 
 
 @api_view(['GET'])
@@ -0,0 +1,32 @@
+from django.contrib import admin
+from .models import Viaje
+
+
+@admin.register(Viaje)
+class ViajeAdmin(admin.ModelAdmin):
+    list_display = [
+        'id',
+        'cliente',
+        'conductor',
+        'estado',
+        'distancia_conductor_km',
+        'fecha_solicitud',
+        'fecha_asignacion',
+    ]
+
+    list_filter = [
+        'estado',
+        'fecha_solicitud',
+    ]
+
+    search_fields = [
+        'cliente__username',
+        'conductor__nombre',
+        'conductor__apellido',
+        'origen_direccion',
+        'destino_direccion',
+    ]
+
+    raw_id_fields = ['cliente', 'conductor']
+    list_select_related = ['cliente', 'conductor']
+    readonly_fields = ['fecha_solicitud', 'fecha_asignacion', 'fecha_inicio', 'fecha_fin']
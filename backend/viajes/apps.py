@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class ViajesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'viajes'
+    verbose_name = 'Viajes'
@@ -0,0 +1,123 @@
+"""
+Despacho de viajes: asigna a cada viaje solicitado el conductor libre más cercano.
+
+Candidatos: conductores 'disponible', con la licencia vigente y una ubicación
+reportada hace menos de VIAJES_UBICACION_MAX_MIN minutos. Se recorren del más
+cercano al origen al más lejano con el índice GiST conductor_ubicacion_gist
+(KNN sobre el tipo point nativo de PostgreSQL), así la consulta lee unas pocas
+filas aunque haya miles de conductores.
+
+El conductor se toma con SELECT ... FOR UPDATE SKIP LOCKED dentro de la
+transacción de la asignación: dos despachos concurrentes nunca bloquean ni
+asignan al mismo conductor, el segundo salta la fila tomada y sigue con el
+próximo candidato. Si el primero ya confirmó, PostgreSQL vuelve a evaluar el
+filtro sobre la fila actualizada y el conductor, ahora 'ocupado', no califica.
+
+El orden del índice es en grados (no en km): a la latitud de Bolivia la
+diferencia entre un grado de longitud y uno de latitud es menor al 5%, de sobra
+para elegir al más cercano. El radio VIAJES_RADIO_KM se verifica en km
+(haversine) sobre el conductor elegido.
+"""
+from datetime import timedelta
+from math import asin, cos, radians, sin, sqrt
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Value
+from django.utils import timezone
+
+from conductores.models import PUNTO_UBICACION, Conductor, Distancia, Punto
+from core.metricas import DESPACHOS
+
+from .models import ASIGNADO, CANCELADO, COMPLETADO, EN_CURSO, SOLICITADO, Viaje
+
+RADIO_TIERRA_KM = 6371.0088
+
+
+def distancia_km(lat1, lng1, lat2, lng2):
+    """Distancia haversine entre dos coordenadas, en km"""
+    lat1, lng1, lat2, lng2 = map(radians, map(float, (lat1, lng1, lat2, lng2)))
+    a = sin((lat2 - lat1) / 2) ** 2 + cos(lat1) * cos(lat2) * sin((lng2 - lng1) / 2) ** 2
+    return 2 * RADIO_TIERRA_KM * asin(sqrt(a))
+
+
+def candidatos(lat, lng, ahora=None):
+    """Conductores que pueden tomar un viaje desde (lat, lng), del más cercano al más lejano"""
+    ahora = ahora or timezone.now()
+    return Conductor.objects.filter(
+        # Mismo predicado que el índice parcial conductor_ubicacion_gist
+        estado='disponible',
+        ultima_ubicacion_lat__isnull=False,
+        ultima_ubicacion_lng__isnull=False,
+        fecha_venc_licencia__gte=ahora.date(),
+        ultima_actualizacion_ubicacion__gte=ahora - timedelta(minutes=settings.VIAJES_UBICACION_MAX_MIN),
+    ).order_by(Distancia(PUNTO_UBICACION, Punto(Value(float(lng)), Value(float(lat)))))
+
+
+def asignar(viaje):
+    """
+    Asigna al viaje el conductor candidato más cercano dentro de VIAJES_RADIO_KM y
+    lo pasa a 'ocupado'. Retorna el viaje actualizado, o None si no quedó asignado
+    (ya no estaba solicitado o no hay conductores libres cerca).
+    """
+    with transaction.atomic():
+        # El viaje también se bloquea: dos reintentos del mismo viaje no asignan dos conductores
+        viaje = Viaje.objects.select_for_update().filter(pk=viaje.pk, estado=SOLICITADO).first()
+        if viaje is None:
+            return None
+
+        ahora = timezone.now()
+        conductor = (
+            candidatos(viaje.origen_lat, viaje.origen_lng, ahora)
+            .select_for_update(skip_locked=True)
+            .first()
+        )
+        distancia = None if conductor is None else distancia_km(
+            viaje.origen_lat, viaje.origen_lng, conductor.ultima_ubicacion_lat, conductor.ultima_ubicacion_lng
+        )
+        if distancia is None or distancia > settings.VIAJES_RADIO_KM:
+            DESPACHOS.labels("sin_conductor").inc()
+            return None
+
+        conductor.cambiar_estado('ocupado')
+        viaje.conductor = conductor
+        viaje.estado = ASIGNADO
+        viaje.fecha_asignacion = ahora
+        viaje.distancia_conductor_km = round(distancia, 3)
+        viaje.save(update_fields=['conductor', 'estado', 'fecha_asignacion', 'distancia_conductor_km'])
+
+    DESPACHOS.labels("asignado").inc()
+    return viaje
+
+
+def _transicion(viaje, desde, hacia, liberar=False, **campos):
+    """
+    Pasa el viaje de uno de los estados `desde` a `hacia` (con `campos`). Con
+    liberar=True el conductor asignado vuelve a 'disponible'. Retorna el viaje
+    actualizado o None si el viaje ya no estaba en un estado de `desde`.
+    """
+    with transaction.atomic():
+        viaje = Viaje.objects.select_for_update().filter(pk=viaje.pk, estado__in=desde).first()
+        if viaje is None:
+            return None
+        viaje.estado = hacia
+        for campo, valor in campos.items():
+            setattr(viaje, campo, valor)
+        viaje.save(update_fields=['estado', *campos])
+        if liberar and viaje.conductor_id:
+            Conductor.objects.filter(pk=viaje.conductor_id, estado='ocupado').update(
+                estado='disponible', fecha_actualizacion=timezone.now()
+            )
+    return viaje
+
+
+def cancelar(viaje):
+    return _transicion(viaje, (SOLICITADO, ASIGNADO), CANCELADO, liberar=True, fecha_fin=timezone.now())
+
+
+def iniciar(viaje):
+    return _transicion(viaje, (ASIGNADO,), EN_CURSO, fecha_inicio=timezone.now())
+
+
+def completar(viaje):
+    return _transicion(viaje, (EN_CURSO,), COMPLETADO, liberar=True, fecha_fin=timezone.now())
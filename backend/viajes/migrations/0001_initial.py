@@ -0,0 +1,46 @@
+# Generated by Django 5.0.7 on 2026-10-18 22:20
+
+import django.core.validators
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('conductores', '0007_ubicacion_gist'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Viaje',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('origen_lat', models.DecimalField(decimal_places=7, max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('-90')), django.core.validators.MaxValueValidator(Decimal('90'))], verbose_name='Origen - Latitud')),
+                ('origen_lng', models.DecimalField(decimal_places=7, max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('-180')), django.core.validators.MaxValueValidator(Decimal('180'))], verbose_name='Origen - Longitud')),
+                ('origen_direccion', models.CharField(blank=True, default='', max_length=255, verbose_name='Dirección de Origen')),
+                ('destino_lat', models.DecimalField(decimal_places=7, max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('-90')), django.core.validators.MaxValueValidator(Decimal('90'))], verbose_name='Destino - Latitud')),
+                ('destino_lng', models.DecimalField(decimal_places=7, max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('-180')), django.core.validators.MaxValueValidator(Decimal('180'))], verbose_name='Destino - Longitud')),
+                ('destino_direccion', models.CharField(blank=True, default='', max_length=255, verbose_name='Dirección de Destino')),
+                ('estado', models.CharField(choices=[('solicitado', 'Solicitado'), ('asignado', 'Asignado'), ('en_curso', 'En Curso'), ('completado', 'Completado'), ('cancelado', 'Cancelado')], default='solicitado', max_length=20, verbose_name='Estado')),
+                ('distancia_conductor_km', models.DecimalField(blank=True, decimal_places=3, max_digits=8, null=True, verbose_name='Distancia del Conductor (km)')),
+                ('fecha_solicitud', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Solicitud')),
+                ('fecha_asignacion', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Asignación')),
+                ('fecha_inicio', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Inicio')),
+                ('fecha_fin', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Finalización')),
+                ('cliente', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='viajes', to=settings.AUTH_USER_MODEL, verbose_name='Cliente')),
+                ('conductor', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='viajes', to='conductores.conductor', verbose_name='Conductor')),
+            ],
+            options={
+                'verbose_name': 'Viaje',
+                'verbose_name_plural': 'Viajes',
+                'ordering': ['-fecha_solicitud'],
+                'indexes': [models.Index(fields=['cliente', '-fecha_solicitud'], name='viaje_cliente_fecha_idx'), models.Index(fields=['conductor', 'estado'], name='viaje_conductor_estado_idx'), models.Index(condition=models.Q(('estado', 'solicitado')), fields=['fecha_solicitud'], name='viaje_solicitado_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,133 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import models
+
+SOLICITADO = 'solicitado'
+ASIGNADO = 'asignado'
+EN_CURSO = 'en_curso'
+COMPLETADO = 'completado'
+CANCELADO = 'cancelado'
+
+# Viajes que todavía no terminaron (cuentan como pendientes para el cliente)
+PENDIENTES = (SOLICITADO, ASIGNADO, EN_CURSO)
+
+# Estadísticas del dashboard del cliente en una sola consulta (aggregate/aaggregate)
+CONTEOS_CLIENTE = {
+    'viajes_totales': models.Count('id'),
+    'viajes_pendientes': models.Count('id', filter=models.Q(estado__in=PENDIENTES)),
+    'viajes_completados': models.Count('id', filter=models.Q(estado=COMPLETADO)),
+}
+
+LATITUD = [MinValueValidator(Decimal(-90)), MaxValueValidator(Decimal(90))]
+LONGITUD = [MinValueValidator(Decimal(-180)), MaxValueValidator(Decimal(180))]
+
+
+class ViajeQuerySet(models.QuerySet):
+    """Consultas reutilizables de viajes (válidas tanto en vistas sync como async)"""
+
+    def visibles_para(self, user):
+        """
+        Todos los viajes si el usuario gestiona viajes; si no, los que solicitó y,
+        si es conductor, los que tiene asignados
+        """
+        if user.tiene_permiso("gestionar_viajes"):
+            return self
+        filtro = models.Q(cliente=user)
+        if getattr(user, "conductor_id", None):
+            filtro |= models.Q(conductor_id=user.conductor_id)
+        return self.filter(filtro)
+
+
+class Viaje(models.Model):
+    """Viaje solicitado por un cliente y asignado a un conductor por el despacho"""
+
+    ESTADOS_CHOICES = [
+        (SOLICITADO, 'Solicitado'),
+        (ASIGNADO, 'Asignado'),
+        (EN_CURSO, 'En Curso'),
+        (COMPLETADO, 'Completado'),
+        (CANCELADO, 'Cancelado'),
+    ]
+
+    cliente = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.PROTECT,
+        related_name='viajes',
+        verbose_name="Cliente",
+        # Lo cubre el índice (cliente, -fecha_solicitud)
+        db_index=False,
+    )
+
+    conductor = models.ForeignKey(
+        'conductores.Conductor',
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='viajes',
+        verbose_name="Conductor",
+        # Lo cubre el índice (conductor, estado)
+        db_index=False,
+    )
+
+    # Recorrido
+    origen_lat = models.DecimalField(
+        max_digits=10, decimal_places=7, validators=LATITUD, verbose_name="Origen - Latitud"
+    )
+    origen_lng = models.DecimalField(
+        max_digits=10, decimal_places=7, validators=LONGITUD, verbose_name="Origen - Longitud"
+    )
+    origen_direccion = models.CharField(max_length=255, blank=True, default="", verbose_name="Dirección de Origen")
+
+    destino_lat = models.DecimalField(
+        max_digits=10, decimal_places=7, validators=LATITUD, verbose_name="Destino - Latitud"
+    )
+    destino_lng = models.DecimalField(
+        max_digits=10, decimal_places=7, validators=LONGITUD, verbose_name="Destino - Longitud"
+    )
+    destino_direccion = models.CharField(max_length=255, blank=True, default="", verbose_name="Dirección de Destino")
+
+    estado = models.CharField(
+        max_length=20,
+        choices=ESTADOS_CHOICES,
+        default=SOLICITADO,
+        verbose_name="Estado"
+    )
+
+    # Distancia del conductor al origen al momento de la asignación
+    distancia_conductor_km = models.DecimalField(
+        max_digits=8,
+        decimal_places=3,
+        null=True,
+        blank=True,
+        verbose_name="Distancia del Conductor (km)"
+    )
+
+    # Campos de control
+    fecha_solicitud = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Solicitud")
+    fecha_asignacion = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de Asignación")
+    fecha_inicio = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de Inicio")
+    fecha_fin = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de Finalización")
+
+    objects = ViajeQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Viaje"
+        verbose_name_plural = "Viajes"
+        ordering = ['-fecha_solicitud']
+        indexes = [
+            # Historial del cliente y estadísticas de su dashboard
+            models.Index(fields=['cliente', '-fecha_solicitud'], name='viaje_cliente_fecha_idx'),
+            # Viajes activos de un conductor
+            models.Index(fields=['conductor', 'estado'], name='viaje_conductor_estado_idx'),
+            # Cola de viajes sin conductor (reintentos de asignación)
+            models.Index(
+                fields=['fecha_solicitud'],
+                name='viaje_solicitado_idx',
+                condition=models.Q(estado=SOLICITADO),
+            ),
+        ]
+
+    def __str__(self):
+        return f"Viaje {self.pk} - {self.get_estado_display()}"
@@ -0,0 +1,46 @@
+from rest_framework import serializers
+
+from .models import Viaje
+
+
+class ViajeSerializer(serializers.ModelSerializer):
+    """Serializer para el modelo Viaje"""
+
+    conductor_nombre = serializers.CharField(source='conductor.get_full_name', read_only=True, default=None)
+
+    class Meta:
+        model = Viaje
+        fields = [
+            'id',
+            'cliente',
+            'conductor',
+            'conductor_nombre',
+            'origen_lat',
+            'origen_lng',
+            'origen_direccion',
+            'destino_lat',
+            'destino_lng',
+            'destino_direccion',
+            'estado',
+            'distancia_conductor_km',
+            'fecha_solicitud',
+            'fecha_asignacion',
+            'fecha_inicio',
+            'fecha_fin',
+        ]
+        read_only_fields = fields
+
+
+class ViajeCreateSerializer(serializers.ModelSerializer):
+    """Serializer para solicitar un viaje (el cliente es el usuario del request)"""
+
+    class Meta:
+        model = Viaje
+        fields = [
+            'origen_lat',
+            'origen_lng',
+            'origen_direccion',
+            'destino_lat',
+            'destino_lng',
+            'destino_direccion',
+        ]
@@ -0,0 +1,164 @@
+import threading
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from conductores.models import Conductor
+from users.models import Rol
+
+from . import despacho
+from .models import Viaje
+
+User = get_user_model()
+
+# Plaza 24 de Septiembre, Santa Cruz
+ORIGEN = (Decimal("-17.7833"), Decimal("-63.1821"))
+
+
+def crear_conductor(i, lat, lng, **kwargs):
+    datos = {
+        "nombre": f"Conductor {i}", "apellido": "Viajes", "email": f"viajes{i}@test.com",
+        "ci": f"V{i}", "nro_licencia": f"VLIC{i}", "tipo_licencia": "B",
+        "fecha_venc_licencia": date.today() + timedelta(days=365),
+        "ultima_ubicacion_lat": Decimal(lat), "ultima_ubicacion_lng": Decimal(lng),
+        "ultima_actualizacion_ubicacion": timezone.now(),
+        **kwargs,
+    }
+    return Conductor.objects.create(**datos)
+
+
+def crear_viaje(cliente):
+    return Viaje.objects.create(
+        cliente=cliente, origen_lat=ORIGEN[0], origen_lng=ORIGEN[1],
+        destino_lat=Decimal("-17.7500"), destino_lng=Decimal("-63.1500"),
+    )
+
+
+class DespachoTest(APITestCase):
+    """Asignación del conductor libre más cercano (viajes/despacho.py)"""
+
+    def setUp(self):
+        rol = Rol.objects.create(
+            nombre="Cliente viajes", permisos=["solicitar_viaje", "ver_historial_viajes", "cancelar_viaje"]
+        )
+        self.cliente = User.objects.create_user(username="cliente_viajes", email="cliente@test.com", rol=rol)
+        self.client.force_authenticate(self.cliente)
+        # ~0.5 km, ~1.5 km y ~25 km del origen
+        self.cerca = crear_conductor(1, "-17.7790", "-63.1810")
+        self.medio = crear_conductor(2, "-17.7700", "-63.1800")
+        self.lejos = crear_conductor(3, "-17.5600", "-63.1821")
+
+    def _solicitar(self):
+        return self.client.post("/api/viajes/", {
+            "origen_lat": str(ORIGEN[0]), "origen_lng": str(ORIGEN[1]),
+            "destino_lat": "-17.7500", "destino_lng": "-63.1500",
+        }, format="json")
+
+    def test_asigna_el_mas_cercano(self):
+        response = self._solicitar()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["estado"], "asignado")
+        self.assertEqual(response.data["conductor"], self.cerca.pk)
+        self.assertLess(Decimal(response.data["distancia_conductor_km"]), 1)
+        self.cerca.refresh_from_db()
+        self.assertEqual(self.cerca.estado, "ocupado")
+
+        # El siguiente viaje va al próximo disponible
+        self.assertEqual(self._solicitar().data["conductor"], self.medio.pk)
+
+    def test_excluye_no_elegibles(self):
+        self.cerca.fecha_venc_licencia = date.today() - timedelta(days=1)
+        self.cerca.save()
+        Conductor.objects.filter(pk=self.medio.pk).update(
+            ultima_actualizacion_ubicacion=timezone.now() - timedelta(hours=1)
+        )
+        # El único elegible está fuera de VIAJES_RADIO_KM: el viaje queda solicitado
+        response = self._solicitar()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["estado"], "solicitado")
+        self.assertIsNone(response.data["conductor"])
+        self.assertEqual(self.client.post(f"/api/viajes/{response.data['id']}/asignar/").status_code, 409)
+
+        with self.settings(VIAJES_RADIO_KM=30):
+            response = self.client.post(f"/api/viajes/{response.data['id']}/asignar/")
+        self.assertEqual(response.data["conductor"], self.lejos.pk)
+
+    def test_cancelar_libera_al_conductor(self):
+        viaje_id = self._solicitar().data["id"]
+        response = self.client.post(f"/api/viajes/{viaje_id}/cancelar/")
+        self.assertEqual(response.data["estado"], "cancelado")
+        self.cerca.refresh_from_db()
+        self.assertEqual(self.cerca.estado, "disponible")
+        self.assertEqual(self.client.post(f"/api/viajes/{viaje_id}/cancelar/").status_code, 409)
+
+    def test_ciclo_del_conductor_y_dashboard(self):
+        viaje_id = self._solicitar().data["id"]
+        usuario_conductor = User.objects.create_user(
+            username="conductor_viajes", email="cond@test.com", conductor=self.cerca
+        )
+        # El cliente no inicia el viaje; el conductor asignado sí
+        self.assertEqual(self.client.post(f"/api/viajes/{viaje_id}/iniciar/").status_code, 403)
+        self.client.force_authenticate(usuario_conductor)
+        self.assertEqual(self.client.post(f"/api/viajes/{viaje_id}/iniciar/").data["estado"], "en_curso")
+        self.assertEqual(self.client.post(f"/api/viajes/{viaje_id}/completar/").data["estado"], "completado")
+        self.cerca.refresh_from_db()
+        self.assertEqual(self.cerca.estado, "disponible")
+        self.assertEqual(self.client.get("/api/viajes/").data["count"], 1)
+
+        self.client.force_authenticate(self.cliente)
+        self._solicitar()
+        response = self.client.get("/api/auth/dashboard-data/")
+        self.assertEqual(response.json()["estadisticas"], {
+            "viajes_totales": 2, "viajes_pendientes": 1, "viajes_completados": 1,
+        })
+
+    def test_sin_permiso_no_solicita(self):
+        self.client.force_authenticate(User.objects.create_user(username="sin_rol", email="x@test.com"))
+        self.assertEqual(self._solicitar().status_code, 403)
+
+    @skipUnless(connections[DEFAULT_DB_ALIAS].vendor == "postgresql", "índice GiST de PostgreSQL")
+    def test_indice_espacial(self):
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute("ANALYZE conductores_conductor")
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = despacho.candidatos(*ORIGEN)[:1].explain()
+        self.assertIn("conductor_ubicacion_gist", plan)
+        # KNN: el índice entrega las filas ya ordenadas por distancia
+        self.assertIn("Order By", plan)
+        self.assertNotIn("Sort", plan)
+
+
+@skipUnless(connections[DEFAULT_DB_ALIAS].vendor == "postgresql", "SKIP LOCKED de PostgreSQL")
+class DespachoConcurrenteTest(TransactionTestCase):
+    """Despachos en paralelo (cada hilo con su conexión) nunca comparten conductor"""
+
+    def test_sin_doble_asignacion(self):
+        cliente = User.objects.create_user(username="cliente_concurrente", email="cc@test.com")
+        for i in range(4):
+            crear_conductor(i, f"-17.78{i}0", "-63.1821")
+        viajes = [crear_viaje(cliente) for _ in range(8)]
+        barrera = threading.Barrier(len(viajes))
+
+        def despachar(viaje):
+            try:
+                barrera.wait()
+                despacho.asignar(viaje)
+            finally:
+                connections.close_all()
+
+        hilos = [threading.Thread(target=despachar, args=(v,)) for v in viajes]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        asignados = list(Viaje.objects.filter(estado="asignado").values_list("conductor_id", flat=True))
+        self.assertEqual(len(asignados), 4)
+        self.assertEqual(len(set(asignados)), 4)
+        self.assertFalse(Conductor.objects.filter(estado="disponible").exists())
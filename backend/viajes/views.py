@@ -0,0 +1,133 @@
+from rest_framework import mixins, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from bitacora.utils import registrar_bitacora
+from core.replicas import LecturaReplicaMixin
+
+from . import despacho
+from .models import Viaje
+from .serializers import ViajeCreateSerializer, ViajeSerializer
+
+
+class ViajeViewSet(
+    LecturaReplicaMixin,
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Viajes: el cliente solicita (POST) y el despacho asigna en el mismo request
+    el conductor libre más cercano (ver viajes/despacho.py)
+    """
+
+    queryset = Viaje.objects.select_related('conductor')
+    serializer_class = ViajeSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_serializer_class(self):
+        """Retorna el serializer apropiado según la acción"""
+        if self.action == "create":
+            return ViajeCreateSerializer
+        return ViajeSerializer
+
+    def get_queryset(self):
+        """Viajes visibles para el usuario, filtrables por ?estado="""
+        queryset = super().get_queryset().visibles_para(self.request.user)
+        estado = self.request.query_params.get("estado")
+        if estado:
+            queryset = queryset.filter(estado=estado)
+        return queryset
+
+    def create(self, request, *args, **kwargs):
+        """Solicitar un viaje y despacharlo"""
+        if not request.user.tiene_permiso("solicitar_viaje"):
+            return Response(
+                {"error": "No tienes permisos para solicitar viajes"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        viaje = serializer.save(cliente=request.user)
+
+        registrar_bitacora(
+            request=request,
+            usuario=request.user,
+            accion="Solicitar viaje",
+            descripcion=f"Se solicitó el viaje {viaje.pk}",
+            modulo="TRANSPORTE",
+        )
+
+        # Sin conductor libre cerca el viaje queda 'solicitado' y se reintenta con asignar
+        viaje = despacho.asignar(viaje) or viaje
+        return Response(ViajeSerializer(viaje).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=["post"])
+    def asignar(self, request, pk=None):
+        """Reintentar la asignación de un viaje todavía sin conductor"""
+        viaje = self.get_object()
+        if viaje.cliente_id != request.user.pk and not request.user.tiene_permiso("gestionar_viajes"):
+            return Response(
+                {"error": "No tienes permisos para asignar este viaje"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        asignado = despacho.asignar(viaje)
+        if asignado is None:
+            return Response(
+                {"error": "No hay conductores disponibles cerca del origen o el viaje ya no está solicitado"},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(ViajeSerializer(asignado).data)
+
+    @action(detail=True, methods=["post"])
+    def cancelar(self, request, pk=None):
+        """Cancelar un viaje (libera al conductor asignado)"""
+        viaje = self.get_object()
+        es_cliente = viaje.cliente_id == request.user.pk and request.user.tiene_permiso("cancelar_viaje")
+        if not es_cliente and not request.user.tiene_permiso("gestionar_viajes"):
+            return Response(
+                {"error": "No tienes permisos para cancelar este viaje"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        return self._transicion(request, viaje, despacho.cancelar, "Cancelar viaje")
+
+    @action(detail=True, methods=["post"])
+    def iniciar(self, request, pk=None):
+        """El conductor asignado inicia el viaje"""
+        return self._del_conductor(request, despacho.iniciar, "Iniciar viaje")
+
+    @action(detail=True, methods=["post"])
+    def completar(self, request, pk=None):
+        """El conductor asignado completa el viaje (queda disponible)"""
+        return self._del_conductor(request, despacho.completar, "Completar viaje")
+
+    def _del_conductor(self, request, transicion, accion):
+        viaje = self.get_object()
+        es_conductor = viaje.conductor_id is not None and viaje.conductor_id == request.user.conductor_id
+        if not es_conductor and not request.user.tiene_permiso("gestionar_viajes"):
+            return Response(
+                {"error": "Solo el conductor asignado puede cambiar el estado del viaje"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        return self._transicion(request, viaje, transicion, accion)
+
+    def _transicion(self, request, viaje, transicion, accion):
+        actualizado = transicion(viaje)
+        if actualizado is None:
+            viaje.refresh_from_db(fields=['estado'])
+            return Response(
+                {"error": f"El viaje está {viaje.get_estado_display().lower()}"},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        registrar_bitacora(
+            request=request,
+            usuario=request.user,
+            accion=accion,
+            descripcion=f"Viaje {viaje.pk}: {actualizado.get_estado_display().lower()}",
+            modulo="TRANSPORTE",
+        )
+        return Response(ViajeSerializer(actualizado).data)
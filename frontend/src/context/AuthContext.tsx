@@ -175,9 +175,10 @@ export function AuthProvider({ children }: { children: ReactNode }) {
     try {
       const response = await authService.refreshToken(refreshToken);
       if (response.success && response.data) {
+        // El backend rota el refresh y revoca el anterior: hay que guardar el nuevo
         const newTokens = {
           access: response.data.access,
-          refresh: refreshToken,
+          refresh: response.data.refresh,
         };
         tokenUtils.saveTokens(newTokens);
       }
@@ -18,8 +18,8 @@ interface UseConductoresState {
   isDeleteModalOpen: boolean;
   filters: ConductorFilters;
   availableConductores: ConductorOption[];
-  licenciasVencidas: Conductor[];
-  licenciasPorVencer: Conductor[];
+  licenciasVencidas: PaginatedResponse<Conductor> | null;
+  licenciasPorVencer: PaginatedResponse<Conductor> | null;
 }
 
 interface UseConductoresActions {
@@ -54,8 +54,8 @@ export function useConductores(): UseConductoresState & UseConductoresActions {
     isDeleteModalOpen: false,
     filters: {},
     availableConductores: [],
-    licenciasVencidas: [],
-    licenciasPorVencer: [],
+    licenciasVencidas: null,
+    licenciasPorVencer: null,
   });
 
   const loadData = useCallback(async (filters?: ConductorFilters) => {
@@ -41,6 +41,10 @@ export default function ConductoresPage() {
     loadLicenciasPorVencer,
   } = useConductores();
 
+  // Totales del paginado (el backend devuelve una página por request)
+  const totalVencidas = licenciasVencidas?.count ?? 0;
+  const totalPorVencer = licenciasPorVencer?.count ?? 0;
+
   // Función para cargar datos con filtros y paginación
   const fetchConductores = async (pageNumber = 1, searchQuery = "", estado = "all", tipoLicencia = "all", licenciaVencida = "all") => {
     const filters: any = {
@@ -158,7 +162,7 @@ export default function ConductoresPage() {
           </CardHeader>
           <CardContent>
             <div className="text-2xl font-bold text-red-600">
-              {licenciasVencidas.length}
+              {totalVencidas}
             </div>
             <p className="text-xs text-muted-foreground">
               Requieren renovación
@@ -173,7 +177,7 @@ export default function ConductoresPage() {
           </CardHeader>
           <CardContent>
             <div className="text-2xl font-bold text-yellow-600">
-              {licenciasPorVencer.length}
+              {totalPorVencer}
             </div>
             <p className="text-xs text-muted-foreground">
               Próximas a vencer
@@ -183,7 +187,7 @@ export default function ConductoresPage() {
       </div>
 
       {/* Alertas de Licencias */}
-      {(licenciasVencidas.length > 0 || licenciasPorVencer.length > 0) && (
+      {(totalVencidas > 0 || totalPorVencer > 0) && (
         <Card className="border-yellow-200 bg-yellow-50">
           <CardHeader>
             <CardTitle className="flex items-center gap-2 text-yellow-800">
@@ -192,19 +196,19 @@ export default function ConductoresPage() {
             </CardTitle>
           </CardHeader>
           <CardContent className="space-y-2">
-            {licenciasVencidas.length > 0 && (
+            {totalVencidas > 0 && (
               <div className="flex items-center gap-2 text-red-700">
                 <AlertTriangle className="h-4 w-4" />
                 <span className="font-medium">
-                  {licenciasVencidas.length} licencia(s) vencida(s) requieren renovación inmediata
+                  {totalVencidas} licencia(s) vencida(s) requieren renovación inmediata
                 </span>
               </div>
             )}
-            {licenciasPorVencer.length > 0 && (
+            {totalPorVencer > 0 && (
               <div className="flex items-center gap-2 text-yellow-700">
                 <AlertTriangle className="h-4 w-4" />
                 <span className="font-medium">
-                  {licenciasPorVencer.length} licencia(s) próxima(s) a vencer en los próximos 30 días
+                  {totalPorVencer} licencia(s) próxima(s) a vencer en los próximos 30 días
                 </span>
               </div>
             )}
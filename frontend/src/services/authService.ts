@@ -195,8 +195,8 @@ export const authService = {
     return apiRequest("/api/auth/dashboard-data/");
   },
 
-  // Refresh token
-  async refreshToken(refreshToken: string): Promise<ApiResponse<{ access: string }>> {
+  // Refresh token (con rotación: devuelve un refresh nuevo y el anterior queda revocado)
+  async refreshToken(refreshToken: string): Promise<ApiResponse<{ access: string; refresh: string }>> {
     return apiRequest("/api/auth/token/refresh/", {
       method: "POST",
       body: JSON.stringify({ refresh: refreshToken }),
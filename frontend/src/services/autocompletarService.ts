@@ -0,0 +1,51 @@
+import { apiRequest, type ApiResponse } from './authService';
+
+// Autocompletado de los selectores del panel (GET /api/autocompletar/)
+export type RecursoAutocompletar = 'usuarios' | 'conductores' | 'personal';
+
+export interface Sugerencia {
+  id: number;
+  label: string;
+}
+
+// Espera tras la última tecla antes de pedir sugerencias
+const DEBOUNCE_MS = 150;
+
+// Requests en vuelo por URL: pedidos idénticos comparten la misma respuesta
+const enVuelo = new Map<string, Promise<ApiResponse<Sugerencia[]>>>();
+
+function pedir(url: string): Promise<ApiResponse<Sugerencia[]>> {
+  let pendiente = enVuelo.get(url);
+  if (!pendiente) {
+    pendiente = apiRequest<Sugerencia[]>(url).finally(() => enVuelo.delete(url));
+    enVuelo.set(url, pendiente);
+  }
+  return pendiente;
+}
+
+/**
+ * Crea un buscador con debounce para un recurso: las teclas dentro de DEBOUNCE_MS
+ * se agrupan en un solo request y las llamadas reemplazadas resuelven con el
+ * resultado del último texto (nunca con respuestas viejas fuera de orden).
+ */
+export function crearAutocompletar(recurso: RecursoAutocompletar, limit = 10) {
+  let timer: ReturnType<typeof setTimeout> | undefined;
+  let esperando: Array<(respuesta: ApiResponse<Sugerencia[]>) => void> = [];
+
+  return (q: string): Promise<ApiResponse<Sugerencia[]>> =>
+    new Promise((resolve) => {
+      esperando.push(resolve);
+      clearTimeout(timer);
+      timer = setTimeout(async () => {
+        const resolver = esperando;
+        esperando = [];
+        const texto = q.trim();
+        const respuesta: ApiResponse<Sugerencia[]> = texto
+          ? await pedir(
+              `/api/autocompletar/?recurso=${recurso}&q=${encodeURIComponent(texto)}&limit=${limit}`
+            )
+          : { success: true, data: [] };
+        resolver.forEach((r) => r(respuesta));
+      }, DEBOUNCE_MS);
+    });
+}
@@ -1,6 +1,7 @@
 import axios from "axios";
 import type { BitacoraLog } from "@/types/bitacora";
 import { getApiBaseUrl } from "@/lib/api";
+import { tokenUtils } from "@/lib/tokenUtils";
 
 const API_URL = `${getApiBaseUrl()}/api/bitacora/`;
 
@@ -17,8 +18,11 @@ export const getBitacora = async (
   search = "",
   rol = ""
 ): Promise<PaginatedBitacora> => {
+  // La bitácora exige un usuario con el permiso ver_bitacora
+  const token = tokenUtils.getAccessToken();
   const response = await axios.get(API_URL, {
     params: { page, search, rol }, // ahora mandamos rol al backend
+    headers: token ? { Authorization: `Bearer ${token}` } : {},
   });
   return response.data;
 };
\ No newline at end of file
@@ -158,34 +158,44 @@ export const conductoresApi = {
     return response as ApiResponse<ConductorOption[]>;
   },
 
-  // Obtener conductores con licencias próximas a vencer
-  async getLicenciasPorVencer(): Promise<ApiResponse<Conductor[]>> {
-    const response = await apiRequest('/api/conductores/licencias_por_vencer/');
+  // Obtener conductores con licencias próximas a vencer (paginado)
+  async getLicenciasPorVencer(page = 1): Promise<ApiResponse<PaginatedResponse<Conductor>>> {
+    const response = await apiRequest(`/api/conductores/licencias_por_vencer/?page=${page}`);
     
     if (response.success && response.data) {
       const data = response.data as any;
       return {
         success: true,
-        data: data.map(fromDTO),
+        data: {
+          count: data.count,
+          next: data.next,
+          previous: data.previous,
+          results: data.results.map(fromDTO),
+        },
       };
     }
     
-    return response as ApiResponse<Conductor[]>;
+    return response as ApiResponse<PaginatedResponse<Conductor>>;
   },
 
-  // Obtener conductores con licencias vencidas
-  async getLicenciasVencidas(): Promise<ApiResponse<Conductor[]>> {
-    const response = await apiRequest('/api/conductores/licencias_vencidas/');
+  // Obtener conductores con licencias vencidas (paginado)
+  async getLicenciasVencidas(page = 1): Promise<ApiResponse<PaginatedResponse<Conductor>>> {
+    const response = await apiRequest(`/api/conductores/licencias_vencidas/?page=${page}`);
     
     if (response.success && response.data) {
       const data = response.data as any;
       return {
         success: true,
-        data: data.map(fromDTO),
+        data: {
+          count: data.count,
+          next: data.next,
+          previous: data.previous,
+          results: data.results.map(fromDTO),
+        },
       };
     }
     
-    return response as ApiResponse<Conductor[]>;
+    return response as ApiResponse<PaginatedResponse<Conductor>>;
   },
 
   // Obtener estadísticas
@@ -43,6 +43,11 @@ export * from './personalService';
 // ========================================
 export * from './bitacoraService';
 
+// ========================================
+// AUTOCOMPLETADO (SELECTORES)
+// ========================================
+export * from './autocompletarService';
+
 // ========================================
 // SERVICIOS DE USUARIOS (LEGACY)
 // ========================================